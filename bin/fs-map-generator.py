@@ -13,6 +13,7 @@ Usage:
     ./bin/fs-map-generator.py                    # Validate only
     ./bin/fs-map-generator.py --regenerate       # Regenerate all fs.map files
     ./bin/fs-map-generator.py --check-drift      # Check for drift
+    ./bin/fs-map-generator.py --check-drift --incremental  # Reuse the persisted repository index
     ./bin/fs-map-generator.py --fix-drift        # Auto-fix drift
     ./bin/fs-map-generator.py --report           # Generate coverage report
 
@@ -31,6 +32,9 @@ from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 from dataclasses import dataclass, field
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'workspace' / 'tools'))
+from path_tools.repo_index import RepoIndex  # noqa: E402
+
 
 def normalize_physical_path(physical_path: str) -> str:
     """Normalize physical paths for consistent coverage calculations.
@@ -51,6 +55,7 @@ def normalize_physical_path(physical_path: str) -> str:
 
     return normalized or '.'
 
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -70,6 +75,12 @@ class GeneratorConfig:
     # Maximum depth for directory scanning
     max_depth: int = 4
 
+    # Top-level subtrees are indexed in parallel
+    workers: int = field(default_factory=lambda: min(8, (os.cpu_count() or 1) + 2))
+
+    # Repository index persisted by --incremental (relative to repo_root)
+    index_file: str = '.cache/fs-map-generator/index.json'
+
     # Module boundary markers (files that indicate a module boundary)
     module_markers: Set[str] = field(default_factory=lambda: {
         'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod',
@@ -142,27 +153,82 @@ def compute_coverage_percentage(total_dirs: int, mapped_count: int) -> float:
     return round((mapped_count / total_dirs) * 100, 2)
 
 
+# =============================================================================
+# Directory Listings
+# =============================================================================
+
+class ExcludeMatcher:
+    """Exclusion patterns compiled once into exact-name and suffix lookups"""
+
+    def __init__(self, patterns: Set[str]):
+        self.names = frozenset(p for p in patterns if not p.startswith('*'))
+        self.suffixes = tuple(p[1:] for p in patterns if p.startswith('*'))
+
+    def __call__(self, name: str) -> bool:
+        return name in self.names or (bool(self.suffixes) and name.endswith(self.suffixes))
+
+
+@dataclass
+class DirListing:
+    """Children of a single directory, grouped from the repository index"""
+    subdirs: List[str] = field(default_factory=list)
+    links: Dict[str, str] = field(default_factory=dict)  # symlinked subdir -> target path
+    files: List[str] = field(default_factory=list)
+
+
+def parse_fsmap_paths(fsmap_file: Path) -> List[str]:
+    """Return the normalized physical paths listed in an fs.map file"""
+    paths = []
+    try:
+        with open(fsmap_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and ':' in line:
+                    parts = line.split(':')
+                    if len(parts) >= 2:
+                        path = normalize_physical_path(parts[1])
+                        if path:
+                            paths.append(path)
+    except Exception:
+        pass
+    return paths
+
+
 # =============================================================================
 # Directory Scanner
 # =============================================================================
 
 class DirectoryScanner:
-    """Scans repository and identifies module boundaries"""
+    """Scans repository and identifies module boundaries
 
-    def __init__(self, config: GeneratorConfig):
+    The walk is a refresh of the shared RepoIndex (workspace/tools/path_tools),
+    with exact-name exclusions pruned by the index and top-level subtrees
+    indexed in parallel. Symlinked directories are recorded by the index but
+    not followed; the scanner expands them from their target's listing, only
+    within ``max_depth``.
+    """
+
+    def __init__(self, config: GeneratorConfig, incremental: bool = False):
         self.config = config
+        self.exclude = ExcludeMatcher(config.exclude_patterns)
+        # --incremental persists the index, so unchanged entries are reused
+        self.index = RepoIndex(
+            config.repo_root,
+            cache_path=config.repo_root / config.index_file,
+            exclude_dirs=self.exclude.names,
+            persist=incremental,
+            record_links=True,
+        )
         self.directories: Dict[str, DirectoryInfo] = {}
+        self.listings: Dict[str, DirListing] = {}
+        # fs.map files found anywhere below the root (not through symlinks)
+        self.fsmap_files: List[str] = []
+        # All non-excluded directories below the root, at any depth
+        self.total_directories = 0
 
     def should_exclude(self, path: Path) -> bool:
         """Check if path should be excluded"""
-        name = path.name
-        for pattern in self.config.exclude_patterns:
-            if pattern.startswith('*'):
-                if name.endswith(pattern[1:]):
-                    return True
-            elif name == pattern:
-                return True
-        return False
+        return self.exclude(path.name)
 
     def get_relative_path(self, path: Path) -> str:
         """Get path relative to repo root"""
@@ -184,16 +250,20 @@ class DirectoryScanner:
             name = 'root'
         return name.lower()
 
-    def is_module_boundary(self, path: Path, relative_path: str) -> Tuple[bool, Optional[str]]:
-        """Check if directory is a module boundary"""
+    def is_module_boundary(self, path: Path, relative_path: str,
+                           names: Optional[Set[str]] = None) -> Tuple[bool, Optional[str]]:
+        """Check if directory is a module boundary
+
+        ``names`` is the directory listing when already known, which avoids
+        one stat per marker.
+        """
         # Check if in force list
         if relative_path in self.config.force_module_dirs:
             return True, 'force_module'
 
         # Check for marker files
         for marker in self.config.module_markers:
-            marker_path = path / marker
-            if marker_path.exists():
+            if (marker in names) if names is not None else (path / marker).exists():
                 return True, marker
 
         return False, None
@@ -201,50 +271,93 @@ class DirectoryScanner:
     def scan(self) -> Dict[str, DirectoryInfo]:
         """Scan repository and return directory info"""
         self.directories = {}
-        self._scan_recursive(self.config.repo_root, 0)
+        self.listings = {}
+        self.fsmap_files = []
+        self.total_directories = 0
+
+        if self.should_exclude(self.config.repo_root.resolve()):
+            return self.directories
+
+        self.index.refresh(workers=max(1, self.config.workers))
+        self.listings = self._build_listings()
+        self._assemble('', '', 0, False)
         return self.directories
 
-    def _scan_recursive(self, path: Path, depth: int):
-        """Recursively scan directories"""
-        if depth > self.config.max_depth:
-            return
+    def _build_listings(self) -> Dict[str, DirListing]:
+        """Group indexed entries into sorted per-directory listings"""
+        listings: Dict[str, DirListing] = {'': DirListing()}
+        for entry in self.index.iter_entries(links=True):
+            if entry.is_dir and entry.link is None:
+                listings.setdefault(entry.path, DirListing())
+            listing = listings.setdefault(entry.parent, DirListing())
+            if not entry.is_dir:
+                listing.files.append(entry.name)
+            else:
+                listing.subdirs.append(entry.name)
+                if entry.link is not None:
+                    listing.links[entry.name] = entry.link
+        for listing in listings.values():
+            listing.subdirs.sort()
+            listing.files.sort()
+        return listings
+
+    def _children(self, rel: str, real: str, depth: int, via_link: bool, listing: DirListing):
+        """Yield (path, real path, depth, via_link) of the subdirectories to descend into
+
+        Symlinked directories are followed only within ``max_depth`` (as the
+        module scan does); below that only real directories are walked, so
+        fs.map discovery and coverage never loop through links.
+        """
+        for name in listing.subdirs:
+            if self.exclude(name):
+                continue
+            target = listing.links.get(name)
+            is_link = via_link or target is not None
+            if is_link and depth + 1 > self.config.max_depth:
+                continue
+            if target is None:
+                target = f"{real}/{name}" if real else name
+            yield (f"{rel}/{name}" if rel else name, target, depth + 1, is_link)
+
+    def _assemble(self, rel: str, real: str, depth: int, via_link: bool):
+        """Build DirectoryInfo entries (children before parents, sorted)"""
+        # A link into an excluded or unindexed tree is reported as empty
+        listing = self.listings.get(real) or DirListing()
+
+        if not via_link and 'fs.map' in listing.files:
+            self.fsmap_files.append(f"{rel}/fs.map" if rel else 'fs.map')
 
-        if self.should_exclude(path):
-            return
+        subdirs = []
+        for child, child_real, child_depth, child_via_link in self._children(rel, real, depth, via_link, listing):
+            subdirs.append(child.rsplit('/', 1)[-1])
+            if not via_link:
+                self.total_directories += 1
+            self._assemble(child, child_real, child_depth, child_via_link)
 
-        relative_path = self.get_relative_path(path)
-        if relative_path == '.':
-            relative_path = ''
+        if depth > self.config.max_depth:
+            return
 
-        logical_name = self.path_to_logical_name(relative_path) if relative_path else 'root'
-        is_boundary, marker = self.is_module_boundary(path, relative_path)
+        if depth == self.config.max_depth:
+            # Listed children beyond max_depth are still reported as subdirs
+            subdirs = [name for name in listing.subdirs if not self.exclude(name)]
 
-        subdirs = []
-        files = []
+        relative_path = rel or '.'
+        path = self.config.repo_root / rel if rel else self.config.repo_root
+        is_boundary, marker = self.is_module_boundary(
+            path, rel, set(listing.subdirs).union(listing.files)
+        )
 
-        try:
-            for item in sorted(path.iterdir()):
-                if item.is_dir() and not self.should_exclude(item):
-                    subdirs.append(item.name)
-                    self._scan_recursive(item, depth + 1)
-                elif item.is_file():
-                    files.append(item.name)
-        except PermissionError:
-            pass
-
-        dir_info = DirectoryInfo(
+        self.directories[relative_path] = DirectoryInfo(
             path=path,
-            relative_path=relative_path or '.',
-            logical_name=logical_name,
+            relative_path=relative_path,
+            logical_name=self.path_to_logical_name(rel) if rel else 'root',
             depth=depth,
             is_module_boundary=is_boundary,
             has_marker=marker,
             subdirs=subdirs,
-            files=files
+            files=list(listing.files)
         )
 
-        self.directories[relative_path or '.'] = dir_info
-
 
 # =============================================================================
 # fs.map Generator
@@ -306,15 +419,29 @@ class FsMapGenerator:
         self.generated_maps = {}
 
         # Find all module boundaries
-        module_boundaries = [
-            (rel_path, dir_info)
+        module_entries: Dict[str, List[FsMapEntry]] = {
+            rel_path: []
             for rel_path, dir_info in self.scanner.directories.items()
             if dir_info.is_module_boundary
-        ]
+        }
+
+        # Single pass: a directory belongs to its own module and to module
+        # boundaries up to three levels above it (same rule as
+        # generate_module_fsmap, without rescanning all directories per module)
+        for rel_path, dir_info in self.scanner.directories.items():
+            parts = rel_path.split('/')
+            owners = [rel_path] if rel_path in module_entries else []
+            for up in range(1, min(3, len(parts) - 1) + 1):
+                ancestor = '/'.join(parts[:-up])
+                if ancestor in module_entries:
+                    owners.append(ancestor)
+            if owners:
+                entry = self.generate_entry(dir_info)
+                for owner in owners:
+                    module_entries[owner].append(entry)
 
         # Generate fs.map for each module boundary
-        for rel_path, dir_info in module_boundaries:
-            entries = self.generate_module_fsmap(rel_path)
+        for rel_path, entries in module_entries.items():
             if entries:
                 fsmap_path = f"{rel_path}/fs.map" if rel_path != '.' else 'root.fs.map'
                 self.generated_maps[fsmap_path] = entries
@@ -367,8 +494,9 @@ class FsMapGenerator:
 class IndexUpdater:
     """Updates root.fs.index with discovered fs.map files"""
 
-    def __init__(self, config: GeneratorConfig):
+    def __init__(self, config: GeneratorConfig, scanner: Optional[DirectoryScanner] = None):
         self.config = config
+        self.scanner = scanner
         self.index_path = config.repo_root / 'root.fs.index'
 
     def update_index(self, generated_maps: Dict[str, List[FsMapEntry]]):
@@ -424,10 +552,11 @@ class IndexUpdater:
 
     def _calculate_coverage(self, generated_maps: Dict[str, List[FsMapEntry]]) -> float:
         """Calculate coverage percentage"""
-        total_dirs = len([
-            d for d in self.config.repo_root.rglob('*')
-            if d.is_dir() and not any(p in str(d) for p in self.config.exclude_patterns)
-        ])
+        scanner = self.scanner
+        if scanner is None or not scanner.listings:
+            scanner = DirectoryScanner(self.config)
+            scanner.scan()
+        total_dirs = scanner.total_directories
 
         mapped_dirs = get_mapped_directories(generated_maps)
 
@@ -672,21 +801,9 @@ class DriftChecker:
     def _get_mapped_directories(self) -> Set[str]:
         """Get all directories currently in fs.map files"""
         mapped = set()
-
-        for fsmap_file in self.config.repo_root.rglob('fs.map'):
-            try:
-                with open(fsmap_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and ':' in line:
-                            parts = line.split(':')
-                            if len(parts) >= 2:
-                                path = normalize_physical_path(parts[1])
-                                if path:
-                                    mapped.add(path)
-            except Exception:
-                pass
-
+        # fs.map locations come from the scanner's walk
+        for rel_path in self.scanner.fsmap_files:
+            mapped.update(parse_fsmap_paths(self.config.repo_root / rel_path))
         return mapped
 
     def has_drift(self) -> bool:
@@ -777,6 +894,7 @@ Examples:
     ./bin/fs-map-generator.py                    # Validate only
     ./bin/fs-map-generator.py --regenerate       # Regenerate all fs.map files
     ./bin/fs-map-generator.py --check-drift      # Check for drift
+    ./bin/fs-map-generator.py --check-drift --incremental  # Reuse the persisted repository index
     ./bin/fs-map-generator.py --fix-drift        # Auto-fix drift
     ./bin/fs-map-generator.py --report           # Generate coverage report
         """
@@ -796,16 +914,27 @@ Examples:
                        help='Verbose output')
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be done without making changes')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Persist the repository index and reuse unchanged entries between runs')
+    parser.add_argument('--jobs', '-j', type=int,
+                       help='Number of parallel scan workers')
 
     args = parser.parse_args()
 
     # Initialize
     config = GeneratorConfig()
-    scanner = DirectoryScanner(config)
+    if args.jobs:
+        config.workers = args.jobs
+
+    scanner = DirectoryScanner(config, incremental=args.incremental)
 
     print("🔍 Scanning repository structure...")
     directories = scanner.scan()
     print(f"   Found {len(directories)} directories")
+    if args.incremental:
+        changes = scanner.index.last_refresh
+        print(f"   Index: {changes.added} added, {changes.changed} changed, "
+              f"{changes.removed} removed of {changes.total} entries (incremental)")
 
     module_boundaries = [d for d in directories.values() if d.is_module_boundary]
     print(f"   Detected {len(module_boundaries)} module boundaries")
@@ -819,6 +948,8 @@ Examples:
     drift_checker = DriftChecker(config, scanner)
     drift_report = drift_checker.check_drift()
 
+    scanner.index.save()
+
     if args.check_drift:
         print("\n📊 Drift Report:")
         if drift_report['new_directories']:
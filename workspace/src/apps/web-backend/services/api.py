@@ -7,12 +7,16 @@
 ============================================================================
 """
 
+import asyncio
+import json
 import logging
-from datetime import datetime
+from collections.abc import Callable
+from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 # from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
@@ -21,6 +25,13 @@ from .code_analyzer import (
     AnalysisStrategy,
     CodeAnalysisEngine,
 )
+from .job_store import (
+    FINISHED_STATUSES,
+    JobStatus,
+    JobStore,
+    JobWorkerPool,
+    default_job_store_path,
+)
 
 # ============================================================================
 # API 數據模型
@@ -32,6 +43,7 @@ class AnalysisRequest(BaseModel):
     commit_hash: str = Field(..., description="提交哈希")
     branch: str = Field(default="main", description="分支名稱")
     strategy: str = Field(default="STANDARD", description="分析策略")
+    base_commit: str | None = Field(default=None, description="基準提交，僅分析相對其變更的文件")
 
     class Config:
         schema_extra = {
@@ -39,7 +51,8 @@ class AnalysisRequest(BaseModel):
                 "repository": "https://github.com/example/repo",
                 "commit_hash": "abc123",
                 "branch": "main",
-                "strategy": "STANDARD"
+                "strategy": "STANDARD",
+                "base_commit": "def456"
             }
         }
 
@@ -49,6 +62,7 @@ class AnalysisResponse(BaseModel):
     analysis_id: str
     status: str
     message: str
+    progress: dict[str, Any] | None = None
     result: dict[str, Any] | None = None
 
 
@@ -84,8 +98,9 @@ app.add_middleware(
 # 全局分析引擎實例
 analysis_engine: CodeAnalysisEngine | None = None
 
-# 分析任務存儲（生產環境應使用 Redis 或數據庫）
-analysis_tasks: dict[str, dict[str, Any]] = {}
+# 分析任務存儲 (SQLite) 與有界工作池，請求處理只負責入隊
+job_store: JobStore | None = None
+job_pool: JobWorkerPool | None = None
 
 
 # ============================================================================
@@ -95,12 +110,26 @@ analysis_tasks: dict[str, dict[str, Any]] = {}
 @app.on_event("startup")
 async def startup_event():
     """應用啟動事件"""
-    global analysis_engine
+    global analysis_engine, job_store, job_pool
     config = {
         'max_workers': 4,
         'cache_enabled': True,
+        'job_concurrency': 2,
+        'job_compact_after_hours': 24,
+        'job_retention_days': 30,
+        'job_max_finished': 10000,
     }
     analysis_engine = CodeAnalysisEngine(config)
+    job_store = JobStore(default_job_store_path(config))
+    job_pool = JobWorkerPool(
+        job_store,
+        run_analysis,
+        concurrency=config['job_concurrency'],
+        compact_after=timedelta(hours=config['job_compact_after_hours']),
+        max_age=timedelta(days=config['job_retention_days']),
+        max_finished=config['job_max_finished'],
+    )
+    job_pool.start()
     logging.info("Code Analysis Engine initialized")
 
 
@@ -108,6 +137,11 @@ async def startup_event():
 async def shutdown_event():
     """應用關閉事件"""
     logging.info("Code Analysis API shutting down")
+    # 工作池停止時釋放運行中的任務，由下一個工作者重新領取
+    if job_pool:
+        await job_pool.stop()
+    if job_store:
+        job_store.close()
 
 
 # ============================================================================
@@ -136,10 +170,7 @@ async def health_check():
 
 
 @app.post("/api/v1/analyze", response_model=AnalysisResponse)
-async def analyze_code(
-    request: AnalysisRequest,
-    background_tasks: BackgroundTasks
-):
+async def analyze_code(request: AnalysisRequest):
     """
     提交代碼分析任務
     
@@ -147,38 +178,23 @@ async def analyze_code(
     - **commit_hash**: 提交哈希
     - **branch**: 分支名稱（默認 main）
     - **strategy**: 分析策略（QUICK/STANDARD/DEEP/COMPREHENSIVE）
+    - **base_commit**: 基準提交（可選），未變更文件重用既有結果
     """
-    if not analysis_engine:
+    if not analysis_engine or not job_store:
         raise HTTPException(status_code=503, detail="Analysis engine not initialized")
 
     # 驗證策略
     try:
-        strategy = AnalysisStrategy[request.strategy.upper()]
+        AnalysisStrategy[request.strategy.upper()]
     except KeyError:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid strategy. Must be one of: {[s.value for s in AnalysisStrategy]}"
         )
 
-    # 生成分析 ID
-    import uuid
-    analysis_id = str(uuid.uuid4())
-
-    # 記錄任務
-    analysis_tasks[analysis_id] = {
-        "status": "pending",
-        "request": request.dict(),
-        "created_at": datetime.utcnow().isoformat()
-    }
-
-    # 在背景執行分析
-    background_tasks.add_task(
-        run_analysis,
-        analysis_id,
-        request.repository,
-        request.commit_hash,
-        strategy
-    )
+    # 持久化入隊，由工作池按並發上限執行 (存儲讀寫在線程中進行，不阻塞事件循環)
+    analysis_id = await asyncio.to_thread(job_store.submit, request.dict())
+    job_pool.notify()
 
     return AnalysisResponse(
         analysis_id=analysis_id,
@@ -194,43 +210,80 @@ async def get_analysis_result(analysis_id: str):
     
     - **analysis_id**: 分析任務 ID
     """
-    if analysis_id not in analysis_tasks:
+    task = await asyncio.to_thread(job_store.get, analysis_id) if job_store else None
+    if task is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    task = analysis_tasks[analysis_id]
-
     return AnalysisResponse(
         analysis_id=analysis_id,
         status=task["status"],
-        message=task.get("message", ""),
-        result=task.get("result")
+        message=task["message"],
+        progress=task["progress"],
+        result=task["result"]
     )
 
 
+@app.get("/api/v1/analyze/{analysis_id}/events")
+async def stream_analysis_progress(
+    analysis_id: str,
+    interval: float = Query(default=0.5, ge=0.1, le=10.0)
+):
+    """
+    以 Server-Sent Events 串流分析進度
+    
+    - **analysis_id**: 分析任務 ID
+    - **interval**: 輪詢間隔（秒）
+    
+    進度變化時推送 `progress` 事件，任務結束時推送 `status` 事件後關閉。
+    """
+    if not job_store or await asyncio.to_thread(job_store.get, analysis_id, False) is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    async def events():
+        last_progress = None
+        while True:
+            task = await asyncio.to_thread(job_store.get, analysis_id, False)
+            if task is None:
+                return
+            progress = task["progress"]
+            if progress is not None and progress != last_progress:
+                last_progress = progress
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+            if task["status"] in FINISHED_STATUSES:
+                payload = {"status": task["status"], "message": task["message"]}
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+                return
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.get("/api/v1/analyze", response_model=list[dict[str, Any]])
 async def list_analyses(
     limit: int = Query(default=10, le=100),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    status: JobStatus | None = Query(default=None)
 ):
     """
     列出分析任務
     
     - **limit**: 返回數量限制（最大 100）
     - **offset**: 偏移量
+    - **status**: 按狀態過濾（可選）
     """
-    tasks = list(analysis_tasks.items())
-    tasks.sort(key=lambda x: x[1].get("created_at", ""), reverse=True)
+    if not job_store:
+        raise HTTPException(status_code=503, detail="Analysis engine not initialized")
 
-    paginated = tasks[offset:offset + limit]
+    tasks = await asyncio.to_thread(job_store.list, limit, offset, status.value if status else None)
 
     return [
         {
-            "analysis_id": task_id,
+            "analysis_id": task["id"],
             "status": task["status"],
-            "created_at": task.get("created_at"),
-            "repository": task["request"].get("repository")
+            "created_at": task["created_at"],
+            "repository": task["repository"]
         }
-        for task_id, task in paginated
+        for task in tasks
     ]
 
 
@@ -241,31 +294,23 @@ async def delete_analysis(analysis_id: str):
     
     - **analysis_id**: 分析任務 ID
     """
-    if analysis_id not in analysis_tasks:
+    if not job_store or not await asyncio.to_thread(job_store.delete, analysis_id):
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    del analysis_tasks[analysis_id]
-
     return {"message": "Analysis deleted successfully"}
 
 
 @app.get("/api/v1/metrics")
 async def get_metrics():
     """獲取引擎指標"""
-    if not analysis_engine:
+    if not analysis_engine or not job_store:
         raise HTTPException(status_code=503, detail="Analysis engine not initialized")
 
     metrics = analysis_engine.get_metrics()
 
     return {
         "engine_metrics": metrics,
-        "task_stats": {
-            "total": len(analysis_tasks),
-            "pending": sum(1 for t in analysis_tasks.values() if t["status"] == "pending"),
-            "running": sum(1 for t in analysis_tasks.values() if t["status"] == "running"),
-            "completed": sum(1 for t in analysis_tasks.values() if t["status"] == "completed"),
-            "failed": sum(1 for t in analysis_tasks.values() if t["status"] == "failed"),
-        }
+        "task_stats": await asyncio.to_thread(job_store.counts)
     }
 
 
@@ -281,7 +326,6 @@ async def get_language_governance():
     - 歷史記錄
     - 指標統計
     """
-    import json
     from pathlib import Path
 
     import yaml
@@ -460,74 +504,60 @@ async def get_language_governance():
 
 
 # ============================================================================
-# 背景任務
+# 分析任務 (由工作池執行)
 # ============================================================================
 
 async def run_analysis(
-    analysis_id: str,
-    repository: str,
-    commit_hash: str,
-    strategy: AnalysisStrategy
-):
-    """執行分析任務"""
-    try:
-        # 更新狀態為運行中
-        analysis_tasks[analysis_id]["status"] = "running"
-        analysis_tasks[analysis_id]["started_at"] = datetime.utcnow().isoformat()
-
-        # 執行分析
-        result = await analysis_engine.analyze_repository(
-            repo_path=repository,
-            commit_hash=commit_hash,
-            strategy=strategy
-        )
-
-        # 轉換結果為可序列化格式
-        result_dict = {
-            "id": result.id,
-            "repository": result.repository,
-            "commit_hash": result.commit_hash,
-            "branch": result.branch,
-            "analysis_timestamp": result.analysis_timestamp.isoformat(),
-            "duration": result.duration,
-            "strategy": result.strategy.value,
-            "total_issues": result.total_issues,
-            "critical_issues": result.critical_issues,
-            "quality_score": result.quality_score,
-            "risk_level": result.risk_level,
-            "files_analyzed": result.files_analyzed,
-            "languages_detected": list(result.languages_detected),
-            "issues": [
-                {
-                    "id": issue.id,
-                    "type": issue.type.value,
-                    "severity": issue.severity.value,
-                    "file": issue.file,
-                    "line": issue.line,
-                    "message": issue.message,
-                    "description": issue.description,
-                    "suggestion": issue.suggestion,
-                    "tags": issue.tags,
-                    "confidence": issue.confidence,
-                }
-                for issue in result.issues[:100]  # 限制返回數量
-            ],
-            "metrics": result.metrics.to_dict()
-        }
+    job: dict[str, Any],
+    report_progress: Callable[[dict[str, Any]], None]
+) -> dict[str, Any]:
+    """執行分析任務 (由工作池調用，狀態與結果由任務存儲記錄)"""
+    request = job["request"]
+    base_commit = request.get("base_commit")
+
+    # 執行分析
+    result = await analysis_engine.analyze_repository(
+        repo_path=request["repository"],
+        commit_hash=request["commit_hash"],
+        strategy=AnalysisStrategy[request["strategy"].upper()],
+        progress_callback=report_progress,
+        base_commit=base_commit
+    )
 
-        # 更新狀態為完成
-        analysis_tasks[analysis_id]["status"] = "completed"
-        analysis_tasks[analysis_id]["result"] = result_dict
-        analysis_tasks[analysis_id]["completed_at"] = datetime.utcnow().isoformat()
-        analysis_tasks[analysis_id]["message"] = "Analysis completed successfully"
-
-    except Exception as e:
-        # 更新狀態為失敗
-        analysis_tasks[analysis_id]["status"] = "failed"
-        analysis_tasks[analysis_id]["error"] = str(e)
-        analysis_tasks[analysis_id]["completed_at"] = datetime.utcnow().isoformat()
-        analysis_tasks[analysis_id]["message"] = f"Analysis failed: {str(e)}"
-        logging.error(f"Analysis {analysis_id} failed: {e}", exc_info=True)
+    # 轉換結果為可序列化格式
+    return {
+        "id": result.id,
+        "repository": result.repository,
+        "commit_hash": result.commit_hash,
+        "branch": result.branch,
+        "analysis_timestamp": result.analysis_timestamp.isoformat(),
+        "duration": result.duration,
+        "strategy": result.strategy.value,
+        "total_issues": result.total_issues,
+        "critical_issues": result.critical_issues,
+        "quality_score": result.quality_score,
+        "risk_level": result.risk_level,
+        "files_analyzed": result.files_analyzed,
+        "files_reused": result.files_reused,
+        "base_commit": base_commit,
+        "languages_detected": list(result.languages_detected),
+        "issues": [
+            {
+                "id": issue.id,
+                "type": issue.type.value,
+                "severity": issue.severity.value,
+                "file": issue.file,
+                "line": issue.line,
+                "message": issue.message,
+                "description": issue.description,
+                "suggestion": issue.suggestion,
+                "tags": issue.tags,
+                "confidence": issue.confidence,
+            }
+            for issue in result.issues[:100]  # 限制返回數量
+        ],
+        "metrics": result.metrics.to_dict()
+    }
 
 
 # ============================================================================
@@ -13,13 +13,18 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
 import re
+import subprocess
+import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
-from typing import Any
+from pathlib import Path
+from typing import Any, Protocol
 
 # ============================================================================
 # 增強型數據模型
@@ -101,6 +106,26 @@ class CodeIssue:
         }
         return severity_scores.get(self.severity, 5.0) * self.confidence
 
+    def to_dict(self) -> dict[str, Any]:
+        """序列化為 JSON 兼容字典"""
+        data = asdict(self)
+        data['type'] = self.type.value
+        data['severity'] = self.severity.value
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], file_path: str | None = None) -> 'CodeIssue':
+        """從 to_dict 的輸出還原；指定 file_path 時覆寫文件路徑並生成新 ID"""
+        data = dict(data)
+        data['type'] = IssueType(data['type'])
+        data['severity'] = SeverityLevel(data['severity'])
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        if file_path is not None:
+            data['file'] = file_path
+            data.pop('id', None)
+        return cls(**data)
+
 
 @dataclass
 class AnalysisResult:
@@ -124,6 +149,7 @@ class AnalysisResult:
         documentation_ratio=0.0
     ))
     files_analyzed: int = 0
+    files_reused: int = 0
     languages_detected: set[str] = field(default_factory=set)
     dependencies: dict[str, str] = field(default_factory=dict)
 
@@ -160,6 +186,131 @@ class AnalysisResult:
             return "LOW"
 
 
+# ============================================================================
+# 語言檢測
+# ============================================================================
+
+LANGUAGE_EXTENSIONS: dict[str, str] = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'javascript',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.cc': 'cpp',
+    '.h': 'cpp',
+}
+
+# 各語言的單行註釋前綴 (用於文檔比率)
+COMMENT_PREFIXES: dict[str, tuple[str, ...]] = {
+    'python': ('#',),
+    'javascript': ('//', '/*', '*'),
+    'go': ('//', '/*', '*'),
+    'rust': ('//', '/*', '*'),
+    'java': ('//', '/*', '*'),
+    'cpp': ('//', '/*', '*'),
+}
+
+
+def detect_language(file_path: str) -> str:
+    """根據擴展名檢測編程語言"""
+    return LANGUAGE_EXTENSIONS.get(os.path.splitext(file_path)[1], 'unknown')
+
+
+class LinePatternSet:
+    """逐行正則集合 - 預編譯，並先以合併模式整體預篩，命中的行才逐一套用各模式"""
+
+    def __init__(self, patterns: list[tuple[str, Any]], flags: int = re.IGNORECASE):
+        self.patterns = [(re.compile(pattern, flags), tag) for pattern, tag in patterns]
+        self.combined = re.compile('|'.join(f'(?:{pattern})' for pattern, _ in patterns), flags)
+
+    def scan(self, code: str) -> Iterator[tuple[int, str, Any]]:
+        """按行順序產出 (行號, 行內容, 標籤)；同一行可命中多個模式"""
+        if not self.combined.search(code):
+            return
+        for line_num, line in enumerate(code.split('\n'), 1):
+            if not self.combined.search(line):
+                continue
+            for pattern, tag in self.patterns:
+                if pattern.search(line):
+                    yield line_num, line, tag
+
+
+# ============================================================================
+# 內容尋址結果存儲
+# ============================================================================
+
+def git_blob_hash(data: bytes) -> str:
+    """計算與 git 相同的 blob 哈希，可直接對應 git ls-tree 的輸出"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class ResultStore(Protocol):
+    """結果存儲接口 - 值為 JSON 兼容數據"""
+
+    def get(self, key: str) -> Any | None: ...
+
+    def put(self, key: str, value: Any) -> None: ...
+
+
+class DiskResultStore:
+    """
+    本地磁盤結果存儲 (默認，無需 Redis)
+
+    鍵經 SHA-1 映射到兩級目錄下的 JSON 文件；寫入使用臨時文件加
+    os.replace，多個工作進程可安全並發寫入。
+    """
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest[2:]}.json"
+
+    def get(self, key: str) -> Any | None:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class RedisResultStore:
+    """Redis 結果存儲 - 包裝現有的 cache_client (get/setex)"""
+
+    def __init__(self, client: Any, ttl: int = 3600):
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key: str) -> Any | None:
+        raw = self.client.get(key)
+        return json.loads(raw) if raw else None
+
+    def put(self, key: str, value: Any) -> None:
+        self.client.setex(key, self.ttl, json.dumps(value))
+
+
+def default_result_store(config: dict[str, Any]) -> DiskResultStore | None:
+    """按配置建立默認存儲：result_store=False 停用；否則使用 result_store_dir 或 ~/.cache/code-analysis"""
+    if config.get('result_store', True) is False:
+        return None
+    root = config.get('result_store_dir')
+    if not root:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'code-analysis')
+    return DiskResultStore(root)
+
+
 # ============================================================================
 # 分析器基類 - 增強版
 # ============================================================================
@@ -167,10 +318,21 @@ class AnalysisResult:
 class BaseAnalyzer:
     """分析器基類 - 支持異步、緩存、監控"""
 
-    def __init__(self, config: dict[str, Any], cache_client: Any | None = None):
+    # 分析邏輯變更時遞增，使既有結果失效
+    version = "1"
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        cache_client: Any | None = None,
+        result_store: ResultStore | None = None
+    ):
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
         self.cache_client = cache_client
+        if result_store is None and cache_client is not None:
+            result_store = RedisResultStore(cache_client)
+        self.result_store = result_store
         self.metrics = {
             'analyses_completed': 0,
             'issues_found': 0,
@@ -179,22 +341,28 @@ class BaseAnalyzer:
             'cache_misses': 0
         }
 
-    def _get_cache_key(self, code: str, file_path: str) -> str:
-        """生成緩存鍵"""
-        content = f"{code}:{file_path}"
-        return f"analysis:{hashlib.md5(content.encode()).hexdigest()}"
+    def _get_cache_key(
+        self,
+        code: str,
+        file_path: str,
+        strategy: AnalysisStrategy = AnalysisStrategy.STANDARD
+    ) -> str:
+        """生成緩存鍵 - 內容 blob 哈希 + 分析器版本 (路徑只取擴展名，相同內容可跨路徑重用)"""
+        blob = git_blob_hash(code.encode('utf-8', errors='replace'))
+        extension = os.path.splitext(file_path)[1]
+        return f"analysis:{self.__class__.__name__}:{self.version}:{strategy.value}:{extension}:{blob}"
 
     async def analyze(self, code: str, file_path: str, strategy: AnalysisStrategy = AnalysisStrategy.STANDARD) -> list[CodeIssue]:
         """分析代碼 - 支持緩存"""
-        cache_key = self._get_cache_key(code, file_path)
+        cache_key = self._get_cache_key(code, file_path, strategy)
 
         # 嘗試從緩存獲取
-        if self.cache_client:
+        if self.result_store:
             try:
-                cached = self.cache_client.get(cache_key)
-                if cached:
+                cached = self.result_store.get(cache_key)
+                if cached is not None:
                     self.metrics['cache_hits'] += 1
-                    return [CodeIssue(**issue) for issue in json.loads(cached)]
+                    return [CodeIssue.from_dict(issue, file_path) for issue in cached]
             except Exception as e:
                 self.logger.warning(f"Cache retrieval failed: {e}")
             self.metrics['cache_misses'] += 1
@@ -203,10 +371,9 @@ class BaseAnalyzer:
         issues = await self._perform_analysis(code, file_path, strategy)
 
         # 存儲到緩存
-        if self.cache_client:
+        if self.result_store:
             try:
-                cache_data = json.dumps([asdict(issue) for issue in issues], default=str)
-                self.cache_client.setex(cache_key, 3600, cache_data)  # 1 小時過期
+                self.result_store.put(cache_key, [issue.to_dict() for issue in issues])
             except Exception as e:
                 self.logger.warning(f"Cache storage failed: {e}")
 
@@ -383,8 +550,49 @@ class CppAnalyzer(BaseAnalyzer):
 class StaticAnalyzer(BaseAnalyzer):
     """靜態代碼分析 - 支持多語言、多工具"""
 
-    def __init__(self, config: dict[str, Any], cache_client: Any | None = None):
-        super().__init__(config, cache_client)
+    # 逐行檢測模式 (預編譯並整體預篩)
+    SECRET_PATTERNS = LinePatternSet([
+        (r"password\s*=\s*['\"][^'\"]+['\"]", "Password"),
+        (r"api_key\s*=\s*['\"][^'\"]+['\"]", "API Key"),
+        (r"secret\s*=\s*['\"][^'\"]+['\"]", "Secret"),
+        (r"token\s*=\s*['\"][^'\"]+['\"]", "Token"),
+        (r"private_key\s*=\s*['\"]", "Private Key"),
+        (r"aws_secret_access_key\s*=\s*['\"]", "AWS Secret"),
+    ])
+    SQL_INJECTION_PATTERNS = LinePatternSet([
+        (r"(query|execute|sql)\s*=\s*['\"].*\+", None),
+        (r"(query|execute|sql)\s*=\s*f['\"].*\{", None),
+        (r"\.format\(.*\)\s*#.*sql", None),
+    ])
+    XSS_PATTERNS = LinePatternSet([
+        (r"innerHTML\s*=", None),
+        (r"\.html\(", None),
+        (r"dangerouslySetInnerHTML", None),
+        (r"eval\(", None),
+        (r"Function\(", None),
+    ])
+    DESERIALIZATION_PATTERNS = LinePatternSet([
+        (r"pickle\.loads?\(", None),
+        (r"yaml\.load\(", None),
+        (r"eval\(", None),
+        (r"exec\(", None),
+    ])
+    WEAK_CRYPTO_PATTERNS = LinePatternSet([
+        (r"\bmd5\(", "MD5"),
+        (r"\bsha1\(", "SHA1"),
+        (r"Random\(\)", "Random (not cryptographically secure)"),
+    ])
+    CYCLOMATIC_KEYWORDS = re.compile(
+        r'\b(?:if|elif|else|for|while|except|and|or|case)\b', re.IGNORECASE
+    )
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        cache_client: Any | None = None,
+        result_store: ResultStore | None = None
+    ):
+        super().__init__(config, cache_client, result_store)
         self.language_analyzers = self._init_language_analyzers()
 
     def _init_language_analyzers(self) -> dict[str, BaseAnalyzer]:
@@ -399,14 +607,17 @@ class StaticAnalyzer(BaseAnalyzer):
         }
 
     async def _perform_analysis(self, code: str, file_path: str, strategy: AnalysisStrategy) -> list[CodeIssue]:
-        """執行靜態分析"""
+        """執行靜態分析
+
+        各項檢查都是 CPU 密集的正則匹配，在同一線程上 gather 並不會並行，
+        因此依序執行；並行發生在文件層級 (見 CodeAnalysisEngine.analyze_repository)。
+        """
         issues = []
 
         # 檢測語言
         language = self._detect_language(file_path)
 
-        # 並行執行多個分析
-        tasks = [
+        checks = [
             self._check_security(code, file_path, language),
             self._check_code_quality(code, file_path, language),
             self._check_performance(code, file_path, language),
@@ -416,36 +627,19 @@ class StaticAnalyzer(BaseAnalyzer):
 
         # 根據策略調整分析深度
         if strategy in [AnalysisStrategy.DEEP, AnalysisStrategy.COMPREHENSIVE]:
-            tasks.extend([
+            checks.extend([
                 self._check_accessibility(code, file_path, language),
                 self._check_compliance(code, file_path, language),
             ])
 
-        results = await asyncio.gather(*tasks)
-        for result in results:
-            issues.extend(result)
+        for check in checks:
+            issues.extend(await check)
 
         return issues
 
     def _detect_language(self, file_path: str) -> str:
         """檢測編程語言"""
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'javascript',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.cc': 'cpp',
-            '.h': 'cpp',
-        }
-
-        for ext, lang in extension_map.items():
-            if file_path.endswith(ext):
-                return lang
-
-        return 'unknown'
+        return detect_language(file_path)
 
     async def _check_security(self, code: str, file_path: str, language: str) -> list[CodeIssue]:
         """檢測安全漏洞"""
@@ -481,33 +675,22 @@ class StaticAnalyzer(BaseAnalyzer):
         """檢測硬編碼密鑰"""
         issues = []
 
-        secret_patterns = [
-            (r"password\s*=\s*['\"][^'\"]+['\"]", "Password"),
-            (r"api_key\s*=\s*['\"][^'\"]+['\"]", "API Key"),
-            (r"secret\s*=\s*['\"][^'\"]+['\"]", "Secret"),
-            (r"token\s*=\s*['\"][^'\"]+['\"]", "Token"),
-            (r"private_key\s*=\s*['\"]", "Private Key"),
-            (r"aws_secret_access_key\s*=\s*['\"]", "AWS Secret"),
-        ]
-
-        for line_num, line in enumerate(code.split('\n'), 1):
-            for pattern, secret_type in secret_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    issues.append(CodeIssue(
-                        type=IssueType.SECURITY,
-                        severity=SeverityLevel.CRITICAL,
-                        file=file_path,
-                        line=line_num,
-                        column=1,
-                        message=f"Hardcoded {secret_type} detected",
-                        description=f"代碼中檢測到硬編碼的 {secret_type}，存在安全風險",
-                        suggestion="使用環境變量、密鑰管理服務（如 AWS Secrets Manager）或配置文件",
-                        code_snippet=line.strip(),
-                        tags=["security", "secrets", "credentials"],
-                        confidence=0.98,
-                        repair_difficulty="EASY",
-                        estimated_repair_time=300
-                    ))
+        for line_num, line, secret_type in self.SECRET_PATTERNS.scan(code):
+            issues.append(CodeIssue(
+                type=IssueType.SECURITY,
+                severity=SeverityLevel.CRITICAL,
+                file=file_path,
+                line=line_num,
+                column=1,
+                message=f"Hardcoded {secret_type} detected",
+                description=f"代碼中檢測到硬編碼的 {secret_type}，存在安全風險",
+                suggestion="使用環境變量、密鑰管理服務（如 AWS Secrets Manager）或配置文件",
+                code_snippet=line.strip(),
+                tags=["security", "secrets", "credentials"],
+                confidence=0.98,
+                repair_difficulty="EASY",
+                estimated_repair_time=300
+            ))
 
         return issues
 
@@ -516,30 +699,22 @@ class StaticAnalyzer(BaseAnalyzer):
         issues = []
 
         # 檢測字符串連接的 SQL 查詢
-        patterns = [
-            r"(query|execute|sql)\s*=\s*['\"].*\+",
-            r"(query|execute|sql)\s*=\s*f['\"].*\{",
-            r"\.format\(.*\)\s*#.*sql",
-        ]
-
-        for line_num, line in enumerate(code.split('\n'), 1):
-            for pattern in patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    issues.append(CodeIssue(
-                        type=IssueType.SECURITY,
-                        severity=SeverityLevel.HIGH,
-                        file=file_path,
-                        line=line_num,
-                        column=1,
-                        message="SQL injection risk detected",
-                        description="檢測到潛在的 SQL 注入漏洞，使用字符串連接構建 SQL 查詢",
-                        suggestion="使用參數化查詢（Prepared Statements）或 ORM 框架",
-                        code_snippet=line.strip(),
-                        tags=["security", "sql", "injection"],
-                        confidence=0.85,
-                        repair_difficulty="MEDIUM",
-                        estimated_repair_time=600
-                    ))
+        for line_num, line, _ in self.SQL_INJECTION_PATTERNS.scan(code):
+            issues.append(CodeIssue(
+                type=IssueType.SECURITY,
+                severity=SeverityLevel.HIGH,
+                file=file_path,
+                line=line_num,
+                column=1,
+                message="SQL injection risk detected",
+                description="檢測到潛在的 SQL 注入漏洞，使用字符串連接構建 SQL 查詢",
+                suggestion="使用參數化查詢（Prepared Statements）或 ORM 框架",
+                code_snippet=line.strip(),
+                tags=["security", "sql", "injection"],
+                confidence=0.85,
+                repair_difficulty="MEDIUM",
+                estimated_repair_time=600
+            ))
 
         return issues
 
@@ -548,32 +723,22 @@ class StaticAnalyzer(BaseAnalyzer):
         issues = []
 
         # 檢測未轉義的用戶輸入
-        patterns = [
-            r"innerHTML\s*=",
-            r"\.html\(",
-            r"dangerouslySetInnerHTML",
-            r"eval\(",
-            r"Function\(",
-        ]
-
-        for line_num, line in enumerate(code.split('\n'), 1):
-            for pattern in patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    issues.append(CodeIssue(
-                        type=IssueType.SECURITY,
-                        severity=SeverityLevel.HIGH,
-                        file=file_path,
-                        line=line_num,
-                        column=1,
-                        message="XSS vulnerability risk detected",
-                        description="檢測到潛在的跨站腳本 (XSS) 漏洞",
-                        suggestion="使用 textContent 而不是 innerHTML，或使用模板引擎進行轉義",
-                        code_snippet=line.strip(),
-                        tags=["security", "xss", "web"],
-                        confidence=0.90,
-                        repair_difficulty="MEDIUM",
-                        estimated_repair_time=500
-                    ))
+        for line_num, line, _ in self.XSS_PATTERNS.scan(code):
+            issues.append(CodeIssue(
+                type=IssueType.SECURITY,
+                severity=SeverityLevel.HIGH,
+                file=file_path,
+                line=line_num,
+                column=1,
+                message="XSS vulnerability risk detected",
+                description="檢測到潛在的跨站腳本 (XSS) 漏洞",
+                suggestion="使用 textContent 而不是 innerHTML，或使用模板引擎進行轉義",
+                code_snippet=line.strip(),
+                tags=["security", "xss", "web"],
+                confidence=0.90,
+                repair_difficulty="MEDIUM",
+                estimated_repair_time=500
+            ))
 
         return issues
 
@@ -604,31 +769,22 @@ class StaticAnalyzer(BaseAnalyzer):
         """檢測不安全的反序列化"""
         issues = []
 
-        patterns = [
-            r"pickle\.loads?\(",
-            r"yaml\.load\(",
-            r"eval\(",
-            r"exec\(",
-        ]
-
-        for line_num, line in enumerate(code.split('\n'), 1):
-            for pattern in patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    issues.append(CodeIssue(
-                        type=IssueType.SECURITY,
-                        severity=SeverityLevel.HIGH,
-                        file=file_path,
-                        line=line_num,
-                        column=1,
-                        message="Unsafe deserialization detected",
-                        description="檢測到不安全的反序列化操作",
-                        suggestion="使用安全的序列化方法，避免 eval/exec",
-                        code_snippet=line.strip(),
-                        tags=["security", "deserialization"],
-                        confidence=0.92,
-                        repair_difficulty="MEDIUM",
-                        estimated_repair_time=400
-                    ))
+        for line_num, line, _ in self.DESERIALIZATION_PATTERNS.scan(code):
+            issues.append(CodeIssue(
+                type=IssueType.SECURITY,
+                severity=SeverityLevel.HIGH,
+                file=file_path,
+                line=line_num,
+                column=1,
+                message="Unsafe deserialization detected",
+                description="檢測到不安全的反序列化操作",
+                suggestion="使用安全的序列化方法，避免 eval/exec",
+                code_snippet=line.strip(),
+                tags=["security", "deserialization"],
+                confidence=0.92,
+                repair_difficulty="MEDIUM",
+                estimated_repair_time=400
+            ))
 
         return issues
 
@@ -636,30 +792,22 @@ class StaticAnalyzer(BaseAnalyzer):
         """檢測密碼學弱點"""
         issues = []
 
-        weak_crypto_patterns = [
-            (r"\bmd5\(", "MD5"),
-            (r"\bsha1\(", "SHA1"),
-            (r"Random\(\)", "Random (not cryptographically secure)"),
-        ]
-
-        for line_num, line in enumerate(code.split('\n'), 1):
-            for pattern, crypto_type in weak_crypto_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    issues.append(CodeIssue(
-                        type=IssueType.SECURITY,
-                        severity=SeverityLevel.MEDIUM,
-                        file=file_path,
-                        line=line_num,
-                        column=1,
-                        message=f"Weak cryptographic algorithm: {crypto_type}",
-                        description=f"使用弱加密算法 {crypto_type}",
-                        suggestion="使用更安全的算法 (如 SHA256, bcrypt)",
-                        code_snippet=line.strip(),
-                        tags=["security", "cryptography"],
-                        confidence=0.95,
-                        repair_difficulty="EASY",
-                        estimated_repair_time=200
-                    ))
+        for line_num, line, crypto_type in self.WEAK_CRYPTO_PATTERNS.scan(code):
+            issues.append(CodeIssue(
+                type=IssueType.SECURITY,
+                severity=SeverityLevel.MEDIUM,
+                file=file_path,
+                line=line_num,
+                column=1,
+                message=f"Weak cryptographic algorithm: {crypto_type}",
+                description=f"使用弱加密算法 {crypto_type}",
+                suggestion="使用更安全的算法 (如 SHA256, bcrypt)",
+                code_snippet=line.strip(),
+                tags=["security", "cryptography"],
+                confidence=0.95,
+                repair_difficulty="EASY",
+                estimated_repair_time=200
+            ))
 
         return issues
 
@@ -838,11 +986,7 @@ class StaticAnalyzer(BaseAnalyzer):
 
     def _calculate_cyclomatic_complexity(self, code: str) -> int:
         """計算圈複雜度"""
-        keywords = ['if', 'elif', 'else', 'for', 'while', 'except', 'and', 'or', 'case']
-        complexity = 1
-        for keyword in keywords:
-            complexity += len(re.findall(rf'\b{keyword}\b', code, re.IGNORECASE))
-        return complexity
+        return 1 + len(self.CYCLOMATIC_KEYWORDS.findall(code))
 
     def _calculate_duplication_ratio(self, code: str) -> float:
         """計算代碼重複率"""
@@ -855,6 +999,328 @@ class StaticAnalyzer(BaseAnalyzer):
         return max(0, 1 - (unique_lines / len(lines)))
 
 
+# ============================================================================
+# 代碼庫分析管線 (Repository Pipeline)
+# ============================================================================
+
+DEFAULT_EXCLUDE_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv', '.tox',
+    '.mypy_cache', '.pytest_cache', 'dist', 'build', 'target', 'vendor',
+})
+
+# SQALE 開發成本估算：每行代碼 30 分鐘
+DEVELOPMENT_COST_PER_LINE = 1800
+
+# 文件級結果記錄格式版本 (FileAnalysis 字段或指標算法變更時遞增)
+PIPELINE_VERSION = "1"
+
+
+@dataclass
+class FileAnalysis:
+    """單個文件的分析結果 (由工作進程回傳)"""
+    file: str
+    language: str
+    lines_of_code: int = 0
+    comment_lines: int = 0
+    cyclomatic_complexity: int = 0
+    duplication_ratio: float = 0.0
+    issues: list[CodeIssue] = field(default_factory=list)
+    error: str | None = None
+    blob: str | None = None
+    reused: bool = False
+
+    def to_record(self) -> dict[str, Any]:
+        """存儲記錄 (不含路徑，供內容相同的文件重用)"""
+        return {
+            'lines_of_code': self.lines_of_code,
+            'comment_lines': self.comment_lines,
+            'cyclomatic_complexity': self.cyclomatic_complexity,
+            'duplication_ratio': self.duplication_ratio,
+            'issues': [issue.to_dict() for issue in self.issues],
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any], file: str, language: str, blob: str) -> 'FileAnalysis':
+        return cls(
+            file=file,
+            language=language,
+            lines_of_code=record['lines_of_code'],
+            comment_lines=record['comment_lines'],
+            cyclomatic_complexity=record['cyclomatic_complexity'],
+            duplication_ratio=record['duplication_ratio'],
+            issues=[CodeIssue.from_dict(issue, file) for issue in record['issues']],
+            blob=blob,
+            reused=True,
+        )
+
+
+def _sorted_dir_entries(directory: str) -> list[os.DirEntry]:
+    """按名稱排序的目錄項；無法讀取的目錄視為空"""
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entries, key=lambda e: e.name)
+    except OSError:
+        return []
+
+
+def iter_source_files(
+    repo_path: str,
+    exclude_dirs: frozenset[str] | set[str] = DEFAULT_EXCLUDE_DIRS,
+    max_file_size: int = 1024 * 1024,
+) -> Iterator[tuple[str, str, str]]:
+    """
+    串流遍歷代碼庫，產出 (相對路徑, 絕對路徑, 語言)
+
+    使用 os.scandir 逐目錄遍歷，不預先收集完整文件列表；
+    跳過排除目錄、符號鏈接、未知語言與超過大小上限的文件。
+    產出順序為按路徑組件逐層比較的字典序：同一目錄內的文件與子目錄
+    依名稱交錯，子目錄在其名稱位置展開，與文件系統列舉順序無關。
+    """
+    root = os.path.abspath(repo_path)
+    stack = [iter(_sorted_dir_entries(root))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in exclude_dirs:
+                    stack.append(iter(_sorted_dir_entries(entry.path)))
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            language = detect_language(entry.name)
+            if language == 'unknown' or entry.stat(follow_symlinks=False).st_size > max_file_size:
+                continue
+        except OSError:
+            continue
+        yield os.path.relpath(entry.path, root), entry.path, language
+
+
+def iter_language_shards(
+    files: Iterator[tuple[str, str, str]],
+    shard_size: int = 64,
+    known_blobs: dict[str, str] | None = None,
+) -> Iterator[tuple[str, list[tuple[str, str, str | None]]]]:
+    """
+    將文件按語言分桶，每桶滿 shard_size 即產出一個分片，最後清空剩餘桶
+
+    分片項目為 (相對路徑, 絕對路徑, 已知 blob 哈希)；known_blobs 提供
+    未變更文件的哈希，工作進程可直接查詢存儲而不必讀取文件。
+    """
+    known_blobs = known_blobs or {}
+    buckets: dict[str, list[tuple[str, str, str | None]]] = {}
+    for rel_path, abs_path, language in files:
+        bucket = buckets.setdefault(language, [])
+        bucket.append((rel_path, abs_path, known_blobs.get(rel_path)))
+        if len(bucket) >= shard_size:
+            yield language, buckets.pop(language)
+    for language, bucket in buckets.items():
+        yield language, bucket
+
+
+def file_record_key(analyzer: StaticAnalyzer, language: str, strategy: AnalysisStrategy, blob: str) -> str:
+    """文件級記錄鍵 - blob 哈希 + 管線與各分析器版本"""
+    language_analyzer = analyzer.language_analyzers.get(language)
+    versions = f"{PIPELINE_VERSION}.{analyzer.version}.{language_analyzer.version if language_analyzer else 0}"
+    return f"file:{versions}:{strategy.value}:{language}:{blob}"
+
+
+def analyze_files(
+    analyzer: StaticAnalyzer,
+    language: str,
+    files: list[tuple[str, str, str | None]],
+    strategy: AnalysisStrategy,
+    store: ResultStore | None = None,
+) -> list[FileAnalysis]:
+    """
+    同步分析一個同語言分片 (在工作進程或線程中執行)
+
+    每個文件先以 blob 哈希查詢存儲，命中則直接重用；已知哈希的文件
+    (相對基準提交未變更) 命中時完全不讀取。未命中的文件執行靜態分析
+    與該語言的特定分析器，計算文件級指標後寫回存儲。
+    """
+    language_analyzer = analyzer.language_analyzers.get(language)
+    prefixes = COMMENT_PREFIXES.get(language, ())
+    loop = asyncio.new_event_loop()
+    results = []
+    try:
+        for rel_path, abs_path, blob in files:
+            result = FileAnalysis(file=rel_path, language=language)
+            try:
+                if store is not None and blob is not None:
+                    record = store.get(file_record_key(analyzer, language, strategy, blob))
+                    if record is not None:
+                        results.append(FileAnalysis.from_record(record, rel_path, language, blob))
+                        continue
+
+                with open(abs_path, 'rb') as f:
+                    raw = f.read()
+                result.blob = git_blob_hash(raw)
+                key = file_record_key(analyzer, language, strategy, result.blob)
+                if store is not None and result.blob != blob:
+                    record = store.get(key)
+                    if record is not None:
+                        results.append(FileAnalysis.from_record(record, rel_path, language, result.blob))
+                        continue
+
+                # 與文本模式讀取一致：統一換行符
+                code = raw.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+                result.issues = loop.run_until_complete(analyzer.analyze(code, rel_path, strategy))
+                if language_analyzer is not None:
+                    result.issues.extend(
+                        loop.run_until_complete(language_analyzer.analyze(code, rel_path, strategy))
+                    )
+                stripped = [line.strip() for line in code.split('\n')]
+                result.lines_of_code = sum(1 for line in stripped if line)
+                result.comment_lines = sum(1 for line in stripped if line and line.startswith(prefixes))
+                result.cyclomatic_complexity = analyzer._calculate_cyclomatic_complexity(code)
+                result.duplication_ratio = analyzer._calculate_duplication_ratio(code)
+                if store is not None:
+                    store.put(key, result.to_record())
+            except Exception as e:
+                result.error = str(e)
+            results.append(result)
+    finally:
+        loop.close()
+    return results
+
+
+# 工作進程內的分析器與存儲 (由 initializer 建立一次，避免每個分片重建)
+_worker_analyzer: StaticAnalyzer | None = None
+_worker_store: ResultStore | None = None
+
+
+def _init_worker(config: dict[str, Any], store: ResultStore | None) -> None:
+    global _worker_analyzer, _worker_store
+    _worker_analyzer = StaticAnalyzer(config)
+    _worker_store = store
+
+
+def _analyze_shard(
+    language: str,
+    files: list[tuple[str, str, str | None]],
+    strategy: AnalysisStrategy
+) -> list[FileAnalysis]:
+    return analyze_files(_worker_analyzer, language, files, strategy, _worker_store)
+
+
+def _git(repo_path: str, *args: str) -> bytes:
+    return subprocess.run(
+        ['git', '-C', repo_path, *args], capture_output=True, check=True, timeout=300
+    ).stdout
+
+
+def git_tree_blobs(repo_path: str, commit: str) -> dict[str, str]:
+    """列出提交中所有文件的 blob 哈希 {相對路徑: blob}"""
+    blobs = {}
+    for record in _git(repo_path, 'ls-tree', '-r', '-z', '--full-tree', commit).split(b'\0'):
+        if not record:
+            continue
+        meta, _, path = record.partition(b'\t')
+        _, kind, blob = meta.split()
+        if kind == b'blob':
+            blobs[os.fsdecode(path)] = blob.decode()
+    return blobs
+
+
+def git_changed_paths(repo_path: str, base_commit: str) -> set[str]:
+    """工作區相對基準提交有變更的路徑 (含暫存、未暫存與未追蹤文件)"""
+    changed = _git(repo_path, 'diff', '--name-only', '-z', '--no-renames', base_commit, '--')
+    untracked = _git(repo_path, 'ls-files', '--others', '--exclude-standard', '-z')
+    return {os.fsdecode(path) for path in (changed + b'\0' + untracked).split(b'\0') if path}
+
+
+def unchanged_blobs(repo_path: str, base_commit: str) -> dict[str, str]:
+    """
+    相對基準提交未變更文件的 blob 哈希
+
+    路徑相對於 git 頂層目錄；repo_path 為子目錄時轉換為相對 repo_path。
+    """
+    top = _git(repo_path, 'rev-parse', '--show-toplevel').decode().strip()
+    prefix = os.path.relpath(os.path.abspath(repo_path), top)
+    prefix = '' if prefix == '.' else prefix.replace(os.sep, '/') + '/'
+
+    changed = git_changed_paths(top, base_commit)
+    blobs = {}
+    for path, blob in git_tree_blobs(top, base_commit).items():
+        if path in changed or not path.startswith(prefix):
+            continue
+        blobs[path[len(prefix):].replace('/', os.sep)] = blob
+    return blobs
+
+
+class RepositoryAggregator:
+    """
+    增量聚合分片結果
+
+    每完成一個分片即更新計數與加權指標，可隨時產出進度快照，
+    最後組裝為 AnalysisResult。
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.files_discovered = 0
+        self.files_analyzed = 0
+        self.files_reused = 0
+        self.files_failed = 0
+        self.languages: set[str] = set()
+        self.issues: list[CodeIssue] = []
+        self.lines_of_code = 0
+        self.comment_lines = 0
+        self.complexity_total = 0
+        self.duplicated_lines = 0.0
+        self.remediation_seconds = 0
+
+    def add(self, result: FileAnalysis) -> None:
+        """合併單個文件結果"""
+        if result.error is not None:
+            self.files_failed += 1
+            return
+        self.files_analyzed += 1
+        self.files_reused += result.reused
+        self.languages.add(result.language)
+        self.issues.extend(result.issues)
+        self.lines_of_code += result.lines_of_code
+        self.comment_lines += result.comment_lines
+        self.complexity_total += result.cyclomatic_complexity
+        self.duplicated_lines += result.duplication_ratio * result.lines_of_code
+        self.remediation_seconds += sum(issue.estimated_repair_time for issue in result.issues)
+
+    def progress(self, done: bool = False) -> dict[str, Any]:
+        """進度快照"""
+        return {
+            "done": done,
+            "files_discovered": self.files_discovered,
+            "files_analyzed": self.files_analyzed,
+            "files_reused": self.files_reused,
+            "files_failed": self.files_failed,
+            "issues_found": len(self.issues),
+            "lines_of_code": self.lines_of_code,
+            "languages": sorted(self.languages),
+            "elapsed": round(time.monotonic() - self.started, 3),
+        }
+
+    def metrics(self) -> CodeMetrics:
+        """由累計值計算代碼指標 (無數據來源的指標保持為 0)"""
+        loc = self.lines_of_code
+        return CodeMetrics(
+            lines_of_code=loc,
+            cyclomatic_complexity=self.complexity_total / self.files_analyzed if self.files_analyzed else 0.0,
+            cognitive_complexity=0.0,
+            maintainability_index=0.0,
+            technical_debt_ratio=self.remediation_seconds / (loc * DEVELOPMENT_COST_PER_LINE) if loc else 0.0,
+            test_coverage=0.0,
+            duplication_ratio=self.duplicated_lines / loc if loc else 0.0,
+            documentation_ratio=self.comment_lines / loc if loc else 0.0,
+        )
+
+    def sorted_issues(self) -> list[CodeIssue]:
+        """按嚴重程度排序，分片完成順序不影響結果"""
+        return sorted(self.issues, key=lambda i: (-i.severity_score, i.file, i.line))
+
+
 # ============================================================================
 # 代碼分析引擎 (Code Analysis Engine)
 # ============================================================================
@@ -862,12 +1328,20 @@ class StaticAnalyzer(BaseAnalyzer):
 class CodeAnalysisEngine:
     """代碼分析引擎 - 企業級"""
 
-    def __init__(self, config: dict[str, Any], cache_client: Any | None = None):
+    def __init__(
+        self,
+        config: dict[str, Any],
+        cache_client: Any | None = None,
+        result_store: ResultStore | None = None
+    ):
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
         self.cache_client = cache_client
+        if result_store is None:
+            result_store = RedisResultStore(cache_client) if cache_client else default_result_store(config)
+        self.result_store = result_store
         self.analyzers: list[BaseAnalyzer] = [
-            StaticAnalyzer(config, cache_client)
+            StaticAnalyzer(config, cache_client, result_store)
         ]
         self.executor = ThreadPoolExecutor(max_workers=config.get('max_workers', 4))
 
@@ -904,26 +1378,101 @@ class CodeAnalysisEngine:
         self,
         repo_path: str,
         commit_hash: str,
-        strategy: AnalysisStrategy = AnalysisStrategy.STANDARD
+        strategy: AnalysisStrategy = AnalysisStrategy.STANDARD,
+        progress_callback: Callable[[dict[str, Any]], None] | None = None,
+        base_commit: str | None = None
     ) -> AnalysisResult:
         """
         分析整個代碼庫
         
+        串流遍歷文件並按語言分片，分片交給進程池分析；同時在途的分片數
+        受 max_in_flight 限制，結果完成即增量聚合並回報進度。
+        
+        每個文件的結果以 blob 哈希存入結果存儲。指定 base_commit 時，相對
+        基準提交未變更的文件直接以基準樹中的 blob 哈希取回既有結果，只有
+        變更的文件會被讀取和分析。
+        
         Args:
             repo_path: 代碼庫路徑
             commit_hash: 提交哈希
             strategy: 分析策略
+            progress_callback: 每完成一個分片調用一次，參數為進度快照
+            base_commit: 基準提交 (可選)
             
         Returns:
             AnalysisResult: 分析結果
         """
         start_time = datetime.utcnow()
-        all_issues = []
-        files_analyzed = 0
-        languages_detected = set()
+        aggregator = RepositoryAggregator()
+        loop = asyncio.get_running_loop()
 
-        # 這裡應該實現實際的文件掃描邏輯
-        # 為示例目的，暫時返回基本結果
+        known_blobs: dict[str, str] = {}
+        if base_commit and self.result_store is not None:
+            try:
+                known_blobs = await loop.run_in_executor(self.executor, unchanged_blobs, repo_path, base_commit)
+            except (OSError, subprocess.SubprocessError) as e:
+                self.logger.warning(f"無法取得相對 {base_commit} 的變更，改為完整分析: {e}")
+
+        workers = self.config.get('process_workers', os.cpu_count() or 1)
+        max_in_flight = self.config.get('max_in_flight', max(workers, 1) * 2)
+        shards = iter_language_shards(
+            iter_source_files(
+                repo_path,
+                exclude_dirs=self.config.get('exclude_dirs', DEFAULT_EXCLUDE_DIRS),
+                max_file_size=self.config.get('max_file_size', 1024 * 1024),
+            ),
+            shard_size=self.config.get('shard_size', 64),
+            known_blobs=known_blobs,
+        )
+
+        # 單進程時在線程池中分析，避免阻塞事件循環
+        # Redis 客戶端無法傳入子進程，工作進程只共享磁盤存儲
+        worker_store = self.result_store if isinstance(self.result_store, DiskResultStore) else None
+        pool: Executor | None = None
+        inline_analyzer: StaticAnalyzer | None = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(self.config, worker_store)
+            )
+        else:
+            # 文件級記錄已覆蓋整個文件，分析器本身不再重複緩存
+            inline_analyzer = StaticAnalyzer(self.config)
+        in_flight: set[asyncio.Future] = set()
+
+        def collect(done: set[asyncio.Future]) -> None:
+            for future in done:
+                for result in future.result():
+                    if result.error is not None:
+                        self.logger.error(f"分析文件失敗 {result.file}: {result.error}")
+                    aggregator.add(result)
+            if progress_callback:
+                progress_callback(aggregator.progress())
+
+        try:
+            for language, files in shards:
+                aggregator.files_discovered += len(files)
+                if pool is not None:
+                    future = loop.run_in_executor(pool, _analyze_shard, language, files, strategy)
+                else:
+                    future = loop.run_in_executor(
+                        self.executor, analyze_files, inline_analyzer, language, files, strategy,
+                        self.result_store
+                    )
+                in_flight.add(future)
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if pool is not None:
+                pool.shutdown(wait=not in_flight, cancel_futures=True)
+
+        if progress_callback:
+            progress_callback(aggregator.progress(done=True))
 
         end_time = datetime.utcnow()
         duration = (end_time - start_time).total_seconds()
@@ -934,19 +1483,11 @@ class CodeAnalysisEngine:
             analysis_timestamp=start_time,
             duration=duration,
             strategy=strategy,
-            issues=all_issues,
-            files_analyzed=files_analyzed,
-            languages_detected=languages_detected,
-            metrics=CodeMetrics(
-                lines_of_code=0,
-                cyclomatic_complexity=0.0,
-                cognitive_complexity=0.0,
-                maintainability_index=0.0,
-                technical_debt_ratio=0.0,
-                test_coverage=0.0,
-                duplication_ratio=0.0,
-                documentation_ratio=0.0
-            )
+            issues=aggregator.sorted_issues(),
+            files_analyzed=aggregator.files_analyzed,
+            files_reused=aggregator.files_reused,
+            languages_detected=aggregator.languages,
+            metrics=aggregator.metrics()
         )
 
     def get_metrics(self) -> dict[str, Any]:
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+分析任務存儲與工作池 (Analysis Job Store & Worker Pool)
+============================================================================
+以本地 SQLite 持久化分析任務隊列，並由固定數量的工作協程領取執行：
+- 任務狀態在重啟後保留；運行中任務帶持有者與租約，由心跳續約，
+  只有租約過期 (持有進程崩潰或失聯) 的任務才重新入隊
+- 同時運行的分析數受 concurrency 限制，請求處理只負責入隊
+- (status, created_at) 與 created_at 索引支持分頁查詢與狀態統計
+- 結果以壓縮 JSON 存儲，過期結果壓實 (移除問題列表) 並按保留策略淘汰
+- 工作池的 SQLite 讀寫與壓縮均經 asyncio.to_thread 執行，不阻塞事件循環
+============================================================================
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import Any
+
+# ============================================================================
+# 任務狀態
+# ============================================================================
+
+class JobStatus(str, Enum):
+    """任務狀態 (與 models.AnalysisStatus 取值一致)"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+# 運行中任務的租約時長 (秒)；持有者須在到期前續約
+DEFAULT_LEASE_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    request TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    message TEXT NOT NULL DEFAULT '',
+    error TEXT,
+    progress TEXT,
+    result BLOB,
+    compacted INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+"""
+
+# 舊版數據庫缺少的欄位 (欄位名, 定義)
+_MIGRATIONS = (
+    ("owner", "owner TEXT"),
+    ("lease_expires_at", "lease_expires_at TEXT"),
+)
+
+# 列表查詢只讀取輕量欄位，不解壓結果
+_SUMMARY_COLUMNS = "id, status, repository, created_at, started_at, completed_at, message"
+
+
+def default_job_store_path(config: dict[str, Any]) -> str:
+    """按配置取得任務庫路徑：job_store_path 或 ~/.cache/code-analysis/jobs.sqlite3"""
+    path = config.get('job_store_path')
+    if path:
+        return path
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'code-analysis', 'jobs.sqlite3')
+
+
+def _now(offset: timedelta = timedelta(0)) -> str:
+    """UTC 時間戳 (固定微秒精度，字串順序即時間順序)"""
+    return (datetime.now(UTC) + offset).isoformat(timespec='microseconds')
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+def _pack(data: Any) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+def _unpack(blob: bytes | None) -> Any:
+    return json.loads(zlib.decompress(blob)) if blob is not None else None
+
+
+# ============================================================================
+# 任務存儲
+# ============================================================================
+
+class JobStore:
+    """
+    SQLite 任務存儲
+
+    WAL 模式下讀寫互不阻塞；領取任務在 BEGIN IMMEDIATE 事務中完成，多個
+    工作者 (包括共享同一數據庫文件的其他進程) 不會領取同一任務。
+
+    每個存儲實例有唯一的 owner；領取的任務記錄 owner 與租約到期時間，
+    進度與結果只寫入仍由本實例持有的任務。方法均為同步調用，異步代碼
+    應經 asyncio.to_thread 調用。
+    """
+
+    def __init__(self, path: str, owner: str | None = None):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """為舊版數據庫補上新欄位 (在事務中檢查，避免多進程重複添加)"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in _MIGRATIONS:
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {definition}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    # ------------------------------------------------------------------
+    # 寫入
+    # ------------------------------------------------------------------
+
+    def submit(self, request: dict[str, Any], job_id: str | None = None) -> str:
+        """新任務入隊，返回任務 ID"""
+        job_id = job_id or str(uuid.uuid4())
+        self._execute(
+            "INSERT INTO jobs (id, status, repository, request, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, JobStatus.PENDING.value, request.get('repository', ''), json.dumps(request), _now()),
+        )
+        return job_id
+
+    def claim(self, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> dict[str, Any] | None:
+        """領取最早的待處理任務，標記為由本實例持有並設置租約；隊列為空時返回 None"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at, rowid LIMIT 1",
+                    (JobStatus.PENDING.value,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, owner = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (JobStatus.RUNNING.value, _now(), self.owner,
+                     _now(timedelta(seconds=lease_seconds)), row['id']),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row['id'])
+
+    def update_progress(self, job_id: str, progress: dict[str, Any]) -> None:
+        self._execute(
+            "UPDATE jobs SET progress = ? WHERE id = ? AND status = ? AND owner = ?",
+            (json.dumps(progress), job_id, JobStatus.RUNNING.value, self.owner),
+        )
+
+    def complete(
+        self,
+        job_id: str,
+        result: dict[str, Any],
+        message: str = "",
+        progress: dict[str, Any] | None = None
+    ) -> None:
+        """記錄完成結果；任務已被刪除或已不由本實例持有時不做任何事"""
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, message = ?, completed_at = ?, "
+            "progress = COALESCE(?, progress), lease_expires_at = NULL "
+            "WHERE id = ? AND status = ? AND owner = ?",
+            (JobStatus.COMPLETED.value, _pack(result), message, _now(),
+             json.dumps(progress) if progress is not None else None,
+             job_id, JobStatus.RUNNING.value, self.owner),
+        )
+
+    def fail(self, job_id: str, error: str, message: str = "") -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, message = ?, completed_at = ?, lease_expires_at = NULL "
+            "WHERE id = ? AND status = ? AND owner = ?",
+            (JobStatus.FAILED.value, error, message, _now(), job_id, JobStatus.RUNNING.value, self.owner),
+        )
+
+    def delete(self, job_id: str) -> bool:
+        return self._execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def heartbeat(self, job_ids: Iterable[str], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """為本實例持有的運行中任務續約，返回續約數量"""
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        return self._execute(
+            f"UPDATE jobs SET lease_expires_at = ? WHERE status = ? AND owner = ? AND id IN ({_placeholders(len(ids))})",
+            (_now(timedelta(seconds=lease_seconds)), JobStatus.RUNNING.value, self.owner, *ids),
+        ).rowcount
+
+    def release(self, job_ids: Iterable[str]) -> int:
+        """將本實例持有的運行中任務放回隊列 (正常停止時調用)，返回數量"""
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        return self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, progress = NULL, owner = NULL, lease_expires_at = NULL "
+            f"WHERE status = ? AND owner = ? AND id IN ({_placeholders(len(ids))})",
+            (JobStatus.PENDING.value, JobStatus.RUNNING.value, self.owner, *ids),
+        ).rowcount
+
+    def recover(self) -> int:
+        """
+        將租約已過期的運行中任務重新入隊，返回數量
+
+        其他進程仍在續約的任務不受影響；沒有租約的舊記錄視為已過期。
+        """
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, progress = NULL, owner = NULL, lease_expires_at = NULL "
+            "WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+            (JobStatus.PENDING.value, JobStatus.RUNNING.value, _now()),
+        )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: str, include_result: bool = True) -> dict[str, Any] | None:
+        """取得任務；include_result=False 時不讀取 (也不解壓) 結果"""
+        columns = "*" if include_result else f"{_SUMMARY_COLUMNS}, request, error, progress, compacted, attempts"
+        row = self._execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['request'] = json.loads(job['request'])
+        job['progress'] = json.loads(job['progress']) if job['progress'] else None
+        if include_result:
+            job['result'] = _unpack(job['result'])
+        return job
+
+    def list(self, limit: int = 10, offset: int = 0, status: str | None = None) -> list[dict[str, Any]]:
+        """按創建時間倒序分頁列出任務摘要"""
+        if status:
+            sql = f"SELECT {_SUMMARY_COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?"
+            params: tuple = (status, limit, offset)
+        else:
+            sql = f"SELECT {_SUMMARY_COLUMNS} FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        return [dict(row) for row in self._execute(sql, params).fetchall()]
+
+    def counts(self) -> dict[str, int]:
+        """各狀態任務數及總數"""
+        counts = {status.value: 0 for status in JobStatus}
+        for row in self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall():
+            counts[row['status']] = row['n']
+        counts['total'] = sum(counts.values())
+        return counts
+
+    # ------------------------------------------------------------------
+    # 壓實與淘汰
+    # ------------------------------------------------------------------
+
+    def compact(self, older_than: timedelta) -> int:
+        """移除早於期限的已完成結果中的問題明細，只保留摘要與指標"""
+        cutoff = _now(-older_than)
+        rows = self._execute(
+            "SELECT id, result FROM jobs WHERE status = ? AND compacted = 0 AND completed_at < ?",
+            (JobStatus.COMPLETED.value, cutoff),
+        ).fetchall()
+        for row in rows:
+            result = _unpack(row['result'])
+            if isinstance(result, dict) and 'issues' in result:
+                result['issues'] = []
+                result['issues_compacted'] = True
+            self._execute(
+                "UPDATE jobs SET result = ?, compacted = 1 WHERE id = ?",
+                (_pack(result), row['id']),
+            )
+        return len(rows)
+
+    def evict(self, max_age: timedelta | None = None, max_finished: int | None = None) -> int:
+        """刪除超過保留期或超出數量上限 (保留最新者) 的已結束任務"""
+        placeholders = _placeholders(len(FINISHED_STATUSES))
+        removed = 0
+        if max_age is not None:
+            cutoff = _now(-max_age)
+            removed += self._execute(
+                f"DELETE FROM jobs WHERE status IN ({placeholders}) AND created_at < ?",
+                (*FINISHED_STATUSES, cutoff),
+            ).rowcount
+        if max_finished is not None:
+            removed += self._execute(
+                f"DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN ({placeholders}) "
+                "ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                (*FINISHED_STATUSES, max_finished),
+            ).rowcount
+        return removed
+
+
+# ============================================================================
+# 工作池
+# ============================================================================
+
+# handler(job, report_progress) -> 可序列化結果
+JobHandler = Callable[[dict[str, Any], Callable[[dict[str, Any]], None]], Awaitable[dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """
+    有界任務工作池
+
+    固定數量的工作協程從存儲領取任務，同時運行的分析數不超過 concurrency；
+    入隊時 notify() 喚醒空閒工作者，否則按 poll_interval 輪詢 (涵蓋其他進程
+    提交的任務)。進度寫入按 progress_interval 節流。心跳協程每隔
+    heartbeat_interval 為運行中任務續約，並將租約過期的任務 (包括其他進程
+    崩潰時遺留者) 重新入隊。停止時釋放運行中任務，使其立即重新入隊。
+    存儲讀寫均在線程中執行。
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: JobHandler,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        progress_interval: float = 0.5,
+        maintenance_interval: float = 300.0,
+        compact_after: timedelta | None = None,
+        max_age: timedelta | None = None,
+        max_finished: int | None = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        heartbeat_interval: float | None = None
+    ):
+        self.store = store
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.maintenance_interval = maintenance_interval
+        self.compact_after = compact_after
+        self.max_age = max_age
+        self.max_finished = max_finished
+        self.lease_seconds = lease_seconds
+        # 預設每個租約期內續約三次，容忍偶發的延遲
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else lease_seconds / 3
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._active: set[str] = set()
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        self._tasks.append(asyncio.create_task(self._maintenance()))
+
+    async def stop(self) -> None:
+        interrupted = list(self._active)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        released = await asyncio.to_thread(self.store.release, interrupted)
+        if released:
+            self.logger.info(f"釋放 {released} 個運行中的任務")
+
+    def notify(self) -> None:
+        """有新任務入隊"""
+        self._wakeup.set()
+
+    def maintain(self) -> None:
+        """執行一次結果壓實與淘汰 (同步，由維護協程在線程中調用)"""
+        if self.compact_after is not None:
+            self.store.compact(self.compact_after)
+        if self.max_age is not None or self.max_finished is not None:
+            self.store.evict(self.max_age, self.max_finished)
+
+    async def _worker(self) -> None:
+        while True:
+            # 先清除再領取，領取後才到達的通知不會丟失
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim, self.lease_seconds)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: dict[str, Any]) -> None:
+        job_id = job['id']
+        latest: dict[str, Any] = {}
+        last_write = 0.0
+        writing: asyncio.Future | None = None
+
+        def report_progress(progress: dict[str, Any]) -> None:
+            # 在事件循環上調用；同一時間只有一個寫入在線程中進行，保證寫入順序
+            nonlocal last_write, writing
+            latest['progress'] = progress
+            now = time.monotonic()
+            if (writing is None or writing.done()) and now - last_write >= self.progress_interval:
+                last_write = now
+                writing = asyncio.ensure_future(asyncio.to_thread(self.store.update_progress, job_id, progress))
+
+        self._active.add(job_id)
+        try:
+            error: Exception | None = None
+            try:
+                result = await self.handler(job, report_progress)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            if writing is not None:
+                # 等待進行中的進度寫入；寫入失敗不影響最終狀態
+                await asyncio.gather(writing, return_exceptions=True)
+            if error is not None:
+                await asyncio.to_thread(self.store.fail, job_id, str(error), f"Analysis failed: {error}")
+                self.logger.error(f"Analysis {job_id} failed: {error}", exc_info=error)
+                return
+            await asyncio.to_thread(
+                self.store.complete, job_id, result, "Analysis completed successfully", latest.get('progress')
+            )
+        finally:
+            self._active.discard(job_id)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.store.heartbeat, list(self._active), self.lease_seconds)
+                recovered = await asyncio.to_thread(self.store.recover)
+                if recovered:
+                    self.logger.info(f"重新入隊 {recovered} 個租約過期的任務")
+                    self.notify()
+            except sqlite3.Error as e:
+                self.logger.warning(f"任務租約續約失敗: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _maintenance(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.maintain)
+            except sqlite3.Error as e:
+                self.logger.warning(f"任務存儲維護失敗: {e}")
+            await asyncio.sleep(self.maintenance_interval)
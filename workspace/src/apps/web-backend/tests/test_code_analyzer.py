@@ -9,6 +9,7 @@ Version: 2.0.0
 ============================================================================
 """
 
+import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -24,11 +25,16 @@ from services.code_analyzer import (
     CodeAnalysisEngine,
     CodeIssue,
     CodeMetrics,
+    DiskResultStore,
     IssueType,
     JavaScriptAnalyzer,
+    LinePatternSet,
     PythonAnalyzer,
     SeverityLevel,
     StaticAnalyzer,
+    git_blob_hash,
+    iter_language_shards,
+    iter_source_files,
 )
 
 # ============================================================================
@@ -330,6 +336,171 @@ class TestCodeAnalysisEngine:
         assert 'cache_misses' in metrics
 
 
+# ============================================================================
+# 測試代碼庫分析管線
+# ============================================================================
+
+class TestRepositoryPipeline:
+    """測試代碼庫分析管線"""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """創建測試代碼庫"""
+        repo = tmp_path / "repo"
+        (repo / "src").mkdir(parents=True)
+        (repo / "src" / "app.py").write_text('password = "hardcoded"\n# comment\nx = 1\n')
+        (repo / "src" / "util.py").write_text("def ok() -> int:\n    return 1\n")
+        (repo / "web.js").write_text("var a = 1;\nelement.innerHTML = a;\n")
+        (repo / "README.md").write_text("# not analyzed\n")
+        (repo / "node_modules").mkdir()
+        (repo / "node_modules" / "dep.js").write_text("var skipped = 1;\n")
+        return repo
+
+    def test_iter_source_files(self, repo):
+        """測試串流遍歷跳過排除目錄與未知語言，並按路徑字典序產出"""
+        (repo / "src" / "lib").mkdir()
+        (repo / "src" / "lib" / "core.py").write_text("x = 1\n")
+        (repo / "main.py").write_text("x = 1\n")
+
+        files = [(rel, lang) for rel, _, lang in iter_source_files(str(repo))]
+
+        assert files == [
+            ("main.py", "python"),
+            ("src/app.py", "python"),
+            ("src/lib/core.py", "python"),
+            ("src/util.py", "python"),
+            ("web.js", "javascript"),
+        ]
+
+    def test_iter_language_shards(self):
+        """測試按語言分桶與分片大小"""
+        files = [(f"f{i}.py", f"/r/f{i}.py", "python") for i in range(5)]
+        files.append(("a.js", "/r/a.js", "javascript"))
+
+        shards = list(iter_language_shards(iter(files), shard_size=2))
+
+        assert [(lang, len(batch)) for lang, batch in shards] == [
+            ("python", 2), ("python", 2), ("python", 1), ("javascript", 1)
+        ]
+
+    def test_line_pattern_set(self):
+        """測試預篩後逐行匹配"""
+        patterns = LinePatternSet([(r"eval\(", "eval"), (r"exec\(", "exec")])
+
+        assert list(patterns.scan("x = 1\ny = 2")) == []
+        assert [(n, tag) for n, _, tag in patterns.scan("a\neval(b); exec(c)\n")] == [
+            (2, "eval"), (2, "exec")
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("process_workers", [1, 2])
+    async def test_analyze_repository_pipeline(self, repo, process_workers):
+        """測試分片分析、增量聚合與進度回報"""
+        engine = CodeAnalysisEngine({
+            'max_workers': 2,
+            'process_workers': process_workers,
+            'shard_size': 1,
+            'result_store': False,
+        })
+        progress = []
+
+        result = await engine.analyze_repository(
+            repo_path=str(repo),
+            commit_hash="abc123",
+            progress_callback=progress.append
+        )
+
+        assert result.files_analyzed == 3
+        assert result.languages_detected == {"python", "javascript"}
+        assert result.metrics.lines_of_code == 7
+        assert any(issue.file == "src/app.py" and issue.severity == SeverityLevel.CRITICAL for issue in result.issues)
+        assert any("var" in issue.message.lower() for issue in result.issues)
+        assert result.issues[0].severity == SeverityLevel.CRITICAL
+        assert progress[-1]["done"] is True
+        assert progress[-1]["files_analyzed"] == 3
+        analyzed = [snapshot["files_analyzed"] for snapshot in progress]
+        assert analyzed == sorted(analyzed)
+
+
+# ============================================================================
+# 測試增量分析與結果存儲
+# ============================================================================
+
+class TestIncrementalAnalysis:
+    """測試內容尋址結果存儲與基於提交的增量分析"""
+
+    def test_git_blob_hash_matches_git(self):
+        """測試 blob 哈希與 git hash-object 一致"""
+        assert git_blob_hash(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+    def test_disk_result_store(self, tmp_path):
+        """測試磁盤存儲讀寫"""
+        store = DiskResultStore(tmp_path)
+
+        assert store.get("missing") is None
+        store.put("file:1:abc", {"issues": []})
+        assert DiskResultStore(tmp_path).get("file:1:abc") == {"issues": []}
+
+    def test_code_issue_round_trip(self):
+        """測試問題序列化往返"""
+        issue = CodeIssue(type=IssueType.SECURITY, severity=SeverityLevel.HIGH, file="a.py", line=3)
+
+        restored = CodeIssue.from_dict(issue.to_dict(), "b.py")
+
+        assert restored.type == IssueType.SECURITY
+        assert restored.severity == SeverityLevel.HIGH
+        assert restored.file == "b.py"
+        assert restored.line == 3
+        assert restored.timestamp == issue.timestamp
+
+    def test_cache_key_is_content_addressed(self):
+        """測試緩存鍵只取決於內容、擴展名與分析器版本"""
+        analyzer = StaticAnalyzer({})
+        code = "x = 1\n"
+
+        assert analyzer._get_cache_key(code, "a/x.py") == analyzer._get_cache_key(code, "b/y.py")
+        assert analyzer._get_cache_key(code, "x.py") != analyzer._get_cache_key(code, "x.js")
+        assert analyzer._get_cache_key(code, "x.py") != analyzer._get_cache_key("x = 2\n", "x.py")
+
+    @pytest.mark.asyncio
+    async def test_analyze_with_result_store(self, tmp_path):
+        """測試分析器通過存儲重用結果"""
+        analyzer = StaticAnalyzer({}, result_store=DiskResultStore(tmp_path))
+        code = 'password = "hardcoded"\n'
+
+        first = await analyzer.analyze(code, "a.py")
+        second = await analyzer.analyze(code, "b.py")
+
+        assert analyzer.metrics['cache_hits'] == 1
+        assert [i.message for i in first] == [i.message for i in second]
+        assert all(issue.file == "b.py" for issue in second)
+
+    @pytest.mark.asyncio
+    async def test_analyze_repository_with_base_commit(self, tmp_path):
+        """測試只分析相對基準提交變更的文件"""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        (repo / "a.py").write_text('password = "hardcoded"\n')
+        (repo / "b.py").write_text("x = 1\n")
+        git = ['git', '-C', str(repo), '-c', 'user.email=ci@example.com', '-c', 'user.name=ci']
+        subprocess.run([*git, 'init', '-q'], check=True)
+        subprocess.run([*git, 'add', '-A'], check=True)
+        subprocess.run([*git, 'commit', '-qm', 'base'], check=True)
+
+        config = {'process_workers': 1, 'result_store_dir': str(tmp_path / "store")}
+        engine = CodeAnalysisEngine(config)
+        base = await engine.analyze_repository(str(repo), "HEAD")
+        assert base.files_reused == 0
+
+        (repo / "b.py").write_text('token = "abc"\n')
+        (repo / "c.py").write_text("y = 2\n")
+        result = await engine.analyze_repository(str(repo), "WORKTREE", base_commit="HEAD")
+
+        assert result.files_analyzed == 3
+        assert result.files_reused == 1
+        assert {issue.file for issue in result.issues if issue.type == IssueType.SECURITY} == {"a.py", "b.py"}
+
+
 # ============================================================================
 # 集成測試
 # ============================================================================
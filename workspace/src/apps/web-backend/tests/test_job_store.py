@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+分析任務存儲與工作池單元測試
+============================================================================
+"""
+
+import asyncio
+import sqlite3
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.job_store import JobStore, JobWorkerPool
+
+# ============================================================================
+# 測試任務存儲
+# ============================================================================
+
+class TestJobStore:
+    """測試 SQLite 任務存儲"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.sqlite3"))
+        yield store
+        store.close()
+
+    def test_claim_in_submission_order(self, store):
+        """測試按提交順序領取，每個任務只領取一次"""
+        first = store.submit({"repository": "a"})
+        second = store.submit({"repository": "b"})
+
+        assert store.claim()["id"] == first
+        job = store.claim()
+        assert job["id"] == second
+        assert job["status"] == "running"
+        assert job["attempts"] == 1
+        assert store.claim() is None
+
+    def test_complete_and_fail(self, store):
+        """測試完成與失敗狀態及結果往返"""
+        ok = store.submit({"repository": "a"})
+        bad = store.submit({"repository": "b"})
+        store.claim()
+        store.claim()
+
+        store.complete(ok, {"issues": [{"id": "x"}], "total_issues": 1}, "done", {"files_done": 3})
+        store.fail(bad, "boom", "Analysis failed: boom")
+
+        job = store.get(ok)
+        assert job["status"] == "completed"
+        assert job["result"]["total_issues"] == 1
+        assert job["progress"] == {"files_done": 3}
+        assert store.get(bad)["error"] == "boom"
+        assert store.counts() == {
+            "pending": 0, "running": 0, "completed": 1, "failed": 1, "cancelled": 0, "total": 2
+        }
+
+    def test_list_pagination_and_status(self, store):
+        """測試分頁按創建時間倒序並可按狀態過濾"""
+        ids = [store.submit({"repository": f"repo-{i}"}) for i in range(5)]
+        store.claim()
+
+        page = store.list(limit=2, offset=1)
+        assert [job["id"] for job in page] == [ids[3], ids[2]]
+        assert [job["id"] for job in store.list(status="running")] == [ids[0]]
+        assert "result" not in page[0]
+
+    def test_persistence_and_recover(self, tmp_path):
+        """測試重啟後狀態保留，租約過期的中斷任務重新入隊"""
+        path = str(tmp_path / "jobs.sqlite3")
+        store = JobStore(path)
+        job_id = store.submit({"repository": "a"})
+        store.claim(lease_seconds=0)
+        store.close()
+
+        reopened = JobStore(path)
+        assert reopened.recover() == 1
+        job = reopened.get(job_id)
+        assert (job["status"], job["owner"], job["lease_expires_at"]) == ("pending", None, None)
+        assert reopened.claim()["attempts"] == 2
+        reopened.close()
+
+    def test_recover_skips_live_leases(self, tmp_path):
+        """測試只回收租約過期的任務，其他進程持有的任務不受影響"""
+        path = str(tmp_path / "jobs.sqlite3")
+        live = JobStore(path, owner="live")
+        dead = JobStore(path, owner="dead")
+        other = JobStore(path, owner="other")
+        live_id = live.submit({"repository": "a"})
+        dead_id = live.submit({"repository": "b"})
+        assert live.claim()["owner"] == "live"
+        assert dead.claim(lease_seconds=0)["id"] == dead_id
+
+        assert other.recover() == 1
+        assert live.get(live_id)["status"] == "running"
+        assert live.get(dead_id)["status"] == "pending"
+
+        # 只有持有者能續約、寫入結果或釋放
+        assert other.heartbeat([live_id]) == 0
+        assert live.heartbeat([live_id, dead_id]) == 1
+        other.complete(live_id, {"total_issues": 0})
+        assert live.get(live_id)["status"] == "running"
+        assert other.release([live_id]) == 0
+        assert live.release([live_id]) == 1
+        assert live.get(live_id)["status"] == "pending"
+
+        # 被回收後重新領取，原持有者遲到的結果不會寫入
+        assert other.claim()["id"] == live_id
+        dead.complete(dead_id, {"total_issues": 0})
+        assert dead.get(dead_id)["status"] == "pending"
+        for store in (live, dead, other):
+            store.close()
+
+    def test_migrates_store_without_lease_columns(self, tmp_path):
+        """測試舊版數據庫補上租約欄位，無租約的運行中任務視為過期"""
+        path = tmp_path / "jobs.sqlite3"
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE jobs (
+                id TEXT PRIMARY KEY, status TEXT NOT NULL, repository TEXT NOT NULL,
+                request TEXT NOT NULL, created_at TEXT NOT NULL, started_at TEXT,
+                completed_at TEXT, message TEXT NOT NULL DEFAULT '', error TEXT,
+                progress TEXT, result BLOB, compacted INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            INSERT INTO jobs (id, status, repository, request, created_at, attempts)
+            VALUES ('old', 'running', 'a', '{}', '2024-01-01T00:00:00', 1);
+        """)
+        conn.close()
+
+        store = JobStore(str(path))
+        assert store.recover() == 1
+        assert store.claim()["id"] == "old"
+        store.close()
+
+    def test_compact_and_evict(self, store):
+        """測試壓實移除問題明細，淘汰只影響已結束任務"""
+        ids = [store.submit({"repository": "a"}) for _ in range(3)]
+        for job_id in ids[:2]:
+            store.claim()
+            store.complete(job_id, {"issues": [{"id": "x"}], "total_issues": 1})
+
+        assert store.compact(timedelta(0)) == 2
+        result = store.get(ids[0])["result"]
+        assert result["issues"] == [] and result["issues_compacted"]
+        assert result["total_issues"] == 1
+        assert store.compact(timedelta(0)) == 0
+
+        assert store.evict(max_finished=1) == 1
+        assert store.get(ids[0]) is None
+        assert store.get(ids[1]) is not None
+        assert store.evict(max_age=timedelta(0)) == 1
+        assert store.get(ids[2])["status"] == "pending"
+
+    def test_delete_running_job(self, store):
+        """測試刪除運行中任務後，遲到的結果不會重新寫入"""
+        job_id = store.submit({"repository": "a"})
+        store.claim()
+        assert store.delete(job_id)
+        store.complete(job_id, {"total_issues": 0})
+        assert store.get(job_id) is None
+        assert not store.delete(job_id)
+
+
+# ============================================================================
+# 測試工作池
+# ============================================================================
+
+class TestJobWorkerPool:
+    """測試有界工作池"""
+
+    def test_bounded_concurrency(self, tmp_path):
+        """測試同時運行的任務數不超過上限，失敗任務記錄錯誤"""
+        store = JobStore(str(tmp_path / "jobs.sqlite3"))
+        running = 0
+        peak = 0
+
+        async def handler(job, report_progress):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            report_progress({"files_done": 1})
+            await asyncio.sleep(0.01)
+            running -= 1
+            if job["request"]["repository"] == "broken":
+                raise RuntimeError("boom")
+            return {"repository": job["request"]["repository"]}
+
+        async def scenario():
+            pool = JobWorkerPool(store, handler, concurrency=2, poll_interval=0.01)
+            pool.start()
+            ids = [store.submit({"repository": f"repo-{i}"}) for i in range(5)]
+            ids.append(store.submit({"repository": "broken"}))
+            pool.notify()
+            while store.counts()["pending"] or store.counts()["running"]:
+                await asyncio.sleep(0.01)
+            await pool.stop()
+            return ids
+
+        ids = asyncio.run(scenario())
+
+        assert peak == 2
+        assert store.get(ids[0])["result"] == {"repository": "repo-0"}
+        assert store.get(ids[0])["progress"] == {"files_done": 1}
+        assert store.get(ids[-1])["status"] == "failed"
+        store.close()
+
+    def test_heartbeat_recovers_expired_and_keeps_own_leases(self, tmp_path):
+        """測試心跳為運行中任務續約，並接手其他進程遺留的過期任務"""
+        path = str(tmp_path / "jobs.sqlite3")
+        crashed = JobStore(path, owner="crashed")
+        orphan = crashed.submit({"repository": "orphan"})
+        crashed.claim(lease_seconds=0)
+        store = JobStore(path, owner="pool")
+        leases = []
+
+        async def handler(job, report_progress):
+            if job["request"]["repository"] == "slow":
+                # 租約僅 0.2 秒，任務運行期間須由心跳續約
+                for _ in range(5):
+                    await asyncio.sleep(0.1)
+                    leases.append(await asyncio.to_thread(crashed.recover))
+            return {"repository": job["request"]["repository"]}
+
+        async def scenario():
+            pool = JobWorkerPool(store, handler, concurrency=1, poll_interval=0.01,
+                                 lease_seconds=0.2, heartbeat_interval=0.02)
+            slow = store.submit({"repository": "slow"})
+            pool.start()
+            while store.counts()["pending"] or store.counts()["running"]:
+                await asyncio.sleep(0.01)
+            await pool.stop()
+            return slow
+
+        slow = asyncio.run(scenario())
+
+        assert store.get(orphan)["result"] == {"repository": "orphan"}
+        assert store.get(orphan)["attempts"] == 2
+        assert store.get(slow)["status"] == "completed"
+        assert leases == [0, 0, 0, 0, 0]
+        crashed.close()
+        store.close()
+
+    def test_stop_releases_running_jobs(self, tmp_path):
+        """測試停止工作池時運行中任務立即重新入隊"""
+        store = JobStore(str(tmp_path / "jobs.sqlite3"))
+        started = asyncio.Event()
+
+        async def handler(job, report_progress):
+            started.set()
+            await asyncio.sleep(10)
+
+        async def scenario():
+            pool = JobWorkerPool(store, handler, concurrency=1, poll_interval=0.01)
+            job_id = store.submit({"repository": "a"})
+            pool.start()
+            await asyncio.wait_for(started.wait(), timeout=5)
+            await pool.stop()
+            return job_id
+
+        job_id = asyncio.run(scenario())
+
+        job = store.get(job_id)
+        assert (job["status"], job["owner"]) == ("pending", None)
+        store.close()
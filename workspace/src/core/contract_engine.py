@@ -23,7 +23,9 @@ import asyncio
 import hashlib
 import json
 import logging
+import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -32,6 +34,11 @@ from uuid import uuid4
 
 import yaml
 
+try:
+    from .validators.schema_compiler import CompiledSchema, compile_schema
+except ImportError:
+    from validators.schema_compiler import CompiledSchema, compile_schema
+
 
 # =============================================================================
 # Configuration | 配置
@@ -323,15 +330,23 @@ class ContractValidator:
     4. Security validation - Security policy compliance
     """
     
-    def __init__(self, execution_mode: ExecutionMode = ExecutionMode.STRICT):
+    def __init__(
+        self,
+        execution_mode: ExecutionMode = ExecutionMode.STRICT,
+        max_compiled_schemas: int = 256
+    ):
         """
         Initialize contract validator
         
         Args:
             execution_mode: Validation execution mode
+            max_compiled_schemas: Compiled schemas kept, least recently used evicted
         """
         self.execution_mode = execution_mode
         self._validators: List[Callable] = []
+        # checksum -> validator, LRU-bounded
+        self._compiled_schemas: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+        self._max_compiled_schemas = max(1, max_compiled_schemas)
         
         # Register default validators
         self._register_default_validators()
@@ -395,6 +410,10 @@ class ContractValidator:
                 errors.append("Schema missing 'type' field")
             if "properties" not in contract.schema:
                 warnings.append("Schema missing 'properties' field")
+            try:
+                self.compile_contract(contract)
+            except re.error as e:
+                errors.append(f"Invalid pattern in schema: {e}")
         
         return ValidationResult(
             is_valid=len(errors) == 0,
@@ -477,6 +496,26 @@ class ContractValidator:
             warnings=warnings
         )
     
+    def compile_contract(self, contract: ContractDefinition) -> CompiledSchema:
+        """
+        Compile a contract's input schema once, keyed by its checksum
+        
+        Args:
+            contract: Contract whose schema to compile
+            
+        Returns:
+            Compiled schema validator
+        """
+        compiled = self._compiled_schemas.get(contract.checksum)
+        if compiled is not None:
+            self._compiled_schemas.move_to_end(contract.checksum)
+            return compiled
+        compiled = compile_schema(contract.schema)
+        self._compiled_schemas[contract.checksum] = compiled
+        while len(self._compiled_schemas) > self._max_compiled_schemas:
+            self._compiled_schemas.popitem(last=False)
+        return compiled
+    
     def validate_execution(
         self,
         contract: ContractDefinition,
@@ -495,34 +534,15 @@ class ContractValidator:
         errors: List[str] = []
         warnings: List[str] = []
         
-        # Validate input against schema
-        if contract.schema.get("properties"):
-            required_fields = contract.schema.get("required", [])
-            for field in required_fields:
-                if field not in input_data:
-                    errors.append(f"Missing required field: {field}")
-        
-        # Validate types
-        properties = contract.schema.get("properties", {})
-        for field, value in input_data.items():
-            if field in properties:
-                expected_type = properties[field].get("type")
-                actual_type = type(value).__name__
-                
-                type_map = {
-                    "str": "string",
-                    "int": "integer",
-                    "float": "number",
-                    "bool": "boolean",
-                    "list": "array",
-                    "dict": "object"
-                }
-                
-                if type_map.get(actual_type) != expected_type:
-                    errors.append(
-                        f"Type mismatch for '{field}': "
-                        f"expected {expected_type}, got {actual_type}"
-                    )
+        # Validate input against the compiled schema
+        for violation in self.compile_contract(contract).validate(input_data):
+            if violation.keyword == "type":
+                errors.append(
+                    f"Type mismatch for '{violation.path}': "
+                    f"expected {violation.expected}, got {violation.actual}"
+                )
+            else:
+                errors.append(violation.message)
         
         return ValidationResult(
             is_valid=len(errors) == 0,
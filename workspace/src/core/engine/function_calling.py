@@ -178,10 +178,17 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Union
 from datetime import datetime
+import fnmatch
+import re
 import uuid
 import json
 import asyncio
 
+try:
+    from ..validators.schema_compiler import CompiledSchema, compile_schema
+except ImportError:
+    from core.validators.schema_compiler import CompiledSchema, compile_schema
+
 
 class FunctionCallStatus(Enum):
     """
@@ -308,6 +315,21 @@ class FunctionDefinition:
         "properties": {},
         "required": []
     })
+    _validator: Optional[CompiledSchema] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def compile(self) -> CompiledSchema:
+        """
+        Compile the parameter schema into a reusable validator.
+
+        Called by FunctionCallHandler.register(); if ``parameters`` is replaced
+        afterwards, call compile() again.
+
+        編譯參數 Schema 為可重用的驗證器。
+        """
+        self._validator = compile_schema(self.parameters)
+        return self._validator
     
     def to_openai_format(self) -> Dict[str, Any]:
         """
@@ -383,7 +405,7 @@ class FunctionDefinition:
         Validation Checks:
             1. Required Fields: All fields in "required" array must be present
             2. Type Checking: Values must match their declared JSON Schema type
-            3. Future: Additional constraints (min/max, enum, patterns, etc.)
+            3. Constraints: nested objects/arrays, enum, pattern, min/max, etc.
 
         Type Mapping:
             - "string" → str
@@ -420,41 +442,16 @@ class FunctionDefinition:
             >>> print(errors)  # Output: ['Invalid type for age: expected integer']
 
         Note:
-            This is a basic validation implementation. For comprehensive JSON Schema
-            validation, consider using libraries like jsonschema or pydantic.
+            The schema is compiled once (see compile()) into a validator from
+            core.validators.schema_compiler; booleans are not accepted as
+            integers or numbers.
 
         See Also:
             - FunctionCallHandler.handle_call(): Uses this for validation
             - FunctionCallResult.validation_errors: Stores validation errors
         """
-        errors = []
-
-        required = self.parameters.get("required", [])
-        properties = self.parameters.get("properties", {})
-
-        # Check required fields
-        for field_name in required:
-            if field_name not in arguments:
-                errors.append(f"Missing required field: {field_name}")
-
-        # Check types
-        type_map = {
-            "string": str,
-            "number": (int, float),
-            "integer": int,
-            "boolean": bool,
-            "array": list,
-            "object": dict,
-        }
-
-        for key, value in arguments.items():
-            if key in properties:
-                expected_type = properties[key].get("type")
-                if expected_type and expected_type in type_map:
-                    if not isinstance(value, type_map[expected_type]):
-                        errors.append(f"Invalid type for {key}: expected {expected_type}")
-
-        return errors
+        validator = self._validator or self.compile()
+        return [violation.message for violation in validator.validate(arguments)]
 
 
 @dataclass
@@ -786,6 +783,7 @@ class FunctionCallHandler:
             - unregister(): Remove a registered function
             - list_functions(): View all registered functions
         """
+        function_def.compile()
         self._functions[function_def.name] = function_def
         self._handlers[function_def.name] = handler
     
@@ -1041,10 +1039,31 @@ class RoutingRule:
         ...     priority=50
         ... )
 
+    Example - Structured Matchers (indexed, preferred):
+        >>> rule = RoutingRule(
+        ...     name="database_rule",
+        ...     name_prefix="db_",
+        ...     param_equals={"engine": "postgres"},
+        ...     executor_id="database_executor",
+        ...     priority=10
+        ... )
+
+    Structured Matchers:
+        tool_name (str): Exact tool name
+        name_prefix (str): Tool name prefix
+        name_glob (str): fnmatch-style pattern, e.g. "db_*_read"
+        param_equals (Dict[str, Any]): Params that must equal these values
+        param_present (List[str]): Params that must be present
+
+        Name matchers are resolved once per tool name and cached by the
+        router; only param matchers and ``condition`` run per call. A rule
+        may combine structured matchers with a ``condition``.
+
     Condition Best Practices:
         - Keep conditions fast (evaluated on every call)
         - Avoid side effects in conditions
         - Make conditions deterministic
+        - Prefer structured matchers, which are indexed
         - Use specific conditions for high-priority rules
         - Use general conditions for low-priority rules
 
@@ -1053,9 +1072,51 @@ class RoutingRule:
         - ToolCallRouter.route(): Evaluate rules to find executor
     """
     name: str
-    condition: Callable[[str, Dict[str, Any]], bool]
-    executor_id: str
+    condition: Optional[Callable[[str, Dict[str, Any]], bool]] = None
+    executor_id: str = ""
     priority: int = 0
+    tool_name: Optional[str] = None
+    name_prefix: Optional[str] = None
+    name_glob: Optional[str] = None
+    param_equals: Dict[str, Any] = field(default_factory=dict)
+    param_present: List[str] = field(default_factory=list)
+    _glob_regex: Optional["re.Pattern"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        if self.name_glob is not None:
+            self._glob_regex = re.compile(fnmatch.translate(self.name_glob))
+    
+    def matches_name(self, tool_name: str) -> bool:
+        """Check the name matchers only (static per tool name)"""
+        if self.tool_name is not None and tool_name != self.tool_name:
+            return False
+        if self.name_prefix is not None and not tool_name.startswith(self.name_prefix):
+            return False
+        if self._glob_regex is not None and not self._glob_regex.match(tool_name):
+            return False
+        return True
+    
+    @property
+    def has_param_matchers(self) -> bool:
+        """True if the rule depends on call parameters"""
+        return bool(self.condition or self.param_equals or self.param_present)
+    
+    def matches_params(self, tool_name: str, params: Dict[str, Any]) -> bool:
+        """Check the per-call matchers"""
+        for key in self.param_present:
+            if key not in params:
+                return False
+        for key, expected in self.param_equals.items():
+            if params.get(key, _MISSING) != expected:
+                return False
+        if self.condition is not None and not self.condition(tool_name, params):
+            return False
+        return True
+
+
+_MISSING = object()
 
 
 class ToolCallRouter:
@@ -1154,15 +1215,20 @@ class ToolCallRouter:
         Not thread-safe. Use separate instances or add synchronization.
 
     Performance:
-        - Rule evaluation: O(n) where n = number of rules
-        - Rules sorted by priority once on add/remove
-        - Executor lookup: O(1) hash table lookup
+        - Name matchers (exact/prefix/glob) are evaluated once per tool name;
+          the resulting candidate rules are cached until rules or executors
+          change
+        - Candidates stop at the first rule without param matchers, so
+          name-only routing is O(1) per call regardless of rule count
+        - Executor call shapes are resolved once at register_executor
 
     See Also:
         - RoutingRule: Define routing conditions
         - FunctionCallHandler: Basic executor without routing
     """
 
+    _ROUTE_CACHE_MAX = 10000
+
     def __init__(self):
         """
         Initialize an empty tool call router.
@@ -1172,53 +1238,97 @@ class ToolCallRouter:
         初始化工具調用路由器。
         """
         self._executors: Dict[str, Any] = {}
+        # executor_id -> (bound call, is_async); call is None if not callable
+        self._executor_calls: Dict[str, Any] = {}
         self._rules: List[RoutingRule] = []
         self._default_executor: Optional[str] = None
+        # tool_name -> candidate rules (name already matched), priority order
+        self._route_cache: Dict[str, tuple] = {}
     
     def register_executor(
         self,
         executor_id: str,
         executor: Any
     ) -> None:
-        """Register an executor"""
+        """Register an executor, resolving its call shape once"""
         self._executors[executor_id] = executor
+        
+        if hasattr(executor, 'execute'):
+            call = executor.execute
+        elif callable(executor):
+            call = executor
+        else:
+            call = None
+        # Callable instances with an async __call__ are detected via the bound method
+        is_async = callable(call) and (
+            asyncio.iscoroutinefunction(call)
+            or asyncio.iscoroutinefunction(call.__call__)
+        )
+        self._executor_calls[executor_id] = (call, is_async)
+        self._route_cache.clear()
     
     def unregister_executor(self, executor_id: str) -> None:
         """Unregister an executor"""
         if executor_id in self._executors:
             del self._executors[executor_id]
+            self._executor_calls.pop(executor_id, None)
+            self._route_cache.clear()
     
     def add_rule(self, rule: RoutingRule) -> None:
         """Add a routing rule"""
+        if not rule.executor_id:
+            raise ValueError(f"Routing rule {rule.name} has no executor_id")
         self._rules.append(rule)
-        # Sort by priority (higher first)
+        # Sort by priority (higher first); stable for equal priorities
         self._rules.sort(key=lambda r: r.priority, reverse=True)
+        self._route_cache.clear()
     
     def remove_rule(self, rule_name: str) -> None:
         """Remove a routing rule"""
         self._rules = [r for r in self._rules if r.name != rule_name]
+        self._route_cache.clear()
     
     def set_default_executor(self, executor_id: str) -> None:
         """Set the default executor"""
         self._default_executor = executor_id
     
+    def _candidates(self, tool_name: str) -> tuple:
+        """Rules whose name matchers accept tool_name, cut at the first sure match"""
+        candidates = self._route_cache.get(tool_name)
+        if candidates is None:
+            matched = []
+            for rule in self._rules:
+                if rule.executor_id not in self._executors or not rule.matches_name(tool_name):
+                    continue
+                matched.append(rule)
+                if not rule.has_param_matchers:
+                    break  # Always matches; lower-priority rules are unreachable
+            candidates = tuple(matched)
+            if len(self._route_cache) >= self._ROUTE_CACHE_MAX:
+                self._route_cache.clear()
+            self._route_cache[tool_name] = candidates
+        return candidates
+    
+    def _resolve(self, tool_name: str, params: Dict[str, Any]) -> Optional[str]:
+        """Resolve the executor ID for a call"""
+        for rule in self._candidates(tool_name):
+            if not rule.has_param_matchers or rule.matches_params(tool_name, params):
+                return rule.executor_id
+        
+        # Use default executor
+        if self._default_executor and self._default_executor in self._executors:
+            return self._default_executor
+        
+        return None
+    
     def route(
         self,
         tool_name: str,
         params: Dict[str, Any]
     ) -> Optional[Any]:
         """Route a tool call to the appropriate executor"""
-        # Check rules in priority order
-        for rule in self._rules:
-            if rule.condition(tool_name, params):
-                if rule.executor_id in self._executors:
-                    return self._executors[rule.executor_id]
-        
-        # Use default executor
-        if self._default_executor and self._default_executor in self._executors:
-            return self._executors[self._default_executor]
-        
-        return None
+        executor_id = self._resolve(tool_name, params)
+        return self._executors[executor_id] if executor_id is not None else None
     
     async def execute(
         self,
@@ -1226,24 +1336,18 @@ class ToolCallRouter:
         params: Dict[str, Any]
     ) -> Any:
         """Route and execute a tool call"""
-        executor = self.route(tool_name, params)
+        executor_id = self._resolve(tool_name, params)
         
-        if executor is None:
+        if executor_id is None:
             raise ValueError(f"No executor found for tool: {tool_name}")
         
-        # Execute based on executor type
-        if hasattr(executor, 'execute'):
-            if asyncio.iscoroutinefunction(executor.execute):
-                return await executor.execute(tool_name, params)
-            else:
-                return executor.execute(tool_name, params)
-        elif callable(executor):
-            if asyncio.iscoroutinefunction(executor):
-                return await executor(tool_name, params)
-            else:
-                return executor(tool_name, params)
-        else:
-            raise ValueError(f"Executor is not callable: {type(executor)}")
+        call, is_async = self._executor_calls[executor_id]
+        if call is None:
+            raise ValueError(f"Executor is not callable: {type(self._executors[executor_id])}")
+        
+        if is_async:
+            return await call(tool_name, params)
+        return call(tool_name, params)
     
     def list_executors(self) -> List[str]:
         """List all executor IDs"""
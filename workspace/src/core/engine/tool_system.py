@@ -13,6 +13,11 @@ import uuid
 import json
 import asyncio
 
+try:
+    from ..validators.schema_compiler import CompiledSchema, compile_schema
+except ImportError:
+    from core.validators.schema_compiler import CompiledSchema, compile_schema
+
 
 class ToolCategory(Enum):
     """Tool categories for organization and routing"""
@@ -78,6 +83,15 @@ class Tool:
     created_at: datetime = field(default_factory=datetime.now)
     tags: List[str] = field(default_factory=list)
     
+    # Compiled input validator (built once by compile_schemas)
+    _input_validator: Optional[CompiledSchema] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def compile_schemas(self) -> None:
+        """Compile the input schema; called on registration"""
+        self._input_validator = compile_schema(self.input_schema) if self.input_schema else None
+    
     async def execute(self, params: Dict[str, Any]) -> ToolResult:
         """Execute the tool with given parameters"""
         start_time = datetime.now()
@@ -129,30 +143,12 @@ class Tool:
         if not self.input_schema:
             return
         
-        required = self.input_schema.get('required', [])
-        properties = self.input_schema.get('properties', {})
+        if self._input_validator is None:
+            self.compile_schemas()
         
-        for req_field in required:
-            if req_field not in params:
-                raise ValueError(f"Missing required field: {req_field}")
-        
-        for key, value in params.items():
-            if key in properties:
-                expected_type = properties[key].get('type')
-                if expected_type and not self._check_type(value, expected_type):
-                    raise ValueError(f"Invalid type for {key}: expected {expected_type}")
-    
-    def _check_type(self, value: Any, expected_type: str) -> bool:
-        """Check if value matches expected JSON Schema type"""
-        type_map = {
-            'string': str,
-            'number': (int, float),
-            'integer': int,
-            'boolean': bool,
-            'array': list,
-            'object': dict,
-        }
-        return isinstance(value, type_map.get(expected_type, object))
+        violation = self._input_validator.first_error(params)
+        if violation is not None:
+            raise ValueError(violation.message)
     
     def to_openai_function(self) -> Dict[str, Any]:
         """Convert to OpenAI function calling format"""
@@ -193,6 +189,7 @@ class ToolRegistry:
         if tool.name in self._tools:
             raise ValueError(f"Tool {tool.name} already registered")
         
+        tool.compile_schemas()
         self._tools[tool.name] = tool
         self._categories[tool.category].append(tool.name)
         
@@ -3,15 +3,22 @@ Real-Time Connector - Real-time connection management for MCP servers
 
 This module provides real-time connection management capabilities
 including WebSocket support, connection pooling, and automatic reconnection.
+
+Outbound traffic goes through a bounded per-connection send queue drained by
+a writer task, which coalesces messages issued in the same event loop tick
+into a single JSON-RPC batch frame. Request timeouts are expired by a shared
+timer wheel rather than one ``wait_for`` per call.
 """
 
 import asyncio
 import json
 import logging
+import math
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
@@ -51,6 +58,137 @@ class ConnectionConfig:
     ssl: bool = False
     ssl_verify: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
+    batch_requests: bool = True
+    max_batch_size: int = 100
+    send_queue_size: int = 1000
+    latency_window: int = 1024
+
+
+class LatencyHistogram:
+    """
+    Rolling latency histogram over the most recent samples
+
+    Samples are counted in logarithmic buckets (~25% width) so recording is
+    O(1) and percentile queries walk a fixed number of buckets. Samples that
+    fall out of the window are subtracted from their bucket.
+    """
+
+    GROWTH = 1.25
+    MIN_MS = 0.01
+    NUM_BUCKETS = 72  # Covers 0.01ms .. ~100s
+
+    def __init__(self, window: int = 1024):
+        self._samples: Deque[int] = deque()
+        self._window = max(1, window)
+        self._counts = [0] * self.NUM_BUCKETS
+        self._log_growth = math.log(self.GROWTH)
+
+    def _bucket(self, value_ms: float) -> int:
+        if value_ms <= self.MIN_MS:
+            return 0
+        index = int(math.log(value_ms / self.MIN_MS) / self._log_growth) + 1
+        return min(index, self.NUM_BUCKETS - 1)
+
+    def record(self, value_ms: float) -> None:
+        """Record a latency sample in milliseconds"""
+        bucket = self._bucket(value_ms)
+        self._samples.append(bucket)
+        self._counts[bucket] += 1
+        if len(self._samples) > self._window:
+            self._counts[self._samples.popleft()] -= 1
+
+    def percentile(self, pct: float) -> float:
+        """Approximate latency at the given percentile (0-100)"""
+        total = len(self._samples)
+        if total == 0:
+            return 0.0
+        rank = max(1, math.ceil(total * pct / 100.0))
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                if bucket == 0:
+                    return self.MIN_MS
+                # Geometric midpoint of the bucket bounds
+                return self.MIN_MS * self.GROWTH ** (bucket - 0.5)
+        return self.MIN_MS * self.GROWTH ** (self.NUM_BUCKETS - 1)
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for request deadlines
+
+    Scheduling and cancelling are O(1) amortised; a single ticker expires all
+    deadlines in the current slot. The ticker asks next_expiry() how long it
+    may sleep, so an idle wheel costs nothing.
+    """
+
+    def __init__(self, resolution: float = 0.01, slots: int = 512):
+        self.resolution = resolution
+        self._slots: List[List[Tuple[int, str]]] = [[] for _ in range(slots)]
+        self._slot_of: Dict[str, int] = {}
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def schedule(self, key: str, delay: float, elapsed: float = 0.0) -> None:
+        """
+        Schedule key to expire after delay seconds
+
+        elapsed is the time already passed since the current tick, for
+        callers whose ticker has not advanced the wheel yet.
+        """
+        self.cancel(key)
+        ticks = max(1, math.ceil((delay + elapsed) / self.resolution))
+        slot = (self._cursor + ticks) % len(self._slots)
+        rounds = (ticks - 1) // len(self._slots)
+        self._slots[slot].append((rounds, key))
+        self._slot_of[key] = slot
+
+    def cancel(self, key: str) -> bool:
+        """Remove a scheduled key; returns False if it was not scheduled"""
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        self._slots[slot] = [entry for entry in self._slots[slot] if entry[1] != key]
+        return True
+
+    def next_expiry(self) -> Optional[int]:
+        """Ticks until the earliest scheduled key expires, or None if empty"""
+        if not self._slot_of:
+            return None
+        size = len(self._slots)
+        best: Optional[int] = None
+        for distance in range(1, size + 1):
+            if best is not None and distance >= best:
+                break
+            for rounds, _ in self._slots[(self._cursor + distance) % size]:
+                ticks = distance + rounds * size
+                if best is None or ticks < best:
+                    best = ticks
+        return best
+
+    def advance(self) -> List[str]:
+        """Advance one tick and return the keys that expired"""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        entries = self._slots[self._cursor]
+        if not entries:
+            return []
+        expired = []
+        remaining = []
+        for rounds, key in entries:
+            if rounds > 0:
+                remaining.append((rounds - 1, key))
+            else:
+                expired.append(key)
+                del self._slot_of[key]
+        self._slots[self._cursor] = remaining
+        return expired
 
 
 @dataclass
@@ -65,7 +203,10 @@ class Connection:
     error_count: int = 0
     messages_sent: int = 0
     messages_received: int = 0
+    batches_sent: int = 0
+    messages_expired: int = 0
     latency_ms: float = 0.0
+    latency_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -83,7 +224,11 @@ class Connection:
             'error_count': self.error_count,
             'messages_sent': self.messages_sent,
             'messages_received': self.messages_received,
+            'batches_sent': self.batches_sent,
+            'messages_expired': self.messages_expired,
             'latency_ms': self.latency_ms,
+            'latency_p50_ms': self.latency_histogram.percentile(50),
+            'latency_p99_ms': self.latency_histogram.percentile(99),
             'metadata': self.metadata
         }
 
@@ -152,15 +297,23 @@ class RealTimeConnector:
     - Connection pooling
     - Automatic reconnection
     - Heartbeat monitoring
-    - Message queuing
+    - Message queuing with backpressure and JSON-RPC batching
     """
     
-    def __init__(self):
+    def __init__(self, timer_resolution: float = 0.01):
         self._connections: Dict[str, Connection] = {}
         self._pending_requests: Dict[str, asyncio.Future] = {}
+        self._request_methods: Dict[str, str] = {}
         self._message_handlers: Dict[str, List[Callable]] = {}
         self._heartbeat_tasks: Dict[str, asyncio.Task] = {}
         self._reconnect_tasks: Dict[str, asyncio.Task] = {}
+        self._send_queues: Dict[str, asyncio.Queue] = {}
+        self._writer_tasks: Dict[str, asyncio.Task] = {}
+        self._timer_wheel = TimerWheel(resolution=timer_resolution)
+        self._timer_task: Optional[asyncio.Task] = None
+        self._timer_wakeup = asyncio.Event()
+        self._timer_deadline: Optional[float] = None
+        self._wheel_time = 0.0
         self._is_running: bool = False
         
     async def start(self) -> None:
@@ -190,6 +343,13 @@ class RealTimeConnector:
         for future in self._pending_requests.values():
             future.cancel()
         self._pending_requests.clear()
+        self._request_methods.clear()
+        
+        if self._timer_task:
+            self._timer_task.cancel()
+            self._timer_task = None
+        self._timer_wheel = TimerWheel(resolution=self._timer_wheel.resolution)
+        self._timer_deadline = None
         
         logger.info('RealTimeConnector stopped')
         
@@ -218,6 +378,8 @@ class RealTimeConnector:
             connection.status = ConnectionStatus.CONNECTED
             connection.connect_time = datetime.now()
             connection.last_activity = datetime.now()
+            connection.latency_histogram = LatencyHistogram(config.latency_window)
+            self._start_writer(connection)
             
             # Start heartbeat if configured
             if config.heartbeat_interval > 0:
@@ -261,6 +423,15 @@ class RealTimeConnector:
         if task:
             task.cancel()
             
+        # Stop the writer and drop anything still queued
+        task = self._writer_tasks.pop(connection_id, None)
+        if task:
+            task.cancel()
+        queue = self._send_queues.pop(connection_id, None)
+        while queue is not None and not queue.empty():
+            message = queue.get_nowait()
+            self._fail_request(message.id, ConnectionError('Connection closed'))
+            
         connection.status = ConnectionStatus.DISCONNECTED
         await self._emit_event('disconnected', connection)
         logger.info(f'Disconnected from {connection.config.server_name}')
@@ -327,30 +498,32 @@ class RealTimeConnector:
             params=params
         )
         
-        # Create future for response
-        future = asyncio.Future()
+        # Create future for response; the timer wheel expires it on deadline
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
         self._pending_requests[request_id] = future
+        self._request_methods[request_id] = method
+        timeout_sec = (timeout or connection.config.timeout) / 1000.0
+        self._schedule_timeout(request_id, timeout_sec)
         
+        started = loop.time()
         try:
-            # Send message
-            await self._send_message(connection, message)
-            connection.messages_sent += 1
-            connection.last_activity = datetime.now()
+            # Enqueue message; blocks when the send queue is full
+            await self._enqueue(connection, message)
             
             # Wait for response
-            timeout_sec = (timeout or connection.config.timeout) / 1000.0
-            result = await asyncio.wait_for(future, timeout=timeout_sec)
+            result = await future
             
-            # Calculate latency
-            latency = (datetime.now() - message.timestamp).total_seconds() * 1000
-            connection.latency_ms = (connection.latency_ms + latency) / 2
+            # Record latency
+            connection.latency_histogram.record((loop.time() - started) * 1000)
+            connection.latency_ms = connection.latency_histogram.percentile(50)
             
             return result
             
-        except asyncio.TimeoutError:
-            raise TimeoutError(f'Request timed out: {method}')
         finally:
             self._pending_requests.pop(request_id, None)
+            self._request_methods.pop(request_id, None)
+            self._timer_wheel.cancel(request_id)
             
     async def send_notification(
         self,
@@ -373,9 +546,7 @@ class RealTimeConnector:
             params=params
         )
         
-        await self._send_message(connection, message)
-        connection.messages_sent += 1
-        connection.last_activity = datetime.now()
+        await self._enqueue(connection, message)
         
     def on_message(self, method: str, handler: Callable) -> None:
         """Register a handler for incoming messages"""
@@ -406,10 +577,96 @@ class RealTimeConnector:
             # Simulate SSE connection
             await asyncio.sleep(0.1)
             
+    def _start_writer(self, connection: Connection) -> None:
+        """Create the send queue and writer task for a connection"""
+        if connection.id not in self._send_queues:
+            self._send_queues[connection.id] = asyncio.Queue(
+                maxsize=max(1, connection.config.send_queue_size)
+            )
+        task = self._writer_tasks.get(connection.id)
+        if task is None or task.done():
+            self._writer_tasks[connection.id] = asyncio.create_task(
+                self._writer_loop(connection)
+            )
+            
+    async def _enqueue(self, connection: Connection, message: Message) -> None:
+        """Queue a message for sending, waiting while the queue is full"""
+        queue = self._send_queues.get(connection.id)
+        if queue is None:
+            raise ConnectionError(f'Connection not active: {connection.id}')
+        await queue.put(message)
+        
+    async def _writer_loop(self, connection: Connection) -> None:
+        """
+        Drain the send queue of a connection
+        
+        After the first message arrives, everything already queued (i.e.
+        issued in the same tick) is taken up to max_batch_size and written
+        as one frame.
+        """
+        queue = self._send_queues[connection.id]
+        config = connection.config
+        max_batch = max(1, config.max_batch_size) if config.batch_requests else 1
+        
+        while True:
+            try:
+                batch = [await queue.get()]
+                while len(batch) < max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                    
+                # Requests that timed out while queued are dropped, not sent
+                live = [message for message in batch if not self._is_expired(message)]
+                connection.messages_expired += len(batch) - len(live)
+                if not live:
+                    continue
+                batch = live
+                
+                try:
+                    await self._send_batch(connection, batch)
+                except Exception as e:
+                    logger.error(f'Send failed for {config.server_name}: {e}')
+                    connection.error_count += 1
+                    for message in batch:
+                        self._fail_request(message.id, ConnectionError(str(e)))
+                    continue
+                    
+                connection.messages_sent += len(batch)
+                connection.batches_sent += 1
+                connection.last_activity = datetime.now()
+                
+            except asyncio.CancelledError:
+                break
+                
+    async def _send_batch(self, connection: Connection, messages: List[Message]) -> None:
+        """Send one frame: a single message or a JSON-RPC batch array"""
+        if len(messages) == 1:
+            await self._send_message(connection, messages[0])
+            return
+            
+        data = json.dumps([message.to_dict() for message in messages])
+        await self._write_frame(connection, data)
+        logger.debug(f'Sent batch of {len(messages)} to {connection.config.server_name}')
+        
+        # Simulate responses for requests
+        requests = [message for message in messages if message.type == 'request']
+        if requests:
+            asyncio.create_task(self._simulate_batch_response(connection, requests))
+            
     async def _send_message(self, connection: Connection, message: Message) -> None:
         """Send a message over the connection"""
-        config = connection.config
         data = json.dumps(message.to_dict())
+        await self._write_frame(connection, data)
+            
+        # Simulate sending
+        logger.debug(f'Sent message to {connection.config.server_name}: {message.method}')
+        
+        # Simulate response for requests
+        if message.type == 'request':
+            asyncio.create_task(self._simulate_response(connection, message))
+            
+    async def _write_frame(self, connection: Connection, data: str) -> None:
+        """Write a serialized frame to the transport"""
+        config = connection.config
         
         if config.transport == TransportType.STDIO:
             # In real implementation, write to stdin
@@ -421,13 +678,6 @@ class RealTimeConnector:
             # In real implementation, send over WebSocket
             pass
             
-        # Simulate sending
-        logger.debug(f'Sent message to {connection.config.server_name}: {message.method}')
-        
-        # Simulate response for requests
-        if message.type == 'request':
-            asyncio.create_task(self._simulate_response(connection, message))
-            
     async def _simulate_response(self, connection: Connection, request: Message) -> None:
         """Simulate a response for testing"""
         await asyncio.sleep(0.05)  # Simulate latency
@@ -441,6 +691,32 @@ class RealTimeConnector:
         await self._handle_response(response)
         connection.messages_received += 1
         
+    async def _simulate_batch_response(
+        self,
+        connection: Connection,
+        requests: List[Message]
+    ) -> None:
+        """Simulate a batch response for testing"""
+        await asyncio.sleep(0.05)  # Simulate latency
+        
+        responses = [
+            {'jsonrpc': '2.0', 'id': request.id,
+             'result': {'status': 'success', 'method': request.method}}
+            for request in requests
+        ]
+        await self._handle_frame(responses)
+        connection.messages_received += len(responses)
+        
+    async def _handle_frame(self, data: Any) -> None:
+        """Handle an incoming frame, which may be a JSON-RPC batch"""
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            message = Message.from_dict(item)
+            if message.type == 'response':
+                await self._handle_response(message)
+            else:
+                await self._emit_event(message.method, message)
+                
     async def _handle_response(self, message: Message) -> None:
         """Handle an incoming response"""
         future = self._pending_requests.get(message.id)
@@ -483,6 +759,77 @@ class RealTimeConnector:
             except Exception as e:
                 logger.error(f'Heartbeat loop error: {e}')
                 
+    def _fail_request(self, request_id: str, error: Exception) -> None:
+        """Fail a pending request, if it is still waiting"""
+        future = self._pending_requests.get(request_id)
+        if future and not future.done():
+            future.set_exception(error)
+            
+    def _is_expired(self, message: Message) -> bool:
+        """Whether a queued request has already timed out or been cancelled"""
+        if message.type != 'request':
+            return False
+        future = self._pending_requests.get(message.id)
+        return future is None or future.done()
+        
+    def _schedule_timeout(self, request_id: str, timeout_sec: float) -> None:
+        """Put a request deadline on the timer wheel and wake the ticker if needed"""
+        now = asyncio.get_running_loop().time()
+        if not self._timer_wheel:
+            # An idle wheel is not advanced; re-anchor its cursor to now
+            self._wheel_time = now
+        self._timer_wheel.schedule(
+            request_id, timeout_sec, elapsed=now - self._wheel_time
+        )
+        if self._timer_deadline is None or now + timeout_sec < self._timer_deadline:
+            self._timer_wakeup.set()
+        self._ensure_timer()
+        
+    def _ensure_timer(self) -> None:
+        """Start the timer wheel ticker if it is not running"""
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._timer_loop())
+            
+    async def _timer_loop(self) -> None:
+        """
+        Advance the timer wheel and time out expired requests
+        
+        Sleeps until the earliest deadline, or until a new deadline is
+        scheduled when the wheel is empty, instead of ticking continuously.
+        """
+        loop = asyncio.get_running_loop()
+        resolution = self._timer_wheel.resolution
+        while True:
+            try:
+                self._timer_wakeup.clear()
+                ticks = self._timer_wheel.next_expiry()
+                if ticks is None:
+                    self._timer_deadline = None
+                    await self._timer_wakeup.wait()
+                    continue
+                    
+                self._timer_deadline = self._wheel_time + ticks * resolution
+                delay = self._timer_deadline - loop.time()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._timer_wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                        
+                # Catch up on every tick that has elapsed since the last advance
+                elapsed = int((loop.time() - self._wheel_time) / resolution + 1e-9)
+                for _ in range(elapsed):
+                    for request_id in self._timer_wheel.advance():
+                        method = self._request_methods.get(request_id, 'unknown')
+                        self._fail_request(
+                            request_id, TimeoutError(f'Request timed out: {method}')
+                        )
+                    if not self._timer_wheel:
+                        break
+                self._wheel_time += elapsed * resolution
+            except asyncio.CancelledError:
+                break
+                
     def _schedule_reconnect(self, connection: Connection) -> None:
         """Schedule a reconnection attempt"""
         if connection.reconnect_count >= connection.config.max_reconnect_attempts:
@@ -501,6 +848,7 @@ class RealTimeConnector:
                 connection.status = ConnectionStatus.CONNECTED
                 connection.error_count = 0
                 connection.last_activity = datetime.now()
+                self._start_writer(connection)
                 
                 await self._emit_event('reconnected', connection)
                 logger.info(f'Reconnected to {connection.config.server_name}')
@@ -532,18 +880,29 @@ class RealTimeConnector:
             
         total_sent = sum(c.messages_sent for c in self._connections.values())
         total_received = sum(c.messages_received for c in self._connections.values())
+        total_batches = sum(c.batches_sent for c in self._connections.values())
+        total_expired = sum(c.messages_expired for c in self._connections.values())
         avg_latency = (
             sum(c.latency_ms for c in self._connections.values()) /
             max(len(self._connections), 1)
         )
+        max_p99 = max(
+            (c.latency_histogram.percentile(99) for c in self._connections.values()),
+            default=0.0
+        )
         
         return {
             'total_connections': len(self._connections),
             'status_distribution': status_counts,
             'pending_requests': len(self._pending_requests),
+            'queued_messages': sum(q.qsize() for q in self._send_queues.values()),
             'total_messages_sent': total_sent,
             'total_messages_received': total_received,
-            'average_latency_ms': avg_latency
+            'total_batches_sent': total_batches,
+            'total_messages_expired': total_expired,
+            'pending_timers': len(self._timer_wheel),
+            'average_latency_ms': avg_latency,
+            'max_latency_p99_ms': max_p99
         }
 
 
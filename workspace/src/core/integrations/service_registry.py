@@ -21,11 +21,14 @@ Design Principles:
 """
 
 import asyncio
+import heapq
 import logging
+import random
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
@@ -79,6 +82,7 @@ class ServiceHealth:
     last_check: Optional[datetime] = None
     consecutive_failures: int = 0
     latency_ms: float = 0.0
+    avg_latency_ms: float = 0.0
     details: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -98,6 +102,8 @@ class ServiceMetadata:
     registered_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     last_heartbeat: Optional[datetime] = None
     config: Dict[str, Any] = field(default_factory=dict)
+    weight: float = 1.0
+    health_check_interval_seconds: Optional[float] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
@@ -126,11 +132,13 @@ class ServiceMetadata:
                 'last_check': self.health.last_check.isoformat() if self.health.last_check else None,
                 'consecutive_failures': self.health.consecutive_failures,
                 'latency_ms': self.health.latency_ms,
+                'avg_latency_ms': self.health.avg_latency_ms,
                 'details': self.health.details
             },
             'registered_at': self.registered_at.isoformat(),
             'last_heartbeat': self.last_heartbeat.isoformat() if self.last_heartbeat else None,
-            'config': self.config
+            'config': self.config,
+            'weight': self.weight
         }
 
 
@@ -143,6 +151,11 @@ class RegistryConfig:
     max_consecutive_failures: int = 3
     enable_auto_deregistration: bool = True
     auto_deregister_after_seconds: int = 300
+    max_concurrent_health_checks: int = 64
+    health_check_timeout_seconds: float = 5.0
+    health_check_jitter_ratio: float = 0.1
+    scheduler_tick_seconds: float = 1.0
+    latency_ewma_alpha: float = 0.3
 
 
 class ServiceRegistry:
@@ -169,6 +182,9 @@ class ServiceRegistry:
         
         # Discover services
         services = registry.discover_by_category(ServiceCategory.EXECUTION)
+        
+        # Pick a healthy instance (weighted, latency-aware)
+        service = registry.select_service(capability='action-execution')
     """
     
     def __init__(self, config: Optional[RegistryConfig] = None):
@@ -180,10 +196,22 @@ class ServiceRegistry:
         self._services_by_name: Dict[str, Set[str]] = {}
         self._services_by_category: Dict[ServiceCategory, Set[str]] = {}
         self._services_by_capability: Dict[str, Set[str]] = {}
+        self._services_by_tag: Dict[str, Set[str]] = {}
+        self._services_by_status: Dict[ServiceStatus, Set[str]] = {}
         
         # Health checkers
         self._health_checkers: Dict[str, Callable] = {}
         
+        # Health check schedule: min-heap of (due_time, service_id) with
+        # lazy invalidation against _next_health_check
+        self._health_check_schedule: List[Tuple[float, str]] = []
+        self._next_health_check: Dict[str, float] = {}
+        self._health_checks_in_flight: Set[str] = set()
+        self._health_check_tasks: Set[asyncio.Task] = set()
+        self._health_check_semaphore: Optional[asyncio.Semaphore] = None
+        self._last_heartbeat_sweep = 0.0
+        self._rng = random.Random()
+        
         # Event handlers
         self._event_handlers: Dict[str, List[Callable]] = {}
         
@@ -199,9 +227,11 @@ class ServiceRegistry:
             'discoveries': 0
         }
         
-        # Initialize category sets
+        # Initialize category and status sets
         for category in ServiceCategory:
             self._services_by_category[category] = set()
+        for status in ServiceStatus:
+            self._services_by_status[status] = set()
             
         logger.info("ServiceRegistry initialized - 服務註冊表已初始化")
     
@@ -211,6 +241,9 @@ class ServiceRegistry:
             return
             
         self._is_running = True
+        self._health_check_semaphore = asyncio.Semaphore(
+            max(1, self.config.max_concurrent_health_checks)
+        )
         self._health_check_task = asyncio.create_task(self._health_check_loop())
         
         await self._emit_event('registry_started', {'timestamp': datetime.now(timezone.utc)})
@@ -226,6 +259,12 @@ class ServiceRegistry:
                 await self._health_check_task
             except asyncio.CancelledError:
                 pass
+        
+        for task in list(self._health_check_tasks):
+            task.cancel()
+        if self._health_check_tasks:
+            await asyncio.gather(*self._health_check_tasks, return_exceptions=True)
+        self._health_check_tasks.clear()
                 
         await self._emit_event('registry_stopped', {'timestamp': datetime.now(timezone.utc)})
         logger.info("ServiceRegistry stopped - 服務註冊表已停止")
@@ -242,7 +281,9 @@ class ServiceRegistry:
         tags: Optional[Set[str]] = None,
         config: Optional[Dict[str, Any]] = None,
         health_checker: Optional[Callable] = None,
-        service_id: Optional[str] = None
+        service_id: Optional[str] = None,
+        weight: float = 1.0,
+        health_check_interval_seconds: Optional[float] = None
     ) -> str:
         """
         Register a service with the registry
@@ -261,6 +302,9 @@ class ServiceRegistry:
             config: Service configuration
             health_checker: Custom health check function
             service_id: Optional service ID (auto-generated if not provided)
+            weight: Relative weight for load-balanced selection
+            health_check_interval_seconds: Per-service check interval
+                (defaults to config.health_check_interval_seconds)
             
         Returns:
             Service ID
@@ -277,9 +321,15 @@ class ServiceRegistry:
             dependencies=dependencies or [],
             provides=provides or [],
             tags=tags or set(),
-            config=config or {}
+            config=config or {},
+            weight=weight,
+            health_check_interval_seconds=health_check_interval_seconds
         )
         
+        # Re-registration under the same ID replaces the old entry
+        if service_id in self._services:
+            self._unindex_service(self._services[service_id])
+        
         # Store service
         self._services[service_id] = service
         
@@ -297,9 +347,21 @@ class ServiceRegistry:
                 self._services_by_capability[capability] = set()
             self._services_by_capability[capability].add(service_id)
         
-        # Register health checker
+        # Index by tags
+        for tag in service.tags:
+            if tag not in self._services_by_tag:
+                self._services_by_tag[tag] = set()
+            self._services_by_tag[tag].add(service_id)
+        
+        # Index by health status
+        self._services_by_status[service.health.status].add(service_id)
+        
+        # Register health checker; the first check is spread over one
+        # interval so a bulk registration does not fire all checks at once
         if health_checker:
             self._health_checkers[service_id] = health_checker
+            interval = self._health_check_interval(service)
+            self._schedule_health_check(service_id, time.monotonic() + self._rng.uniform(0, interval))
         
         # Update statistics
         self._stats['registrations'] += 1
@@ -331,6 +393,24 @@ class ServiceRegistry:
             return False
         
         # Remove from indexes
+        self._unindex_service(service)
+        
+        # Update statistics
+        self._stats['deregistrations'] += 1
+        
+        # Emit event (safely handle case when no event loop is running)
+        self._safe_emit_event('service_deregistered', {
+            'service_id': service_id,
+            'name': service.name
+        })
+        
+        logger.info(f"Service deregistered: {service.name} ({service_id}) - 服務已取消註冊")
+        return True
+    
+    def _unindex_service(self, service: ServiceMetadata) -> None:
+        """Remove a service from all secondary indexes and the health schedule"""
+        service_id = service.service_id
+        
         if service.name in self._services_by_name:
             self._services_by_name[service.name].discard(service_id)
             if not self._services_by_name[service.name]:
@@ -341,21 +421,21 @@ class ServiceRegistry:
         for capability in service.provides:
             if capability in self._services_by_capability:
                 self._services_by_capability[capability].discard(service_id)
+                if not self._services_by_capability[capability]:
+                    del self._services_by_capability[capability]
         
-        # Remove health checker
-        self._health_checkers.pop(service_id, None)
-        
-        # Update statistics
-        self._stats['deregistrations'] += 1
+        for tag in service.tags:
+            if tag in self._services_by_tag:
+                self._services_by_tag[tag].discard(service_id)
+                if not self._services_by_tag[tag]:
+                    del self._services_by_tag[tag]
         
-        # Emit event (safely handle case when no event loop is running)
-        self._safe_emit_event('service_deregistered', {
-            'service_id': service_id,
-            'name': service.name
-        })
+        for status_ids in self._services_by_status.values():
+            status_ids.discard(service_id)
         
-        logger.info(f"Service deregistered: {service.name} ({service_id}) - 服務已取消註冊")
-        return True
+        # Remove health checker; stale heap entries are skipped lazily
+        self._health_checkers.pop(service_id, None)
+        self._next_health_check.pop(service_id, None)
     
     def get_service(self, service_id: str) -> Optional[ServiceMetadata]:
         """Get service by ID"""
@@ -398,10 +478,8 @@ class ServiceRegistry:
         按標籤發現服務
         """
         self._stats['discoveries'] += 1
-        return [
-            service for service in self._services.values()
-            if tag in service.tags
-        ]
+        service_ids = self._services_by_tag.get(tag, set())
+        return [self._services[sid] for sid in service_ids if sid in self._services]
     
     def discover_healthy(self, category: Optional[ServiceCategory] = None) -> List[ServiceMetadata]:
         """
@@ -410,16 +488,71 @@ class ServiceRegistry:
         發現健康的服務
         """
         self._stats['discoveries'] += 1
-        services = self._services.values()
+        service_ids = self._services_by_status[ServiceStatus.HEALTHY]
         
         if category:
-            service_ids = self._services_by_category.get(category, set())
-            services = [self._services[sid] for sid in service_ids if sid in self._services]
+            service_ids = service_ids & self._services_by_category.get(category, set())
         
-        return [
-            service for service in services
-            if service.health.status == ServiceStatus.HEALTHY
+        return [self._services[sid] for sid in service_ids if sid in self._services]
+    
+    def select_service(
+        self,
+        name: Optional[str] = None,
+        capability: Optional[str] = None,
+        category: Optional[ServiceCategory] = None,
+        tag: Optional[str] = None,
+        allow_degraded: bool = True
+    ) -> Optional[ServiceMetadata]:
+        """
+        Select one service instance using weighted, latency-aware load balancing
+        
+        以加權與延遲感知的負載均衡選擇服務實例
+        
+        Candidates are the healthy services matching every given filter. Each
+        candidate is picked with probability proportional to
+        ``weight / (avg_latency_ms + 1)``. When no healthy candidate exists and
+        ``allow_degraded`` is set, degraded services are considered instead.
+        
+        Returns:
+            The selected service, or None if no candidate is available
+        """
+        self._stats['discoveries'] += 1
+        
+        filters: List[Set[str]] = []
+        if name is not None:
+            filters.append(self._services_by_name.get(name, set()))
+        if capability is not None:
+            filters.append(self._services_by_capability.get(capability, set()))
+        if category is not None:
+            filters.append(self._services_by_category.get(category, set()))
+        if tag is not None:
+            filters.append(self._services_by_tag.get(tag, set()))
+        
+        statuses = [ServiceStatus.HEALTHY]
+        if allow_degraded:
+            statuses.append(ServiceStatus.DEGRADED)
+        
+        for status in statuses:
+            # Intersect starting from the smallest set
+            candidate_ids = sorted(filters + [self._services_by_status[status]], key=len)
+            matched = set(candidate_ids[0]).intersection(*candidate_ids[1:])
+            candidates = [self._services[sid] for sid in matched if sid in self._services]
+            if candidates:
+                return self._weighted_choice(candidates)
+        
+        return None
+    
+    def _weighted_choice(self, candidates: List[ServiceMetadata]) -> ServiceMetadata:
+        """Pick a candidate weighted by configured weight and observed latency"""
+        if len(candidates) == 1:
+            return candidates[0]
+        weights = [
+            max(service.weight, 0.0) / (service.health.avg_latency_ms + 1.0)
+            for service in candidates
         ]
+        if sum(weights) <= 0:
+            return self._rng.choice(candidates)
+        return self._rng.choices(candidates, weights=weights, k=1)[0]
     
     def heartbeat(self, service_id: str) -> bool:
         """
@@ -461,6 +594,18 @@ class ServiceRegistry:
         service.health.last_check = datetime.now(timezone.utc)
         service.health.latency_ms = latency_ms
         
+        # Smoothed latency drives load-balanced selection
+        if latency_ms > 0:
+            if service.health.avg_latency_ms <= 0:
+                service.health.avg_latency_ms = latency_ms
+            else:
+                alpha = self.config.latency_ewma_alpha
+                service.health.avg_latency_ms += alpha * (latency_ms - service.health.avg_latency_ms)
+        
+        if old_status != status:
+            self._services_by_status[old_status].discard(service_id)
+            self._services_by_status[status].add(service_id)
+        
         if details:
             service.health.details = details
         
@@ -494,12 +639,10 @@ class ServiceRegistry:
         
         resolved = {}
         for dep_name in service.dependencies:
-            candidates = self.discover_healthy()
-            matching = [
-                s for s in candidates
-                if s.name == dep_name or dep_name in s.provides
-            ]
-            resolved[dep_name] = matching[0] if matching else None
+            resolved[dep_name] = (
+                self.select_service(name=dep_name, allow_degraded=False)
+                or self.select_service(capability=dep_name, allow_degraded=False)
+            )
         
         return resolved
     
@@ -538,10 +681,11 @@ class ServiceRegistry:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get registry statistics"""
-        status_counts = {}
-        for service in self._services.values():
-            status = service.health.status.value
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = {
+            status.value: len(service_ids)
+            for status, service_ids in self._services_by_status.items()
+            if service_ids
+        }
         
         category_counts = {
             category.value: len(service_ids)
@@ -556,48 +700,118 @@ class ServiceRegistry:
             'discoveries': self._stats['discoveries'],
             'status_counts': status_counts,
             'category_counts': category_counts,
+            'health_checks_in_flight': len(self._health_checks_in_flight),
             'is_running': self._is_running
         }
     
     async def _health_check_loop(self) -> None:
-        """Background health check loop"""
+        """Background health check scheduler loop"""
         while self._is_running:
             try:
-                await self._run_health_checks()
-                await self._check_heartbeat_timeouts()
-                await asyncio.sleep(self.config.health_check_interval_seconds)
+                self._run_health_checks()
+                
+                now = time.monotonic()
+                if now - self._last_heartbeat_sweep >= self.config.health_check_interval_seconds:
+                    self._last_heartbeat_sweep = now
+                    await self._check_heartbeat_timeouts()
+                
+                await asyncio.sleep(self._seconds_until_next_check())
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Health check loop error: {e}")
                 await asyncio.sleep(5)
     
-    async def _run_health_checks(self) -> None:
-        """Run health checks for all services"""
-        for service_id, service in list(self._services.items()):
-            self._stats['health_checks'] += 1
+    async def run_health_checks(self) -> None:
+        """
+        Run every registered health check now and wait for completion
+        
+        立即執行所有健康檢查
+        
+        Checks run concurrently, bounded by config.max_concurrent_health_checks.
+        """
+        tasks = self._run_health_checks(due_only=False)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _run_health_checks(self, due_only: bool = True) -> List[asyncio.Task]:
+        """
+        Launch health checks that are due as independent tasks
+        
+        Each launched service is rescheduled at its interval plus jitter. A
+        service whose previous check is still running is skipped this round.
+        
+        Returns:
+            The launched check tasks
+        """
+        now = time.monotonic()
+        due: List[str] = []
+        
+        if due_only:
+            schedule = self._health_check_schedule
+            while schedule and schedule[0][0] <= now:
+                due_at, service_id = heapq.heappop(schedule)
+                if self._next_health_check.get(service_id) != due_at:
+                    continue  # Stale entry (rescheduled or deregistered)
+                due.append(service_id)
+        else:
+            due = list(self._health_checkers)
+        
+        tasks = []
+        for service_id in due:
+            service = self._services.get(service_id)
+            if service is None:
+                continue
+            
+            interval = self._health_check_interval(service)
+            jitter = interval * self.config.health_check_jitter_ratio
+            self._schedule_health_check(service_id, now + interval + self._rng.uniform(-jitter, jitter))
             
-            checker = self._health_checkers.get(service_id)
-            if checker:
+            if service_id in self._health_checks_in_flight:
+                continue
+            
+            self._health_checks_in_flight.add(service_id)
+            task = asyncio.create_task(self._check_service_health(service_id))
+            self._health_check_tasks.add(task)
+            task.add_done_callback(self._health_check_tasks.discard)
+            tasks.append(task)
+        
+        return tasks
+    
+    async def _check_service_health(self, service_id: str) -> None:
+        """Run a single health check with a timeout under the concurrency limit"""
+        if self._health_check_semaphore is None:
+            self._health_check_semaphore = asyncio.Semaphore(
+                max(1, self.config.max_concurrent_health_checks)
+            )
+        
+        try:
+            async with self._health_check_semaphore:
+                checker = self._health_checkers.get(service_id)
+                if checker is None:
+                    return
+                
+                self._stats['health_checks'] += 1
+                loop = asyncio.get_running_loop()
+                start_time = loop.time()
+                
                 try:
-                    start_time = asyncio.get_event_loop().time()
-                    
                     if asyncio.iscoroutinefunction(checker):
-                        result = await checker()
-                    else:
-                        result = checker()
-                    
-                    latency_ms = (asyncio.get_event_loop().time() - start_time) * 1000
-                    
-                    if isinstance(result, bool):
-                        status = ServiceStatus.HEALTHY if result else ServiceStatus.UNHEALTHY
-                    elif isinstance(result, dict):
-                        status = ServiceStatus(result.get('status', 'healthy'))
+                        call = checker()
                     else:
-                        status = ServiceStatus.HEALTHY
-                    
-                    self.update_health(service_id, status, latency_ms)
-                    
+                        # Blocking checkers must not stall the event loop
+                        call = asyncio.to_thread(checker)
+                    result = await asyncio.wait_for(
+                        call, timeout=self.config.health_check_timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Health check timed out for {service_id}")
+                    self.update_health(
+                        service_id,
+                        ServiceStatus.UNHEALTHY,
+                        details={'error': 'timeout'}
+                    )
+                    return
                 except Exception as e:
                     logger.warning(f"Health check failed for {service_id}: {e}")
                     self.update_health(
@@ -605,6 +819,59 @@ class ServiceRegistry:
                         ServiceStatus.UNHEALTHY,
                         details={'error': str(e)}
                     )
+                    return
+                
+                latency_ms = (loop.time() - start_time) * 1000
+                
+                if isinstance(result, bool):
+                    status = ServiceStatus.HEALTHY if result else ServiceStatus.UNHEALTHY
+                elif isinstance(result, dict):
+                    try:
+                        status = ServiceStatus(result.get('status', 'healthy'))
+                    except ValueError:
+                        logger.warning(
+                            f"Health check for {service_id} returned unknown status "
+                            f"{result.get('status')!r}"
+                        )
+                        self.update_health(
+                            service_id,
+                            ServiceStatus.UNHEALTHY,
+                            latency_ms,
+                            details={'error': f"unknown status: {result.get('status')!r}"}
+                        )
+                        return
+                else:
+                    status = ServiceStatus.HEALTHY
+                
+                self.update_health(service_id, status, latency_ms)
+        finally:
+            self._health_checks_in_flight.discard(service_id)
+    
+    def _health_check_interval(self, service: ServiceMetadata) -> float:
+        """Get the effective health check interval for a service"""
+        if service.health_check_interval_seconds is not None:
+            return float(service.health_check_interval_seconds)
+        return float(self.config.health_check_interval_seconds)
+    
+    def _schedule_health_check(self, service_id: str, due_at: float) -> None:
+        """Schedule the next health check for a service"""
+        self._next_health_check[service_id] = due_at
+        heapq.heappush(self._health_check_schedule, (due_at, service_id))
+        
+        # Compact the heap once stale entries dominate it
+        if len(self._health_check_schedule) > 2 * len(self._next_health_check) + 64:
+            self._health_check_schedule = [
+                (due, sid) for sid, due in self._next_health_check.items()
+            ]
+            heapq.heapify(self._health_check_schedule)
+    
+    def _seconds_until_next_check(self) -> float:
+        """Time to sleep before the next scheduled check, capped at one tick"""
+        tick = self.config.scheduler_tick_seconds
+        if not self._health_check_schedule:
+            return tick
+        delay = self._health_check_schedule[0][0] - time.monotonic()
+        return min(max(delay, 0.0), tick)
     
     async def _check_heartbeat_timeouts(self) -> None:
         """Check for heartbeat timeouts and deregister stale services"""
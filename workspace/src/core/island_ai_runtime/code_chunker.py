@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Code Chunker - 代碼分塊
+Symbol-aware chunking and out-of-line content storage
+
+將文件拆分為符號級分塊（類、函數），並解析導入關係；文件內容按哈希存放於
+ContentStore，圖節點只保存行號範圍。
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# 無法按符號拆分時使用的語言正則（JS/TS/Go/Java 等）
+_SYMBOL_PATTERNS = {
+    ".js": re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function\*?|class)\s+([A-Za-z_$][\w$]*)"),
+    ".ts": re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(?:async\s+)?(?:function\*?|class|interface)\s+([A-Za-z_$][\w$]*)"),
+    ".go": re.compile(r"^func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)|^type\s+([A-Za-z_]\w*)\s+struct"),
+    ".java": re.compile(r"^\s*(?:public|private|protected)?\s*(?:static\s+)?(?:final\s+)?(?:abstract\s+)?(?:class|interface|enum)\s+([A-Za-z_]\w*)"),
+}
+_SYMBOL_PATTERNS[".jsx"] = _SYMBOL_PATTERNS[".js"]
+_SYMBOL_PATTERNS[".mjs"] = _SYMBOL_PATTERNS[".js"]
+_SYMBOL_PATTERNS[".tsx"] = _SYMBOL_PATTERNS[".ts"]
+
+_JS_IMPORT = re.compile(r"""(?:^|\s)(?:import\s[^'"]*?from\s*|import\s*|require\s*\(\s*)['"]([^'"]+)['"]""")
+
+
+def content_hash(content: str) -> str:
+    """計算內容哈希"""
+    return hashlib.sha256(content.encode("utf-8", "surrogateescape")).hexdigest()
+
+
+@dataclass
+class Chunk:
+    """代碼分塊（1-based 行號，含首尾）"""
+
+    name: str
+    kind: str  # module, class, function, section
+    start_line: int
+    end_line: int
+    text: str
+
+
+@dataclass
+class FileAnalysis:
+    """文件分析結果"""
+
+    chunks: list[Chunk] = field(default_factory=list)
+    imports: list[str] = field(default_factory=list)
+
+
+def _window(lines: list[str], start: int, end: int, name: str, kind: str, max_lines: int) -> list[Chunk]:
+    """按最大行數切分 [start, end] 範圍"""
+    chunks = []
+    for offset, chunk_start in enumerate(range(start, end + 1, max_lines)):
+        chunk_end = min(chunk_start + max_lines - 1, end)
+        text = "\n".join(lines[chunk_start - 1:chunk_end])
+        if text.strip():
+            chunk_name = name if offset == 0 else f"{name}#{offset + 1}"
+            chunks.append(Chunk(chunk_name, kind, chunk_start, chunk_end, text))
+    return chunks
+
+
+def _resolve_relative(path: str, module: str | None, level: int) -> str:
+    """將相對導入轉為點分模組名"""
+    package = Path(path).parent.parts
+    if level > 1:
+        package = package[: len(package) - (level - 1)]
+    return ".".join([*package, *([module] if module else [])])
+
+
+def _analyze_python(path: str, content: str, lines: list[str], max_lines: int) -> FileAnalysis | None:
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    analysis = FileAnalysis()
+    covered_until = 0
+    module_lines: list[tuple[int, int]] = []
+
+    for node in tree.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+            end = node.end_lineno or start
+            if start > covered_until + 1:
+                module_lines.append((covered_until + 1, start - 1))
+            kind = "class" if isinstance(node, ast.ClassDef) else "function"
+            analysis.chunks.extend(_window(lines, start, end, node.name, kind, max_lines))
+            covered_until = end
+
+    if covered_until < len(lines):
+        module_lines.append((covered_until + 1, len(lines)))
+
+    # 模組級代碼（導入、常量、腳本入口）合併為 module 分塊
+    for start, end in module_lines:
+        analysis.chunks.extend(_window(lines, start, end, Path(path).stem, "module", max_lines))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            analysis.imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module if not node.level else _resolve_relative(path, node.module, node.level)
+            if module:
+                # "from pkg import mod" 可能導入子模組；解析時會回退到 pkg
+                analysis.imports.extend(
+                    f"{module}.{alias.name}" if alias.name != "*" else module for alias in node.names
+                )
+
+    analysis.chunks.sort(key=lambda chunk: chunk.start_line)
+    analysis.imports = list(dict.fromkeys(analysis.imports))
+    return analysis
+
+
+def _analyze_by_pattern(content: str, lines: list[str], pattern: re.Pattern, name: str, max_lines: int) -> FileAnalysis:
+    starts = []
+    for number, line in enumerate(lines, start=1):
+        match = pattern.match(line)
+        if match:
+            starts.append((number, next(group for group in match.groups() if group)))
+
+    analysis = FileAnalysis(imports=list(dict.fromkeys(_JS_IMPORT.findall(content))))
+    boundaries = [(1, name, "module")] + [(line, symbol, "function") for line, symbol in starts]
+    for index, (start, symbol, kind) in enumerate(boundaries):
+        end = boundaries[index + 1][0] - 1 if index + 1 < len(boundaries) else len(lines)
+        if end >= start:
+            analysis.chunks.extend(_window(lines, start, end, symbol, kind, max_lines))
+    return analysis
+
+
+def analyze_file(path: str, content: str, max_chunk_lines: int = 120) -> FileAnalysis:
+    """
+    拆分文件並提取導入
+
+    Python 使用 AST，常見語言使用符號正則，其餘按固定行數切分。
+    """
+    lines = content.splitlines()
+    suffix = os.path.splitext(path)[1].lower()
+
+    if suffix == ".py":
+        analysis = _analyze_python(path, content, lines, max_chunk_lines)
+        if analysis is not None:
+            return analysis
+
+    pattern = _SYMBOL_PATTERNS.get(suffix)
+    if pattern is not None:
+        return _analyze_by_pattern(content, lines, pattern, Path(path).stem, max_chunk_lines)
+
+    return FileAnalysis(chunks=_window(lines, 1, len(lines), Path(path).stem, "section", max_chunk_lines))
+
+
+class ContentStore:
+    """
+    內容存儲
+
+    按內容哈希去重保存文件內容，並以引用計數回收。指定 directory 時內容寫入
+    磁碟，記憶體中不保留。分塊讀取時按內容緩存已拆分的行，同一文件的多個分塊
+    不會重複讀取與拆分。
+    """
+
+    def __init__(self, directory: str | None = None, line_cache_size: int = 64):
+        self.directory = Path(directory) if directory else None
+        self._blobs: dict[str, str] = {}
+        self._refs: dict[str, int] = {}
+        self._lines: OrderedDict[str, list[str]] = OrderedDict()
+        self.line_cache_size = line_cache_size
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _blob_path(self, digest: str, root: Path | None = None) -> Path:
+        return (root or self.directory) / digest[:2] / digest
+
+    def put(self, content: str, digest: str | None = None) -> str:
+        """保存內容，返回哈希"""
+        digest = digest or content_hash(content)
+        self._refs[digest] = self._refs.get(digest, 0) + 1
+        if self._refs[digest] == 1:
+            if self.directory:
+                blob = self._blob_path(digest)
+                if not blob.exists():
+                    blob.parent.mkdir(exist_ok=True)
+                    blob.write_text(content, encoding="utf-8", errors="surrogateescape")
+            else:
+                self._blobs[digest] = content
+        return digest
+
+    def get(self, digest: str) -> str | None:
+        """讀取內容"""
+        if self.directory:
+            blob = self._blob_path(digest)
+            return blob.read_text(encoding="utf-8", errors="surrogateescape") if blob.exists() else None
+        return self._blobs.get(digest)
+
+    def get_lines(self, digest: str, start_line: int, end_line: int) -> str:
+        """讀取內容的行範圍"""
+        lines = self._lines.get(digest)
+        if lines is None:
+            lines = (self.get(digest) or "").splitlines()
+            self._lines[digest] = lines
+            while len(self._lines) > self.line_cache_size:
+                self._lines.popitem(last=False)
+        else:
+            self._lines.move_to_end(digest)
+        return "\n".join(lines[start_line - 1:end_line])
+
+    def release(self, digest: str) -> None:
+        """釋放一次引用"""
+        remaining = self._refs.get(digest, 0) - 1
+        if remaining > 0:
+            self._refs[digest] = remaining
+            return
+        self._refs.pop(digest, None)
+        self._blobs.pop(digest, None)
+        self._lines.pop(digest, None)
+        if self.directory:
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def save(self, directory: str | os.PathLike) -> None:
+        """
+        保存引用計數；記憶體中的內容一併寫入 directory
+
+        磁碟存儲的內容已在自身目錄中，只需保存引用計數。
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        if not self.directory:
+            for digest, content in self._blobs.items():
+                blob = self._blob_path(digest, path)
+                if not blob.exists():
+                    blob.parent.mkdir(exist_ok=True)
+                    blob.write_text(content, encoding="utf-8", errors="surrogateescape")
+            for blob in path.glob("??/*"):
+                if blob.name not in self._refs:
+                    blob.unlink()
+        tmp = path / "refs.json.tmp"
+        tmp.write_text(json.dumps(self._refs))
+        os.replace(tmp, path / "refs.json")
+
+    def load(self, directory: str | os.PathLike) -> None:
+        """從 save() 的目錄恢復引用計數與記憶體內容"""
+        path = Path(directory)
+        self._refs = json.loads((path / "refs.json").read_text())
+        self._lines.clear()
+        if not self.directory:
+            self._blobs = {}
+            for digest in self._refs:
+                blob = self._blob_path(digest, path)
+                if blob.exists():
+                    self._blobs[digest] = blob.read_text(encoding="utf-8", errors="surrogateescape")
+
+    def __len__(self) -> int:
+        return len(self._refs)
@@ -6,11 +6,36 @@ Repository Graph, Embeddings, and Vector Search
 提供代碼庫理解和語義搜索能力
 """
 
+import asyncio
 import hashlib
-from dataclasses import dataclass, field
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
+from .code_chunker import ContentStore, analyze_file, content_hash
+from .vector_store import VectorStore
+
+DEFAULT_INDEX_EXTENSIONS = frozenset({
+    ".py", ".js", ".jsx", ".mjs", ".ts", ".tsx", ".go", ".java", ".rs",
+    ".md", ".yaml", ".yml", ".json", ".toml", ".sh",
+})
+DEFAULT_EXCLUDE_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build",
+    ".mypy_cache", ".pytest_cache", ".tox",
+})
+
+# 修改時間距上次校驗不足此值的文件視為「racy」，不能只憑 (mtime, size) 跳過：
+# 同一時間戳刻度內的再次修改不會改變 mtime（涵蓋 FAT/HFS+ 等粗粒度文件系統）
+MTIME_RESOLUTION_NS = 2_000_000_000
+
+_STATE_FILE = "knowledge.json"
+_CONTENT_DIR = "contents"
+_STATE_VERSION = 1
+
 
 class NodeType(Enum):
     """節點類型"""
@@ -22,6 +47,7 @@ class NodeType(Enum):
     VARIABLE = "variable"
     IMPORT = "import"
     COMMENT = "comment"
+    CHUNK = "chunk"
 
 
 class EdgeType(Enum):
@@ -67,16 +93,47 @@ class SearchResult:
     context: str = ""
 
 
+@dataclass
+class IndexedFile:
+    """已索引文件的狀態（用於增量索引）"""
+
+    path: str
+    content_hash: str
+    chunk_ids: list[str] = field(default_factory=list)
+    mtime_ns: int = 0
+    size: int = 0
+    root: str | None = None
+    verified_ns: int = 0  # 最近一次讀取並比對內容的掃描時間
+
+
+@dataclass
+class IndexReport:
+    """索引結果統計"""
+
+    scanned: int = 0
+    indexed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    chunks: int = 0
+
+
 class RepoGraph:
     """
     倉庫圖
 
-    建立代碼庫的圖結構表示。
+    建立代碼庫的圖結構表示。邊按來源節點建立鄰接表，並記錄反向引用，
+    刪除節點與查詢鄰居都不需掃描全部邊。
     """
 
     def __init__(self):
         self.nodes: dict[str, GraphNode] = {}
-        self.edges: list[GraphEdge] = []
+        self._out_edges: dict[str, list[GraphEdge]] = {}
+        self._in_sources: dict[str, set[str]] = {}
+
+    @property
+    def edges(self) -> list[GraphEdge]:
+        """所有邊"""
+        return [edge for edges in self._out_edges.values() for edge in edges]
 
     def add_node(self, node: GraphNode) -> None:
         """添加節點"""
@@ -84,7 +141,26 @@ class RepoGraph:
 
     def add_edge(self, edge: GraphEdge) -> None:
         """添加邊"""
-        self.edges.append(edge)
+        self._out_edges.setdefault(edge.source_id, []).append(edge)
+        self._in_sources.setdefault(edge.target_id, set()).add(edge.source_id)
+
+    def remove_out_edges(self, node_id: str) -> None:
+        """刪除節點的所有出邊"""
+        for edge in self._out_edges.pop(node_id, ()):
+            sources = self._in_sources.get(edge.target_id)
+            if sources is not None:
+                sources.discard(node_id)
+                if not sources:
+                    del self._in_sources[edge.target_id]
+
+    def remove_node(self, node_id: str) -> None:
+        """刪除節點及其所有出入邊"""
+        self.nodes.pop(node_id, None)
+        self.remove_out_edges(node_id)
+        for source_id in self._in_sources.pop(node_id, ()):
+            edges = self._out_edges.get(source_id)
+            if edges:
+                edges[:] = [edge for edge in edges if edge.target_id != node_id]
 
     def get_node(self, node_id: str) -> GraphNode | None:
         """獲取節點"""
@@ -93,14 +169,54 @@ class RepoGraph:
     def get_neighbors(self, node_id: str, edge_type: EdgeType | None = None) -> list[GraphNode]:
         """獲取鄰居節點"""
         neighbors = []
-        for edge in self.edges:
-            if edge.source_id == node_id:
-                if edge_type is None or edge.edge_type == edge_type:
-                    neighbor = self.nodes.get(edge.target_id)
-                    if neighbor:
-                        neighbors.append(neighbor)
+        for edge in self._out_edges.get(node_id, ()):
+            if edge_type is None or edge.edge_type == edge_type:
+                neighbor = self.nodes.get(edge.target_id)
+                if neighbor:
+                    neighbors.append(neighbor)
         return neighbors
 
+    def get_dependents(self, node_id: str, edge_type: EdgeType | None = None) -> list[GraphNode]:
+        """獲取指向此節點的來源節點"""
+        dependents = []
+        for source_id in self._in_sources.get(node_id, ()):
+            if edge_type is not None and not any(
+                edge.target_id == node_id and edge.edge_type == edge_type
+                for edge in self._out_edges.get(source_id, ())
+            ):
+                continue
+            source = self.nodes.get(source_id)
+            if source:
+                dependents.append(source)
+        return dependents
+
+    def to_state(self) -> dict[str, Any]:
+        """完整狀態（含元數據），供持久化"""
+        return {
+            "nodes": [
+                {"id": n.id, "name": n.name, "type": n.node_type.value, "path": n.path,
+                 "content": n.content, "metadata": n.metadata}
+                for n in self.nodes.values()
+            ],
+            "edges": [
+                [e.source_id, e.target_id, e.edge_type.value, e.metadata] for e in self.edges
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "RepoGraph":
+        """由 to_state() 的結果重建"""
+        graph = cls()
+        for node in state["nodes"]:
+            graph.add_node(GraphNode(
+                id=node["id"], name=node["name"], node_type=NodeType(node["type"]),
+                path=node["path"], content=node.get("content", ""),
+                metadata=node.get("metadata", {}),
+            ))
+        for source_id, target_id, edge_type, metadata in state["edges"]:
+            graph.add_edge(GraphEdge(source_id, target_id, EdgeType(edge_type), metadata))
+        return graph
+
     def to_dict(self) -> dict[str, Any]:
         """轉換為字典"""
         return {
@@ -156,52 +272,10 @@ class EmbeddingProvider:
         return embedding[: self._dimension]
 
 
-class VectorStore:
-    """
-    向量存儲
-
-    存儲和搜索向量嵌入。
-    """
-
-    def __init__(self):
-        self.vectors: dict[str, list[float]] = {}
-        self.metadata: dict[str, dict[str, Any]] = {}
-
-    def upsert(self, id: str, vector: list[float], metadata: dict[str, Any] | None = None) -> None:
-        """插入或更新向量"""
-        self.vectors[id] = vector
-        self.metadata[id] = metadata or {}
-
-    def delete(self, id: str) -> None:
-        """刪除向量"""
-        self.vectors.pop(id, None)
-        self.metadata.pop(id, None)
-
-    def search(self, query_vector: list[float], top_k: int = 10) -> list[tuple[str, float]]:
-        """搜索最相似的向量"""
-        scores = []
-        for id, vector in self.vectors.items():
-            score = self._cosine_similarity(query_vector, vector)
-            scores.append((id, score))
-
-        # 按分數排序
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:top_k]
-
-    @staticmethod
-    def _cosine_similarity(a: list[float], b: list[float]) -> float:
-        """計算餘弦相似度"""
-        if len(a) != len(b):
-            return 0.0
-
-        dot_product = sum(x * y for x, y in zip(a, b))
-        norm_a = sum(x * x for x in a) ** 0.5
-        norm_b = sum(x * x for x in b) ** 0.5
-
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-
-        return dot_product / (norm_a * norm_b)
+_CHUNK_NODE_TYPES = {
+    "class": NodeType.CLASS,
+    "function": NodeType.FUNCTION,
+}
 
 
 class KnowledgeEngine:
@@ -223,33 +297,299 @@ class KnowledgeEngine:
         self.embedding_provider = EmbeddingProvider(
             model=self.config.get("embedding_model", "text-embedding-3-small")
         )
-        self.vector_store = VectorStore()
+        self.vector_store = VectorStore(
+            dimension=self.embedding_provider.dimension,
+            index=self.config.get("vector_index", "flat"),
+            nprobe=self.config.get("vector_nprobe", 8),
+        )
+        self.content_store = ContentStore(self.config.get("content_dir"))
+
+        # 增量索引設定
+        self.embedding_batch_size = self.config.get("embedding_batch_size", 64)
+        self.embedding_concurrency = self.config.get("embedding_concurrency", 4)
+        self.max_chunk_lines = self.config.get("max_chunk_lines", 120)
+        self.max_file_bytes = self.config.get("max_file_bytes", 1_000_000)
+        self.index_extensions = frozenset(self.config.get("index_extensions", DEFAULT_INDEX_EXTENSIONS))
+        self.exclude_dirs = frozenset(self.config.get("exclude_dirs", DEFAULT_EXCLUDE_DIRS))
+
+        self._files: dict[str, IndexedFile] = {}
+        self._module_paths: dict[str, str] = {}  # python module -> path
 
     async def index_file(self, path: str, content: str) -> None:
-        """索引文件"""
-        # 創建節點
-        node_id = self._generate_id(path)
+        """索引文件（內容未變則跳過）"""
+        digest = content_hash(content)
+        record = self._files.get(path)
+        if record and record.content_hash == digest:
+            return
+        await self._index_changed([(path, content, digest, None, None, 0)])
+
+    async def index_tree(self, root: str) -> IndexReport:
+        """
+        增量索引目錄樹
+
+        以 (mtime, size) 快速跳過未修改文件，其次比對內容哈希；只有內容變化的
+        文件會重新分塊與嵌入，已刪除的文件會從圖與向量存儲中移除。修改時間
+        接近上次校驗時間的文件一律重新比對哈希，避免同一時間戳刻度內的修改被漏掉。
+        """
+        root_path = Path(root)
+        root_key = str(root_path.resolve())
+        scan_ns = time.time_ns()
+        report = IndexReport()
+        seen: set[str] = set()
+        changed: list[tuple[str, str, str, os.stat_result, str, int]] = []
+
+        for absolute, path, stat in self._walk(root_path):
+            report.scanned += 1
+            seen.add(path)
+            record = self._files.get(path)
+            if (
+                record
+                and record.mtime_ns == stat.st_mtime_ns
+                and record.size == stat.st_size
+                and stat.st_mtime_ns + MTIME_RESOLUTION_NS < record.verified_ns
+            ):
+                report.unchanged += 1
+                continue
+            try:
+                content = absolute.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            digest = content_hash(content)
+            if record and record.content_hash == digest:
+                record.mtime_ns, record.size = stat.st_mtime_ns, stat.st_size
+                record.verified_ns = scan_ns
+                report.unchanged += 1
+                continue
+            changed.append((path, content, digest, stat, root_key, scan_ns))
+
+        for path in [p for p, r in self._files.items() if r.root == root_key and p not in seen]:
+            self._remove_file(path)
+            report.removed += 1
+
+        report.indexed = len(changed)
+        report.chunks = await self._index_changed(changed)
+        return report
+
+    def _walk(self, root: Path):
+        """遍歷目錄樹，跳過排除目錄與不支援的擴展名"""
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = [
+                d for d in dirnames if d not in self.exclude_dirs and not d.startswith(".")
+            ]
+            for filename in filenames:
+                if os.path.splitext(filename)[1].lower() not in self.index_extensions:
+                    continue
+                absolute = Path(directory) / filename
+                try:
+                    stat = absolute.stat()
+                except OSError:
+                    continue
+                if stat.st_size > self.max_file_bytes:
+                    continue
+                yield absolute, absolute.relative_to(root).as_posix(), stat
+
+    async def _index_changed(self, changed: list[tuple]) -> int:
+        """重新分塊、建圖並批量嵌入變更文件，返回分塊數"""
+        pending: list[tuple[str, str, dict[str, Any]]] = []
+        analyses = []
+
+        for path, content, digest, stat, root, verified_ns in changed:
+            is_new = path not in self._files
+            if not is_new:
+                self._drop_file_contents(path)
+
+            analysis = analyze_file(path, content, self.max_chunk_lines)
+            analyses.append((path, analysis))
+            self.content_store.put(content, digest)
+
+            file_id = self._generate_id(path)
+            self.repo_graph.add_node(GraphNode(
+                id=file_id,
+                name=path.split("/")[-1],
+                node_type=NodeType.FILE,
+                path=path,
+                metadata={"content_hash": digest, "lines": content.count("\n") + 1},
+            ))
+            if is_new:
+                self._link_directories(path, file_id)
+                module = self._module_name(path)
+                if module:
+                    self._module_paths[module] = path
+
+            chunk_ids = []
+            for chunk in analysis.chunks:
+                chunk_id = self._generate_id(f"{path}#{chunk.name}:{chunk.start_line}")
+                chunk_ids.append(chunk_id)
+                self.repo_graph.add_node(GraphNode(
+                    id=chunk_id,
+                    name=chunk.name,
+                    node_type=_CHUNK_NODE_TYPES.get(chunk.kind, NodeType.CHUNK),
+                    path=path,
+                    metadata={
+                        "kind": chunk.kind,
+                        "content_hash": digest,
+                        "start_line": chunk.start_line,
+                        "end_line": chunk.end_line,
+                    },
+                ))
+                self.repo_graph.add_edge(GraphEdge(file_id, chunk_id, EdgeType.CONTAINS))
+                pending.append((chunk_id, f"{path} :: {chunk.name}\n{chunk.text}", {
+                    "path": path, "type": chunk.kind, "name": chunk.name,
+                    "start_line": chunk.start_line, "end_line": chunk.end_line,
+                }))
+
+            self._files[path] = IndexedFile(
+                path=path,
+                content_hash=digest,
+                chunk_ids=chunk_ids,
+                mtime_ns=stat.st_mtime_ns if stat else 0,
+                size=stat.st_size if stat else 0,
+                root=root,
+                verified_ns=verified_ns,
+            )
 
-        # 生成嵌入
-        embedding = await self.embedding_provider.embed(content)
-
-        # 創建圖節點
-        node = GraphNode(
-            id=node_id,
-            name=path.split("/")[-1],
-            node_type=NodeType.FILE,
-            path=path,
-            content=content,
-            embedding=embedding,
-        )
+        # 所有變更文件登記後再解析導入，使同批文件可互相引用
+        for path, analysis in analyses:
+            file_id = self._generate_id(path)
+            targets: dict[str, str] = {}
+            for module in analysis.imports:
+                targets.setdefault(self._import_target(module), module)
+            for target_id, module in targets.items():
+                self.repo_graph.add_edge(
+                    GraphEdge(file_id, target_id, EdgeType.IMPORTS, {"module": module})
+                )
 
-        # 添加到圖
-        self.repo_graph.add_node(node)
+        await self._embed_chunks(pending)
+        return len(pending)
+
+    async def _embed_chunks(self, pending: list[tuple[str, str, dict[str, Any]]]) -> None:
+        """以有界並發與批次大小調用 embed_batch"""
+        if not pending:
+            return
+        semaphore = asyncio.Semaphore(max(1, self.embedding_concurrency))
+        batch_size = max(1, self.embedding_batch_size)
+
+        async def embed(batch: list[tuple[str, str, dict[str, Any]]]) -> None:
+            async with semaphore:
+                vectors = await self.embedding_provider.embed_batch([text for _, text, _ in batch])
+            self.vector_store.upsert_many(
+                [chunk_id for chunk_id, _, _ in batch], vectors, [meta for _, _, meta in batch]
+            )
 
-        # 添加到向量存儲
-        self.vector_store.upsert(
-            id=node_id, vector=embedding, metadata={"path": path, "type": "file"}
-        )
+        await asyncio.gather(*[
+            embed(pending[start:start + batch_size]) for start in range(0, len(pending), batch_size)
+        ])
+
+    def _drop_file_contents(self, path: str) -> None:
+        """移除文件的分塊、出邊與內容引用（保留文件節點及其入邊）"""
+        record = self._files.pop(path, None)
+        if record is None:
+            return
+        for chunk_id in record.chunk_ids:
+            self.repo_graph.remove_node(chunk_id)
+            self.vector_store.delete(chunk_id)
+        self.repo_graph.remove_out_edges(self._generate_id(path))
+        self.content_store.release(record.content_hash)
+
+    def _remove_file(self, path: str) -> None:
+        """從索引中完全移除文件"""
+        self._drop_file_contents(path)
+        self.repo_graph.remove_node(self._generate_id(path))
+        module = self._module_name(path)
+        if module and self._module_paths.get(module) == path:
+            del self._module_paths[module]
+
+    def _link_directories(self, path: str, file_id: str) -> None:
+        """建立目錄節點與 CONTAINS 邊"""
+        parts = path.split("/")[:-1]
+        child_id = file_id
+        for depth in range(len(parts), 0, -1):
+            directory = "/".join(parts[:depth])
+            dir_id = self._generate_id(directory + "/")
+            exists = dir_id in self.repo_graph.nodes
+            if not exists:
+                self.repo_graph.add_node(GraphNode(
+                    id=dir_id, name=parts[depth - 1], node_type=NodeType.DIRECTORY, path=directory
+                ))
+            self.repo_graph.add_edge(GraphEdge(dir_id, child_id, EdgeType.CONTAINS))
+            if exists:
+                break
+            child_id = dir_id
+
+    @staticmethod
+    def _module_name(path: str) -> str | None:
+        """由 Python 文件路徑推導模組名"""
+        if not path.endswith(".py"):
+            return None
+        parts = path[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        return ".".join(parts) or None
+
+    def _import_target(self, module: str) -> str:
+        """解析導入目標：已索引文件，否則為外部 IMPORT 節點"""
+        candidate = module
+        while candidate:
+            path = self._module_paths.get(candidate)
+            if path:
+                return self._generate_id(path)
+            candidate = candidate.rpartition(".")[0]
+
+        # 外部依賴按頂層套件歸併
+        package = module.split(".")[0] if not module.startswith((".", "/")) else module
+        import_id = self._generate_id(f"import:{package}")
+        if import_id not in self.repo_graph.nodes:
+            self.repo_graph.add_node(GraphNode(
+                id=import_id, name=package, node_type=NodeType.IMPORT, path=package
+            ))
+        return import_id
+
+    def get_content(self, node: GraphNode) -> str:
+        """讀取節點內容（文件或分塊的行範圍）"""
+        if node.content:
+            return node.content
+        digest = node.metadata.get("content_hash")
+        if not digest:
+            return ""
+        if "start_line" in node.metadata:
+            return self.content_store.get_lines(
+                digest, node.metadata["start_line"], node.metadata["end_line"]
+            )
+        return self.content_store.get(digest) or ""
+
+    def save_index(self, directory: str) -> None:
+        """
+        保存索引：向量、倉庫圖、文件狀態與內容引用
+
+        重啟後 load_index() 恢復增量狀態，index_tree() 只需處理變更文件。
+        """
+        path = Path(directory)
+        self.vector_store.save(path)
+        self.content_store.save(path / _CONTENT_DIR)
+        state = {
+            "version": _STATE_VERSION,
+            "files": [asdict(record) for record in self._files.values()],
+            "module_paths": self._module_paths,
+            "graph": self.repo_graph.to_state(),
+        }
+        tmp = path / (_STATE_FILE + ".tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False))
+        os.replace(tmp, path / _STATE_FILE)
+
+    def load_index(self, directory: str, mmap: bool = True) -> None:
+        """載入索引（向量預設以 mmap 映射）；舊格式目錄只含向量時僅載入向量"""
+        path = Path(directory)
+        self.vector_store = VectorStore.load(path, mmap=mmap)
+        state_file = path / _STATE_FILE
+        if not state_file.exists():
+            return
+        state = json.loads(state_file.read_text())
+        if state.get("version") != _STATE_VERSION:
+            raise ValueError(f"Unsupported knowledge index format: {state.get('version')}")
+        self._files = {record["path"]: IndexedFile(**record) for record in state["files"]}
+        self._module_paths = dict(state["module_paths"])
+        self.repo_graph = RepoGraph.from_state(state["graph"])
+        self.content_store.load(path / _CONTENT_DIR)
 
     async def search(self, query: str, top_k: int = 10) -> list[SearchResult]:
         """語義搜索"""
@@ -265,9 +605,7 @@ class KnowledgeEngine:
             node = self.repo_graph.get_node(node_id)
             if node:
                 search_results.append(
-                    SearchResult(
-                        node=node, score=score, context=node.content[:500] if node.content else ""
-                    )
+                    SearchResult(node=node, score=score, context=self.get_content(node)[:500])
                 )
 
         return search_results
@@ -298,8 +636,23 @@ class KnowledgeEngine:
                 {"id": neighbor.id, "name": neighbor.name, "type": neighbor.node_type.value}
             )
 
+        # 導入此文件的其他文件
+        for dependent in self.repo_graph.get_dependents(node_id, EdgeType.IMPORTS):
+            context["related"].append(
+                {"id": dependent.id, "name": dependent.name, "path": dependent.path}
+            )
+
         return context
 
+    def get_stats(self) -> dict[str, Any]:
+        """獲取統計信息"""
+        return {
+            "files": len(self._files),
+            "nodes": len(self.repo_graph.nodes),
+            "contents": len(self.content_store),
+            "vector_store": self.vector_store.get_stats(),
+        }
+
     @staticmethod
     def _generate_id(path: str) -> str:
         """生成節點 ID"""
@@ -4,12 +4,21 @@ Model Gateway - 模型閘道
 LLM Provider Selection and Routing
 
 支援多種 LLM 提供者：OpenAI, Anthropic, Local, BYOM
+
+請求先查回應快取，相同的進行中請求會合併為一次調用；未命中時依路由策略
+排序候選提供者，在各提供者的並發上限內執行，失敗時依序故障轉移。
 """
 
+import asyncio
+import hashlib
+import json
 import os
+import random
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import AsyncIterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from typing import Any
 
@@ -29,6 +38,8 @@ class RoutingStrategy(Enum):
     COST_OPTIMIZED = "cost-optimized"
     PERFORMANCE = "performance"
     ROUND_ROBIN = "round-robin"
+    LATENCY_WEIGHTED = "latency-weighted"
+    FAILOVER = "failover"
 
 
 @dataclass
@@ -51,6 +62,7 @@ class CompletionRequest:
     temperature: float = 0.7
     max_tokens: int | None = None
     stream: bool = False
+    system_prompt: str | None = None
 
 
 @dataclass
@@ -61,6 +73,13 @@ class CompletionResponse:
     model: str
     usage: dict[str, int]
     finish_reason: str
+    provider: str | None = None
+    cached: bool = False
+
+
+def _copy_response(response: CompletionResponse, cached: bool = False) -> CompletionResponse:
+    """複製回應（含 usage），快取與合併的調用方不共享同一實例"""
+    return replace(response, usage=dict(response.usage), cached=cached)
 
 
 class BaseModelClient(ABC):
@@ -118,6 +137,140 @@ class AnthropicClient(BaseModelClient):
         yield ""
 
 
+class LocalStubClient(BaseModelClient):
+    """
+    本地樁客戶端
+
+    不調用任何模型，按固定延遲回傳確定性內容，用於基準測試與離線開發。
+    """
+
+    def __init__(self, latency_seconds: float = 0.05, model: str = "local-stub"):
+        self.latency_seconds = latency_seconds
+        self.model = model
+        self.calls = 0
+
+    async def complete(self, request: CompletionRequest) -> CompletionResponse:
+        """回傳最後一則訊息的回聲"""
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        prompt = request.messages[-1].get("content", "") if request.messages else ""
+        return CompletionResponse(
+            content=f"[stub] {prompt[:200]}",
+            model=request.model or self.model,
+            usage={
+                "prompt_tokens": sum(len(m.get("content", "")) for m in request.messages) // 4,
+                "completion_tokens": min(len(prompt), 200) // 4,
+            },
+            finish_reason="stop",
+        )
+
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        """逐詞串流回聲內容"""
+        response = await self.complete(request)
+        for word in response.content.split(" "):
+            yield word + " "
+
+
+class ResponseCache:
+    """
+    回應快取
+
+    以正規化後的訊息與參數為鍵，LRU + TTL 淘汰。
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, CompletionResponse]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(request: CompletionRequest) -> str:
+        """正規化請求並計算鍵（角色小寫、空白摺疊）"""
+        normalized = {
+            "messages": [
+                [str(m.get("role", "")).lower(), " ".join(str(m.get("content", "")).split())]
+                for m in request.messages
+            ],
+            "system": " ".join((request.system_prompt or "").split()),
+            "model": request.model,
+            "temperature": round(request.temperature, 3),
+            "max_tokens": request.max_tokens,
+        }
+        encoded = json.dumps(normalized, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def get(self, key: str) -> CompletionResponse | None:
+        """讀取未過期的快取項"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, response: CompletionResponse) -> None:
+        """寫入快取並淘汰最舊項"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空快取"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class ProviderState:
+    """提供者運行狀態（並發、延遲、成本、健康）"""
+
+    provider: ModelProvider
+    client: BaseModelClient
+    max_concurrency: int = 16
+    cost_per_1k_tokens: float = 0.0
+    priority: int = 0
+    latency_ewma: float = 0.0
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    cooldown_until: float = 0.0
+    semaphore: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.max_concurrency
+
+    def record(self, latency: float, alpha: float = 0.2) -> None:
+        self.latency_ewma = latency if self.latency_ewma == 0.0 else (
+            alpha * latency + (1 - alpha) * self.latency_ewma
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "latency_ms": round(self.latency_ewma * 1000, 2),
+            "requests": self.requests,
+            "failures": self.failures,
+            "available": self.available,
+        }
+
+
 class ModelGateway:
     """
     模型閘道
@@ -130,12 +283,36 @@ class ModelGateway:
     - 模型切換
     - 成本優化
     - 故障轉移
+    - 請求合併：相同的進行中請求不論溫度都只調用一次（coalesce_requests，預設開啟）
+    - 回應快取：只緩存 temperature <= cache.max_temperature 的請求；預設 0.0，
+      而 CompletionRequest.temperature 預設 0.7，因此取樣請求的快取需顯式提高
+      max_temperature 才會啟用
+
+    每個調用方拿到的都是回應的獨立副本。
     """
 
     def __init__(self, config: dict[str, Any] | None = None):
         self.config = config or {}
         self.clients: dict[ModelProvider, BaseModelClient] = {}
         self.models: dict[str, ModelConfig] = {}
+        self.providers: dict[ModelProvider, ProviderState] = {}
+        self.strategy = RoutingStrategy(self.config.get("routing_strategy", RoutingStrategy.FAILOVER.value))
+        self.failure_cooldown_seconds = self.config.get("failure_cooldown_seconds", 30.0)
+
+        cache_config = self.config.get("cache", {})
+        self.cache_enabled = cache_config.get("enabled", True)
+        # 只緩存確定性請求；取樣溫度更高的回應不應在之後重放給其他調用方
+        self.cache_max_temperature = cache_config.get("max_temperature", 0.0)
+        # 合併同時進行的相同請求，不受溫度限制
+        self.coalesce_enabled = self.config.get("coalesce_requests", True)
+        self.cache = ResponseCache(
+            max_entries=cache_config.get("max_entries", 1024),
+            ttl_seconds=cache_config.get("ttl_seconds", 300.0),
+        )
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._round_robin = 0
+        self.coalesced_requests = 0
+
         self._initialize_clients()
 
     def _initialize_clients(self) -> None:
@@ -148,34 +325,183 @@ class ModelGateway:
         if providers.get("anthropic", {}).get("enabled", True):
             self.clients[ModelProvider.ANTHROPIC] = AnthropicClient()
 
+        local = providers.get("local", {})
+        if local.get("enabled", False):
+            self.clients[ModelProvider.LOCAL] = LocalStubClient(
+                latency_seconds=local.get("latency_seconds", 0.05)
+            )
+
+        for provider, client in self.clients.items():
+            self.register_client(provider, client, **self._provider_options(provider))
+
+        for name, provider_config in providers.items():
+            try:
+                provider = ModelProvider(name)
+            except ValueError:
+                continue
+            for model in provider_config.get("models", []):
+                if model.get("id"):
+                    self.models[model["id"]] = ModelConfig(
+                        id=model["id"],
+                        provider=provider,
+                        type=model.get("type", "chat"),
+                        max_tokens=model.get("max_tokens", 4096),
+                        default=model.get("default", False),
+                    )
+
+    def _provider_options(self, provider: ModelProvider) -> dict[str, Any]:
+        provider_config = self.config.get("providers", {}).get(provider.value, {})
+        options = {}
+        for key in ("max_concurrency", "cost_per_1k_tokens", "priority"):
+            if key in provider_config:
+                options[key] = provider_config[key]
+        return options
+
+    def register_client(
+        self,
+        provider: ModelProvider,
+        client: BaseModelClient,
+        max_concurrency: int = 16,
+        cost_per_1k_tokens: float = 0.0,
+        priority: int | None = None,
+    ) -> None:
+        """註冊或替換提供者客戶端"""
+        self.clients[provider] = client
+        self.providers[provider] = ProviderState(
+            provider=provider,
+            client=client,
+            max_concurrency=max_concurrency,
+            cost_per_1k_tokens=cost_per_1k_tokens,
+            priority=len(self.providers) if priority is None else priority,
+        )
+
     def get_default_model(self) -> str:
         """獲取預設模型"""
         return self.config.get("default_provider", "openai")
 
     async def complete(
-        self, messages: list[dict[str, str]], model: str | None = None, **kwargs: Any
+        self,
+        messages: list[dict[str, str]] | CompletionRequest,
+        model: str | None = None,
+        **kwargs: Any,
     ) -> CompletionResponse:
         """
         執行完成請求
 
         Args:
-            messages: 對話訊息列表
+            messages: 對話訊息列表（或完整的 CompletionRequest）
             model: 指定模型 ID
             **kwargs: 其他參數
 
         Returns:
             CompletionResponse: 完成回應
         """
-        request = CompletionRequest(messages=messages, model=model, **kwargs)
-
-        # 根據模型選擇客戶端
-        provider = self._get_provider_for_model(model)
-        client = self.clients.get(provider)
+        if isinstance(messages, CompletionRequest):
+            request = messages
+        else:
+            request = CompletionRequest(messages=messages, model=model, **kwargs)
+
+        cacheable = self.cache_enabled and request.temperature <= self.cache_max_temperature
+        if not cacheable and not self.coalesce_enabled:
+            return await self._dispatch(request)
+
+        key = self.cache.make_key(request)
+        if cacheable:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return _copy_response(cached, cached=True)
+
+        if not self.coalesce_enabled:
+            return _copy_response(await self._dispatch_and_cache(key, request, cacheable))
+
+        # 合併相同的進行中請求：請求在獨立任務中執行，各調用方經 shield 等待，
+        # 任一調用方被取消不會影響其他調用方
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._dispatch_and_cache(key, request, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget_inflight(key, done))
+        else:
+            self.coalesced_requests += 1
+        return _copy_response(await asyncio.shield(task))
 
-        if not client:
-            raise ValueError(f"Provider not available: {provider}")
+    async def _dispatch_and_cache(
+        self, key: str, request: CompletionRequest, cacheable: bool
+    ) -> CompletionResponse:
+        response = await self._dispatch(request)
+        if cacheable:
+            self.cache.put(key, response)
+        return response
+
+    def _forget_inflight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 所有調用方都已取消時不警告
+
+    async def _dispatch(self, request: CompletionRequest) -> CompletionResponse:
+        """依路由策略選擇提供者，失敗時故障轉移"""
+        candidates = self._route(request.model)
+        if not candidates:
+            raise ValueError(f"Provider not available: {self._get_provider_for_model(request.model)}")
+
+        last_error: Exception | None = None
+        for state in candidates:
+            started = time.monotonic()
+            async with state.semaphore:
+                state.in_flight += 1
+                state.requests += 1
+                try:
+                    response = await state.client.complete(request)
+                except Exception as exc:
+                    state.failures += 1
+                    state.cooldown_until = time.monotonic() + self.failure_cooldown_seconds
+                    last_error = exc
+                    continue
+                finally:
+                    state.in_flight -= 1
+            state.record(time.monotonic() - started)
+            response.provider = state.provider.value
+            return response
+
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    def _route(self, model: str | None) -> list[ProviderState]:
+        """根據策略返回候選提供者（依嘗試順序）"""
+        if model:
+            primary = self._get_provider_for_model(model)
+            pinned = [self.providers[primary]] if primary in self.providers else []
+            # 指定模型時只有同提供者可服務；FAILOVER 策略允許跨提供者轉移
+            if self.strategy != RoutingStrategy.FAILOVER or not self.config.get("cross_provider_failover", False):
+                return pinned
+            others = [s for s in self.providers.values() if s.provider != primary]
+            return pinned + self._order(others)
+        return self._order(list(self.providers.values()))
+
+    def _order(self, states: list[ProviderState]) -> list[ProviderState]:
+        """依策略排序；冷卻中或並發已滿的提供者排到最後"""
+        if not states:
+            return []
+
+        if self.strategy == RoutingStrategy.COST_OPTIMIZED:
+            states.sort(key=lambda s: (s.cost_per_1k_tokens, s.priority))
+        elif self.strategy == RoutingStrategy.PERFORMANCE:
+            states.sort(key=lambda s: (s.latency_ewma, s.priority))
+        elif self.strategy == RoutingStrategy.ROUND_ROBIN:
+            offset = self._round_robin % len(states)
+            self._round_robin += 1
+            states.sort(key=lambda s: s.priority)
+            states = states[offset:] + states[:offset]
+        elif self.strategy == RoutingStrategy.LATENCY_WEIGHTED:
+            # 按 1/延遲 加權抽樣排序（Efraimidis-Spirakis）
+            states.sort(
+                key=lambda s: random.random() ** (s.latency_ewma + 1e-3),
+                reverse=True,
+            )
+        else:
+            states.sort(key=lambda s: s.priority)
 
-        return await client.complete(request)
+        return sorted(states, key=lambda s: (not s.available, s.saturated))
 
     async def stream(
         self, messages: list[dict[str, str]], model: str | None = None, **kwargs: Any
@@ -183,20 +509,29 @@ class ModelGateway:
         """執行串流完成請求"""
         request = CompletionRequest(messages=messages, model=model, stream=True, **kwargs)
 
-        provider = self._get_provider_for_model(model)
-        client = self.clients.get(provider)
-
-        if not client:
-            raise ValueError(f"Provider not available: {provider}")
+        candidates = self._route(model)
+        if not candidates:
+            raise ValueError(f"Provider not available: {self._get_provider_for_model(model)}")
 
-        async for chunk in client.stream(request):
-            yield chunk
+        state = candidates[0]
+        async with state.semaphore:
+            state.in_flight += 1
+            state.requests += 1
+            try:
+                async for chunk in state.client.stream(request):
+                    yield chunk
+            finally:
+                state.in_flight -= 1
 
     def _get_provider_for_model(self, model: str | None) -> ModelProvider:
         """根據模型 ID 獲取提供者"""
         if not model:
             return ModelProvider.OPENAI
 
+        configured = self.models.get(model)
+        if configured:
+            return configured.provider
+
         if model.startswith("gpt") or model.startswith("o1"):
             return ModelProvider.OPENAI
         elif model.startswith("claude"):
@@ -212,3 +547,17 @@ class ModelGateway:
                 for model in provider_config.get("models", []):
                     models.append(model.get("id", ""))
         return models
+
+    def get_stats(self) -> dict[str, Any]:
+        """獲取閘道統計"""
+        return {
+            "strategy": self.strategy.value,
+            "cache": {
+                "entries": len(self.cache),
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+            },
+            "coalesced_requests": self.coalesced_requests,
+            "in_flight": len(self._inflight),
+            "providers": {p.value: state.to_dict() for p, state in self.providers.items()},
+        }
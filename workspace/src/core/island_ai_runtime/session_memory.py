@@ -4,14 +4,34 @@ Session Memory - 會話記憶
 Short-term Memory, Context Management, and Planning
 
 管理 AI 會話上下文和任務規劃
+
+每則訊息在寫入時估算一次 token 數並建立關鍵詞索引；組裝上下文時在 token 預算內
+依序納入釘選訊息、較早歷史的滾動摘要與最近訊息。
 """
 
+import itertools
+import re
 import time
 from collections import deque
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """估算 token 數（英文約 4 字元一個 token，CJK 約一字一個）"""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return (len(text) - cjk + 3) // 4 + cjk + _MESSAGE_OVERHEAD_TOKENS
+
+
+def _keywords(text: str) -> set[str]:
+    return set(_WORD_PATTERN.findall(text.lower()))
+
 
 class MemoryType(Enum):
     """記憶類型"""
@@ -38,6 +58,16 @@ class Message:
     content: str
     timestamp: float = field(default_factory=time.time)
     metadata: dict[str, Any] = field(default_factory=dict)
+    pinned: bool = False
+    tokens: int = 0
+    seq: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.content)
+
+    def to_dict(self) -> dict[str, str]:
+        return {"role": self.role.value, "content": self.content}
 
 
 @dataclass
@@ -62,50 +92,234 @@ class Plan:
     created_at: float = field(default_factory=time.time)
 
 
-@dataclass
+def summarize_messages(messages: Iterable[Message], max_chars: int = 160) -> str:
+    """抽取式摘要：每則訊息保留角色與開頭一段"""
+    lines = []
+    for message in messages:
+        text = " ".join(message.content.split())
+        if len(text) > max_chars:
+            text = text[: max_chars - 1] + "…"
+        lines.append(f"- {message.role.value}: {text}")
+    return "\n".join(lines)
+
+
 class ContextWindow:
-    """上下文窗口"""
+    """
+    上下文窗口
+
+    在 token 預算內組裝提示：釘選訊息 > 滾動摘要 > 最近訊息。被逐出短期記憶
+    的訊息會摘要進滾動摘要，摘要本身也有 token 上限，超出時捨棄最舊的部分。
+    """
 
-    max_tokens: int
-    current_tokens: int = 0
-    messages: list[Message] = field(default_factory=list)
+    def __init__(
+        self,
+        max_tokens: int,
+        reserve_tokens: int = 0,
+        summary_max_tokens: int = 512,
+        summarizer: Callable[[list[Message]], str] | None = None,
+    ):
+        self.max_tokens = max_tokens
+        self.reserve_tokens = reserve_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer or summarize_messages
+        self.current_tokens = 0
+        self._summary_parts: deque[tuple[str, int]] = deque()
+        self._summary_tokens = 0
+
+    @property
+    def budget(self) -> int:
+        return max(0, self.max_tokens - self.reserve_tokens)
+
+    def record_evicted(self, messages: list[Message]) -> None:
+        """將逐出的訊息併入滾動摘要"""
+        if not messages:
+            return
+        text = self.summarizer(messages)
+        if not text:
+            return
+        tokens = estimate_tokens(text)
+        self._summary_parts.append((text, tokens))
+        self._summary_tokens += tokens
+        while self._summary_tokens > self.summary_max_tokens and len(self._summary_parts) > 1:
+            _, dropped = self._summary_parts.popleft()
+            self._summary_tokens -= dropped
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(text for text, _ in self._summary_parts)
+
+    def build(
+        self,
+        messages: Iterable[Message],
+        max_tokens: int | None = None,
+        max_messages: int | None = None,
+    ) -> list[dict[str, str]]:
+        """在預算內組裝上下文（保持時間順序）"""
+        budget = self.budget if max_tokens is None else max_tokens
+        ordered = list(messages)
+        selected: dict[int, Message] = {}
+        used = 0
+
+        for message in ordered:
+            if message.pinned and used + message.tokens <= budget:
+                selected[message.seq] = message
+                used += message.tokens
+
+        # 放不下全部歷史時為摘要預留空間，但不超過預算的四分之一
+        unpinned_tokens = sum(message.tokens for message in ordered if not message.pinned)
+        wanted = self.summary_max_tokens if used + unpinned_tokens > budget else self._summary_tokens
+        summary_reserve = min(wanted, self.summary_max_tokens, budget // 4)
+        taken = 0
+        budget_exhausted = False
+        cutoff = len(ordered)
+        for index in range(len(ordered) - 1, -1, -1):
+            message = ordered[index]
+            if message.pinned:
+                continue
+            if max_messages is not None and taken >= max_messages:
+                break
+            if used + message.tokens + summary_reserve > budget:
+                budget_exhausted = True
+                break
+            selected[message.seq] = message
+            used += message.tokens
+            taken += 1
+            cutoff = index
+
+        # 因預算未納入的較早訊息與已逐出的歷史一起摘要
+        summary_parts = [text for text, _ in self._summary_parts]
+        skipped = [m for m in ordered[:cutoff] if not m.pinned] if budget_exhausted else []
+        if skipped:
+            summary_parts.append(self.summarizer(skipped))
+        summary_message = self._fit_summary(summary_parts, budget - used)
+
+        context = [selected[seq].to_dict() for seq in sorted(selected)]
+        if summary_message:
+            position = 0
+            while position < len(context) and context[position]["role"] == MessageRole.SYSTEM.value:
+                position += 1
+            context.insert(position, summary_message)
+            used += estimate_tokens(summary_message["content"])
+
+        self.current_tokens = used
+        return context
+
+    def _fit_summary(self, parts: list[str], available: int) -> dict[str, str] | None:
+        """保留最新的摘要行直到用完可用預算"""
+        header = "Earlier conversation summary:"
+        limit = min(available, self.summary_max_tokens) - estimate_tokens(header)
+        kept: list[str] = []
+        for line in reversed("\n".join(parts).splitlines()):
+            cost = estimate_tokens(line) - _MESSAGE_OVERHEAD_TOKENS + 1
+            if cost > limit:
+                break
+            kept.append(line)
+            limit -= cost
+        if not kept:
+            return None
+        return {"role": MessageRole.SYSTEM.value, "content": "\n".join([header, *reversed(kept)])}
+
+    def clear(self) -> None:
+        """清空摘要"""
+        self._summary_parts.clear()
+        self._summary_tokens = 0
+        self.current_tokens = 0
 
 
 class ShortTermMemory:
     """
     短期記憶
 
-    管理會話內的即時記憶。
+    管理會話內的即時記憶。按訊息數與 token 數上限逐出最舊的未釘選訊息，
+    並維護關鍵詞倒排索引供快速檢索。
     """
 
-    def __init__(self, max_messages: int = 100):
+    def __init__(
+        self,
+        max_messages: int = 100,
+        max_tokens: int | None = None,
+        on_evict: Callable[[list[Message]], None] | None = None,
+    ):
         self.max_messages = max_messages
-        self.messages: deque[Message] = deque(maxlen=max_messages)
+        self.max_tokens = max_tokens
+        self.on_evict = on_evict
+        self.messages: deque[Message] = deque()
+        self.total_tokens = 0
+        self._seq = itertools.count(1)
+        self._keyword_index: dict[str, dict[int, Message]] = {}
 
     def add(self, message: Message) -> None:
         """添加訊息"""
+        message.seq = next(self._seq)
         self.messages.append(message)
+        self.total_tokens += message.tokens
+        for word in _keywords(message.content):
+            self._keyword_index.setdefault(word, {})[message.seq] = message
+        self._evict()
+
+    def _evict(self) -> None:
+        """逐出超出上限的最舊未釘選訊息"""
+        evicted: list[Message] = []
+        held: list[Message] = []
+        while self.messages and (
+            len(self.messages) + len(held) > self.max_messages
+            or (self.max_tokens is not None and self.total_tokens > self.max_tokens)
+        ):
+            message = self.messages.popleft()
+            if message.pinned:
+                held.append(message)
+                continue
+            self.total_tokens -= message.tokens
+            self._unindex(message)
+            evicted.append(message)
+        self.messages.extendleft(reversed(held))
+        if evicted and self.on_evict:
+            self.on_evict(evicted)
+
+    def _unindex(self, message: Message) -> None:
+        for word in _keywords(message.content):
+            postings = self._keyword_index.get(word)
+            if postings is not None:
+                postings.pop(message.seq, None)
+                if not postings:
+                    del self._keyword_index[word]
 
     def get_recent(self, n: int = 10) -> list[Message]:
         """獲取最近的訊息"""
-        return list(self.messages)[-n:]
-
-    def search(self, query: str) -> list[Message]:
-        """搜索訊息"""
-        results = []
-        query_lower = query.lower()
-        for msg in self.messages:
-            if query_lower in msg.content.lower():
-                results.append(msg)
-        return results
+        count = min(n, len(self.messages))
+        return [self.messages[i] for i in range(len(self.messages) - count, len(self.messages))]
+
+    def search(self, query: str, limit: int | None = None) -> list[Message]:
+        """搜索包含所有關鍵詞的訊息（按時間順序）"""
+        words = _keywords(query)
+        if not words:
+            return []
+        postings = sorted(
+            (self._keyword_index.get(word, {}) for word in words), key=len
+        )
+        if not postings[0]:
+            return []
+        seqs = set(postings[0])
+        for other in postings[1:]:
+            seqs &= other.keys()
+            if not seqs:
+                return []
+        results = [postings[0][seq] for seq in sorted(seqs)]
+        return results[-limit:] if limit else results
+
+    def pinned(self) -> list[Message]:
+        """獲取釘選訊息"""
+        return [message for message in self.messages if message.pinned]
 
     def clear(self) -> None:
         """清空記憶"""
         self.messages.clear()
+        self._keyword_index.clear()
+        self.total_tokens = 0
 
     def to_messages(self) -> list[dict[str, str]]:
         """轉換為 LLM 訊息格式"""
-        return [{"role": msg.role.value, "content": msg.content} for msg in self.messages]
+        return [msg.to_dict() for msg in self.messages]
 
 
 class WorkingMemory:
@@ -240,29 +454,52 @@ class SessionMemory:
 
     def __init__(self, config: dict[str, Any] | None = None):
         self.config = config or {}
-        self.short_term = ShortTermMemory(max_messages=self.config.get("max_messages", 100))
+        self.context_window = ContextWindow(
+            max_tokens=self.config.get("max_tokens", 128000),
+            reserve_tokens=self.config.get("reserve_tokens", 0),
+            summary_max_tokens=self.config.get("summary_max_tokens", 512),
+        )
+        self.short_term = ShortTermMemory(
+            max_messages=self.config.get("max_messages", 100),
+            max_tokens=self.config.get("memory_max_tokens"),
+            on_evict=self.context_window.record_evicted,
+        )
         self.working = WorkingMemory()
         self.planner = Planner()
-        self.context_window = ContextWindow(max_tokens=self.config.get("max_tokens", 128000))
+        self.pin_system_messages = self.config.get("pin_system_messages", True)
 
     def add_message(
-        self, role: str | MessageRole, content: str, metadata: dict[str, Any] | None = None
-    ) -> None:
-        """添加訊息到記憶"""
+        self,
+        role: str | MessageRole,
+        content: str,
+        metadata: dict[str, Any] | None = None,
+        pinned: bool | None = None,
+    ) -> Message:
+        """添加訊息到記憶（系統訊息預設釘選）"""
         if isinstance(role, str):
             role = MessageRole(role)
+        if pinned is None:
+            pinned = self.pin_system_messages and role == MessageRole.SYSTEM
 
-        message = Message(role=role, content=content, metadata=metadata or {})
-
+        message = Message(role=role, content=content, metadata=metadata or {}, pinned=pinned)
         self.short_term.add(message)
-        self.context_window.messages.append(message)
+        return message
+
+    def pin_message(self, message: Message, pinned: bool = True) -> None:
+        """釘選或取消釘選訊息"""
+        message.pinned = pinned
+
+    def get_context(
+        self, max_messages: int | None = None, max_tokens: int | None = None
+    ) -> list[dict[str, str]]:
+        """在 token 預算內獲取上下文"""
+        return self.context_window.build(
+            self.short_term.messages, max_tokens=max_tokens, max_messages=max_messages
+        )
 
-    def get_context(self, max_messages: int | None = None) -> list[dict[str, str]]:
-        """獲取上下文"""
-        messages = self.short_term.to_messages()
-        if max_messages:
-            messages = messages[-max_messages:]
-        return messages
+    def recall(self, query: str, limit: int = 5) -> list[Message]:
+        """按關鍵詞檢索記憶中的訊息"""
+        return self.short_term.search(query, limit=limit)
 
     def set_working_data(self, key: str, value: Any) -> None:
         """設置工作記憶數據"""
@@ -289,6 +526,8 @@ class SessionMemory:
         return {
             "short_term": {
                 "message_count": len(self.short_term.messages),
+                "total_tokens": self.short_term.total_tokens,
+                "pinned": len(self.short_term.pinned()),
                 "recent_topics": self._extract_topics(),
             },
             "working": {"focus": self.working.focus, "data_keys": list(self.working.data.keys())},
@@ -317,4 +556,4 @@ class SessionMemory:
         self.working.clear()
         self.planner.plans.clear()
         self.planner.current_plan = None
-        self.context_window.messages.clear()
+        self.context_window.clear()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Vector Store - 向量存儲
+Contiguous float32 matrix, IVF approximate index and mmap persistence
+
+向量在寫入時即正規化並存放於連續的 float32 矩陣，搜索為一次矩陣-向量乘積加
+argpartition top-k；大型語料可啟用 IVF 近似索引。刪除以墓碑標記，累積到一定
+比例後壓縮。磁碟格式為 .npy + JSON，載入時以 mmap 映射，無需解析向量。
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+_VECTORS_FILE = "vectors.npy"
+_CENTROIDS_FILE = "centroids.npy"
+_ASSIGNMENTS_FILE = "assignments.npy"
+_MANIFEST_FILE = "manifest.json"
+_FORMAT_VERSION = 1
+
+
+def _normalize(vector: Any, dimension: int) -> np.ndarray:
+    """轉為 float32 單位向量（零向量保持為零）"""
+    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    if array.shape[0] != dimension:
+        raise ValueError(f"Vector dimension mismatch: expected {dimension}, got {array.shape[0]}")
+    norm = float(np.linalg.norm(array))
+    if norm > 0:
+        array = array / norm
+    return array
+
+
+def _save_array(target: Path, array: np.ndarray) -> None:
+    """寫入暫存檔後原子替換 .npy 檔案"""
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, target)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """返回分數最高的 k 個位置（已按分數降序）"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class IVFIndex:
+    """
+    倒排文件（IVF）近似索引
+
+    以球面 k-means 將向量分為 nlist 個簇，查詢時只掃描最接近的 nprobe 個簇。
+    每行的所屬簇記錄在 assignments 中；簇列表允許殘留過期行，查詢時以
+    assignments 過濾，壓縮時重建。
+    """
+
+    def __init__(self, nlist: int = 256, nprobe: int = 8, iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: np.ndarray | None = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self._lists: list[list[int]] = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        """以球面 k-means 訓練簇中心（輸入需已正規化）"""
+        count = vectors.shape[0]
+        nlist = max(1, min(self.nlist, count))
+        rng = np.random.default_rng(self.seed)
+        centroids = vectors[rng.choice(count, size=nlist, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            labels = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, vectors)
+            norms = np.linalg.norm(sums, axis=1)
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        self.centroids = centroids
+
+    def assign(self, rows: np.ndarray, vectors: np.ndarray, capacity: int) -> None:
+        """將指定行分配到最近的簇"""
+        if self.centroids is None or rows.size == 0:
+            return
+        if self.assignments.shape[0] < capacity:
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[: self.assignments.shape[0]] = self.assignments
+            self.assignments = grown
+        if not self._lists:
+            self._lists = [[] for _ in range(self.centroids.shape[0])]
+
+        labels = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+        self.assignments[rows] = labels
+        for row, label in zip(rows.tolist(), labels.tolist(), strict=True):
+            self._lists[label].append(row)
+
+    def rebuild_lists(self, count: int) -> None:
+        """依 assignments 重建簇列表（去除過期行）"""
+        if self.centroids is None:
+            return
+        self._lists = [[] for _ in range(self.centroids.shape[0])]
+        for row, label in enumerate(self.assignments[:count].tolist()):
+            if label >= 0:
+                self._lists[label].append(row)
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """返回查詢需掃描的候選行"""
+        if self.centroids is None:
+            return np.empty(0, dtype=np.int64)
+        probes = _top_k(self.centroids @ query, min(self.nprobe, self.centroids.shape[0]))
+        rows = []
+        for label in probes.tolist():
+            members = np.asarray(self._lists[label], dtype=np.int64)
+            if members.size:
+                rows.append(members[self.assignments[members] == label])
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(rows))
+
+
+class VectorStore:
+    """
+    向量存儲
+
+    存儲和搜索向量嵌入。
+
+    - index="flat"：精確搜索，一次矩陣-向量乘積
+    - index="ivf"：向量數達到 ivf_train_size 後自動訓練 IVF，之後近似搜索
+    """
+
+    def __init__(
+        self,
+        dimension: int | None = None,
+        index: str = "flat",
+        nlist: int = 256,
+        nprobe: int = 8,
+        ivf_train_size: int = 10000,
+        compact_ratio: float = 0.25,
+    ):
+        if index not in ("flat", "ivf"):
+            raise ValueError(f"Unknown vector index type: {index}")
+        self.dimension = dimension
+        self.index_type = index
+        self.ivf_train_size = ivf_train_size
+        self.compact_ratio = compact_ratio
+        self.metadata: dict[str, dict[str, Any]] = {}
+
+        self._matrix = np.empty((0, dimension or 0), dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._ids: list[str | None] = []
+        self._rows: dict[str, int] = {}
+        self._count = 0
+        self._deleted = 0
+        self._ivf = IVFIndex(nlist=nlist, nprobe=nprobe) if index == "ivf" else None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._rows
+
+    # ------------------------------------------------------------------
+    # 寫入
+    # ------------------------------------------------------------------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity and self._matrix.flags.writeable:
+            return
+        new_capacity = max(needed, capacity * 2, 64) if needed > capacity else capacity
+        matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        matrix[: self._count] = self._matrix[: self._count]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[: self._count] = self._alive[: self._count]
+        self._matrix = matrix
+        self._alive = alive
+
+    def upsert(self, id: str, vector: list[float], metadata: dict[str, Any] | None = None) -> None:
+        """插入或更新向量"""
+        self.upsert_many([id], [vector], [metadata])
+
+    def upsert_many(
+        self,
+        ids: list[str],
+        vectors: Any,
+        metadata: list[dict[str, Any] | None] | None = None,
+    ) -> None:
+        """批量插入或更新向量"""
+        if not ids:
+            return
+        if self.dimension is None:
+            self.dimension = len(vectors[0])
+            self._matrix = np.empty((0, self.dimension), dtype=np.float32)
+
+        normalized = np.stack([_normalize(vector, self.dimension) for vector in vectors])
+        self._ensure_capacity(self._count + len(ids))
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        for position, id in enumerate(ids):
+            row = self._rows.get(id)
+            if row is None:
+                row = self._count
+                self._count += 1
+                self._rows[id] = row
+                self._ids.append(id)
+            rows[position] = row
+            self._alive[row] = True
+            self.metadata[id] = (metadata[position] if metadata else None) or {}
+
+        self._matrix[rows] = normalized
+
+        if self._ivf is not None:
+            if self._ivf.is_trained:
+                self._ivf.assign(rows, normalized, self._matrix.shape[0])
+            elif len(self._rows) >= self.ivf_train_size:
+                self.train()
+
+    def delete(self, id: str) -> None:
+        """刪除向量（墓碑標記，必要時壓縮）"""
+        row = self._rows.pop(id, None)
+        self.metadata.pop(id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._ids[row] = None
+        self._deleted += 1
+        if self._deleted > self.compact_ratio * max(self._count, 1):
+            self.compact()
+
+    def compact(self) -> None:
+        """移除墓碑行，重排矩陣"""
+        if not self._deleted:
+            return
+        keep = np.flatnonzero(self._alive[: self._count])
+        self._matrix = np.ascontiguousarray(self._matrix[keep])
+        self._alive = np.ones(keep.size, dtype=bool)
+        self._ids = [self._ids[row] for row in keep.tolist()]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._count = keep.size
+        self._deleted = 0
+        if self._ivf is not None and self._ivf.is_trained:
+            self._ivf.assignments = self._ivf.assignments[keep]
+            self._ivf.rebuild_lists(self._count)
+
+    def train(self) -> None:
+        """訓練 IVF 索引並分配所有現有向量"""
+        if self._ivf is None or not self._rows:
+            return
+        rows = np.flatnonzero(self._alive[: self._count])
+        vectors = self._matrix[rows]
+        self._ivf.train(vectors)
+        self._ivf.assignments = np.full(self._matrix.shape[0], -1, dtype=np.int32)
+        self._ivf._lists = []
+        self._ivf.assign(rows, vectors, self._matrix.shape[0])
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def get_vector(self, id: str) -> list[float] | None:
+        """獲取已正規化的向量"""
+        row = self._rows.get(id)
+        return None if row is None else self._matrix[row].tolist()
+
+    def search(self, query_vector: list[float], top_k: int = 10) -> list[tuple[str, float]]:
+        """搜索最相似的向量"""
+        if not self._rows or top_k <= 0:
+            return []
+        query = _normalize(query_vector, self.dimension)
+
+        if self._ivf is not None and self._ivf.is_trained:
+            rows = self._ivf.candidates(query)
+            rows = rows[self._alive[rows]]
+            scores = self._matrix[rows] @ query
+        else:
+            rows = None
+            scores = self._matrix[: self._count] @ query
+            if self._deleted:
+                scores[~self._alive[: self._count]] = -np.inf
+
+        best = _top_k(scores, min(top_k, len(self._rows)))
+        results = []
+        for position in best.tolist():
+            score = float(scores[position])
+            if score == -np.inf:
+                break
+            row = position if rows is None else int(rows[position])
+            results.append((self._ids[row], score))
+        return results
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self, directory: str | os.PathLike) -> None:
+        """
+        保存到目錄（壓縮後寫入 .npy 與 manifest）
+
+        每個檔案先寫入同目錄的暫存檔再以 os.replace 替換，因此可以保存回
+        自身 mmap 載入的目錄：映射仍指向舊檔案，不會被截斷。
+        """
+        self.compact()
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+
+        _save_array(path / _VECTORS_FILE, self._matrix[: self._count])
+        ivf_trained = self._ivf is not None and self._ivf.is_trained
+        if ivf_trained:
+            _save_array(path / _CENTROIDS_FILE, self._ivf.centroids)
+            _save_array(path / _ASSIGNMENTS_FILE, self._ivf.assignments[: self._count])
+
+        manifest = {
+            "version": _FORMAT_VERSION,
+            "dimension": self.dimension,
+            "index": self.index_type,
+            "nlist": self._ivf.nlist if self._ivf else None,
+            "nprobe": self._ivf.nprobe if self._ivf else None,
+            "ivf_train_size": self.ivf_train_size,
+            "ivf_trained": ivf_trained,
+            "ids": self._ids,
+            "metadata": [self.metadata.get(id, {}) for id in self._ids],
+        }
+        tmp = path / (_MANIFEST_FILE + ".tmp")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False))
+        os.replace(tmp, path / _MANIFEST_FILE)
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike, mmap: bool = True) -> "VectorStore":
+        """從目錄載入；mmap=True 時向量以唯讀映射載入，首次寫入時才複製"""
+        path = Path(directory)
+        manifest = json.loads((path / _MANIFEST_FILE).read_text())
+        if manifest.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector store format: {manifest.get('version')}")
+
+        store = cls(
+            dimension=manifest["dimension"],
+            index=manifest["index"],
+            nlist=manifest.get("nlist") or 256,
+            nprobe=manifest.get("nprobe") or 8,
+            ivf_train_size=manifest.get("ivf_train_size", 10000),
+        )
+        matrix = np.load(path / _VECTORS_FILE, mmap_mode="r" if mmap else None)
+        store._matrix = matrix
+        store._count = matrix.shape[0]
+        store._alive = np.ones(store._count, dtype=bool)
+        store._ids = list(manifest["ids"])
+        store._rows = {id: row for row, id in enumerate(store._ids)}
+        store.metadata = dict(zip(store._ids, manifest["metadata"], strict=True))
+
+        if store._ivf is not None and manifest.get("ivf_trained"):
+            store._ivf.centroids = np.load(path / _CENTROIDS_FILE)
+            store._ivf.assignments = np.array(np.load(path / _ASSIGNMENTS_FILE), dtype=np.int32)
+            store._ivf.rebuild_lists(store._count)
+        return store
+
+    def get_stats(self) -> dict[str, Any]:
+        """獲取統計信息"""
+        return {
+            "vectors": len(self._rows),
+            "tombstones": self._deleted,
+            "dimension": self.dimension,
+            "index": self.index_type,
+            "ivf_trained": bool(self._ivf and self._ivf.is_trained),
+            "memory_mapped": isinstance(self._matrix, np.memmap),
+        }
@@ -14,6 +14,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
+from ...training_system.knowledge_index import KnowledgeIndex
+
 
 class KnowledgeCategory(Enum):
     """Knowledge categories for organization."""
@@ -178,12 +180,17 @@ class KnowledgeBase:
         self.best_practices: dict[str, BestPractice] = {}
         self.anti_patterns: dict[str, AntiPattern] = {}
         self._concept_index: dict[str, set[str]] = {}  # tag -> concept_ids
+        # BM25 search indexes used by get_relevant_knowledge
+        self._concept_search = KnowledgeIndex()
+        self._practice_search = KnowledgeIndex()
+        self._anti_pattern_search = KnowledgeIndex()
 
         # Initialize with built-in knowledge
         self._initialize_database_knowledge()
         self._initialize_security_knowledge()
         self._initialize_architecture_knowledge()
         self._initialize_performance_knowledge()
+        self._rebuild_search_indexes()
 
     def _initialize_database_knowledge(self) -> None:
         """Initialize database domain knowledge."""
@@ -585,6 +592,8 @@ user = db.users.find_first(where={'email': email})
                 self._concept_index[tag] = set()
             self._concept_index[tag].add(concept.id)
 
+        self._concept_search.add(concept.id, concept.name, concept.definition, concept.tags)
+
     def add_best_practice(self, practice: BestPractice) -> None:
         """Add a new best practice."""
         self.best_practices[practice.id] = practice
@@ -592,6 +601,8 @@ user = db.users.find_first(where={'email': email})
         if practice.category in self.domains:
             self.domains[practice.category].best_practices[practice.id] = practice
 
+        self._practice_search.add(practice.id, practice.name, practice.principle, practice.tags)
+
     def add_anti_pattern(self, pattern: AntiPattern) -> None:
         """Add a new anti-pattern."""
         self.anti_patterns[pattern.id] = pattern
@@ -599,6 +610,8 @@ user = db.users.find_first(where={'email': email})
         if pattern.category in self.domains:
             self.domains[pattern.category].anti_patterns[pattern.id] = pattern
 
+        self._anti_pattern_search.add(pattern.id, pattern.name, pattern.description, pattern.tags)
+
     def get_relevant_knowledge(self, context: str, max_results: int = 5) -> dict[str, Any]:
         """
         Get relevant knowledge based on context.
@@ -606,76 +619,48 @@ user = db.users.find_first(where={'email': email})
         根據上下文獲取相關知識
         """
         context_lower = context.lower()
+        self._sync_search_indexes()
 
         relevant = {
-            "concepts": [],
-            "best_practices": [],
-            "anti_patterns": [],
+            "concepts": self._top_matches(self._concept_search, self.concepts, context, max_results),
+            "best_practices": self._top_matches(self._practice_search, self.best_practices, context, max_results),
+            "anti_patterns": self._top_matches(self._anti_pattern_search, self.anti_patterns, context, max_results),
             "tips": [],
         }
 
-        # Find relevant concepts
-        for concept in self.concepts.values():
-            score = self._calculate_relevance(context_lower, concept.name, concept.definition, concept.tags)
-            if score > 0:
-                relevant["concepts"].append((concept, score))
-
-        relevant["concepts"] = [
-            c for c, _ in sorted(relevant["concepts"], key=lambda x: x[1], reverse=True)[:max_results]
-        ]
-
-        # Find relevant best practices
-        for practice in self.best_practices.values():
-            score = self._calculate_relevance(context_lower, practice.name, practice.principle, practice.tags)
-            if score > 0:
-                relevant["best_practices"].append((practice, score))
-
-        relevant["best_practices"] = [
-            p for p, _ in sorted(relevant["best_practices"], key=lambda x: x[1], reverse=True)[:max_results]
-        ]
-
-        # Find relevant anti-patterns
-        for pattern in self.anti_patterns.values():
-            score = self._calculate_relevance(context_lower, pattern.name, pattern.description, pattern.tags)
-            if score > 0:
-                relevant["anti_patterns"].append((pattern, score))
-
-        relevant["anti_patterns"] = [
-            p for p, _ in sorted(relevant["anti_patterns"], key=lambda x: x[1], reverse=True)[:max_results]
-        ]
-
         # Collect tips from relevant domains
+        context_words = context_lower.split()
         for domain in self.domains.values():
             for tip in domain.tips:
-                if any(word in tip.lower() for word in context_lower.split()):
+                if any(word in tip.lower() for word in context_words):
                     relevant["tips"].append(tip)
 
         return relevant
 
-    def _calculate_relevance(self, context: str, name: str, description: str, tags: list[str]) -> float:
-        """Calculate relevance score for knowledge item."""
-        score = 0.0
-        context_words = set(context.split())
-
-        # Name matching (high weight)
-        name_lower = name.lower()
-        for word in context_words:
-            if word in name_lower:
-                score += 3.0
-
-        # Description matching (medium weight)
-        description_lower = description.lower()
-        for word in context_words:
-            if word in description_lower:
-                score += 1.0
-
-        # Tag matching (high weight)
-        tags_lower = [t.lower() for t in tags]
-        for word in context_words:
-            if word in tags_lower:
-                score += 2.0
-
-        return score
+    def _top_matches(self, index: KnowledgeIndex, items: dict[str, Any], context: str, max_results: int) -> list[Any]:
+        """Rank indexed items against the context (BM25, heap top-k)."""
+        return [items[item_id] for item_id, _ in index.search(context, max_results) if item_id in items]
+
+    def _rebuild_search_indexes(self) -> None:
+        """Re-index every concept, best practice and anti-pattern."""
+        self._concept_search.clear()
+        for concept_id, concept in self.concepts.items():
+            self._concept_search.add(concept_id, concept.name, concept.definition, concept.tags)
+
+        self._practice_search.clear()
+        for practice_id, practice in self.best_practices.items():
+            self._practice_search.add(practice_id, practice.name, practice.principle, practice.tags)
+
+        self._anti_pattern_search.clear()
+        for pattern_id, pattern in self.anti_patterns.items():
+            self._anti_pattern_search.add(pattern_id, pattern.name, pattern.description, pattern.tags)
+
+    def _sync_search_indexes(self) -> None:
+        """Rebuild if the dictionaries were modified without the add_* methods."""
+        if (len(self._concept_search) != len(self.concepts)
+                or len(self._practice_search) != len(self.best_practices)
+                or len(self._anti_pattern_search) != len(self.anti_patterns)):
+            self._rebuild_search_indexes()
 
     def get_stats(self) -> dict[str, int]:
         """Get knowledge base statistics."""
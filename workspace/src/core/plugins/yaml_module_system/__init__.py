@@ -52,6 +52,7 @@ from .yaml_module_definition import (
     YAMLModuleDefinition,
 )
 from .yaml_schema_validator import (
+    CompiledSchema,
     SchemaRegistry,
     ValidationError,
     ValidationResult,
@@ -74,6 +75,7 @@ __all__ = [
     'ValidationResult',
     'ValidationError',
     'SchemaRegistry',
+    'CompiledSchema',
 
     # Policy Gate
     'PolicyGate',
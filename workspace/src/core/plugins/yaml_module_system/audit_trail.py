@@ -7,8 +7,11 @@ Reference: DevSecOps audit requirements [2] [5]
 """
 
 import hashlib
+import itertools
 import json
 import uuid
+from collections import deque
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -291,12 +294,23 @@ class ChangeRecord:
 class ChangeTracker:
     """
     變更追蹤器
-    
+
     追蹤資源的詳細變更歷史。
+
+    以樹狀差異比對新舊狀態：相同物件或相等的子樹直接跳過，字典逐鍵遞迴，
+    元素帶有 id/name/key 的列表按鍵配對，其餘列表整體比較。創建與刪除只產生
+    一筆根記錄。記錄數量有上限，並按 (resource_type, resource_id, field_path)
+    建立索引。
     """
 
-    def __init__(self):
-        self._records: list[ChangeRecord] = []
+    LIST_KEYS = ('id', 'name', 'key')
+
+    def __init__(self, max_records: int = 100000):
+        self.max_records = max_records
+        self._records: deque[ChangeRecord] = deque()
+        self._by_resource: dict[tuple[str, str], deque[ChangeRecord]] = {}
+        self._by_field: dict[tuple[str, str, str], deque[ChangeRecord]] = {}
+        self._sequence = itertools.count(1)
 
     def track_changes(self,
                       resource_type: str,
@@ -306,123 +320,159 @@ class ChangeTracker:
                       actor: str = "") -> list[ChangeRecord]:
         """
         追蹤變更
-        
+
         Args:
             resource_type: 資源類型
             resource_id: 資源 ID
             old_state: 舊狀態
             new_state: 新狀態
             actor: 執行者
-        
+
         Returns:
-            List[ChangeRecord]: 變更記錄列表
+            list[ChangeRecord]: 變更記錄列表
         """
-        records = []
-        timestamp = datetime.now()
+        patches: list[tuple[str, str, Any, Any]] = []
 
         if old_state is None and new_state is not None:
-            # 創建
-            for key, value in self._flatten_dict(new_state):
-                record = ChangeRecord(
-                    id=str(uuid.uuid4()),
-                    timestamp=timestamp,
-                    resource_type=resource_type,
-                    resource_id=resource_id,
-                    change_type='added',
-                    field_path=key,
-                    new_value=value,
-                    actor=actor,
-                )
-                records.append(record)
-
+            patches.append(('added', '', None, new_state))
         elif old_state is not None and new_state is None:
-            # 刪除
-            for key, value in self._flatten_dict(old_state):
-                record = ChangeRecord(
-                    id=str(uuid.uuid4()),
-                    timestamp=timestamp,
-                    resource_type=resource_type,
-                    resource_id=resource_id,
-                    change_type='removed',
-                    field_path=key,
-                    old_value=value,
-                    actor=actor,
-                )
-                records.append(record)
-
+            patches.append(('removed', '', old_state, None))
         else:
-            # 更新
-            old_flat = dict(self._flatten_dict(old_state or {}))
-            new_flat = dict(self._flatten_dict(new_state or {}))
-
-            all_keys = set(old_flat.keys()) | set(new_flat.keys())
-
-            for key in all_keys:
-                old_value = old_flat.get(key)
-                new_value = new_flat.get(key)
-
-                if old_value != new_value:
-                    if key not in old_flat:
-                        change_type = 'added'
-                    elif key not in new_flat:
-                        change_type = 'removed'
-                    else:
-                        change_type = 'modified'
-
-                    record = ChangeRecord(
-                        id=str(uuid.uuid4()),
-                        timestamp=timestamp,
-                        resource_type=resource_type,
-                        resource_id=resource_id,
-                        change_type=change_type,
-                        field_path=key,
-                        old_value=old_value,
-                        new_value=new_value,
-                        actor=actor,
-                    )
-                    records.append(record)
-
-        self._records.extend(records)
+            self._diff(old_state or {}, new_state or {}, '', patches)
+
+        if not patches:
+            return []
+
+        timestamp = datetime.now()
+        change_set = f"{next(self._sequence):x}"
+        records = [
+            ChangeRecord(
+                id=f"{change_set}.{index}",
+                timestamp=timestamp,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                change_type=change_type,
+                field_path=path,
+                old_value=old_value,
+                new_value=new_value,
+                actor=actor,
+            )
+            for index, (change_type, path, old_value, new_value) in enumerate(patches)
+        ]
+        for record in records:
+            self._append(record)
         return records
 
-    def _flatten_dict(self, d: dict[str, Any], parent_key: str = '') -> list[tuple]:
-        """展平字典"""
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}.{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self._flatten_dict(v, new_key))
+    def _diff(self, old: Any, new: Any, path: str, patches: list[tuple[str, str, Any, Any]]) -> None:
+        """遞迴比較兩棵子樹，未變的子樹直接跳過"""
+        if old is new:
+            return
+        if isinstance(old, dict) and isinstance(new, dict):
+            if old == new:
+                return
+            for key, old_value in old.items():
+                child = f"{path}.{key}" if path else str(key)
+                if key not in new:
+                    patches.append(('removed', child, old_value, None))
+                else:
+                    self._diff(old_value, new[key], child, patches)
+            for key, new_value in new.items():
+                if key not in old:
+                    child = f"{path}.{key}" if path else str(key)
+                    patches.append(('added', child, None, new_value))
+            return
+        if isinstance(old, list) and isinstance(new, list):
+            if old == new:
+                return
+            list_key = self._list_key(old, new)
+            if list_key is not None:
+                self._diff_keyed_list(old, new, list_key, path, patches)
+                return
+        if type(old) is not type(new) or old != new:
+            patches.append(('modified', path, old, new))
+
+    def _list_key(self, old: list[Any], new: list[Any]) -> str | None:
+        """找出所有元素共有且唯一的鍵欄位"""
+        items = old + new
+        if not items or not all(isinstance(item, dict) for item in items):
+            return None
+        for key in self.LIST_KEYS:
+            if all(key in item for item in items):
+                if (len({repr(item[key]) for item in old}) == len(old)
+                        and len({repr(item[key]) for item in new}) == len(new)):
+                    return key
+        return None
+
+    def _diff_keyed_list(self, old: list[dict[str, Any]], new: list[dict[str, Any]], key: str,
+                         path: str, patches: list[tuple[str, str, Any, Any]]) -> None:
+        """按鍵配對比較列表元素"""
+        old_items = {item[key]: item for item in old}
+        new_items = {item[key]: item for item in new}
+        for item_key, old_item in old_items.items():
+            child = f"{path}[{key}={item_key}]"
+            if item_key not in new_items:
+                patches.append(('removed', child, old_item, None))
             else:
-                items.append((new_key, v))
-        return items
+                self._diff(old_item, new_items[item_key], child, patches)
+        for item_key, new_item in new_items.items():
+            if item_key not in old_items:
+                patches.append(('added', f"{path}[{key}={item_key}]", None, new_item))
+
+    def _append(self, record: ChangeRecord) -> None:
+        """寫入記錄並維護索引，超出上限時淘汰最舊記錄"""
+        self._records.append(record)
+        resource_key = (record.resource_type, record.resource_id)
+        self._by_resource.setdefault(resource_key, deque()).append(record)
+        self._by_field.setdefault(resource_key + (record.field_path,), deque()).append(record)
+
+        while len(self._records) > self.max_records:
+            oldest = self._records.popleft()
+            oldest_key = (oldest.resource_type, oldest.resource_id)
+            for index, index_key in ((self._by_resource, oldest_key),
+                                     (self._by_field, oldest_key + (oldest.field_path,))):
+                bucket = index.get(index_key)
+                if bucket and bucket[0] is oldest:
+                    bucket.popleft()
+                    if not bucket:
+                        del index[index_key]
 
     def get_changes(self,
                     resource_type: str | None = None,
                     resource_id: str | None = None,
                     change_type: str | None = None,
                     limit: int = 100) -> list[ChangeRecord]:
-        """獲取變更記錄"""
-        records = self._records.copy()
-
-        if resource_type:
-            records = [r for r in records if r.resource_type == resource_type]
-
-        if resource_id:
-            records = [r for r in records if r.resource_id == resource_id]
-
-        if change_type:
-            records = [r for r in records if r.change_type == change_type]
+        """獲取變更記錄（由新到舊）"""
+        if resource_type and resource_id:
+            source: Iterable[ChangeRecord] = self._by_resource.get((resource_type, resource_id), ())
+        else:
+            source = self._records
 
-        records.sort(key=lambda r: r.timestamp, reverse=True)
-        return records[:limit]
+        records = []
+        for record in reversed(source):
+            if resource_type and record.resource_type != resource_type:
+                continue
+            if resource_id and record.resource_id != resource_id:
+                continue
+            if change_type and record.change_type != change_type:
+                continue
+            records.append(record)
+            if len(records) >= limit:
+                break
+        return records
 
     def get_field_history(self, resource_type: str, resource_id: str, field_path: str) -> list[ChangeRecord]:
-        """獲取特定字段的歷史"""
-        records = [
-            r for r in self._records
-            if r.resource_type == resource_type
-            and r.resource_id == resource_id
-            and r.field_path == field_path
-        ]
+        """獲取特定字段的歷史（含覆蓋此字段的上層記錄，由新到舊）"""
+        records: list[ChangeRecord] = []
+        for path in self._ancestor_paths(field_path):
+            records.extend(self._by_field.get((resource_type, resource_id, path), ()))
         records.sort(key=lambda r: r.timestamp, reverse=True)
         return records
+
+    @staticmethod
+    def _ancestor_paths(field_path: str) -> list[str]:
+        """返回字段路徑本身及其所有上層路徑（含根路徑 ''）"""
+        paths = ['', field_path] if field_path else ['']
+        for index, char in enumerate(field_path):
+            if char in '.[' and index:
+                paths.append(field_path[:index])
+        return list(dict.fromkeys(paths))
@@ -8,9 +8,14 @@ Reference: DevSecOps pipeline best practices [3] [4] [5]
 
 import hashlib
 import json
+import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
 from typing import Any
@@ -278,17 +283,31 @@ class VerificationReport:
 class CIVerificationPipeline:
     """
     CI/CD 驗證管道
-    
+
     完整的驗證流程，包含多階段驗證和證據收集。
-    
+
+    階段按 depends_on 組成 DAG：依賴已通過的階段會並發提交到工作線程池，
+    每個階段受 timeout_ms 限制；必需階段失敗時不再啟動新階段（fail-fast）。
+    通過的階段結果按 (module_id, module_version, 階段配置) 快取，模組未變更
+    時直接重用。
+
     參考：DevSecOps 管道最佳實踐 [3] [4] [5]
     """
 
-    def __init__(self, pipeline_id: str | None = None, name: str = "default"):
+    def __init__(self, pipeline_id: str | None = None, name: str = "default",
+                 max_workers: int | None = None,
+                 result_cache: dict[str, StageResult] | None = None,
+                 max_cache_entries: int = 10000):
         self.pipeline_id = pipeline_id or str(uuid.uuid4())
         self.name = name
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self.max_cache_entries = max_cache_entries
         self._stages: list[PipelineStage] = []
         self._evidence_collector = EvidenceCollector()
+        # 可由多條管道共享的結果快取
+        self._result_cache: dict[str, StageResult] = result_cache if result_cache is not None else OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
 
     def add_stage(self, stage: PipelineStage) -> None:
         """添加階段"""
@@ -309,17 +328,94 @@ class CIVerificationPipeline:
                 return stage
         return None
 
+    # ------------------------------------------------------------------
+    # Result cache
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _stage_cache_key(stage: PipelineStage, module_id: str, module_version: str) -> str:
+        """以模組 ID、版本與階段配置計算快取鍵"""
+        executor = stage.executor
+        executor_name = (
+            f"{getattr(executor, '__module__', '')}.{getattr(executor, '__qualname__', repr(executor))}"
+            if executor else None
+        )
+        config = {
+            'module_id': module_id,
+            'module_version': module_version,
+            'stage_id': stage.id,
+            'stage_type': stage.stage_type.value,
+            'executor': executor_name,
+            'depends_on': list(stage.depends_on),
+            'timeout_ms': stage.timeout_ms,
+            'environment': stage.environment,
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> StageResult | None:
+        with self._cache_lock:
+            result = self._result_cache.get(key)
+            if result is not None and isinstance(self._result_cache, OrderedDict):
+                self._result_cache.move_to_end(key)
+        if result is None:
+            return None
+        self.cache_hits += 1
+        now = datetime.now()
+        return replace(
+            result,
+            started_at=now,
+            completed_at=now,
+            duration_ms=0,
+            outputs={**result.outputs, 'cached': True},
+            errors=list(result.errors),
+            warnings=list(result.warnings),
+        )
+
+    def _cache_put(self, key: str, result: StageResult) -> None:
+        with self._cache_lock:
+            self._result_cache[key] = result
+            if isinstance(self._result_cache, OrderedDict):
+                while len(self._result_cache) > self.max_cache_entries:
+                    self._result_cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """清除階段結果快取"""
+        with self._cache_lock:
+            self._result_cache.clear()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _skipped(stage: PipelineStage, reason: str | None) -> StageResult:
+        now = datetime.now()
+        return StageResult(
+            stage_id=stage.id,
+            stage_type=stage.stage_type,
+            status=StageStatus.SKIPPED,
+            started_at=now,
+            completed_at=now,
+            errors=[reason] if reason else [],
+        )
+
     def run(self, data: Any, module_id: str, module_version: str,
-            context: dict[str, Any] | None = None) -> VerificationReport:
+            context: dict[str, Any] | None = None,
+            max_workers: int | None = None,
+            fail_fast: bool = True,
+            use_cache: bool = True) -> VerificationReport:
         """
         執行驗證管道
-        
+
         Args:
             data: 待驗證的數據
             module_id: 模組 ID
             module_version: 模組版本
             context: 額外的上下文信息
-        
+            max_workers: 並發執行的階段數上限（默認使用管道設定）
+            fail_fast: 必需階段失敗後不再啟動新階段
+            use_cache: 重用相同模組版本與階段配置的通過結果
+
         Returns:
             VerificationReport: 驗證報告
         """
@@ -329,65 +425,110 @@ class CIVerificationPipeline:
         context['module_version'] = module_version
 
         started_at = datetime.now()
-        stage_results: list[StageResult] = []
-        completed_stages: dict[str, StageResult] = {}
-
-        # 按順序執行階段
-        for stage in self._stages:
-            # 檢查依賴
-            dependencies_met = all(
-                dep in completed_stages and completed_stages[dep].status == StageStatus.PASSED
-                for dep in stage.depends_on
+        stages = list(self._stages)
+        known_ids = {stage.id for stage in stages}
+        workers = max(1, max_workers or self.max_workers)
+
+        results: dict[str, StageResult] = {}
+        pending: dict[str, PipelineStage] = {stage.id: stage for stage in stages}
+        running: dict[Future, tuple[PipelineStage, float, str | None]] = {}
+        halted = False
+
+        def finish(stage: PipelineStage, result: StageResult, cache_key: str | None) -> None:
+            nonlocal halted
+            results[stage.id] = result
+            self._evidence_collector.collect(
+                type=f"stage_{stage.stage_type.value}",
+                name=f"{stage.name} Result",
+                description=f"Result from {stage.name} stage",
+                data=result.to_dict(),
+                source=stage.id,
             )
+            if cache_key and result.status == StageStatus.PASSED and not result.outputs.get('cached'):
+                self._cache_put(cache_key, result)
+            if fail_fast and stage.required and result.status == StageStatus.FAILED:
+                halted = True
 
-            if not dependencies_met:
-                if stage.required:
-                    result = StageResult(
-                        stage_id=stage.id,
-                        stage_type=stage.stage_type,
-                        status=StageStatus.SKIPPED,
-                        started_at=datetime.now(),
-                        completed_at=datetime.now(),
-                        errors=['Dependencies not met'],
-                    )
-                else:
-                    result = StageResult(
-                        stage_id=stage.id,
-                        stage_type=stage.stage_type,
-                        status=StageStatus.SKIPPED,
-                        started_at=datetime.now(),
-                        completed_at=datetime.now(),
-                    )
-            else:
-                # 執行階段
-                result = stage.execute(data, context)
-
-                # 收集證據
-                self._evidence_collector.collect(
-                    type=f"stage_{stage.stage_type.value}",
-                    name=f"{stage.name} Result",
-                    description=f"Result from {stage.name} stage",
-                    data=result.to_dict(),
-                    source=stage.id,
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"pipeline-{self.name}")
+        try:
+            while pending or running:
+                # 調度所有就緒階段（依插入順序）
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for stage_id, stage in list(pending.items()):
+                        if halted:
+                            results[stage_id] = self._skipped(stage, 'Previous required stage failed')
+                            del pending[stage_id]
+                            continue
+
+                        blocked = any(
+                            dep not in known_ids
+                            or (dep in results and results[dep].status != StageStatus.PASSED)
+                            for dep in stage.depends_on
+                        )
+                        if blocked:
+                            results[stage_id] = self._skipped(
+                                stage, 'Dependencies not met' if stage.required else None
+                            )
+                            del pending[stage_id]
+                            progressed = True
+                            continue
+
+                        if not all(dep in results for dep in stage.depends_on):
+                            continue
+
+                        cache_key = self._stage_cache_key(stage, module_id, module_version) if use_cache else None
+                        cached = self._cache_get(cache_key) if cache_key else None
+                        if cached is not None:
+                            del pending[stage_id]
+                            finish(stage, cached, cache_key)
+                            progressed = True
+                            continue
+
+                        if len(running) >= workers:
+                            continue
+                        future = executor.submit(stage.execute, data, context)
+                        running[future] = (stage, time.monotonic() + stage.timeout_ms / 1000.0, cache_key)
+                        del pending[stage_id]
+
+                if not running:
+                    # 剩餘階段互相依賴（循環），無法執行
+                    for stage_id, stage in pending.items():
+                        results[stage_id] = self._skipped(stage, 'Dependencies not met')
+                    pending.clear()
+                    break
+
+                nearest_deadline = min(deadline for _, deadline, _ in running.values())
+                done, _ = wait(
+                    list(running),
+                    timeout=max(0.0, nearest_deadline - time.monotonic()),
+                    return_when=FIRST_COMPLETED,
                 )
-
-            stage_results.append(result)
-            completed_stages[stage.id] = result
-
-            # 如果必需階段失敗，停止執行
-            if stage.required and result.status == StageStatus.FAILED:
-                # 標記剩餘階段為跳過
-                for remaining_stage in self._stages[self._stages.index(stage) + 1:]:
-                    stage_results.append(StageResult(
-                        stage_id=remaining_stage.id,
-                        stage_type=remaining_stage.stage_type,
-                        status=StageStatus.SKIPPED,
-                        started_at=datetime.now(),
-                        completed_at=datetime.now(),
-                        errors=['Previous required stage failed'],
-                    ))
-                break
-
+                now = time.monotonic()
+                for future in list(running):
+                    stage, deadline, cache_key = running[future]
+                    if future in done:
+                        result = future.result()
+                    elif now >= deadline:
+                        future.cancel()
+                        result = StageResult(
+                            stage_id=stage.id,
+                            stage_type=stage.stage_type,
+                            status=StageStatus.FAILED,
+                            started_at=datetime.now(),
+                            completed_at=datetime.now(),
+                            errors=[f'Stage timed out after {stage.timeout_ms}ms'],
+                        )
+                    else:
+                        continue
+                    del running[future]
+                    finish(stage, result, cache_key)
+        finally:
+            # 超時的階段線程無法強制終止，不等待其結束
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        stage_results = [results[stage.id] for stage in stages]
         completed_at = datetime.now()
         total_duration_ms = int((completed_at - started_at).total_seconds() * 1000)
 
@@ -411,6 +552,27 @@ class CIVerificationPipeline:
             total_duration_ms=total_duration_ms,
         )
 
+    def run_many(self, modules: list[tuple[Any, str, str]],
+                 max_workers: int | None = None,
+                 **kwargs: Any) -> list[VerificationReport]:
+        """
+        批量驗證多個模組
+
+        Args:
+            modules: (data, module_id, module_version) 列表
+            max_workers: 同時驗證的模組數上限
+
+        Returns:
+            list[VerificationReport]: 與輸入順序一致的報告
+        """
+        workers = max(1, max_workers or self.max_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"pipeline-{self.name}-batch") as pool:
+            futures = [
+                pool.submit(self.run, data, module_id, module_version, None, **kwargs)
+                for data, module_id, module_version in modules
+            ]
+            return [future.result() for future in futures]
+
     @classmethod
     def create_default_pipeline(cls) -> 'CIVerificationPipeline':
         """創建默認驗證管道"""
@@ -496,7 +658,7 @@ class CIVerificationPipeline:
             stage_type=PipelineStageType.SECURITY,
             description="Scan for security vulnerabilities",
             executor=security_executor,
-            depends_on=["test"],
+            depends_on=["validate"],
         ))
 
         return pipeline
@@ -8,6 +8,8 @@ Reference: Schema validation best practices [8]
 
 import json
 import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
@@ -77,39 +79,49 @@ class ValidationResult:
         }
 
 
+def _version_key(version: str) -> tuple[tuple[int, Any], ...]:
+    """版本排序鍵（數字段按數值比較，1.10.0 > 1.9.0）"""
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in re.split(r'[.\-+]', version))
+
+
 class SchemaRegistry:
     """
     Schema 註冊表
-    
+
     管理和存儲所有 JSON Schema 定義。
     """
 
     def __init__(self):
         self._schemas: dict[str, dict[str, Any]] = {}
         self._schema_versions: dict[str, list[str]] = {}
+        self._latest: dict[str, str] = {}
 
     def register(self, schema_id: str, schema: dict[str, Any], version: str = "1.0.0") -> None:
         """註冊 Schema"""
         full_id = f"{schema_id}@{version}"
         self._schemas[full_id] = schema
 
-        if schema_id not in self._schema_versions:
-            self._schema_versions[schema_id] = []
-        self._schema_versions[schema_id].append(version)
+        versions = self._schema_versions.setdefault(schema_id, [])
+        if version not in versions:
+            versions.append(version)
 
-    def get(self, schema_id: str, version: str | None = None) -> dict[str, Any] | None:
-        """獲取 Schema"""
+        # 註冊時維護最新版本，查詢時無需排序
+        latest = self._latest.get(schema_id)
+        if latest is None or _version_key(version) >= _version_key(latest):
+            self._latest[schema_id] = version
+
+    def resolve_version(self, schema_id: str, version: str | None = None) -> str | None:
+        """解析版本（未指定時返回最新版本）"""
         if version:
-            full_id = f"{schema_id}@{version}"
-            return self._schemas.get(full_id)
+            return version if f"{schema_id}@{version}" in self._schemas else None
+        return self._latest.get(schema_id)
 
-        # 獲取最新版本
-        versions = self._schema_versions.get(schema_id, [])
-        if not versions:
+    def get(self, schema_id: str, version: str | None = None) -> dict[str, Any] | None:
+        """獲取 Schema"""
+        version = self.resolve_version(schema_id, version)
+        if version is None:
             return None
-
-        latest_version = sorted(versions)[-1]
-        return self._schemas.get(f"{schema_id}@{latest_version}")
+        return self._schemas.get(f"{schema_id}@{version}")
 
     def list_schemas(self) -> list[str]:
         """列出所有 Schema"""
@@ -120,298 +132,398 @@ class SchemaRegistry:
         return self._schema_versions.get(schema_id, [])
 
 
-class YAMLSchemaValidator:
-    """
-    YAML Schema 驗證器
-    
-    使用 JSON Schema 驗證 YAML 模組的結構和內容。
-    """
+class _StopValidation(Exception):
+    """快速模式下遇到第一個錯誤時中止驗證"""
 
-    # 內建類型映射
-    TYPE_MAP = {
-        'string': str,
-        'number': (int, float),
-        'integer': int,
-        'boolean': bool,
-        'array': list,
-        'object': dict,
-        'null': type(None),
-    }
 
-    # 格式驗證正則表達式
-    FORMAT_PATTERNS = {
-        'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-        'uri': r'^https?://[^\s/$.?#].[^\s]*$',
-        'date': r'^\d{4}-\d{2}-\d{2}$',
-        'date-time': r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',
-        'uuid': r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$',
-        'semver': r'^\d+\.\d+\.\d+(-[a-zA-Z0-9.]+)?(\+[a-zA-Z0-9.]+)?$',
-    }
+class _FailFastResult(ValidationResult):
+    """記錄第一個錯誤後立即中止的驗證結果"""
 
-    def __init__(self, registry: SchemaRegistry | None = None):
-        self.registry = registry or SchemaRegistry()
-        self._custom_validators: dict[str, callable] = {}
+    def add_error(self, error: ValidationError) -> None:
+        super().add_error(error)
+        raise _StopValidation()
 
-    def register_custom_validator(self, name: str, validator: callable) -> None:
-        """註冊自定義驗證器"""
-        self._custom_validators[name] = validator
 
-    def validate(self, data: Any, schema: dict[str, Any], path: str = "$") -> ValidationResult:
+# 編譯後的檢查函數：(data, path, result) -> None
+_Check = Callable[[Any, str, ValidationResult], None]
+
+
+def _noop(_data: Any, _path: str, _result: ValidationResult) -> None:
+    return None
+
+
+def _is_number(data: Any) -> bool:
+    return isinstance(data, (int, float)) and not isinstance(data, bool)
+
+
+def _resolve_pointer(document: Any, pointer: str) -> Any:
+    """解析 JSON Pointer（"#/definitions/name"）"""
+    node = document
+    for token in pointer.lstrip('#').split('/'):
+        if not token:
+            continue
+        token = token.replace('~1', '/').replace('~0', '~')
+        node = node[int(token)] if isinstance(node, list) else node[token]
+    return node
+
+
+class CompiledSchema:
+    """
+    已編譯的 Schema
+
+    Schema 在編譯時轉為檢查函數樹：類型解析為 isinstance 檢查，pattern/format
+    正則預先編譯，$ref 在編譯時解析，節點中不存在的關鍵字不會被訪問。
+    """
+
+    def __init__(self, schema: dict[str, Any], check: _Check):
+        self.schema = schema
+        self.schema_version = schema.get('$schema', 'unknown')
+        self._check = check
+
+    def validate(self, data: Any, path: str = "$", fail_fast: bool = False) -> ValidationResult:
         """
-        驗證數據是否符合 Schema
-        
+        驗證數據
+
         Args:
             data: 待驗證的數據
-            schema: JSON Schema
-            path: 當前路徑（用於錯誤報告）
-        
-        Returns:
-            ValidationResult: 驗證結果
+            path: 根路徑（用於錯誤報告）
+            fail_fast: 遇到第一個錯誤即停止
         """
-        result = ValidationResult(valid=True)
-        result.schema_version = schema.get('$schema', 'unknown')
+        result_class = _FailFastResult if fail_fast else ValidationResult
+        result = result_class(valid=True, schema_version=self.schema_version)
+        try:
+            self._check(data, path, result)
+        except _StopValidation:
+            pass
+        return result
 
-        self._validate_node(data, schema, path, result)
+    def is_valid(self, data: Any) -> bool:
+        """快速判斷是否通過（遇到第一個錯誤即停止）"""
+        return self.validate(data, fail_fast=True).valid
 
-        return result
 
-    def _validate_node(self, data: Any, schema: dict[str, Any], path: str, result: ValidationResult) -> None:
-        """驗證單個節點"""
+class _SchemaCompiler:
+    """將 Schema 編譯為檢查函數樹"""
+
+    def __init__(self, validator: 'YAMLSchemaValidator', root: dict[str, Any]):
+        self.validator = validator
+        self.root = root
+        # $ref 目標快取；遞迴引用通過 cell 延遲綁定
+        self._refs: dict[tuple[int, str], list[_Check]] = {}
+
+    def compile(self) -> CompiledSchema:
+        return CompiledSchema(self.root, self._compile_node(self.root, self.root))
+
+    def _compile_ref(self, ref: str, document: dict[str, Any]) -> _Check:
+        """解析 $ref：'#/definitions/x'、'schema_id'、'schema_id@version#/...'"""
+        target_id, _, pointer = ref.partition('#')
+        if target_id:
+            schema_id, _, version = target_id.partition('@')
+            document = self.validator.registry.get(schema_id, version or None)
+            if document is None:
+                raise ValueError(f"Unresolvable $ref '{ref}'")
+
+        key = (id(document), pointer)
+        cell = self._refs.get(key)
+        if cell is None:
+            cell = self._refs[key] = [_noop]
+            try:
+                target = _resolve_pointer(document, pointer)
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise ValueError(f"Unresolvable $ref '{ref}'") from None
+            cell[0] = self._compile_node(target, document)
+
+        def check_ref(data, path, result, _cell=cell):
+            _cell[0](data, path, result)
+        return check_ref
+
+    def _compile_node(self, schema: dict[str, Any], document: dict[str, Any]) -> _Check:
+        """編譯單個節點（檢查順序與錯誤信息保持不變）"""
+        if not isinstance(schema, dict):
+            return _noop
+
+        checks: list[_Check] = []
+
+        if '$ref' in schema:
+            checks.append(self._compile_ref(schema['$ref'], document))
 
-        # 檢查類型
         if 'type' in schema:
-            self._validate_type(data, schema['type'], path, result)
+            check = self._compile_type(schema['type'])
+            if check is not None:
+                checks.append(check)
 
-        # 檢查 enum
         if 'enum' in schema:
-            self._validate_enum(data, schema['enum'], path, result)
-
-        # 檢查 const
-        if 'const' in schema and data != schema['const']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.ENUM_VIOLATION,
-                message=f"Value must be exactly {schema['const']}",
-                expected=schema['const'],
-                actual=data,
-            ))
-
-        # 字符串驗證
-        if isinstance(data, str):
-            self._validate_string(data, schema, path, result)
-
-        # 數字驗證
-        if isinstance(data, (int, float)) and not isinstance(data, bool):
-            self._validate_number(data, schema, path, result)
-
-        # 數組驗證
-        if isinstance(data, list):
-            self._validate_array(data, schema, path, result)
-
-        # 對象驗證
-        if isinstance(data, dict):
-            self._validate_object(data, schema, path, result)
-
-        # 自定義驗證
-        if 'x-custom-validator' in schema:
-            validator_name = schema['x-custom-validator']
-            if validator_name in self._custom_validators:
-                try:
-                    self._custom_validators[validator_name](data, path, result)
-                except Exception as e:
-                    result.add_error(ValidationError(
-                        path=path,
-                        error_type=ValidationErrorType.CUSTOM_VALIDATION_FAILED,
-                        message=f"Custom validator '{validator_name}' failed: {str(e)}",
-                    ))
+            checks.append(self._compile_enum(schema['enum']))
+
+        if 'const' in schema:
+            const = schema['const']
 
-    def _validate_type(self, data: Any, expected_type: str, path: str, result: ValidationResult) -> None:
-        """驗證類型"""
-        if expected_type == 'any':
-            return
-
-        expected_python_type = self.TYPE_MAP.get(expected_type)
-        if expected_python_type is None:
-            return
-
-        # 特殊處理：boolean 不應該是 int
-        if expected_type == 'boolean' and isinstance(data, bool):
-            return
-        if expected_type == 'integer' and isinstance(data, bool):
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.TYPE_MISMATCH,
-                message=f"Expected {expected_type}, got boolean",
-                expected=expected_type,
-                actual=type(data).__name__,
-            ))
-            return
-
-        if not isinstance(data, expected_python_type):
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.TYPE_MISMATCH,
-                message=f"Expected {expected_type}, got {type(data).__name__}",
-                expected=expected_type,
-                actual=type(data).__name__,
-            ))
-
-    def _validate_enum(self, data: Any, enum_values: list[Any], path: str, result: ValidationResult) -> None:
-        """驗證 enum"""
-        if data not in enum_values:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.ENUM_VIOLATION,
-                message=f"Value must be one of {enum_values}",
-                expected=enum_values,
-                actual=data,
-            ))
-
-    def _validate_string(self, data: str, schema: dict[str, Any], path: str, result: ValidationResult) -> None:
-        """驗證字符串"""
-        # 最小長度
-        if 'minLength' in schema and len(data) < schema['minLength']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                message=f"String length {len(data)} is less than minimum {schema['minLength']}",
-                expected=f">= {schema['minLength']}",
-                actual=len(data),
-            ))
-
-        # 最大長度
-        if 'maxLength' in schema and len(data) > schema['maxLength']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                message=f"String length {len(data)} is greater than maximum {schema['maxLength']}",
-                expected=f"<= {schema['maxLength']}",
-                actual=len(data),
-            ))
-
-        # 模式匹配
-        if 'pattern' in schema and not re.match(schema['pattern'], data):
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.PATTERN_MISMATCH,
-                message=f"String does not match pattern {schema['pattern']}",
-                expected=schema['pattern'],
-                actual=data,
-            ))
-
-        # 格式驗證
-        if 'format' in schema:
-            format_name = schema['format']
-            if format_name in self.FORMAT_PATTERNS:
-                if not re.match(self.FORMAT_PATTERNS[format_name], data):
+            def check_const(data, path, result):
+                if data != const:
                     result.add_error(ValidationError(
                         path=path,
-                        error_type=ValidationErrorType.FORMAT_ERROR,
-                        message=f"String does not match format '{format_name}'",
-                        expected=format_name,
+                        error_type=ValidationErrorType.ENUM_VIOLATION,
+                        message=f"Value must be exactly {const}",
+                        expected=const,
                         actual=data,
                     ))
+            checks.append(check_const)
+
+        for compile_keywords in (self._compile_string, self._compile_number,
+                                 self._compile_array, self._compile_object):
+            check = compile_keywords(schema, document)
+            if check is not None:
+                checks.append(check)
+
+        if 'x-custom-validator' in schema:
+            checks.append(self._compile_custom(schema['x-custom-validator']))
 
-    def _validate_number(self, data: float, schema: dict[str, Any], path: str, result: ValidationResult) -> None:
-        """驗證數字"""
-        # 最小值
-        if 'minimum' in schema:
-            if 'exclusiveMinimum' in schema and schema['exclusiveMinimum']:
-                if data <= schema['minimum']:
+        if not checks:
+            return _noop
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_node(data, path, result, _checks=tuple(checks)):
+            for check in _checks:
+                check(data, path, result)
+        return check_node
+
+    def _compile_type(self, expected_type: Any) -> _Check | None:
+        type_names = expected_type if isinstance(expected_type, list) else [expected_type]
+        if 'any' in type_names:
+            return None
+        known = [name for name in type_names if name in YAMLSchemaValidator.TYPE_MAP]
+        if not known:
+            return None
+
+        python_types: tuple[type, ...] = ()
+        for name in known:
+            mapped = YAMLSchemaValidator.TYPE_MAP[name]
+            python_types += mapped if isinstance(mapped, tuple) else (mapped,)
+        allow_bool = 'boolean' in known or 'number' in known
+        label = known[0] if len(known) == 1 else '|'.join(known)
+
+        def check_type(data, path, result):
+            # 特殊處理：boolean 不應該是 int
+            if isinstance(data, bool):
+                if allow_bool:
+                    return
+                if 'integer' in known:
                     result.add_error(ValidationError(
                         path=path,
-                        error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                        message=f"Value {data} must be greater than {schema['minimum']}",
-                        expected=f"> {schema['minimum']}",
-                        actual=data,
+                        error_type=ValidationErrorType.TYPE_MISMATCH,
+                        message=f"Expected {label}, got boolean",
+                        expected=label,
+                        actual=type(data).__name__,
                     ))
-            elif data < schema['minimum']:
+                    return
+            if not isinstance(data, python_types):
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.TYPE_MISMATCH,
+                    message=f"Expected {label}, got {type(data).__name__}",
+                    expected=label,
+                    actual=type(data).__name__,
+                ))
+        return check_type
+
+    def _compile_enum(self, enum_values: list[Any]) -> _Check:
+        try:
+            allowed = frozenset(enum_values)
+        except TypeError:
+            allowed = None
+
+        def check_enum(data, path, result):
+            try:
+                found = data in allowed if allowed is not None else data in enum_values
+            except TypeError:
+                found = data in enum_values
+            if not found:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.ENUM_VIOLATION,
+                    message=f"Value must be one of {enum_values}",
+                    expected=enum_values,
+                    actual=data,
+                ))
+        return check_enum
+
+    def _compile_string(self, schema: dict[str, Any], _document: dict[str, Any]) -> _Check | None:
+        min_length = schema.get('minLength')
+        max_length = schema.get('maxLength')
+        pattern = schema.get('pattern')
+        format_name = schema.get('format')
+        format_regex = YAMLSchemaValidator._FORMAT_REGEXES.get(format_name)
+        if min_length is None and max_length is None and pattern is None and format_regex is None:
+            return None
+        regex = re.compile(pattern) if pattern is not None else None
+
+        def check_string(data, path, result):
+            if not isinstance(data, str):
+                return
+            # 最小長度
+            if min_length is not None and len(data) < min_length:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                    message=f"String length {len(data)} is less than minimum {min_length}",
+                    expected=f">= {min_length}",
+                    actual=len(data),
+                ))
+            # 最大長度
+            if max_length is not None and len(data) > max_length:
                 result.add_error(ValidationError(
                     path=path,
                     error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                    message=f"Value {data} is less than minimum {schema['minimum']}",
-                    expected=f">= {schema['minimum']}",
+                    message=f"String length {len(data)} is greater than maximum {max_length}",
+                    expected=f"<= {max_length}",
+                    actual=len(data),
+                ))
+            # 模式匹配
+            if regex is not None and not regex.match(data):
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.PATTERN_MISMATCH,
+                    message=f"String does not match pattern {pattern}",
+                    expected=pattern,
                     actual=data,
                 ))
+            # 格式驗證
+            if format_regex is not None and not format_regex.match(data):
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.FORMAT_ERROR,
+                    message=f"String does not match format '{format_name}'",
+                    expected=format_name,
+                    actual=data,
+                ))
+        return check_string
+
+    def _compile_number(self, schema: dict[str, Any], _document: dict[str, Any]) -> _Check | None:
+        # (邊界, 是否排他, 是否為下界)
+        bounds: list[tuple[Any, bool, bool]] = []
+        for keyword, exclusive_keyword, lower in (('minimum', 'exclusiveMinimum', True),
+                                                  ('maximum', 'exclusiveMaximum', False)):
+            exclusive = schema.get(exclusive_keyword)
+            if keyword in schema:
+                bounds.append((schema[keyword], exclusive is True, lower))
+            if _is_number(exclusive):
+                bounds.append((exclusive, True, lower))
+        multiple_of = schema.get('multipleOf')
+        if not bounds and multiple_of is None:
+            return None
 
-        # 最大值
-        if 'maximum' in schema:
-            if 'exclusiveMaximum' in schema and schema['exclusiveMaximum']:
-                if data >= schema['maximum']:
-                    result.add_error(ValidationError(
-                        path=path,
-                        error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                        message=f"Value {data} must be less than {schema['maximum']}",
-                        expected=f"< {schema['maximum']}",
-                        actual=data,
-                    ))
-            elif data > schema['maximum']:
+        def check_number(data, path, result):
+            if not _is_number(data):
+                return
+            for bound, exclusive, lower in bounds:
+                if lower:
+                    if exclusive and data <= bound:
+                        message, expected = f"Value {data} must be greater than {bound}", f"> {bound}"
+                    elif not exclusive and data < bound:
+                        message, expected = f"Value {data} is less than minimum {bound}", f">= {bound}"
+                    else:
+                        continue
+                else:
+                    if exclusive and data >= bound:
+                        message, expected = f"Value {data} must be less than {bound}", f"< {bound}"
+                    elif not exclusive and data > bound:
+                        message, expected = f"Value {data} is greater than maximum {bound}", f"<= {bound}"
+                    else:
+                        continue
                 result.add_error(ValidationError(
                     path=path,
                     error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                    message=f"Value {data} is greater than maximum {schema['maximum']}",
-                    expected=f"<= {schema['maximum']}",
+                    message=message,
+                    expected=expected,
                     actual=data,
                 ))
+            # 倍數
+            if multiple_of is not None and data % multiple_of != 0:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                    message=f"Value {data} is not a multiple of {multiple_of}",
+                    expected=f"multiple of {multiple_of}",
+                    actual=data,
+                ))
+        return check_number
+
+    def _compile_array(self, schema: dict[str, Any], document: dict[str, Any]) -> _Check | None:
+        min_items = schema.get('minItems')
+        max_items = schema.get('maxItems')
+        unique_items = schema.get('uniqueItems', False)
+        items = schema.get('items')
+        item_check = self._compile_node(items, document) if isinstance(items, dict) else None
+        if item_check is _noop:
+            item_check = None
+        if min_items is None and max_items is None and not unique_items and item_check is None:
+            return None
 
-        # 倍數
-        if 'multipleOf' in schema and data % schema['multipleOf'] != 0:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                message=f"Value {data} is not a multiple of {schema['multipleOf']}",
-                expected=f"multiple of {schema['multipleOf']}",
-                actual=data,
-            ))
-
-    def _validate_array(self, data: list, schema: dict[str, Any], path: str, result: ValidationResult) -> None:
-        """驗證數組"""
-        # 最小項目數
-        if 'minItems' in schema and len(data) < schema['minItems']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.ARRAY_LENGTH_ERROR,
-                message=f"Array length {len(data)} is less than minimum {schema['minItems']}",
-                expected=f">= {schema['minItems']} items",
-                actual=len(data),
-            ))
-
-        # 最大項目數
-        if 'maxItems' in schema and len(data) > schema['maxItems']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.ARRAY_LENGTH_ERROR,
-                message=f"Array length {len(data)} is greater than maximum {schema['maxItems']}",
-                expected=f"<= {schema['maxItems']} items",
-                actual=len(data),
-            ))
-
-        # 唯一性
-        if schema.get('uniqueItems', False):
-            seen = []
-            for item in data:
-                item_json = json.dumps(item, sort_keys=True) if isinstance(item, (dict, list)) else item
-                if item_json in seen:
-                    result.add_error(ValidationError(
-                        path=path,
-                        error_type=ValidationErrorType.CUSTOM_VALIDATION_FAILED,
-                        message="Array items must be unique",
-                        actual=data,
-                    ))
-                    break
-                seen.append(item_json)
-
-        # 項目驗證
-        if 'items' in schema:
-            for i, item in enumerate(data):
-                item_path = f"{path}[{i}]"
-                self._validate_node(item, schema['items'], item_path, result)
-
-    def _validate_object(self, data: dict, schema: dict[str, Any], path: str, result: ValidationResult) -> None:
-        """驗證對象"""
-        # 必需屬性
-        if 'required' in schema:
-            for required_prop in schema['required']:
+        def check_array(data, path, result):
+            if not isinstance(data, list):
+                return
+            # 最小項目數
+            if min_items is not None and len(data) < min_items:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.ARRAY_LENGTH_ERROR,
+                    message=f"Array length {len(data)} is less than minimum {min_items}",
+                    expected=f">= {min_items} items",
+                    actual=len(data),
+                ))
+            # 最大項目數
+            if max_items is not None and len(data) > max_items:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.ARRAY_LENGTH_ERROR,
+                    message=f"Array length {len(data)} is greater than maximum {max_items}",
+                    expected=f"<= {max_items} items",
+                    actual=len(data),
+                ))
+            # 唯一性
+            if unique_items:
+                seen = set()
+                for item in data:
+                    marker = (json.dumps(item, sort_keys=True, default=str) if isinstance(item, (dict, list))
+                              else (type(item).__name__, repr(item)))
+                    if marker in seen:
+                        result.add_error(ValidationError(
+                            path=path,
+                            error_type=ValidationErrorType.CUSTOM_VALIDATION_FAILED,
+                            message="Array items must be unique",
+                            actual=data,
+                        ))
+                        break
+                    seen.add(marker)
+            # 項目驗證
+            if item_check is not None:
+                for i, item in enumerate(data):
+                    item_check(item, f"{path}[{i}]", result)
+        return check_array
+
+    def _compile_object(self, schema: dict[str, Any], document: dict[str, Any]) -> _Check | None:
+        required = tuple(schema.get('required', ()))
+        properties = schema.get('properties', {})
+        property_checks = {
+            name: check for name, check in
+            ((name, self._compile_node(sub, document)) for name, sub in properties.items())
+            if check is not _noop
+        }
+        forbid_additional = schema.get('additionalProperties') is False
+        property_patterns = tuple(re.compile(p) for p in schema.get('patternProperties', {}))
+        allowed = frozenset(properties) | frozenset(schema.get('patternProperties', {}))
+        min_properties = schema.get('minProperties')
+        max_properties = schema.get('maxProperties')
+        if not (required or property_checks or forbid_additional
+                or min_properties is not None or max_properties is not None):
+            return None
+
+        def check_object(data, path, result):
+            if not isinstance(data, dict):
+                return
+            # 必需屬性
+            for required_prop in required:
                 if required_prop not in data:
                     result.add_error(ValidationError(
                         path=f"{path}.{required_prop}",
@@ -419,43 +531,179 @@ class YAMLSchemaValidator:
                         message=f"Required property '{required_prop}' is missing",
                         expected=required_prop,
                     ))
-
-        # 屬性驗證
-        if 'properties' in schema:
-            for prop_name, prop_schema in schema['properties'].items():
+            # 屬性驗證
+            for prop_name, prop_check in property_checks.items():
                 if prop_name in data:
-                    prop_path = f"{path}.{prop_name}"
-                    self._validate_node(data[prop_name], prop_schema, prop_path, result)
-
-        # 額外屬性
-        if schema.get('additionalProperties') is False:
-            allowed_props = set(schema.get('properties', {}).keys())
-            allowed_props.update(schema.get('patternProperties', {}).keys())
-
-            for prop_name in data:
-                if prop_name not in allowed_props:
+                    prop_check(data[prop_name], f"{path}.{prop_name}", result)
+            # 額外屬性
+            if forbid_additional:
+                for prop_name in data:
+                    if prop_name in allowed:
+                        continue
+                    if isinstance(prop_name, str) and any(p.search(prop_name) for p in property_patterns):
+                        continue
                     result.add_error(ValidationError(
                         path=f"{path}.{prop_name}",
                         error_type=ValidationErrorType.ADDITIONAL_PROPERTY,
                         message=f"Additional property '{prop_name}' is not allowed",
                         actual=prop_name,
                     ))
+            # 屬性數量
+            if min_properties is not None and len(data) < min_properties:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                    message=f"Object has {len(data)} properties, minimum is {min_properties}",
+                    expected=f">= {min_properties} properties",
+                    actual=len(data),
+                ))
+            if max_properties is not None and len(data) > max_properties:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                    message=f"Object has {len(data)} properties, maximum is {max_properties}",
+                    expected=f"<= {max_properties} properties",
+                    actual=len(data),
+                ))
+        return check_object
+
+    def _compile_custom(self, validator_name: str) -> _Check:
+        # 自定義驗證器在執行時查找，允許編譯後再註冊
+        custom_validators = self.validator._custom_validators
+
+        def check_custom(data, path, result):
+            custom = custom_validators.get(validator_name)
+            if custom is None:
+                return
+            try:
+                custom(data, path, result)
+            except _StopValidation:
+                raise
+            except Exception as e:
+                result.add_error(ValidationError(
+                    path=path,
+                    error_type=ValidationErrorType.CUSTOM_VALIDATION_FAILED,
+                    message=f"Custom validator '{validator_name}' failed: {str(e)}",
+                ))
+        return check_custom
+
+
+class YAMLSchemaValidator:
+    """
+    YAML Schema 驗證器
+
+    使用 JSON Schema 驗證 YAML 模組的結構和內容。Schema 首次使用時編譯為
+    CompiledSchema 並快取：註冊表中的 Schema 按 (schema_id, version) 快取，
+    直接傳入的 Schema 按內容快取。
+    """
 
-        # 屬性數量
-        if 'minProperties' in schema and len(data) < schema['minProperties']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                message=f"Object has {len(data)} properties, minimum is {schema['minProperties']}",
-                expected=f">= {schema['minProperties']} properties",
-                actual=len(data),
-            ))
-
-        if 'maxProperties' in schema and len(data) > schema['maxProperties']:
-            result.add_error(ValidationError(
-                path=path,
-                error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
-                message=f"Object has {len(data)} properties, maximum is {schema['maxProperties']}",
-                expected=f"<= {schema['maxProperties']} properties",
-                actual=len(data),
-            ))
+    # 內建類型映射
+    TYPE_MAP = {
+        'string': str,
+        'number': (int, float),
+        'integer': int,
+        'boolean': bool,
+        'array': list,
+        'object': dict,
+        'null': type(None),
+    }
+
+    # 格式驗證正則表達式
+    FORMAT_PATTERNS = {
+        'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
+        'uri': r'^https?://[^\s/$.?#].[^\s]*$',
+        'date': r'^\d{4}-\d{2}-\d{2}$',
+        'date-time': r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',
+        'uuid': r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$',
+        'semver': r'^\d+\.\d+\.\d+(-[a-zA-Z0-9.]+)?(\+[a-zA-Z0-9.]+)?$',
+    }
+    _FORMAT_REGEXES = {name: re.compile(pattern) for name, pattern in FORMAT_PATTERNS.items()}
+
+    def __init__(self, registry: SchemaRegistry | None = None, max_cached_schemas: int = 256):
+        self.registry = registry or SchemaRegistry()
+        self.max_cached_schemas = max_cached_schemas
+        self._custom_validators: dict[str, callable] = {}
+        self._registered: dict[str, CompiledSchema] = {}
+        self._compiled: 'OrderedDict[str, CompiledSchema]' = OrderedDict()
+
+    def register_custom_validator(self, name: str, validator: callable) -> None:
+        """註冊自定義驗證器"""
+        self._custom_validators[name] = validator
+
+    def compile(self, schema: dict[str, Any]) -> CompiledSchema:
+        """
+        編譯 Schema（相同內容的 Schema 只編譯一次）
+
+        Raises:
+            ValueError: $ref 無法解析
+            re.error: pattern 不是有效的正則表達式
+        """
+        key = json.dumps(schema, sort_keys=True, default=str)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            self._compiled.move_to_end(key)
+            return compiled
+
+        compiled = _SchemaCompiler(self, schema).compile()
+        self._compiled[key] = compiled
+        while len(self._compiled) > self.max_cached_schemas:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def get_compiled(self, schema_id: str, version: str | None = None) -> CompiledSchema | None:
+        """獲取註冊表中 Schema 的編譯結果（按 schema_id@version 快取）"""
+        version = self.registry.resolve_version(schema_id, version)
+        if version is None:
+            return None
+        full_id = f"{schema_id}@{version}"
+        schema = self.registry.get(schema_id, version)
+        compiled = self._registered.get(full_id)
+        # 同一版本重新註冊時重新編譯
+        if compiled is None or compiled.schema is not schema:
+            compiled = self._registered[full_id] = _SchemaCompiler(self, schema).compile()
+        return compiled
+
+    def _resolve(self, schema: dict[str, Any] | CompiledSchema | str) -> CompiledSchema:
+        if isinstance(schema, CompiledSchema):
+            return schema
+        if isinstance(schema, str):
+            schema_id, _, version = schema.partition('@')
+            compiled = self.get_compiled(schema_id, version or None)
+            if compiled is None:
+                raise KeyError(f"Schema '{schema}' is not registered")
+            return compiled
+        return self.compile(schema)
+
+    def validate(self, data: Any, schema: dict[str, Any] | CompiledSchema | str,
+                 path: str = "$", fail_fast: bool = False) -> ValidationResult:
+        """
+        驗證數據是否符合 Schema
+
+        Args:
+            data: 待驗證的數據
+            schema: JSON Schema、已編譯的 Schema 或註冊表 ID（"id" 或 "id@version"）
+            path: 當前路徑（用於錯誤報告）
+            fail_fast: 遇到第一個錯誤即停止
+
+        Returns:
+            ValidationResult: 驗證結果
+        """
+        return self._resolve(schema).validate(data, path, fail_fast)
+
+    def is_valid(self, data: Any, schema: dict[str, Any] | CompiledSchema | str) -> bool:
+        """快速判斷是否通過（遇到第一個錯誤即停止）"""
+        return self._resolve(schema).is_valid(data)
+
+    def validate_many(self, documents: Iterable[Any],
+                      schema: dict[str, Any] | CompiledSchema | str,
+                      fail_fast: bool = False) -> list[ValidationResult]:
+        """
+        批量驗證（例如 CI 中的大量模組清單）
+
+        Schema 只解析和編譯一次。
+
+        Returns:
+            list[ValidationResult]: 與輸入順序一致的驗證結果
+        """
+        compiled = self._resolve(schema)
+        return [compiled.validate(document, "$", fail_fast) for document in documents]
@@ -22,6 +22,7 @@ from .circuit_breaker import (
     CircuitBreakerState,
     CircuitBreakerConfig,
     CircuitBreakerRegistry,
+    SlidingWindowType,
 )
 
 from .escalation_ladder import (
@@ -68,6 +69,7 @@ __all__ = [
     'CircuitBreakerState',
     'CircuitBreakerConfig',
     'CircuitBreakerRegistry',
+    'SlidingWindowType',
     # Escalation Ladder
     'EscalationLadder',
     'EscalationLevel',
@@ -6,12 +6,15 @@ When anomalies are detected, automatically cut off operations to prevent disaste
 Reference: Circuit breakers trigger automatically when AI executes unauthorized operations [2]
 """
 
+from array import array
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Generic
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Generic
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
+import threading
 import time
+import zlib
 
 
 class CircuitBreakerState(Enum):
@@ -21,17 +24,28 @@ class CircuitBreakerState(Enum):
     HALF_OPEN = "half_open"  # Testing - allowing limited requests
 
 
+class SlidingWindowType(Enum):
+    """How the failure-rate window is measured"""
+    COUNT_BASED = "count_based"  # Last N calls
+    TIME_BASED = "time_based"    # Calls in the last monitoring_period seconds
+
+
 @dataclass
 class CircuitBreakerConfig:
     """Configuration for circuit breaker"""
     name: str = "default"
-    failure_threshold: int = 5          # Number of failures before opening
+    failure_threshold: int = 5          # Minimum calls in window before the rate is evaluated
     success_threshold: int = 2          # Successes needed to close from half-open
     timeout: float = 60.0               # Seconds before trying half-open
     monitoring_period: float = 10.0     # Window for counting failures
     slow_call_threshold: float = 5.0    # Seconds to consider a call "slow"
     slow_call_rate_threshold: float = 0.5  # Rate of slow calls to trigger
     excluded_exceptions: List[type] = field(default_factory=list)
+    failure_rate_threshold: float = 0.5    # Rate of failed calls to trigger
+    sliding_window_type: SlidingWindowType = SlidingWindowType.TIME_BASED
+    sliding_window_size: int = 100      # Calls kept by a count-based window
+    window_buckets: int = 10            # Buckets per monitoring_period (time-based)
+    max_half_open_calls: int = 0        # Concurrent probes in half-open (0 = success_threshold)
 
 
 @dataclass
@@ -48,6 +62,102 @@ class CircuitBreakerMetrics:
     last_state_change: Optional[datetime] = None
 
 
+_OUTCOME_FAILED = 1
+_OUTCOME_SLOW = 2
+
+
+class CountBasedWindow:
+    """
+    Sliding window over the last N call outcomes
+
+    Outcomes are stored as bit flags in a fixed-size ring; running totals
+    make recording and rate queries O(1).
+    """
+
+    def __init__(self, size: int):
+        self._size = max(1, size)
+        self._outcomes = array('B', bytes(self._size))
+        self._cursor = 0
+        self._calls = 0
+        self._failures = 0
+        self._slow = 0
+
+    def record(self, failed: bool, slow: bool, now: float) -> None:
+        outcome = (_OUTCOME_FAILED if failed else 0) | (_OUTCOME_SLOW if slow else 0)
+        if self._calls == self._size:
+            evicted = self._outcomes[self._cursor]
+            self._failures -= evicted & _OUTCOME_FAILED
+            self._slow -= (evicted & _OUTCOME_SLOW) >> 1
+        else:
+            self._calls += 1
+        self._outcomes[self._cursor] = outcome
+        self._failures += failed
+        self._slow += slow
+        self._cursor = (self._cursor + 1) % self._size
+
+    def totals(self, now: float) -> Tuple[int, int, int]:
+        """Return (calls, failures, slow_calls) currently in the window"""
+        return self._calls, self._failures, self._slow
+
+    def reset(self) -> None:
+        self.__init__(self._size)
+
+
+class TimeBasedWindow:
+    """
+    Sliding window over the last ``period`` seconds
+
+    The period is split into fixed-size bucket arrays. Advancing the window
+    clears only the buckets that expired since the last call and running
+    totals are kept, so recording and rate queries are amortized O(1).
+    """
+
+    def __init__(self, period: float, buckets: int):
+        self._buckets = max(1, buckets)
+        self._period = period
+        self._bucket_seconds = max(period / self._buckets, 1e-3)
+        self._head_epoch = -1
+        self._calls = array('L', [0] * self._buckets)
+        self._failures = array('L', [0] * self._buckets)
+        self._slow = array('L', [0] * self._buckets)
+        self._total_calls = 0
+        self._total_failures = 0
+        self._total_slow = 0
+
+    def _advance(self, now: float) -> int:
+        """Expire buckets older than the window and return the current slot"""
+        epoch = int(now / self._bucket_seconds)
+        if epoch > self._head_epoch:
+            steps = min(epoch - self._head_epoch, self._buckets)
+            for expired in range(epoch - steps + 1, epoch + 1):
+                index = expired % self._buckets
+                self._total_calls -= self._calls[index]
+                self._total_failures -= self._failures[index]
+                self._total_slow -= self._slow[index]
+                self._calls[index] = 0
+                self._failures[index] = 0
+                self._slow[index] = 0
+            self._head_epoch = epoch
+        return self._head_epoch % self._buckets
+
+    def record(self, failed: bool, slow: bool, now: float) -> None:
+        index = self._advance(now)
+        self._calls[index] += 1
+        self._failures[index] += failed
+        self._slow[index] += slow
+        self._total_calls += 1
+        self._total_failures += failed
+        self._total_slow += slow
+
+    def totals(self, now: float) -> Tuple[int, int, int]:
+        """Return (calls, failures, slow_calls) currently in the window"""
+        self._advance(now)
+        return self._total_calls, self._total_failures, self._total_slow
+
+    def reset(self) -> None:
+        self.__init__(self._period, self._buckets)
+
+
 T = TypeVar('T')
 
 
@@ -63,21 +173,38 @@ class CircuitBreaker(Generic[T]):
     - OPEN: Tripped, all requests are blocked
     - HALF_OPEN: Testing recovery, limited requests allowed
     
+    The breaker trips when, over a sliding window of at least
+    ``failure_threshold`` calls, the failure rate or slow-call rate reaches
+    its threshold. The lock only guards short bookkeeping sections and is
+    never held while the protected operation runs.
+    
     Example:
         breaker = CircuitBreaker(CircuitBreakerConfig(name="database"))
         result = await breaker.execute(lambda: db.query("SELECT * FROM users"))
     """
     
-    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+    def __init__(
+        self,
+        config: Optional[CircuitBreakerConfig] = None,
+        lock: Optional[threading.Lock] = None
+    ):
         self.config = config or CircuitBreakerConfig()
         self._state = CircuitBreakerState.CLOSED
-        self._failure_count = 0
         self._success_count = 0
+        self._half_open_in_flight = 0
         self._last_failure_time: Optional[float] = None
-        self._last_state_change_time = time.time()
+        self._last_state_change_time = time.monotonic()
         self._metrics = CircuitBreakerMetrics()
         self._listeners: List[Callable[[CircuitBreakerState, CircuitBreakerState], None]] = []
-        self._lock = asyncio.Lock()
+        self._window = self._create_window()
+        # May be a stripe lock shared with other breakers of a registry
+        self._lock = lock or threading.Lock()
+    
+    def _create_window(self):
+        """Create the sliding window configured for this breaker"""
+        if self.config.sliding_window_type == SlidingWindowType.COUNT_BASED:
+            return CountBasedWindow(self.config.sliding_window_size)
+        return TimeBasedWindow(self.config.monitoring_period, self.config.window_buckets)
     
     @property
     def state(self) -> CircuitBreakerState:
@@ -104,6 +231,10 @@ class CircuitBreaker(Generic[T]):
         """Check if circuit is half-open (testing)"""
         return self._state == CircuitBreakerState.HALF_OPEN
     
+    @property
+    def _max_half_open_calls(self) -> int:
+        return self.config.max_half_open_calls or max(1, self.config.success_threshold)
+    
     def add_state_change_listener(
         self, 
         listener: Callable[[CircuitBreakerState, CircuitBreakerState], None]
@@ -123,63 +254,144 @@ class CircuitBreaker(Generic[T]):
             except Exception:
                 pass  # Don't let listener errors affect circuit breaker
     
-    def _transition_to(self, new_state: CircuitBreakerState) -> None:
-        """Transition to a new state"""
-        if self._state != new_state:
-            old_state = self._state
-            self._state = new_state
-            self._last_state_change_time = time.time()
-            self._metrics.state_changes += 1
-            self._metrics.last_state_change = datetime.now()
-            
-            # Reset counters on state change
-            if new_state == CircuitBreakerState.HALF_OPEN:
-                self._success_count = 0
-            elif new_state == CircuitBreakerState.CLOSED:
-                self._failure_count = 0
-            
-            self._notify_state_change(old_state, new_state)
+    def _transition_to(self, new_state: CircuitBreakerState) -> Optional[CircuitBreakerState]:
+        """
+        Transition to a new state (caller holds the lock)
+        
+        Returns:
+            The previous state if a transition happened, else None
+        """
+        if self._state == new_state:
+            return None
+        
+        old_state = self._state
+        self._state = new_state
+        self._last_state_change_time = time.monotonic()
+        self._metrics.state_changes += 1
+        self._metrics.last_state_change = datetime.now()
+        
+        # Reset counters on state change
+        self._success_count = 0
+        self._half_open_in_flight = 0
+        if new_state == CircuitBreakerState.CLOSED:
+            self._window.reset()
+        
+        return old_state
     
     def _should_attempt_reset(self) -> bool:
         """Check if we should try to reset from OPEN to HALF_OPEN"""
         if self._state != CircuitBreakerState.OPEN:
             return False
         
-        time_since_open = time.time() - self._last_state_change_time
+        time_since_open = time.monotonic() - self._last_state_change_time
         return time_since_open >= self.config.timeout
     
-    def _record_success(self) -> None:
+    def _window_exceeded(self, now: float) -> bool:
+        """Check failure and slow-call rates over the sliding window"""
+        calls, failures, slow = self._window.totals(now)
+        if calls < max(1, self.config.failure_threshold):
+            return False
+        return (
+            failures / calls >= self.config.failure_rate_threshold
+            or slow / calls >= self.config.slow_call_rate_threshold
+        )
+    
+    def try_acquire(self) -> bool:
+        """
+        Check whether a call may proceed, reserving a probe slot in half-open
+        
+        Callers that get True must report the outcome with record_success()
+        or record_failure(), or give the slot back with release().
+        """
+        transition = None
+        with self._lock:
+            self._metrics.total_calls += 1
+            
+            if self._should_attempt_reset():
+                transition = self._transition_to(CircuitBreakerState.HALF_OPEN)
+            
+            if self._state == CircuitBreakerState.CLOSED:
+                permitted = True
+            elif (
+                self._state == CircuitBreakerState.HALF_OPEN
+                and self._half_open_in_flight < self._max_half_open_calls
+            ):
+                self._half_open_in_flight += 1
+                permitted = True
+            else:
+                self._metrics.rejected_calls += 1
+                permitted = False
+        
+        if transition is not None:
+            self._notify_state_change(transition, CircuitBreakerState.HALF_OPEN)
+        return permitted
+    
+    def release(self) -> None:
+        """
+        Give back a half-open probe slot without recording an outcome
+        
+        Used when the protected operation ends without a verdict, e.g. it was
+        cancelled, so the slot is not held forever.
+        """
+        with self._lock:
+            if self._state == CircuitBreakerState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+    
+    def record_success(self, duration: float = 0.0) -> None:
         """Record a successful call"""
-        self._metrics.successful_calls += 1
-        self._metrics.last_success_time = datetime.now()
+        slow = duration >= self.config.slow_call_threshold
+        transition = None
+        with self._lock:
+            self._metrics.successful_calls += 1
+            self._metrics.last_success_time = datetime.now()
+            if slow:
+                self._metrics.slow_calls += 1
+            
+            if self._state == CircuitBreakerState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._success_count += 1
+                if self._success_count >= self.config.success_threshold:
+                    transition = (self._transition_to(CircuitBreakerState.CLOSED),
+                                  CircuitBreakerState.CLOSED)
+            elif self._state == CircuitBreakerState.CLOSED:
+                now = time.monotonic()
+                self._window.record(False, slow, now)
+                if slow and self._window_exceeded(now):
+                    transition = (self._transition_to(CircuitBreakerState.OPEN),
+                                  CircuitBreakerState.OPEN)
         
-        if self._state == CircuitBreakerState.HALF_OPEN:
-            self._success_count += 1
-            if self._success_count >= self.config.success_threshold:
-                self._transition_to(CircuitBreakerState.CLOSED)
+        if transition and transition[0] is not None:
+            self._notify_state_change(*transition)
     
-    def _record_failure(self, exception: Exception) -> None:
+    def record_failure(self, exception: Optional[Exception] = None, duration: float = 0.0) -> None:
         """Record a failed call"""
         # Check if exception is excluded
-        if any(isinstance(exception, exc) for exc in self.config.excluded_exceptions):
+        if exception is not None and any(
+            isinstance(exception, exc) for exc in self.config.excluded_exceptions
+        ):
+            self.release()
             return
         
-        self._metrics.failed_calls += 1
-        self._metrics.last_failure_time = datetime.now()
-        self._last_failure_time = time.time()
+        slow = duration >= self.config.slow_call_threshold
+        transition = None
+        with self._lock:
+            self._metrics.failed_calls += 1
+            self._metrics.last_failure_time = datetime.now()
+            if slow:
+                self._metrics.slow_calls += 1
+            self._last_failure_time = time.monotonic()
+            
+            if self._state == CircuitBreakerState.HALF_OPEN:
+                # Any failure in half-open goes back to open
+                transition = self._transition_to(CircuitBreakerState.OPEN)
+            elif self._state == CircuitBreakerState.CLOSED:
+                now = self._last_failure_time
+                self._window.record(True, slow, now)
+                if self._window_exceeded(now):
+                    transition = self._transition_to(CircuitBreakerState.OPEN)
         
-        if self._state == CircuitBreakerState.HALF_OPEN:
-            # Any failure in half-open goes back to open
-            self._transition_to(CircuitBreakerState.OPEN)
-        elif self._state == CircuitBreakerState.CLOSED:
-            self._failure_count += 1
-            if self._failure_count >= self.config.failure_threshold:
-                self._transition_to(CircuitBreakerState.OPEN)
-    
-    def _record_slow_call(self, duration: float) -> None:
-        """Record a slow call"""
-        if duration >= self.config.slow_call_threshold:
-            self._metrics.slow_calls += 1
+        if transition is not None:
+            self._notify_state_change(transition, CircuitBreakerState.OPEN)
     
     async def execute(
         self, 
@@ -199,58 +411,65 @@ class CircuitBreaker(Generic[T]):
         Raises:
             CircuitBreakerOpenError: If circuit is open and no fallback provided
         """
-        async with self._lock:
-            self._metrics.total_calls += 1
-            
-            # Check if we should try to reset
-            if self._should_attempt_reset():
-                self._transition_to(CircuitBreakerState.HALF_OPEN)
-            
-            # If open, reject or use fallback
-            if self._state == CircuitBreakerState.OPEN:
-                self._metrics.rejected_calls += 1
-                if fallback:
-                    return fallback()
-                raise CircuitBreakerOpenError(
-                    f"Circuit breaker '{self.config.name}' is OPEN"
-                )
-            
-            # Execute the operation
-            start_time = time.time()
-            try:
-                if asyncio.iscoroutinefunction(operation):
-                    result = await operation()
-                else:
-                    result = operation()
-                
-                duration = time.time() - start_time
-                self._record_slow_call(duration)
-                self._record_success()
-                return result
-                
-            except Exception as e:
-                self._record_failure(e)
-                if fallback:
-                    return fallback()
-                raise
+        # If open (or half-open probes exhausted), reject or use fallback
+        if not self.try_acquire():
+            if fallback:
+                return fallback()
+            raise CircuitBreakerOpenError(
+                f"Circuit breaker '{self.config.name}' is {self._state.value.upper()}"
+            )
+        
+        # Execute the operation
+        start_time = time.monotonic()
+        try:
+            if asyncio.iscoroutinefunction(operation):
+                result = await operation()
+            else:
+                result = operation()
+        except Exception as e:
+            self.record_failure(e, time.monotonic() - start_time)
+            if fallback:
+                return fallback()
+            raise
+        except BaseException:
+            # Cancellation says nothing about the downstream; free the probe slot
+            self.release()
+            raise
+        
+        self.record_success(time.monotonic() - start_time)
+        return result
     
     def reset(self) -> None:
         """Manually reset the circuit breaker to CLOSED state"""
-        self._transition_to(CircuitBreakerState.CLOSED)
-        self._failure_count = 0
-        self._success_count = 0
+        with self._lock:
+            old_state = self._transition_to(CircuitBreakerState.CLOSED)
+            self._window.reset()
+        if old_state is not None:
+            self._notify_state_change(old_state, CircuitBreakerState.CLOSED)
     
     def trip(self) -> None:
         """Manually trip the circuit breaker to OPEN state"""
-        self._transition_to(CircuitBreakerState.OPEN)
+        with self._lock:
+            old_state = self._transition_to(CircuitBreakerState.OPEN)
+        if old_state is not None:
+            self._notify_state_change(old_state, CircuitBreakerState.OPEN)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get circuit breaker statistics"""
+        with self._lock:
+            calls, failures, slow = self._window.totals(time.monotonic())
         return {
             "name": self.config.name,
             "state": self._state.value,
-            "failure_count": self._failure_count,
+            "failure_count": failures,
             "success_count": self._success_count,
+            "window": {
+                "type": self.config.sliding_window_type.value,
+                "calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+                "slow_call_rate": slow / calls if calls else 0.0,
+            },
+            "half_open_in_flight": self._half_open_in_flight,
             "metrics": {
                 "total_calls": self._metrics.total_calls,
                 "successful_calls": self._metrics.successful_calls,
@@ -269,7 +488,12 @@ class CircuitBreakerOpenError(Exception):
 
 class CircuitBreakerRegistry:
     """
-    Registry for managing multiple circuit breakers
+    Registry for managing multiple circuit breakers, keyed by dependency
+    
+    Breakers are spread over lock stripes by a hash of their name. Lookups
+    of existing breakers are lock-free; the stripe lock is taken only to
+    create a breaker, and is shared as the bookkeeping lock of every breaker
+    in that stripe, so thousands of breakers need only a handful of locks.
     
     Example:
         registry = CircuitBreakerRegistry()
@@ -277,8 +501,15 @@ class CircuitBreakerRegistry:
         await registry.execute("database", lambda: db.query(...))
     """
     
-    def __init__(self):
-        self._breakers: Dict[str, CircuitBreaker] = {}
+    def __init__(self, stripes: int = 64):
+        self._stripe_count = max(1, stripes)
+        self._stripes: List[Dict[str, CircuitBreaker]] = [
+            {} for _ in range(self._stripe_count)
+        ]
+        self._stripe_locks = [threading.Lock() for _ in range(self._stripe_count)]
+    
+    def _stripe_index(self, name: str) -> int:
+        return zlib.crc32(name.encode()) % self._stripe_count
     
     def register(
         self, 
@@ -291,13 +522,16 @@ class CircuitBreakerRegistry:
         else:
             config.name = name
         
-        breaker = CircuitBreaker(config)
-        self._breakers[name] = breaker
+        index = self._stripe_index(name)
+        lock = self._stripe_locks[index]
+        breaker = CircuitBreaker(config, lock=lock)
+        with lock:
+            self._stripes[index][name] = breaker
         return breaker
     
     def get(self, name: str) -> Optional[CircuitBreaker]:
         """Get a circuit breaker by name"""
-        return self._breakers.get(name)
+        return self._stripes[self._stripe_index(name)].get(name)
     
     def get_or_create(
         self, 
@@ -305,9 +539,33 @@ class CircuitBreakerRegistry:
         config: Optional[CircuitBreakerConfig] = None
     ) -> CircuitBreaker:
         """Get existing or create new circuit breaker"""
-        if name not in self._breakers:
-            return self.register(name, config)
-        return self._breakers[name]
+        index = self._stripe_index(name)
+        stripe = self._stripes[index]
+        breaker = stripe.get(name)
+        if breaker is not None:
+            return breaker
+        
+        if config is None:
+            config = CircuitBreakerConfig(name=name)
+        else:
+            config.name = name
+        
+        lock = self._stripe_locks[index]
+        with lock:
+            breaker = stripe.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(config, lock=lock)
+                stripe[name] = breaker
+        return breaker
+    
+    def allow(self, name: str) -> bool:
+        """Hot-path check: True unless the named breaker is open"""
+        breaker = self._stripes[self._stripe_index(name)].get(name)
+        if breaker is None or breaker.state == CircuitBreakerState.CLOSED:
+            return True
+        if breaker.state == CircuitBreakerState.OPEN:
+            return breaker._should_attempt_reset()
+        return True
     
     async def execute(
         self, 
@@ -319,16 +577,22 @@ class CircuitBreakerRegistry:
         breaker = self.get_or_create(name)
         return await breaker.execute(operation, fallback)
     
+    def _all_breakers(self) -> List[Tuple[str, CircuitBreaker]]:
+        return [item for stripe in self._stripes for item in list(stripe.items())]
+    
     def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
         """Get stats for all circuit breakers"""
-        return {name: breaker.get_stats() for name, breaker in self._breakers.items()}
+        return {name: breaker.get_stats() for name, breaker in self._all_breakers()}
     
     def reset_all(self) -> None:
         """Reset all circuit breakers"""
-        for breaker in self._breakers.values():
+        for _, breaker in self._all_breakers():
             breaker.reset()
     
     def trip_all(self) -> None:
         """Trip all circuit breakers (emergency stop)"""
-        for breaker in self._breakers.values():
+        for _, breaker in self._all_breakers():
             breaker.trip()
+    
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self._stripes)
@@ -0,0 +1,154 @@
+"""
+Knowledge Search Index (知識檢索索引)
+
+Tokenized inverted index with field-weighted BM25 (BM25F) ranking for
+knowledge items. Each document has a name, a body text and tags; a query
+only touches the postings of its own terms, and top-k selection uses a
+heap instead of sorting every scored document.
+
+參考：倒排索引 + BM25 排序，避免每次查詢掃描全部知識項目
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import heapq
+import math
+import re
+
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Field order used by postings and length statistics
+FIELDS: Tuple[str, ...] = ("name", "text", "tags")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class FieldWeights:
+    """
+    Per-field boosts for BM25F scoring.
+
+    欄位權重：名稱 > 標籤 > 描述
+    """
+    name: float = 3.0
+    text: float = 1.0
+    tags: float = 2.0
+
+    def as_tuple(self) -> Tuple[float, float, float]:
+        return (self.name, self.text, self.tags)
+
+
+class KnowledgeIndex:
+    """
+    Incremental BM25F inverted index.
+
+    檢索索引：支援增量新增、更新與移除
+
+    Postings map ``term -> {doc_id: (tf_name, tf_text, tf_tags)}``. Field
+    length totals are kept as running sums so averages never need a scan.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[FieldWeights] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.weights = weights or FieldWeights()
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, Tuple[int, int, int]]] = {}
+        self._doc_lengths: Dict[Hashable, Tuple[int, int, int]] = {}
+        self._doc_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self._length_totals = [0, 0, 0]
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: Hashable, name: str, text: str = "", tags: Iterable[str] = ()) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self._doc_lengths:
+            self.remove(doc_id)
+
+        field_tokens = (tokenize(name), tokenize(text), tokenize(" ".join(tags)))
+        frequencies: Dict[str, List[int]] = {}
+        for position, tokens in enumerate(field_tokens):
+            for token in tokens:
+                counts = frequencies.get(token)
+                if counts is None:
+                    counts = frequencies[token] = [0, 0, 0]
+                counts[position] += 1
+
+        for term, counts in frequencies.items():
+            self._postings.setdefault(term, {})[doc_id] = tuple(counts)
+
+        lengths = tuple(len(tokens) for tokens in field_tokens)
+        self._doc_lengths[doc_id] = lengths
+        self._doc_terms[doc_id] = tuple(frequencies)
+        for position, length in enumerate(lengths):
+            self._length_totals[position] += length
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """Remove a document; returns False if it was not indexed."""
+        lengths = self._doc_lengths.pop(doc_id, None)
+        if lengths is None:
+            return False
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        for position, length in enumerate(lengths):
+            self._length_totals[position] -= length
+        return True
+
+    def clear(self) -> None:
+        """Drop all documents."""
+        self._postings.clear()
+        self._doc_lengths.clear()
+        self._doc_terms.clear()
+        self._length_totals = [0, 0, 0]
+
+    def score(self, query: str) -> Dict[Hashable, float]:
+        """Return BM25F scores for every document matching at least one query term."""
+        doc_count = len(self._doc_lengths)
+        if not doc_count:
+            return {}
+
+        averages = [max(total / doc_count, 1e-9) for total in self._length_totals]
+        weights = self.weights.as_tuple()
+        k1, b = self.k1, self.b
+        doc_lengths = self._doc_lengths
+        scores: Dict[Hashable, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, counts in postings.items():
+                lengths = doc_lengths[doc_id]
+                weighted_tf = 0.0
+                for position in range(3):
+                    tf = counts[position]
+                    if tf:
+                        norm = 1.0 - b + b * lengths[position] / averages[position]
+                        weighted_tf += weights[position] * tf / norm
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weighted_tf / (k1 + weighted_tf)
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[Hashable, float]]:
+        """Return the ``top_k`` best ``(doc_id, score)`` pairs, best first."""
+        if top_k <= 0:
+            return []
+        scores = self.score(query)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
@@ -9,10 +9,14 @@ from .multi_layer_validator import MultiLayerValidator
 from .syntax_validator import SyntaxValidator
 from .semantic_validator import SemanticValidator
 from .security_validator import SecurityValidator
+from .schema_compiler import CompiledSchema, SchemaViolation, compile_schema
 
 __all__ = [
     "MultiLayerValidator",
     "SyntaxValidator",
     "SemanticValidator",
     "SecurityValidator",
+    "CompiledSchema",
+    "SchemaViolation",
+    "compile_schema",
 ]
@@ -0,0 +1,419 @@
+"""
+Compiled JSON Schema Validation
+===============================
+
+Turns a JSON Schema dict into a tree of closures once, so validating a value
+does no schema interpretation: types are resolved to isinstance checks,
+patterns are precompiled, and keyword checks absent from a node are never
+visited.
+
+Supported keywords: type, enum, const, properties, required,
+additionalProperties, items, minItems, maxItems, uniqueItems, minLength,
+maxLength, pattern, minimum, maximum, exclusiveMinimum, exclusiveMaximum,
+multipleOf, allOf, anyOf, oneOf.
+
+Usage:
+    validator = compile_schema({"type": "object", "properties": {...}})
+    violations = validator.validate(arguments)   # all violations
+    ok = validator.is_valid(arguments)           # stops at the first one
+"""
+
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Context, Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = [
+    "SchemaViolation",
+    "CompiledSchema",
+    "compile_schema",
+    "clear_schema_cache",
+]
+
+
+@dataclass
+class SchemaViolation:
+    """A single validation failure"""
+    path: str
+    keyword: str
+    message: str
+    expected: Any = None
+    actual: Any = None
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class _StopValidation(Exception):
+    """Raised in fail-fast mode on the first violation"""
+
+
+# Check signature: (value, path, sink) where sink collects violations
+_Check = Callable[[Any, str, "_Sink"], None]
+
+
+class _Sink:
+    """Collects violations, or aborts on the first one in fail-fast mode"""
+
+    __slots__ = ("violations", "fail_fast")
+
+    def __init__(self, fail_fast: bool):
+        self.violations: List[SchemaViolation] = []
+        self.fail_fast = fail_fast
+
+    def add(self, violation: SchemaViolation) -> None:
+        self.violations.append(violation)
+        if self.fail_fast:
+            raise _StopValidation()
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _canonical(value: Any) -> Any:
+    """
+    Hashable, type-tagged form of a JSON value for enum/const comparison
+
+    Keeps booleans apart from numbers (``True`` must not match ``1``) while
+    treating ``1`` and ``1.0`` as the same JSON number.
+    """
+    if isinstance(value, bool):
+        return ("boolean", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    if isinstance(value, str):
+        return ("string", value)
+    if value is None:
+        return ("null",)
+    if isinstance(value, (list, tuple)):
+        return ("array", tuple(_canonical(item) for item in value))
+    if isinstance(value, dict):
+        return ("object", frozenset((key, _canonical(item)) for key, item in value.items()))
+    return ("other", repr(value))
+
+
+def _is_multiple_of(value: Any, divisor: Any) -> bool:
+    """
+    Exact multipleOf check
+
+    Floats are compared through their shortest decimal repr, so 0.3 is a
+    multiple of 0.1. Infinity and NaN are never multiples.
+    """
+    if _is_integer(value) and _is_integer(divisor):
+        return value % divisor == 0
+    if not math.isfinite(value):
+        return False
+    dividend, step = Decimal(repr(value)), Decimal(repr(divisor))
+    # Enough precision for the integer part of the quotient, so the remainder is exact
+    context = Context(prec=max(28, dividend.adjusted() - step.adjusted() + 2))
+    return context.remainder(dividend, step) == 0
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+
+
+def _join(path: str, key: Any) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else str(key)
+
+
+def _compile_node(schema: Dict[str, Any]) -> _Check:
+    """Compile one schema node into a single check closure"""
+    if not isinstance(schema, dict):
+        return lambda value, path, sink: None
+
+    checks: List[_Check] = []
+
+    # type
+    expected_type = schema.get("type")
+    if expected_type is not None:
+        type_names = expected_type if isinstance(expected_type, list) else [expected_type]
+        type_checks = [_TYPE_CHECKS[name] for name in type_names if name in _TYPE_CHECKS]
+        if type_checks:
+            expected_label = "|".join(type_names)
+
+            def check_type(value, path, sink, _checks=tuple(type_checks)):
+                for type_check in _checks:
+                    if type_check(value):
+                        return
+                sink.add(SchemaViolation(
+                    path, "type",
+                    f"Invalid type for {path or 'value'}: expected {expected_label}",
+                    expected=expected_label, actual=type(value).__name__,
+                ))
+            checks.append(check_type)
+
+    # enum / const
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        allowed_keys = frozenset(_canonical(item) for item in allowed)
+
+        def check_enum(value, path, sink):
+            if _canonical(value) not in allowed_keys:
+                sink.add(SchemaViolation(
+                    path, "enum",
+                    f"Invalid value for {path or 'value'}: must be one of {allowed}",
+                    expected=allowed, actual=value,
+                ))
+        checks.append(check_enum)
+
+    if "const" in schema:
+        const = schema["const"]
+        const_key = _canonical(const)
+
+        def check_const(value, path, sink):
+            if _canonical(value) != const_key:
+                sink.add(SchemaViolation(
+                    path, "const", f"Invalid value for {path or 'value'}: must be {const!r}",
+                    expected=const, actual=value,
+                ))
+        checks.append(check_const)
+
+    # strings
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = schema.get("pattern")
+    if min_length is not None or max_length is not None or pattern is not None:
+        regex = re.compile(pattern) if pattern is not None else None
+
+        def check_string(value, path, sink):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                sink.add(SchemaViolation(
+                    path, "minLength", f"{path or 'value'} is shorter than {min_length}",
+                    expected=min_length, actual=len(value),
+                ))
+            if max_length is not None and len(value) > max_length:
+                sink.add(SchemaViolation(
+                    path, "maxLength", f"{path or 'value'} is longer than {max_length}",
+                    expected=max_length, actual=len(value),
+                ))
+            if regex is not None and not regex.search(value):
+                sink.add(SchemaViolation(
+                    path, "pattern", f"{path or 'value'} does not match pattern {pattern}",
+                    expected=pattern, actual=value,
+                ))
+        checks.append(check_string)
+
+    # numbers
+    bounds: List[Tuple[str, Any, Callable[[Any, Any], bool], str]] = []
+    if "minimum" in schema:
+        bounds.append(("minimum", schema["minimum"], lambda v, b: v >= b, ">="))
+    if "maximum" in schema:
+        bounds.append(("maximum", schema["maximum"], lambda v, b: v <= b, "<="))
+    if "exclusiveMinimum" in schema and not isinstance(schema["exclusiveMinimum"], bool):
+        bounds.append(("exclusiveMinimum", schema["exclusiveMinimum"], lambda v, b: v > b, ">"))
+    if "exclusiveMaximum" in schema and not isinstance(schema["exclusiveMaximum"], bool):
+        bounds.append(("exclusiveMaximum", schema["exclusiveMaximum"], lambda v, b: v < b, "<"))
+    multiple_of = schema.get("multipleOf")
+    if bounds or multiple_of:
+        def check_number(value, path, sink, _bounds=tuple(bounds)):
+            if not _is_number(value):
+                return
+            for keyword, bound, within, op in _bounds:
+                if not within(value, bound):
+                    sink.add(SchemaViolation(
+                        path, keyword, f"{path or 'value'} must be {op} {bound}",
+                        expected=bound, actual=value,
+                    ))
+            if multiple_of and not _is_multiple_of(value, multiple_of):
+                sink.add(SchemaViolation(
+                    path, "multipleOf", f"{path or 'value'} must be a multiple of {multiple_of}",
+                    expected=multiple_of, actual=value,
+                ))
+        checks.append(check_number)
+
+    # objects
+    properties = schema.get("properties")
+    required = schema.get("required")
+    additional = schema.get("additionalProperties", True)
+    if properties or required or additional is not True:
+        property_checks = {
+            name: _compile_node(sub) for name, sub in (properties or {}).items()
+        }
+        required_names = tuple(required or ())
+        additional_check = _compile_node(additional) if isinstance(additional, dict) else None
+        forbid_additional = additional is False
+
+        def check_object(value, path, sink):
+            if not isinstance(value, dict):
+                return
+            for name in required_names:
+                if name not in value:
+                    field_path = _join(path, name)
+                    sink.add(SchemaViolation(
+                        field_path, "required", f"Missing required field: {field_path}",
+                        expected=name,
+                    ))
+            for key, item in value.items():
+                property_check = property_checks.get(key)
+                if property_check is not None:
+                    property_check(item, _join(path, key), sink)
+                elif forbid_additional:
+                    field_path = _join(path, key)
+                    sink.add(SchemaViolation(
+                        field_path, "additionalProperties", f"Unexpected field: {field_path}",
+                        actual=key,
+                    ))
+                elif additional_check is not None:
+                    additional_check(item, _join(path, key), sink)
+        checks.append(check_object)
+
+    # arrays
+    items = schema.get("items")
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    unique_items = schema.get("uniqueItems", False)
+    if isinstance(items, dict) or min_items is not None or max_items is not None or unique_items:
+        item_check = _compile_node(items) if isinstance(items, dict) else None
+
+        def check_array(value, path, sink):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                sink.add(SchemaViolation(
+                    path, "minItems", f"{path or 'value'} has fewer than {min_items} items",
+                    expected=min_items, actual=len(value),
+                ))
+            if max_items is not None and len(value) > max_items:
+                sink.add(SchemaViolation(
+                    path, "maxItems", f"{path or 'value'} has more than {max_items} items",
+                    expected=max_items, actual=len(value),
+                ))
+            if unique_items:
+                seen = set()
+                for item in value:
+                    marker = json.dumps(item, sort_keys=True, default=str)
+                    if marker in seen:
+                        sink.add(SchemaViolation(
+                            path, "uniqueItems", f"{path or 'value'} has duplicate items",
+                        ))
+                        break
+                    seen.add(marker)
+            if item_check is not None:
+                for index, item in enumerate(value):
+                    item_check(item, _join(path, index), sink)
+        checks.append(check_array)
+
+    # combinators
+    for keyword in ("allOf", "anyOf", "oneOf"):
+        subschemas = schema.get(keyword)
+        if not subschemas:
+            continue
+        sub_checks = tuple(_compile_node(sub) for sub in subschemas)
+        if keyword == "allOf":
+            def check_all(value, path, sink, _subs=sub_checks):
+                for sub in _subs:
+                    sub(value, path, sink)
+            checks.append(check_all)
+        else:
+            def check_some(value, path, sink, _subs=sub_checks, _keyword=keyword):
+                matches = 0
+                for sub in _subs:
+                    trial = _Sink(fail_fast=True)
+                    try:
+                        sub(value, path, trial)
+                    except _StopValidation:
+                        continue
+                    matches += 1
+                    if _keyword == "anyOf":
+                        return
+                if (_keyword == "anyOf" and matches == 0) or (_keyword == "oneOf" and matches != 1):
+                    sink.add(SchemaViolation(
+                        path, _keyword,
+                        f"{path or 'value'} does not match {_keyword} ({matches} matched)",
+                        actual=matches,
+                    ))
+            checks.append(check_some)
+
+    if not checks:
+        return lambda value, path, sink: None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all_keywords(value, path, sink, _checks=tuple(checks)):
+        for check in _checks:
+            check(value, path, sink)
+    return check_all_keywords
+
+
+class CompiledSchema:
+    """A JSON Schema compiled into a validator closure tree"""
+
+    __slots__ = ("schema", "_check")
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self._check = _compile_node(schema or {})
+
+    def validate(self, value: Any) -> List[SchemaViolation]:
+        """Return every violation (empty list if valid)"""
+        sink = _Sink(fail_fast=False)
+        self._check(value, "", sink)
+        return sink.violations
+
+    def first_error(self, value: Any) -> Optional[SchemaViolation]:
+        """Return the first violation, stopping validation there"""
+        sink = _Sink(fail_fast=True)
+        try:
+            self._check(value, "", sink)
+        except _StopValidation:
+            return sink.violations[0]
+        return None
+
+    def is_valid(self, value: Any) -> bool:
+        """Fast pass/fail check"""
+        return self.first_error(value) is None
+
+
+_CACHE_SIZE = 1024
+_cache: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_schema(schema: Optional[Dict[str, Any]]) -> CompiledSchema:
+    """
+    Compile a schema, reusing an earlier compilation of an equal schema
+
+    Callers should compile once (e.g. at registration) and keep the
+    returned object; the cache only deduplicates equal schemas.
+    """
+    schema = schema or {}
+    key = json.dumps(schema, sort_keys=True, default=str)
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+
+    compiled = CompiledSchema(schema)
+    with _cache_lock:
+        _cache[key] = compiled
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def clear_schema_cache() -> None:
+    """Drop all cached compilations"""
+    with _cache_lock:
+        _cache.clear()
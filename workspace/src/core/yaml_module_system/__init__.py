@@ -23,6 +23,7 @@ from .yaml_module_definition import (
 
 from .yaml_schema_validator import (
     YAMLSchemaValidator,
+    CompiledSchema,
     ValidationResult,
     ValidationError,
     SchemaRegistry,
@@ -79,6 +80,7 @@ __all__ = [
     'ValidationResult',
     'ValidationError',
     'SchemaRegistry',
+    'CompiledSchema',
     
     # Policy Gate
     'PolicyGate',
@@ -5,9 +5,11 @@ Go modules 生態系統的依賴分析器
 
 import logging
 import re
+from collections.abc import Iterable
 from pathlib import Path
 
 from ..models.dependency import Dependency, DependencyType, Ecosystem
+from ..utils.dependency_graph import DependencyGraph
 from .base_analyzer import BaseAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -217,40 +219,35 @@ class GoAnalyzer(BaseAnalyzer):
         seen_modules = set()
 
         try:
+            # 逐行讀取，不將整個文件載入內存
             with open(sum_path, encoding='utf-8') as f:
-                lines = f.readlines()
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 格式: module/path v1.2.3 h1:hash=
-                # 或: module/path v1.2.3/go.mod h1:hash=
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-
-                module_path = parts[0]
-                version = parts[1]
-
-                # 跳過 go.mod 校驗行
-                if version.endswith('/go.mod'):
-                    version = version.replace('/go.mod', '')
-
-                # 去重
-                module_key = f"{module_path}@{version}"
-                if module_key in seen_modules:
-                    continue
-                seen_modules.add(module_key)
-
-                dep = Dependency(
-                    name=module_path,
-                    current_version=self._clean_version(version),
-                    ecosystem=Ecosystem.GO,
-                    dep_type=DependencyType.TRANSITIVE  # go.sum 中的都視為傳遞依賴
-                )
-                dependencies.append(dep)
+                for line in f:
+                    # 格式: module/path v1.2.3 h1:hash=
+                    # 或: module/path v1.2.3/go.mod h1:hash=
+                    parts = line.split()
+                    if len(parts) < 2:
+                        continue
+
+                    module_path = parts[0]
+                    version = parts[1]
+
+                    # 跳過 go.mod 校驗行
+                    if version.endswith('/go.mod'):
+                        version = version[:-len('/go.mod')]
+
+                    # 去重
+                    module_key = (module_path, version)
+                    if module_key in seen_modules:
+                        continue
+                    seen_modules.add(module_key)
+
+                    dep = Dependency(
+                        name=module_path,
+                        current_version=self._clean_version(version),
+                        ecosystem=Ecosystem.GO,
+                        dep_type=DependencyType.TRANSITIVE  # go.sum 中的都視為傳遞依賴
+                    )
+                    dependencies.append(dep)
 
             logger.info(f"從 {sum_path} 解析出 {len(dependencies)} 個依賴項")
 
@@ -259,6 +256,39 @@ class GoAnalyzer(BaseAnalyzer):
 
         return dependencies
 
+    def build_mod_graph(self, lines: Iterable[str]) -> DependencyGraph:
+        """
+        由 `go mod graph` 輸出逐行建立去重依賴圖
+        
+        每行格式: <模組>[@版本] <依賴模組>@版本；不帶版本的為主模組，
+        其直接依賴為圖的根節點。
+        
+        Args:
+            lines: go mod graph 輸出的行 (可為打開的文件或子進程輸出)
+            
+        Returns:
+            已凍結的依賴圖
+        """
+        graph = DependencyGraph(Ecosystem.GO)
+
+        for line in lines:
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            source, target = parts
+            target_path, _, target_version = target.partition('@')
+            if not target_version:
+                continue
+            target_node = graph.add_node(target_path, self._clean_version(target_version))
+
+            source_path, _, source_version = source.partition('@')
+            if not source_version:
+                graph.add_root(target_node)
+            else:
+                graph.add_edge(graph.add_node(source_path, self._clean_version(source_version)), target_node)
+
+        return graph.freeze()
+
     def get_module_name(self, mod_path: Path) -> str | None:
         """
         從 go.mod 獲取模組名稱
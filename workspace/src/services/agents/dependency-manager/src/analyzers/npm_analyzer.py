@@ -8,10 +8,34 @@ import logging
 from pathlib import Path
 
 from ..models.dependency import Dependency, DependencyType, Ecosystem
+from ..utils.dependency_graph import FLAG_DEV, FLAG_OPTIONAL, FLAG_PEER, DependencyGraph
+from ..utils.json_stream import JsonStream, JsonStreamError
 from .base_analyzer import BaseAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# 產生依賴邊的欄位 (根專案另含 devDependencies)
+_EDGE_FIELDS = ('dependencies', 'optionalDependencies', 'peerDependencies')
+
+
+def _package_name(path: str) -> str:
+    """由 lock 文件中的安裝路徑取得套件名稱 (支援 @scope/name)"""
+    marker = path.rfind('node_modules/')
+    if marker == -1:
+        return path.rsplit('/', 1)[-1]
+    return path[marker + len('node_modules/'):]
+
+
+def _flags(info: dict) -> int:
+    flags = 0
+    if info.get('dev'):
+        flags |= FLAG_DEV
+    if info.get('optional') or info.get('devOptional'):
+        flags |= FLAG_OPTIONAL
+    if info.get('peer'):
+        flags |= FLAG_PEER
+    return flags
+
 
 class NpmAnalyzer(BaseAnalyzer):
     """
@@ -159,6 +183,9 @@ class NpmAnalyzer(BaseAnalyzer):
         """
         解析 package-lock.json 獲取完整依賴樹
         
+        串流解析並按 name@version 去重，直接依賴標記為 DIRECT，其餘按
+        dev/optional/peer 標記或 TRANSITIVE。
+        
         Args:
             lock_path: package-lock.json 文件路徑
             
@@ -168,73 +195,152 @@ class NpmAnalyzer(BaseAnalyzer):
         dependencies = []
 
         try:
-            with open(lock_path, encoding='utf-8') as f:
-                lock_data = json.load(f)
-
-            # 處理 npm v7+ 的 packages 格式
-            if 'packages' in lock_data:
-                for pkg_path, pkg_info in lock_data['packages'].items():
-                    if not pkg_path:  # 跳過根專案
-                        continue
-
-                    # 從路徑提取套件名稱
-                    name = pkg_path.replace('node_modules/', '').split('/')[-1]
-                    version = pkg_info.get('version', '')
-
-                    if name and version:
-                        dep = Dependency(
-                            name=name,
-                            current_version=version,
-                            ecosystem=Ecosystem.NPM,
-                            dep_type=DependencyType.TRANSITIVE
-                        )
-                        dependencies.append(dep)
-
-            # 處理舊版本的 dependencies 格式
-            elif 'dependencies' in lock_data:
-                self._parse_nested_dependencies(
-                    lock_data['dependencies'],
-                    dependencies
-                )
-
+            dependencies = self.build_lock_graph(lock_path).to_dependencies()
             logger.info(f"從 lock 文件解析出 {len(dependencies)} 個依賴項")
 
-        except json.JSONDecodeError as e:
+        except (JsonStreamError, json.JSONDecodeError) as e:
             logger.error(f"解析 package-lock.json 失敗: {e}")
         except FileNotFoundError:
             logger.error(f"文件不存在: {lock_path}")
 
         return dependencies
 
-    def _parse_nested_dependencies(
-        self,
-        deps_dict: dict,
-        result: list[Dependency],
-        depth: int = 0
-    ) -> None:
+    def build_lock_graph(self, lock_path: Path) -> DependencyGraph:
         """
-        遞歸解析嵌套的依賴結構
+        串流解析 package-lock.json 為去重依賴圖
+        
+        v2/v3 讀取 packages (按 Node 模組解析規則連接依賴邊)；v1 讀取嵌套的
+        dependencies。v2 中與 packages 重複的 dependencies 段直接跳過。
         
         Args:
-            deps_dict: 依賴字典
-            result: 結果列表
-            depth: 當前深度
-        """
-        for name, info in deps_dict.items():
-            version = info.get('version', '')
-
-            dep = Dependency(
-                name=name,
-                current_version=version,
-                ecosystem=Ecosystem.NPM,
-                dep_type=DependencyType.DIRECT if depth == 0 else DependencyType.TRANSITIVE
-            )
-            result.append(dep)
-
-            # 遞歸處理子依賴
-            if 'dependencies' in info:
-                self._parse_nested_dependencies(
-                    info['dependencies'],
-                    result,
-                    depth + 1
-                )
+            lock_path: package-lock.json 文件路徑
+            
+        Returns:
+            已凍結的依賴圖
+        """
+        graph = DependencyGraph(Ecosystem.NPM)
+        lock_version = None
+        source = None
+
+        with open(lock_path, encoding='utf-8') as f:
+            stream = JsonStream(f)
+            for key in stream.object_items():
+                if key == 'lockfileVersion':
+                    lock_version = stream.read_value()
+                elif key == 'packages' and stream.peek_type() == '{':
+                    if source is not None:
+                        graph = DependencyGraph(Ecosystem.NPM)
+                    self._stream_packages(stream, graph)
+                    source = key
+                elif (key == 'dependencies' and source is None and lock_version in (None, 1)
+                        and stream.peek_type() == '{'):
+                    self._stream_nested_dependencies(stream, graph)
+                    source = key
+                else:
+                    stream.skip_value()
+
+        return graph.freeze()
+
+    def _stream_packages(self, stream: JsonStream, graph: DependencyGraph) -> None:
+        """
+        讀取 v2/v3 的 packages 段
+        
+        每個條目只保留節點 ID 與依賴名稱，讀完後按 Node 解析規則 (由自身
+        node_modules 逐級向上) 連接依賴邊；workspace 連結指向其目標路徑。
+        """
+        path_nodes: dict[str, int] = {}
+        links: dict[str, str] = {}
+        pending: list[tuple[str, int, list[str]]] = []
+        root_names: list[str] = []
+
+        for path in stream.object_items():
+            info = stream.read_value()
+            if not isinstance(info, dict):
+                continue
+            if info.get('link'):
+                links[path] = info.get('resolved', '')
+                continue
+            names = [name for field in _EDGE_FIELDS for name in info.get(field) or {}]
+            if not path:  # 根專案
+                root_names = names + list(info.get('devDependencies') or {})
+                continue
+            version = info.get('version')
+            if not version:
+                continue
+            node = graph.add_node(info.get('name') or _package_name(path), version, _flags(info))
+            path_nodes[path] = node
+            if 'node_modules/' not in path:  # workspace 套件
+                graph.add_root(node)
+            if names:
+                pending.append((path, node, names))
+
+        def resolve(base: str, name: str) -> int | None:
+            while True:
+                candidate = f"{base}/node_modules/{name}" if base else f"node_modules/{name}"
+                node = path_nodes.get(links.get(candidate, candidate))
+                if node is not None or not base:
+                    return node
+                marker = base.rfind('/node_modules/')
+                base = base[:marker] if marker != -1 else ''
+
+        for name in root_names:
+            node = resolve('', name)
+            if node is not None:
+                graph.add_root(node)
+        for path, node, names in pending:
+            for name in names:
+                target = resolve(path, name)
+                if target is not None:
+                    graph.add_edge(node, target)
+
+    def _stream_nested_dependencies(self, stream: JsonStream, graph: DependencyGraph) -> None:
+        """
+        讀取 v1 的嵌套 dependencies 段
+        
+        每層 dependencies 為一個作用域；requires 由自身作用域開始逐級向上
+        解析，讀完整個段後再連接依賴邊 (同層後出現的套件也能被解析)。
+        """
+        scopes: list[dict[str, int]] = [{}]
+        scope_parent: list[int] = [-1]
+        pending: list[tuple[int, int, list[str]]] = []
+
+        def read_scope(scope: int) -> None:
+            for name in stream.object_items():
+                version = None
+                flags = 0
+                requires: list[str] = []
+                child_scope = None
+                for field in stream.object_items():
+                    if field == 'version':
+                        version = stream.read_value()
+                    elif field == 'requires':
+                        value = stream.read_value()
+                        requires = list(value) if isinstance(value, dict) else []
+                    elif field == 'dependencies' and stream.peek_type() == '{':
+                        child_scope = len(scopes)
+                        scopes.append({})
+                        scope_parent.append(scope)
+                        read_scope(child_scope)
+                    elif field in ('dev', 'optional'):
+                        if stream.read_value():
+                            flags |= FLAG_DEV if field == 'dev' else FLAG_OPTIONAL
+                    else:
+                        stream.skip_value()
+                if not isinstance(version, str):
+                    continue
+                node = graph.add_node(name, version, flags)
+                scopes[scope][name] = node
+                if requires:
+                    pending.append((child_scope if child_scope is not None else scope, node, requires))
+
+        read_scope(0)
+
+        for scope, node, names in pending:
+            for name in names:
+                current = scope
+                while current != -1:
+                    target = scopes[current].get(name)
+                    if target is not None:
+                        graph.add_edge(node, target)
+                        break
+                    current = scope_parent[current]
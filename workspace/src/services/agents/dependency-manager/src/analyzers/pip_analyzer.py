@@ -71,24 +71,23 @@ class PipAnalyzer(BaseAnalyzer):
         dependencies = []
 
         try:
+            # 逐行讀取，不將整個文件載入內存
             with open(file_path, encoding='utf-8') as f:
-                lines = f.readlines()
+                for line in f:
+                    line = line.strip()
 
-            for line in lines:
-                line = line.strip()
-
-                # 跳過空行和註釋
-                if not line or line.startswith('#'):
-                    continue
+                    # 跳過空行和註釋
+                    if not line or line.startswith('#'):
+                        continue
 
-                # 跳過選項行
-                if line.startswith('-'):
-                    continue
+                    # 跳過選項行
+                    if line.startswith('-'):
+                        continue
 
-                # 解析依賴規範
-                dep = self._parse_requirement_line(line)
-                if dep:
-                    dependencies.append(dep)
+                    # 解析依賴規範
+                    dep = self._parse_requirement_line(line)
+                    if dep:
+                        dependencies.append(dep)
 
             logger.info(f"從 {file_path} 解析出 {len(dependencies)} 個依賴項")
 
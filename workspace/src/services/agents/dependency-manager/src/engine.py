@@ -15,8 +15,9 @@ from .analyzers import BaseAnalyzer, GoAnalyzer, NpmAnalyzer, PipAnalyzer
 from .models.dependency import DependencyAnalysis, Ecosystem
 from .models.update import UpdateResult
 from .models.vulnerability import VulnerabilityScanResult
-from .scanners import LicenseScanner, VulnerabilityScanner
+from .scanners import AdvisoryIndex, LicenseScanner, VulnerabilityScanner
 from .scanners.license_scanner import LicenseScanResult
+from .scanners.vulnerability_scanner import ScanConfig
 from .updaters import AutoUpdater
 
 # 配置日誌
@@ -37,6 +38,7 @@ class ManagerConfig:
         parallel: 是否並行處理
         max_workers: 最大工作線程數
         ecosystems: 啟用的生態系統
+        vulnerability_scan: 漏洞掃描配置
     """
     enabled: bool = True
     parallel: bool = True
@@ -46,6 +48,7 @@ class ManagerConfig:
         Ecosystem.PIP,
         Ecosystem.GO
     ])
+    vulnerability_scan: ScanConfig = field(default_factory=lambda: ScanConfig.from_dict({}))
 
 
 class DependencyManager:
@@ -60,20 +63,31 @@ class DependencyManager:
         vulnerabilities = await manager.scan_vulnerabilities(analysis)
     """
 
-    def __init__(self, config_path: str | None = None):
+    def __init__(
+        self,
+        config_path: str | None = None,
+        advisory_index: str | None = None,
+        offline: bool = False
+    ):
         """
         初始化依賴管理器
         
         Args:
             config_path: 配置文件路徑
+            advisory_index: 離線公告索引路徑，覆蓋配置文件
+            offline: 只使用離線索引掃描漏洞
         """
         self.config = self._load_config(config_path)
+        if advisory_index:
+            self.config.vulnerability_scan.advisory_index = advisory_index
+        if offline:
+            self.config.vulnerability_scan.offline = True
 
         # 初始化各個組件
         self._analyzers: dict[Ecosystem, BaseAnalyzer] = {}
         self._init_analyzers()
 
-        self._vulnerability_scanner = VulnerabilityScanner()
+        self._vulnerability_scanner = VulnerabilityScanner(self.config.vulnerability_scan)
         self._license_scanner = LicenseScanner()
         self._auto_updater = AutoUpdater()
 
@@ -100,7 +114,10 @@ class DependencyManager:
                     max_workers=yaml_config.get('max_workers', 8),
                     ecosystems=[
                         Ecosystem(e) for e in yaml_config.get('ecosystems', ['npm'])
-                    ]
+                    ],
+                    vulnerability_scan=ScanConfig.from_dict(
+                        (yaml_config.get('scanning') or {}).get('vulnerabilities') or {}
+                    )
                 )
             except Exception as e:
                 logger.warning(f"載入配置失敗: {e}，使用默認配置")
@@ -306,7 +323,6 @@ async def main():
     )
     parser.add_argument(
         "--project", "-p",
-        required=True,
         help="專案路徑"
     )
     parser.add_argument(
@@ -323,11 +339,41 @@ async def main():
         "--config", "-c",
         help="配置文件路徑"
     )
+    parser.add_argument(
+        "--advisory-index",
+        help="離線公告索引路徑 (SQLite)"
+    )
+    parser.add_argument(
+        "--import-advisories",
+        nargs="+",
+        metavar="DUMP",
+        help="導入 OSV/GHSA 公告導出 (目錄、zip 或 JSON) 至離線索引"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="只使用離線索引掃描漏洞"
+    )
 
     args = parser.parse_args()
+    if not args.project and not args.import_advisories:
+        parser.error("需要 --project 或 --import-advisories")
+
+    if args.import_advisories:
+        index = AdvisoryIndex(args.advisory_index)
+        count = index.import_dumps(args.import_advisories)
+        print(f"已導入 {count} 條公告至 {index.path} ({index.package_count} 個套件)")
+        index.close()
+        args.advisory_index = index.path
+        if not args.project:
+            return
 
     # 初始化管理器
-    manager = DependencyManager(config_path=args.config)
+    manager = DependencyManager(
+        config_path=args.config,
+        advisory_index=args.advisory_index,
+        offline=args.offline
+    )
 
     # 執行完整掃描
     result = await manager.full_scan(args.project)
@@ -0,0 +1,427 @@
+"""
+離線漏洞公告索引 - Offline Advisory Index
+將 OSV / GHSA 公告數據導出 (OSV JSON 格式) 編譯為本地 SQLite 索引
+
+- 以 (生態系統, 套件) 為主鍵，每個套件一行，查詢為單次主鍵查找
+- 導入時將 OSV 範圍事件 (introduced/fixed/last_affected) 編譯為版本區間
+- 載入的匹配器按套件緩存，版本解析結果全局緩存
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import zipfile
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from ..models.dependency import Ecosystem
+from ..models.vulnerability import Vulnerability, VulnerabilitySeverity, VulnerabilitySource
+
+logger = logging.getLogger(__name__)
+
+# 索引格式變更時遞增，舊索引需重新導入
+INDEX_FORMAT_VERSION = "1"
+
+# 生態系統 -> OSV 生態系統名稱
+OSV_ECOSYSTEMS: dict[Ecosystem, str] = {
+    Ecosystem.NPM: "npm",
+    Ecosystem.PIP: "PyPI",
+    Ecosystem.GO: "Go",
+    Ecosystem.MAVEN: "Maven",
+    Ecosystem.GRADLE: "Maven",
+    Ecosystem.CARGO: "crates.io",
+}
+
+_GHSA_SEVERITY = {
+    "CRITICAL": VulnerabilitySeverity.CRITICAL,
+    "HIGH": VulnerabilitySeverity.HIGH,
+    "MODERATE": VulnerabilitySeverity.MEDIUM,
+    "MEDIUM": VulnerabilitySeverity.MEDIUM,
+    "LOW": VulnerabilitySeverity.LOW,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS advisories (
+    ecosystem TEXT NOT NULL,
+    package TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (ecosystem, package)
+) WITHOUT ROWID;
+"""
+
+_RELEASE = re.compile(r'^(\d+(?:\.\d+)*)(.*)$')
+_PRE_PART = re.compile(r'\d+|[a-z]+')
+_DEV_TAGS = {"dev"}
+_POST_TAGS = {"post", "rev", "r"}
+
+
+def default_index_path() -> str:
+    """默認索引路徑：~/.cache/dependency-manager/advisories.sqlite3"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'dependency-manager', 'advisories.sqlite3')
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    """規範化套件名稱 (PyPI 按 PEP 503，其他保持原樣)"""
+    if ecosystem == "PyPI":
+        return re.sub(r'[-_.]+', '-', name).lower()
+    return name
+
+
+@lru_cache(maxsize=65536)
+def version_key(version: str) -> tuple:
+    """
+    版本排序鍵
+
+    兼容 SemVer 與 PEP 440 的常見形式：忽略前綴 v 與構建元數據，發行號
+    去除尾部 0；dev < 預發佈 (alpha/beta/rc/...) < 正式版 < post。
+    無法解析的版本按字串比較並排在所有數字版本之前。
+    """
+    v = version.strip().lower()
+    if v.startswith('v'):
+        v = v[1:]
+    v = v.split('+', 1)[0]
+    match = _RELEASE.match(v)
+    if not match:
+        return ((), 0, ((1, 0, v),))
+    release = tuple(int(p) for p in match.group(1).split('.'))
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+    parts = tuple(
+        (0, int(p), '') if p.isdigit() else (1, 0, p)
+        for p in _PRE_PART.findall(match.group(2))
+    )
+    if not parts:
+        return (release, 3, ())
+    tag = parts[0][2]
+    if tag in _DEV_TAGS:
+        stage = 1
+    elif tag in _POST_TAGS:
+        stage = 4
+    else:
+        stage = 2
+    return (release, stage, parts)
+
+
+# ============================================================================
+# 範圍編譯與匹配
+# ============================================================================
+
+def compile_ranges(affected: dict[str, Any]) -> tuple[list[list], list[str]]:
+    """
+    將 OSV affected 條目編譯為版本區間
+
+    Returns:
+        ([[起始或 None, 結束或 None, 結束是否包含], ...], 明確列出的版本)
+    """
+    intervals: list[list] = []
+    for rng in affected.get('ranges', []):
+        if rng.get('type') == 'GIT':
+            continue
+        events: list[tuple[str, str]] = []
+        for event in rng.get('events', []):
+            for kind in ('introduced', 'fixed', 'last_affected'):
+                if kind in event:
+                    events.append((kind, event[kind]))
+        events.sort(key=lambda e: (0,) if e[1] == '0' else (1, version_key(e[1])))
+
+        start: str | None = None
+        open_ = False
+        for kind, value in events:
+            if kind == 'introduced':
+                start = None if value == '0' else value
+                open_ = True
+            elif open_:
+                intervals.append([start, value, kind == 'last_affected'])
+                open_ = False
+        if open_:
+            intervals.append([start, None, False])
+    return intervals, list(affected.get('versions', []))
+
+
+class VersionMatcher:
+    """已編譯的版本區間匹配器"""
+
+    __slots__ = ('intervals', 'versions')
+
+    def __init__(self, intervals: list[list], versions: Iterable[str]):
+        self.intervals = [
+            (version_key(lo) if lo else None, version_key(hi) if hi else None, inclusive, hi)
+            for lo, hi, inclusive in intervals
+        ]
+        self.versions = frozenset(versions)
+
+    def match(self, version: str) -> tuple[bool, str | None]:
+        """返回 (是否受影響, 修復版本)"""
+        if version in self.versions:
+            return True, None
+        key = version_key(version)
+        for lo, hi, inclusive, fixed in self.intervals:
+            if lo is not None and key < lo:
+                continue
+            if hi is None or key < hi or (inclusive and key == hi):
+                return True, None if inclusive else fixed
+        return False, None
+
+
+def _severity(record: dict[str, Any]) -> tuple[VulnerabilitySeverity, float | None]:
+    label = (record.get('database_specific') or {}).get('severity')
+    if isinstance(label, str) and label.upper() in _GHSA_SEVERITY:
+        return _GHSA_SEVERITY[label.upper()], None
+    for entry in record.get('severity', []):
+        try:
+            score = float(entry.get('score', ''))
+        except (TypeError, ValueError):
+            continue
+        return VulnerabilitySeverity.from_cvss(score), score
+    return VulnerabilitySeverity.UNKNOWN, None
+
+
+def compile_advisory(
+    record: dict[str, Any],
+    source: VulnerabilitySource | None = None
+) -> Iterator[tuple[str, str, dict[str, Any]]]:
+    """將一條 OSV 公告編譯為 (生態系統, 套件, 精簡記錄)"""
+    if record.get('withdrawn'):
+        return
+    advisory_id = record.get('id')
+    if not advisory_id:
+        return
+    if source is None:
+        source = VulnerabilitySource.GHSA if advisory_id.startswith('GHSA-') else VulnerabilitySource.OSV
+    severity, score = _severity(record)
+    base = {
+        'id': advisory_id,
+        'aliases': record.get('aliases', []),
+        'summary': record.get('summary', ''),
+        'severity': severity.value,
+        'cvss': score,
+        'source': source.value,
+        'references': [ref['url'] for ref in record.get('references', [])[:5] if 'url' in ref],
+        'published': record.get('published'),
+    }
+    for affected in record.get('affected', []):
+        package = affected.get('package') or {}
+        ecosystem = package.get('ecosystem')
+        name = package.get('name')
+        if not ecosystem or not name:
+            continue
+        intervals, versions = compile_ranges(affected)
+        if not intervals and not versions:
+            continue
+        yield ecosystem, normalize_package(ecosystem, name), {
+            **base, 'intervals': intervals, 'versions': versions
+        }
+
+
+def iter_dump_records(path: str | Path) -> Iterator[dict[str, Any]]:
+    """
+    逐條讀取公告導出：目錄 (遞歸 *.json)、zip (如 osv.dev 的 all.zip)、
+    單個 JSON 文件 (單條公告或公告列表)
+    """
+    path = Path(path)
+    if path.is_dir():
+        for file in sorted(path.rglob('*.json')):
+            yield from _records(file.read_bytes())
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith('.json'):
+                    yield from _records(archive.read(name))
+    else:
+        yield from _records(path.read_bytes())
+
+
+def _records(raw: bytes) -> Iterator[dict[str, Any]]:
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        logger.warning(f"跳過無法解析的公告文件: {e}")
+        return
+    if isinstance(data, list):
+        yield from (item for item in data if isinstance(item, dict))
+    elif isinstance(data, dict):
+        yield data
+
+
+# ============================================================================
+# 索引
+# ============================================================================
+
+class AdvisoryIndex:
+    """
+    離線公告索引
+
+    使用方式:
+        index = AdvisoryIndex("advisories.sqlite3")
+        index.import_dumps(["osv-npm.zip", "advisory-database/advisories"])
+        vulns = index.lookup(Ecosystem.NPM, "lodash", "4.17.15")
+    """
+
+    def __init__(self, path: str | None = None, cache_size: int = 4096):
+        self.path = path or default_index_path()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        if self._meta('format') not in (None, INDEX_FORMAT_VERSION):
+            logger.warning("公告索引格式已變更，清空後需重新導入")
+            with self._conn:
+                self._conn.execute("DELETE FROM advisories")
+                self._conn.execute("DELETE FROM meta")
+        self._load = lru_cache(maxsize=cache_size)(self._load_package)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _meta(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def sources(self) -> set[VulnerabilitySource]:
+        """已導入的數據源"""
+        value = self._meta('sources')
+        return {VulnerabilitySource(s) for s in json.loads(value)} if value else set()
+
+    @property
+    def package_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM advisories").fetchone()[0]
+
+    def import_dumps(
+        self,
+        paths: Iterable[str | Path],
+        source: VulnerabilitySource | None = None
+    ) -> int:
+        """
+        導入公告導出並合併至索引 (同 ID 的公告以新數據替換)
+
+        Args:
+            paths: 導出文件或目錄
+            source: 數據源，未指定時按公告 ID 推斷 (GHSA-* 為 GHSA，其他為 OSV)
+
+        Returns:
+            導入的公告數
+        """
+        grouped: dict[tuple[str, str], dict[str, dict[str, Any]]] = {}
+        sources = self.sources
+        count = 0
+        for path in paths:
+            for record in iter_dump_records(path):
+                compiled = list(compile_advisory(record, source))
+                if not compiled:
+                    continue
+                count += 1
+                for ecosystem, package, entry in compiled:
+                    grouped.setdefault((ecosystem, package), {})[entry['id']] = entry
+                    sources.add(VulnerabilitySource(entry['source']))
+
+        with self._conn:
+            for (ecosystem, package), entries in grouped.items():
+                row = self._conn.execute(
+                    "SELECT data FROM advisories WHERE ecosystem = ? AND package = ?", (ecosystem, package)
+                ).fetchone()
+                if row:
+                    existing = {e['id']: e for e in json.loads(zlib.decompress(row[0]))}
+                    existing.update(entries)
+                    entries = existing
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO advisories (ecosystem, package, data) VALUES (?, ?, ?)",
+                    (ecosystem, package, zlib.compress(json.dumps(list(entries.values())).encode('utf-8'))),
+                )
+            for key, value in (
+                ('format', INDEX_FORMAT_VERSION),
+                ('sources', json.dumps(sorted(s.value for s in sources))),
+                ('updated_at', datetime.utcnow().isoformat()),
+            ):
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self._load.cache_clear()
+        logger.info(f"已導入 {count} 條公告，涉及 {len(grouped)} 個套件")
+        return count
+
+    def _load_package(self, ecosystem: str, package: str) -> tuple:
+        row = self._conn.execute(
+            "SELECT data FROM advisories WHERE ecosystem = ? AND package = ?", (ecosystem, package)
+        ).fetchone()
+        if row is None:
+            return ()
+        return tuple(
+            (entry, VersionMatcher(entry['intervals'], entry['versions']))
+            for entry in json.loads(zlib.decompress(row[0]))
+        )
+
+    def lookup(
+        self,
+        ecosystem: Ecosystem,
+        package_name: str,
+        version: str,
+        sources: set[VulnerabilitySource] | None = None
+    ) -> list[Vulnerability]:
+        """
+        查詢受影響的公告
+
+        Args:
+            ecosystem: 生態系統
+            package_name: 套件名稱
+            version: 版本號
+            sources: 只返回這些數據源的公告 (可選)
+
+        Returns:
+            漏洞列表
+        """
+        osv_ecosystem = OSV_ECOSYSTEMS.get(ecosystem)
+        if osv_ecosystem is None:
+            return []
+        vulnerabilities = []
+        for entry, matcher in self._load(osv_ecosystem, normalize_package(osv_ecosystem, package_name)):
+            source = VulnerabilitySource(entry['source'])
+            if sources is not None and source not in sources:
+                continue
+            affected, fixed = matcher.match(version)
+            if not affected:
+                continue
+            vulnerabilities.append(Vulnerability(
+                id=entry['id'],
+                package=package_name,
+                severity=VulnerabilitySeverity(entry['severity']),
+                title=entry['summary'],
+                description=entry['summary'],
+                affected_versions=_describe(entry['intervals']),
+                fixed_version=fixed,
+                cvss_score=entry['cvss'],
+                source=source,
+                references=entry['references'],
+                published_at=_parse_time(entry['published']),
+            ))
+        return vulnerabilities
+
+
+def _describe(intervals: list[list]) -> str:
+    parts = []
+    for lo, hi, inclusive in intervals:
+        bounds = []
+        if lo:
+            bounds.append(f">={lo}")
+        if hi:
+            bounds.append(f"{'<=' if inclusive else '<'}{hi}")
+        parts.append(", ".join(bounds) or "*")
+    return " || ".join(parts)
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
@@ -1,11 +1,17 @@
 """
 漏洞掃描器 - Vulnerability Scanner
 掃描依賴項的已知安全漏洞
+
+批量掃描：相同套件版本只查詢一次，各數據源並發查詢並分別限速；
+離線索引覆蓋的數據源直接本地查找，其餘在線查詢結果按 TTL 緩存。
 """
 
+import asyncio
 import logging
+import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
 from ..models.dependency import Dependency, Ecosystem
 from ..models.vulnerability import (
@@ -14,17 +20,101 @@ from ..models.vulnerability import (
     VulnerabilitySeverity,
     VulnerabilitySource,
 )
+from .advisory_index import AdvisoryIndex
 
 logger = logging.getLogger(__name__)
 
+# (生態系統, 套件名稱, 版本)
+PackageKey = tuple[Ecosystem, str, str]
+
 
 @dataclass
 class ScanConfig:
-    """掃描配置"""
+    """
+    掃描配置
+
+    Attributes:
+        rate_limits: 各數據源每秒最大請求數，未列出的數據源不限速
+        max_concurrency: 在線查詢的最大並發數
+        cache_ttl_seconds: 在線查詢結果緩存時間，0 表示不緩存
+        advisory_index: 離線公告索引路徑 (可選)
+        offline: 只使用離線索引，不發送任何在線請求
+    """
     sources: list[VulnerabilitySource]
     severity_threshold: VulnerabilitySeverity = VulnerabilitySeverity.MEDIUM
     include_dev_dependencies: bool = True
     timeout_seconds: int = 30
+    rate_limits: dict[VulnerabilitySource, float] = field(default_factory=dict)
+    max_concurrency: int = 32
+    cache_ttl_seconds: int = 3600
+    advisory_index: str | None = None
+    offline: bool = False
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ScanConfig":
+        """由配置文件 (scanning.vulnerabilities) 建立"""
+        return cls(
+            sources=[VulnerabilitySource(s) for s in data.get('sources', ['nvd', 'ghsa', 'osv'])],
+            severity_threshold=VulnerabilitySeverity(data.get('severity_threshold', 'MEDIUM')),
+            include_dev_dependencies=data.get('include_dev_dependencies', True),
+            timeout_seconds=data.get('timeout_seconds', 30),
+            rate_limits={
+                VulnerabilitySource(name): float(rate)
+                for name, rate in (data.get('rate_limits') or {}).items()
+            },
+            max_concurrency=data.get('max_concurrency', 32),
+            cache_ttl_seconds=data.get('cache_ttl_seconds', 3600),
+            advisory_index=data.get('advisory_index'),
+            offline=data.get('offline', False),
+        )
+
+
+class RateLimiter:
+    """令牌桶限速器：平均每秒 rate 個請求，允許 burst 個突發"""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ResultCache:
+    """在線查詢結果的 TTL 緩存"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[tuple, tuple[float, list[Vulnerability]]] = {}
+
+    def get(self, key: tuple) -> list[Vulnerability] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[1]
+
+    def put(self, key: tuple, value: list[Vulnerability]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # 按插入順序淘汰最舊的條目
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
 
 
 class VulnerabilityScanner:
@@ -35,6 +125,8 @@ class VulnerabilityScanner:
     - NVD (美國國家漏洞數據庫)
     - GHSA (GitHub Security Advisories)
     - OSV (Open Source Vulnerabilities)
+
+    配置了離線索引時，索引已導入的數據源改為本地查找。
     """
 
     def __init__(self, config: ScanConfig | None = None):
@@ -51,6 +143,13 @@ class VulnerabilityScanner:
                 VulnerabilitySource.OSV
             ]
         )
+        self.index: AdvisoryIndex | None = (
+            AdvisoryIndex(self.config.advisory_index) if self.config.advisory_index else None
+        )
+        self._limiters = {
+            source: RateLimiter(rate) for source, rate in self.config.rate_limits.items() if rate > 0
+        }
+        self._cache = ResultCache(self.config.cache_ttl_seconds)
         logger.info(f"漏洞掃描器初始化完成，數據源: {[s.value for s in self.config.sources]}")
 
     async def scan(
@@ -71,29 +170,21 @@ class VulnerabilityScanner:
 
         logger.info(f"開始漏洞掃描 [{scan_id}]: {len(dependencies)} 個依賴項")
 
-        # 追蹤已掃描的套件避免重複
-        scanned: set[str] = set()
-
+        # 相同套件版本只查詢一次，結果標記到所有對應的依賴項
+        groups: dict[PackageKey, list[Dependency]] = {}
         for dep in dependencies:
-            package_key = f"{dep.ecosystem.value}:{dep.name}@{dep.current_version}"
-
-            if package_key in scanned:
-                continue
-            scanned.add(package_key)
+            groups.setdefault((dep.ecosystem, dep.name, dep.current_version), []).append(dep)
 
-            # 掃描每個數據源
-            vulnerabilities = await self._scan_package(
-                dep.name,
-                dep.current_version,
-                dep.ecosystem
-            )
+        found = await self.scan_packages(list(groups))
 
-            for vuln in vulnerabilities:
+        for key, deps in groups.items():
+            for vuln in found[key]:
                 # 檢查是否符合嚴重程度閾值
                 if self._meets_threshold(vuln.severity):
                     result.add_vulnerability(vuln)
-                    dep.has_vulnerability = True
-                    dep.vulnerability_count += 1
+                    for dep in deps:
+                        dep.has_vulnerability = True
+                        dep.vulnerability_count += 1
 
         logger.info(
             f"掃描完成 [{scan_id}]: 發現 {result.total_count} 個漏洞 "
@@ -102,6 +193,46 @@ class VulnerabilityScanner:
 
         return result
 
+    async def scan_packages(
+        self,
+        packages: list[PackageKey]
+    ) -> dict[PackageKey, list[Vulnerability]]:
+        """
+        批量掃描套件
+
+        離線索引覆蓋的數據源本地查找；其餘數據源 (offline 時跳過) 對所有
+        套件並發查詢，受 max_concurrency 與各數據源限速約束。
+
+        Args:
+            packages: (生態系統, 套件名稱, 版本) 列表
+
+        Returns:
+            每個套件去重後的漏洞列表
+        """
+        results: dict[PackageKey, list[Vulnerability]] = {key: [] for key in packages}
+
+        indexed = self.index.sources & set(self.config.sources) if self.index else set()
+        if indexed:
+            for key in results:
+                ecosystem, name, version = key
+                results[key].extend(self.index.lookup(ecosystem, name, version, indexed))
+
+        live = [] if self.config.offline else [s for s in self.config.sources if s not in indexed]
+        if live:
+            semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+            async def query(key: PackageKey, source: VulnerabilitySource) -> list[Vulnerability]:
+                async with semaphore:
+                    return await self._query_cached(source, *key)
+
+            keys = list(results)
+            responses = await asyncio.gather(*(query(key, source) for key in keys for source in live))
+            for i, vulns in enumerate(responses):
+                results[keys[i // len(live)]].extend(vulns)
+
+        # 去重（同一漏洞可能在多個數據源中出現）
+        return {key: self._deduplicate(vulns) for key, vulns in results.items()}
+
     async def _scan_package(
         self,
         package_name: str,
@@ -119,24 +250,36 @@ class VulnerabilityScanner:
         Returns:
             發現的漏洞列表
         """
-        vulnerabilities = []
-
-        for source in self.config.sources:
-            try:
-                source_vulns = await self._query_source(
-                    source,
-                    package_name,
-                    version,
-                    ecosystem
-                )
-                vulnerabilities.extend(source_vulns)
-            except Exception as e:
-                logger.warning(f"查詢 {source.value} 時發生錯誤: {e}")
+        key = (ecosystem, package_name, version)
+        return (await self.scan_packages([key]))[key]
 
-        # 去重（同一漏洞可能在多個數據源中出現）
-        unique_vulns = self._deduplicate(vulnerabilities)
+    async def _query_cached(
+        self,
+        source: VulnerabilitySource,
+        ecosystem: Ecosystem,
+        package_name: str,
+        version: str
+    ) -> list[Vulnerability]:
+        """經 TTL 緩存與限速查詢在線數據源，失敗時返回空列表且不緩存"""
+        cache_key = (source, ecosystem, package_name, version)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        limiter = self._limiters.get(source)
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            vulns = await asyncio.wait_for(
+                self._query_source(source, package_name, version, ecosystem),
+                self.config.timeout_seconds
+            )
+        except Exception as e:
+            logger.warning(f"查詢 {source.value} 時發生錯誤: {e}")
+            return []
 
-        return unique_vulns
+        self._cache.put(cache_key, vulns)
+        return vulns
 
     async def _query_source(
         self,
@@ -4,13 +4,17 @@
 """
 
 from .audit_logger import AuditEvent, AuditEventType, AuditLogger
+from .dependency_graph import DependencyGraph
 from .dependency_tree import DependencyTree, TreeNode
+from .json_stream import JsonStream
 from .language_boundary import LanguageBoundary, OutputLanguage, msg, t
 from .policy_simulator import PolicySimulator, SimulationResult, SimulationScenario
 
 __all__ = [
     "DependencyTree",
+    "DependencyGraph",
     "TreeNode",
+    "JsonStream",
     "AuditLogger",
     "AuditEvent",
     "AuditEventType",
@@ -0,0 +1,290 @@
+"""
+依賴圖模組 - Dependency Graph
+以整數節點 ID 與數組存儲的去重依賴圖
+
+- 套件名稱與版本字符串駐留 (intern)，相同 name@version 只有一個節點
+- 邊以 CSR (壓縮稀疏行) 數組存儲，正向與反向各一份
+- freeze() 時預先計算深度與最短路徑樹；mark_vulnerable() 預先計算
+  可到達漏洞節點的集合，路徑查詢只需沿父指針回溯
+"""
+
+import logging
+from array import array
+from collections import deque
+from collections.abc import Iterable
+
+from ..models.dependency import Dependency, DependencyType, Ecosystem
+
+logger = logging.getLogger(__name__)
+
+# 節點標記
+FLAG_DEV = 1
+FLAG_OPTIONAL = 2
+FLAG_PEER = 4
+
+# 未到達節點的深度
+UNREACHABLE = -1
+
+
+class DependencyGraph:
+    """
+    依賴圖
+
+    使用方式:
+        graph = DependencyGraph(Ecosystem.NPM)
+        a = graph.add_node("express", "4.18.0")
+        b = graph.add_node("qs", "6.11.0")
+        graph.add_edge(a, b)
+        graph.add_root(a)
+        graph.freeze()
+        graph.mark_vulnerable([b])
+        graph.vulnerable_paths()  # [["express", "qs"]]
+    """
+
+    def __init__(self, ecosystem: Ecosystem | None = None):
+        self.ecosystem = ecosystem
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self._node_ids: dict[tuple[int, int], int] = {}
+
+        self.node_name = array('i')
+        self.node_version = array('i')
+        self.node_flags = bytearray()
+        self.is_root = bytearray()
+
+        # 構建期間的邊列表，freeze() 後轉為 CSR
+        self._edge_src = array('i')
+        self._edge_dst = array('i')
+
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        self.reverse_offsets = array('i', [0])
+        self.reverse_targets = array('i')
+        self.depth = array('i')
+        self.bfs_parent = array('i')
+        self.vulnerable = bytearray()
+        self.reaches_vulnerable = bytearray()
+        self._by_name: dict[int, list[int]] = {}
+        self._frozen = False
+
+    def __len__(self) -> int:
+        return len(self.node_name)
+
+    # ------------------------------------------------------------------
+    # 構建
+    # ------------------------------------------------------------------
+
+    def intern(self, value: str) -> int:
+        """駐留字符串並返回其 ID"""
+        sid = self._string_ids.get(value)
+        if sid is None:
+            sid = len(self.strings)
+            self._string_ids[value] = sid
+            self.strings.append(value)
+        return sid
+
+    def add_node(self, name: str, version: str, flags: int = 0) -> int:
+        """
+        添加節點，相同 name@version 返回既有節點
+
+        重複出現時 dev/optional 標記取交集：只要有一處為生產依賴即視為生產依賴。
+        """
+        key = (self.intern(name), self.intern(version))
+        node = self._node_ids.get(key)
+        if node is not None:
+            self.node_flags[node] &= flags
+            return node
+        node = len(self.node_name)
+        self._node_ids[key] = node
+        self.node_name.append(key[0])
+        self.node_version.append(key[1])
+        self.node_flags.append(flags)
+        self.is_root.append(0)
+        self._frozen = False
+        return node
+
+    def add_edge(self, src: int, dst: int) -> None:
+        self._edge_src.append(src)
+        self._edge_dst.append(dst)
+        self._frozen = False
+
+    def add_root(self, node: int) -> None:
+        self.is_root[node] = 1
+
+    def freeze(self) -> "DependencyGraph":
+        """
+        建立 CSR 鄰接數組並預先計算深度與最短路徑樹
+
+        未標記任何根節點時，以入度為 0 的節點為根。
+        """
+        n = len(self)
+        self.offsets, self.targets = _csr(n, self._edge_src, self._edge_dst)
+        self.reverse_offsets, self.reverse_targets = _csr(n, self._edge_dst, self._edge_src)
+
+        if not any(self.is_root):
+            for node in range(n):
+                if self.reverse_offsets[node] == self.reverse_offsets[node + 1]:
+                    self.is_root[node] = 1
+
+        # 多源 BFS：深度為距最近根節點的距離，父指針構成最短路徑樹
+        self.depth = array('i', [UNREACHABLE]) * n
+        self.bfs_parent = array('i', [-1]) * n
+        queue = deque(node for node in range(n) if self.is_root[node])
+        for node in queue:
+            self.depth[node] = 0
+        while queue:
+            node = queue.popleft()
+            next_depth = self.depth[node] + 1
+            for child in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+                if self.depth[child] == UNREACHABLE:
+                    self.depth[child] = next_depth
+                    self.bfs_parent[child] = node
+                    queue.append(child)
+
+        self._by_name = {}
+        for node, name in enumerate(self.node_name):
+            self._by_name.setdefault(name, []).append(node)
+
+        self.vulnerable = bytearray(n)
+        self.reaches_vulnerable = bytearray(n)
+        self._frozen = True
+        logger.info(f"依賴圖建構完成: {n} 個節點, {len(self.targets)} 條邊")
+        return self
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def _require_frozen(self) -> None:
+        if not self._frozen:
+            self.freeze()
+
+    def name(self, node: int) -> str:
+        return self.strings[self.node_name[node]]
+
+    def version(self, node: int) -> str:
+        return self.strings[self.node_version[node]]
+
+    def label(self, node: int) -> str:
+        return f"{self.name(node)}@{self.version(node)}"
+
+    def roots(self) -> list[int]:
+        self._require_frozen()
+        return [node for node in range(len(self)) if self.is_root[node]]
+
+    def children(self, node: int) -> array:
+        self._require_frozen()
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def parents(self, node: int) -> array:
+        self._require_frozen()
+        return self.reverse_targets[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    def find(self, name: str, version: str | None = None) -> list[int]:
+        """按名稱 (及版本) 查找節點"""
+        self._require_frozen()
+        sid = self._string_ids.get(name)
+        if sid is None:
+            return []
+        nodes = self._by_name.get(sid, [])
+        if version is None:
+            return list(nodes)
+        return [node for node in nodes if self.version(node) == version]
+
+    def path_to(self, node: int) -> list[int]:
+        """從最近的根節點到該節點的最短路徑；不可到達時返回空列表"""
+        self._require_frozen()
+        if self.depth[node] == UNREACHABLE:
+            return []
+        path = [node]
+        while self.bfs_parent[node] != -1:
+            node = self.bfs_parent[node]
+            path.append(node)
+        path.reverse()
+        return path
+
+    def mark_vulnerable(self, nodes: Iterable[int]) -> None:
+        """標記漏洞節點並預先計算可到達漏洞的節點集合 (反向 BFS)"""
+        self._require_frozen()
+        self.vulnerable = bytearray(len(self))
+        self.reaches_vulnerable = bytearray(len(self))
+        queue = deque()
+        for node in nodes:
+            if not self.vulnerable[node]:
+                self.vulnerable[node] = 1
+                self.reaches_vulnerable[node] = 1
+                queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for parent in self.reverse_targets[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]:
+                if not self.reaches_vulnerable[parent]:
+                    self.reaches_vulnerable[parent] = 1
+                    queue.append(parent)
+
+    def vulnerable_paths(self) -> list[list[str]]:
+        """每個可到達的漏洞節點一條最短路徑 (依賴名稱列表)"""
+        self._require_frozen()
+        return [
+            [self.name(step) for step in self.path_to(node)]
+            for node in range(len(self))
+            if self.vulnerable[node] and self.depth[node] != UNREACHABLE
+        ]
+
+    def statistics(self) -> dict:
+        """節點、邊、深度與漏洞可達性統計"""
+        self._require_frozen()
+        return {
+            "total_dependencies": len(self),
+            "direct_dependencies": sum(self.is_root),
+            "edges": len(self.targets),
+            "max_depth": max(self.depth, default=0),
+            "unreachable": sum(1 for d in self.depth if d == UNREACHABLE),
+            "vulnerable_count": sum(self.vulnerable),
+            "reaches_vulnerable": sum(self.reaches_vulnerable),
+        }
+
+    def to_dependencies(self) -> list[Dependency]:
+        """每個去重後的節點生成一個 Dependency"""
+        self._require_frozen()
+        ecosystem = self.ecosystem or Ecosystem.NPM
+        dependencies = []
+        for node in range(len(self)):
+            flags = self.node_flags[node]
+            if flags & FLAG_DEV:
+                dep_type = DependencyType.DEV
+            elif flags & FLAG_OPTIONAL:
+                dep_type = DependencyType.OPTIONAL
+            elif flags & FLAG_PEER:
+                dep_type = DependencyType.PEER
+            elif self.is_root[node]:
+                dep_type = DependencyType.DIRECT
+            else:
+                dep_type = DependencyType.TRANSITIVE
+            dependencies.append(Dependency(
+                name=self.name(node),
+                current_version=self.version(node),
+                ecosystem=ecosystem,
+                dep_type=dep_type
+            ))
+        return dependencies
+
+
+def _csr(n: int, src: array, dst: array) -> tuple[array, array]:
+    """計數排序建立 CSR 偏移與目標數組，每行去重並排序"""
+    starts = array('i', [0]) * (n + 1)
+    for node in src:
+        starts[node + 1] += 1
+    for i in range(n):
+        starts[i + 1] += starts[i]
+    fill = starts[:-1]
+    bucketed = array('i', [0]) * len(src)
+    for s, d in zip(src, dst, strict=True):
+        bucketed[fill[s]] = d
+        fill[s] += 1
+
+    offsets = array('i', [0]) * (n + 1)
+    targets = array('i')
+    for i in range(n):
+        targets.extend(sorted(set(bucketed[starts[i]:starts[i + 1]])))
+        offsets[i + 1] = len(targets)
+    return offsets, targets
@@ -1,6 +1,9 @@
 """
 依賴樹模組 - Dependency Tree
 依賴關係樹狀視覺化
+
+統計與漏洞路徑查詢由 build_tree() 同時建立的 DependencyGraph 回答，
+每個節點只訪問一次 (共享子依賴與循環依賴不會被重複遍歷)。
 """
 
 import logging
@@ -8,6 +11,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 
 from ..models.dependency import Dependency, DependencyStatus
+from .dependency_graph import UNREACHABLE, DependencyGraph
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +80,9 @@ class DependencyTree:
         self.project_name = project_name
         self.root_nodes: list[TreeNode] = []
         self._all_nodes: dict[str, TreeNode] = {}
+        self.graph = DependencyGraph()
+        # 圖節點 ID 對應的樹節點
+        self._graph_nodes: list[TreeNode] = []
 
         logger.info(f"初始化依賴樹: {project_name}")
 
@@ -119,8 +126,35 @@ class DependencyTree:
             if name not in children_set:
                 self.root_nodes.append(node)
 
+        self._build_graph(parent_map or {}, children_set)
+
         logger.info(f"依賴樹建構完成: {len(self.root_nodes)} 個根節點, {len(self._all_nodes)} 個總節點")
 
+    def _build_graph(self, parent_map: dict[str, list[str]], children_set: set[str]) -> None:
+        """以唯一的樹節點建立依賴圖，節點 ID 與 _graph_nodes 下標一致"""
+        self.graph = DependencyGraph()
+        self._graph_nodes = list(self._all_nodes.values())
+        ids = {
+            name: self.graph.add_node(name, node.dependency.current_version)
+            for name, node in self._all_nodes.items()
+        }
+        for parent_name, children in parent_map.items():
+            if parent_name in ids:
+                for child_name in children:
+                    if child_name in ids:
+                        self.graph.add_edge(ids[parent_name], ids[child_name])
+        for name, node_id in ids.items():
+            if name not in children_set:
+                self.graph.add_root(node_id)
+        self.graph.freeze()
+        self._sync_vulnerabilities()
+
+    def _sync_vulnerabilities(self) -> None:
+        """依賴項的漏洞標記變化時重新計算可達性"""
+        vulnerable = [i for i, node in enumerate(self._graph_nodes) if node.dependency.has_vulnerability]
+        if vulnerable != [i for i, flag in enumerate(self.graph.vulnerable) if flag]:
+            self.graph.mark_vulnerable(vulnerable)
+
     def _calculate_risk(self, dep: Dependency) -> RiskLevel:
         """
         計算依賴項的風險等級
@@ -245,6 +279,8 @@ class DependencyTree:
         """
         獲取依賴樹統計資訊
         
+        每個依賴項只計算一次；max_depth 為距最近根節點的最長最短路徑。
+        
         Returns:
             統計資訊字典
         """
@@ -263,8 +299,10 @@ class DependencyTree:
             "outdated_count": 0
         }
 
-        def process_node(node: TreeNode, depth: int = 0):
-            stats["max_depth"] = max(stats["max_depth"], depth)
+        for node_id, node in enumerate(self._graph_nodes):
+            if self.graph.depth[node_id] == UNREACHABLE:
+                continue
+            stats["max_depth"] = max(stats["max_depth"], self.graph.depth[node_id])
             stats["risk_summary"][node.risk_level.value] += 1
 
             if node.dependency.has_vulnerability:
@@ -272,33 +310,16 @@ class DependencyTree:
             if node.dependency.is_outdated():
                 stats["outdated_count"] += 1
 
-            for child in node.children:
-                process_node(child, depth + 1)
-
-        for root in self.root_nodes:
-            process_node(root)
-
         return stats
 
     def find_path_to_vulnerable(self) -> list[list[str]]:
         """
         找出到有漏洞依賴的路徑
         
+        每個有漏洞的依賴返回一條自根節點起的最短路徑。
+        
         Returns:
             路徑列表，每個路徑是依賴名稱列表
         """
-        paths = []
-
-        def find_paths(node: TreeNode, current_path: list[str]):
-            current_path = current_path + [node.dependency.name]
-
-            if node.dependency.has_vulnerability:
-                paths.append(current_path)
-
-            for child in node.children:
-                find_paths(child, current_path)
-
-        for root in self.root_nodes:
-            find_paths(root, [])
-
-        return paths
+        self._sync_vulnerabilities()
+        return self.graph.vulnerable_paths()
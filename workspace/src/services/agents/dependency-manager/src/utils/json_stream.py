@@ -0,0 +1,163 @@
+"""
+JSON 串流讀取 - JSON Stream Reader
+按需逐項讀取大型 JSON 文件，不在內存中構建整個文檔
+
+只有調用 read_value() 的值會被解碼；skip_value() 以字元掃描跳過值，
+不構建任何對象，因此讀取 50MB+ 的 lock 文件時內存佔用只與單個條目相當。
+"""
+
+import json
+import re
+from collections.abc import Iterator
+from typing import IO, Any
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_SCALAR_END = re.compile(r'[,}\]\s]')
+
+
+class JsonStreamError(ValueError):
+    """JSON 格式錯誤"""
+
+
+class JsonStream:
+    """
+    JSON 串流讀取器
+
+    使用方式:
+        stream = JsonStream(f)
+        for key in stream.object_items():
+            if key == "packages":
+                for path in stream.object_items():
+                    info = stream.read_value()
+            else:
+                stream.skip_value()
+
+    object_items() 每產出一個鍵，調用方必須以 read_value()、skip_value() 或
+    嵌套的 object_items() 消費其值後再繼續迭代。
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """讀入更多數據並丟棄已消費部分；已到文件末尾時返回 False"""
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise JsonStreamError("JSON 意外結束")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise JsonStreamError(f"位置 {self._pos} 預期 {char!r}，實際為 {self._buf[self._pos]!r}")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """解碼並返回下一個值"""
+        if self._peek() not in '{["':
+            # 數字與字面量須讀到分隔符為止，避免在緩衝區邊界被截斷
+            while not _SCALAR_END.search(self._buf, self._pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """跳過下一個值而不解碼"""
+        char = self._peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in '{[':
+            while True:
+                match = _SCALAR_END.search(self._buf, self._pos)
+                if match:
+                    self._pos = match.start()
+                    return
+                if not self._fill():
+                    self._pos = len(self._buf)
+                    return
+
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise JsonStreamError("JSON 意外結束")
+                continue
+            self._pos = match.start()
+            token = match.group()
+            if token == '"':
+                self._skip_string()
+                continue
+            self._pos += 1
+            depth += 1 if token in '{[' else -1
+            if depth == 0:
+                return
+
+    def _skip_string(self) -> None:
+        while True:
+            match = _STRING.match(self._buf, self._pos)
+            if match:
+                self._pos = match.end()
+                return
+            if not self._fill():
+                raise JsonStreamError("字符串未結束")
+
+    def _read_key(self) -> str:
+        if self._peek() != '"':
+            raise JsonStreamError(f"位置 {self._pos} 預期對象鍵")
+        while True:
+            match = _STRING.match(self._buf, self._pos)
+            if match:
+                self._pos = match.end()
+                return json.loads(match.group())
+            if not self._fill():
+                raise JsonStreamError("字符串未結束")
+
+    def object_items(self) -> Iterator[str]:
+        """逐個產出對象的鍵，值由調用方消費"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._read_key()
+            self._expect(':')
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise JsonStreamError(f"位置 {self._pos - 1} 預期 ',' 或 '}}'")
+
+    def peek_type(self) -> str:
+        """下一個值的首字元 ('{'、'['、'"' 等)"""
+        return self._peek()
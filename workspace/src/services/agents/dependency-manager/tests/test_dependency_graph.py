@@ -0,0 +1,197 @@
+"""
+依賴圖與串流 lock 文件解析測試
+Tests for streaming lockfile parsing and the dependency graph
+"""
+
+import asyncio
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 分析器使用包內相對導入，需以 src 包的形式導入
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzers.go_analyzer import GoAnalyzer
+from src.analyzers.npm_analyzer import NpmAnalyzer
+from src.models.dependency import Dependency, DependencyType, Ecosystem
+from src.utils.dependency_graph import UNREACHABLE, DependencyGraph
+from src.utils.dependency_tree import DependencyTree
+from src.utils.json_stream import JsonStream
+
+LOCK_V3 = {
+    "name": "app",
+    "lockfileVersion": 3,
+    "requires": True,
+    "packages": {
+        "": {
+            "name": "app",
+            "workspaces": ["packages/lib"],
+            "dependencies": {"express": "^4.18.0"},
+            "devDependencies": {"jest": "^29.0.0"},
+        },
+        "node_modules/express": {"version": "4.18.0", "dependencies": {"qs": "6.11.0", "debug": "2.6.9"}},
+        "node_modules/qs": {"version": "6.11.0"},
+        "node_modules/debug": {"version": "2.6.9", "dependencies": {"ms": "2.0.0"}},
+        "node_modules/ms": {"version": "2.1.3"},
+        "node_modules/debug/node_modules/ms": {"version": "2.0.0"},
+        "node_modules/jest": {"version": "29.0.0", "dev": True, "dependencies": {"debug": "^2.6.9"}},
+        "node_modules/@scope/lib": {"resolved": "packages/lib", "link": True},
+        "packages/lib": {"name": "@scope/lib", "version": "1.0.0", "dependencies": {"ms": "^2.1.0"}},
+    },
+}
+
+LOCK_V1 = {
+    "name": "legacy",
+    "lockfileVersion": 1,
+    "requires": True,
+    "dependencies": {
+        "a": {"version": "1.0.0", "requires": {"b": "^1.0.0", "c": "^1.0.0"}},
+        "b": {
+            "version": "1.0.0",
+            "requires": {"c": "^2.0.0"},
+            "dependencies": {"c": {"version": "2.0.0"}},
+        },
+        "c": {"version": "1.0.0", "dev": True},
+    },
+}
+
+
+def write_json(path: Path, data: dict) -> Path:
+    path.write_text(json.dumps(data, indent=2))
+    return path
+
+
+class TestJsonStream:
+    """JSON 串流讀取測試"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64])
+    def test_read_and_skip_across_chunks(self, chunk_size):
+        """測試跨緩衝區邊界讀取與跳過"""
+        text = json.dumps({"skip": {"x": ["}", '\\"', 1.5e3]}, "n": -2500.25, "obj": {"a": [1, {"b": None}]}})
+        stream = JsonStream(io.StringIO(text), chunk_size=chunk_size)
+        seen = {}
+        for key in stream.object_items():
+            if key == "skip":
+                stream.skip_value()
+            else:
+                seen[key] = stream.read_value()
+        assert seen == {"n": -2500.25, "obj": {"a": [1, {"b": None}]}}
+
+
+class TestDependencyGraph:
+    """依賴圖測試"""
+
+    def test_dedup_csr_and_paths(self):
+        """測試節點去重、邊去重與最短路徑"""
+        graph = DependencyGraph(Ecosystem.NPM)
+        a = graph.add_node("a", "1.0.0")
+        b = graph.add_node("b", "1.0.0")
+        c = graph.add_node("c", "1.0.0")
+        assert graph.add_node("a", "1.0.0") == a
+        graph.add_edge(a, b)
+        graph.add_edge(a, b)
+        graph.add_edge(b, c)
+        graph.add_edge(c, b)  # 循環
+        graph.add_edge(a, c)
+        graph.freeze()
+
+        assert graph.roots() == [a]
+        assert list(graph.children(a)) == [b, c]
+        assert list(graph.parents(b)) == [a, c]
+        assert graph.path_to(c) == [a, c]
+
+        graph.mark_vulnerable([c])
+        assert graph.vulnerable_paths() == [["a", "c"]]
+        assert list(graph.reaches_vulnerable) == [1, 1, 1]
+        assert graph.statistics()["max_depth"] == 1
+
+
+class TestLockfileParsing:
+    """lock 文件串流解析測試"""
+
+    def test_npm_v3_packages(self, tmp_path):
+        """測試 v2/v3 packages 段的解析規則、workspace 與去重"""
+        graph = NpmAnalyzer().build_lock_graph(write_json(tmp_path / "package-lock.json", LOCK_V3))
+
+        assert len(graph) == 7
+        [express] = graph.find("express")
+        [nested_ms] = graph.find("ms", "2.0.0")
+        [lib] = graph.find("@scope/lib")
+        assert sorted(graph.label(n) for n in graph.roots()) == [
+            "@scope/lib@1.0.0", "express@4.18.0", "jest@29.0.0"
+        ]
+        assert [graph.label(n) for n in graph.path_to(nested_ms)] == [
+            "express@4.18.0", "debug@2.6.9", "ms@2.0.0"
+        ]
+        assert [graph.label(n) for n in graph.children(lib)] == ["ms@2.1.3"]
+        assert graph.depth[express] == 0
+
+        deps = {d.name + "@" + d.current_version: d for d in graph.to_dependencies()}
+        assert deps["jest@29.0.0"].dep_type == DependencyType.DEV
+        assert deps["express@4.18.0"].dep_type == DependencyType.DIRECT
+        assert deps["qs@6.11.0"].dep_type == DependencyType.TRANSITIVE
+
+    def test_npm_v1_nested_scopes(self, tmp_path):
+        """測試 v1 嵌套作用域的 requires 解析"""
+        graph = NpmAnalyzer().build_lock_graph(write_json(tmp_path / "package-lock.json", LOCK_V1))
+
+        [a] = graph.find("a")
+        [b] = graph.find("b")
+        assert graph.roots() == [a]
+        assert sorted(graph.label(n) for n in graph.children(a)) == ["b@1.0.0", "c@1.0.0"]
+        assert [graph.label(n) for n in graph.children(b)] == ["c@2.0.0"]
+
+    def test_parse_lock_file_is_deduplicated(self, tmp_path):
+        """測試 parse_lock_file 每個 name@version 只返回一次"""
+        deps = asyncio.run(NpmAnalyzer().parse_lock_file(write_json(tmp_path / "package-lock.json", LOCK_V3)))
+        labels = [f"{d.name}@{d.current_version}" for d in deps]
+        assert len(labels) == len(set(labels)) == 7
+
+    def test_go_mod_graph(self):
+        """測試 go mod graph 輸出建圖"""
+        lines = [
+            "example.com/app github.com/a/x@v1.2.0",
+            "example.com/app github.com/b/y@v0.3.0",
+            "github.com/a/x@v1.2.0 github.com/b/y@v0.3.0",
+            "github.com/b/y@v0.3.0 golang.org/x/text@v0.3.7",
+        ]
+        graph = GoAnalyzer().build_mod_graph(lines)
+
+        [text] = graph.find("golang.org/x/text")
+        assert len(graph.roots()) == 2
+        assert [graph.name(n) for n in graph.path_to(text)] == ["github.com/b/y", "golang.org/x/text"]
+        assert graph.version(text) == "0.3.7"
+
+
+class TestDependencyTreeQueries:
+    """依賴樹統計與漏洞路徑測試"""
+
+    def test_shared_and_cyclic_dependencies(self):
+        """測試共享與循環依賴只計算一次"""
+        deps = [
+            Dependency(name="app-a", current_version="1.0.0", ecosystem=Ecosystem.NPM),
+            Dependency(name="app-b", current_version="1.0.0", ecosystem=Ecosystem.NPM),
+            Dependency(name="shared", current_version="1.0.0", ecosystem=Ecosystem.NPM),
+            Dependency(name="vuln", current_version="1.0.0", ecosystem=Ecosystem.NPM, has_vulnerability=True),
+        ]
+        tree = DependencyTree("test-project")
+        tree.build_tree(deps, {
+            "app-a": ["shared"],
+            "app-b": ["shared"],
+            "shared": ["vuln"],
+            "vuln": ["shared"],
+        })
+
+        stats = tree.get_statistics()
+        assert stats["total_dependencies"] == 4
+        assert stats["vulnerable_count"] == 1
+        assert stats["max_depth"] == 2
+        assert tree.find_path_to_vulnerable() == [["app-a", "shared", "vuln"]]
+
+        deps[3].has_vulnerability = False
+        deps[2].has_vulnerability = True
+        assert tree.find_path_to_vulnerable() == [["app-a", "shared"]]
+        assert tree.graph.depth[0] != UNREACHABLE
@@ -0,0 +1,167 @@
+"""
+漏洞掃描器測試
+Tests for batch vulnerability scanning and the offline advisory index
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 掃描器使用包內相對導入，需以 src 包的形式導入
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.dependency import Dependency, Ecosystem
+from src.models.vulnerability import Vulnerability, VulnerabilitySeverity, VulnerabilitySource
+from src.scanners.advisory_index import AdvisoryIndex, compile_ranges, version_key
+from src.scanners.vulnerability_scanner import ScanConfig, VulnerabilityScanner
+
+ADVISORIES = [
+    {
+        "id": "GHSA-aaaa-bbbb-cccc",
+        "aliases": ["CVE-2020-8203"],
+        "summary": "Prototype pollution in lodash",
+        "database_specific": {"severity": "HIGH"},
+        "affected": [{
+            "package": {"ecosystem": "npm", "name": "lodash"},
+            "ranges": [{"type": "SEMVER", "events": [{"introduced": "0"}, {"fixed": "4.17.19"}]}],
+        }],
+    },
+    {
+        "id": "PYSEC-2021-1",
+        "summary": "Issue in Django",
+        "severity": [{"type": "CVSS_V3", "score": "9.8"}],
+        "affected": [{
+            "package": {"ecosystem": "PyPI", "name": "Django"},
+            "ranges": [{"type": "ECOSYSTEM", "events": [
+                {"introduced": "3.0"}, {"fixed": "3.0.14"},
+                {"introduced": "3.1"}, {"last_affected": "3.1.8"},
+            ]}],
+            "versions": ["2.2.0rc1"],
+        }],
+    },
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    dump = tmp_path / "advisories"
+    dump.mkdir()
+    for advisory in ADVISORIES:
+        (dump / f"{advisory['id']}.json").write_text(json.dumps(advisory))
+    index = AdvisoryIndex(str(tmp_path / "advisories.sqlite3"))
+    index.import_dumps([dump])
+    yield index
+    index.close()
+
+
+class TestVersionMatching:
+    """版本比較與範圍編譯測試"""
+
+    def test_version_key_ordering(self):
+        """測試版本排序"""
+        ordered = ["1.0.dev1", "1.0.0-alpha", "1.0.0-rc.1", "1.0", "v1.0.1", "1.0.1.post1", "1.10.0"]
+        assert sorted(ordered, key=version_key) == ordered
+        assert version_key("1.0") == version_key("1.0.0")
+
+    def test_compile_ranges(self):
+        """測試範圍事件編譯為區間"""
+        intervals, versions = compile_ranges(ADVISORIES[1]["affected"][0])
+        assert intervals == [["3.0", "3.0.14", False], ["3.1", "3.1.8", True]]
+        assert versions == ["2.2.0rc1"]
+
+
+class TestAdvisoryIndex:
+    """離線公告索引測試"""
+
+    def test_lookup(self, index):
+        """測試按套件與版本查找"""
+        assert index.sources == {VulnerabilitySource.GHSA, VulnerabilitySource.OSV}
+        assert index.package_count == 2
+
+        vulns = index.lookup(Ecosystem.NPM, "lodash", "4.17.15")
+        assert [v.id for v in vulns] == ["GHSA-aaaa-bbbb-cccc"]
+        assert vulns[0].severity == VulnerabilitySeverity.HIGH
+        assert vulns[0].fixed_version == "4.17.19"
+        assert index.lookup(Ecosystem.NPM, "lodash", "4.17.19") == []
+
+    def test_lookup_normalizes_pypi_names(self, index):
+        """測試 PyPI 名稱規範化與區間邊界"""
+        assert index.lookup(Ecosystem.PIP, "django", "3.0.5")[0].severity == VulnerabilitySeverity.CRITICAL
+        assert index.lookup(Ecosystem.PIP, "Django", "3.1.8")[0].fixed_version is None
+        assert index.lookup(Ecosystem.PIP, "django", "3.1.9") == []
+        assert index.lookup(Ecosystem.PIP, "django", "2.2.0rc1")
+        assert index.lookup(Ecosystem.PIP, "django", "2.2") == []
+
+    def test_reimport_replaces_by_id(self, index, tmp_path):
+        """測試重新導入同 ID 公告時替換而非重複"""
+        updated = dict(ADVISORIES[0], summary="updated")
+        dump = tmp_path / "update.json"
+        dump.write_text(json.dumps([updated]))
+        assert index.import_dumps([dump]) == 1
+
+        vulns = index.lookup(Ecosystem.NPM, "lodash", "1.0.0")
+        assert [v.title for v in vulns] == ["updated"]
+
+
+class TestVulnerabilityScanner:
+    """批量漏洞掃描測試"""
+
+    def test_offline_scan_marks_all_duplicates(self, index):
+        """測試離線掃描並標記重複的依賴項"""
+        scanner = VulnerabilityScanner(ScanConfig(
+            sources=[VulnerabilitySource.GHSA, VulnerabilitySource.OSV],
+            advisory_index=index.path,
+            offline=True,
+        ))
+        deps = [
+            Dependency(name="lodash", current_version="4.17.15", ecosystem=Ecosystem.NPM),
+            Dependency(name="lodash", current_version="4.17.15", ecosystem=Ecosystem.NPM),
+            Dependency(name="django", current_version="3.0.1", ecosystem=Ecosystem.PIP),
+            Dependency(name="requests", current_version="2.31.0", ecosystem=Ecosystem.PIP),
+        ]
+
+        result = asyncio.run(scanner.scan(deps))
+
+        assert result.total_count == 2
+        assert result.critical_count == 1
+        assert all(d.has_vulnerability for d in deps[:3])
+        assert not deps[3].has_vulnerability
+
+    def test_live_sources_are_cached_and_bounded(self):
+        """測試在線查詢並發受限且結果被緩存"""
+        scanner = VulnerabilityScanner(ScanConfig(
+            sources=[VulnerabilitySource.OSV, VulnerabilitySource.NVD],
+            max_concurrency=4,
+        ))
+        calls = []
+        running = 0
+        peak = 0
+
+        async def fake_query(source, package_name, version, ecosystem):
+            nonlocal running, peak
+            calls.append((source, package_name))
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            if package_name == "pkg-0":
+                return [Vulnerability(id="CVE-1", package=package_name, severity=VulnerabilitySeverity.HIGH)]
+            return []
+
+        scanner._query_source = fake_query
+        packages = [(Ecosystem.NPM, f"pkg-{i}", "1.0.0") for i in range(20)]
+
+        async def scan_twice():
+            first = await scanner.scan_packages(packages)
+            second = await scanner.scan_packages(packages)
+            return first, second
+
+        first, second = asyncio.run(scan_twice())
+
+        assert len(calls) == 40
+        assert peak <= 4
+        assert [v.id for v in first[packages[0]]] == ["CVE-1"]
+        assert second == first
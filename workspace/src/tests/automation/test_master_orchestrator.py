@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Tests for master_orchestrator.py event bus, scheduling and engine discovery."""
+
+import asyncio
+import sys
+import textwrap
+from pathlib import Path
+
+# master_orchestrator 以頂層名稱導入 engine_base
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "tools" / "automation"))
+
+from engine_base import (
+    BaseEngine, EngineConfig, EngineEvent, EngineState, EngineType, ResourceConfig, TaskResult
+)
+from master_orchestrator import (
+    EngineRegistration, EngineRegistry, EngineScheduler, EventBus, MasterOrchestrator, OrchestratorConfig
+)
+
+
+class _QueueOnlyEngine(BaseEngine):
+    """只排隊不執行的引擎，用於觀察調度結果"""
+
+    async def _initialize(self) -> bool:
+        return True
+
+    async def _execute(self, task):
+        return TaskResult(task_id=task["task_id"], success=True)
+
+    async def _shutdown(self) -> bool:
+        return True
+
+    def _get_capabilities(self):
+        return {}
+
+
+def _event(event_type: str = "test.event", index: int = 0) -> EngineEvent:
+    return EngineEvent.create(event_type, "engine-1", {"index": index})
+
+
+def _register(registry: EngineRegistry, engine_id: str, max_tasks: int = 4, queued: int = 0) -> EngineRegistration:
+    config = EngineConfig(
+        engine_id=engine_id,
+        engine_type=EngineType.EXECUTION,
+        resource=ResourceConfig(max_concurrent_tasks=max_tasks),
+    )
+    engine = _QueueOnlyEngine(config)
+    engine._state = EngineState.RUNNING
+    engine._task_queue = asyncio.Queue()
+    for index in range(queued):
+        engine._task_queue.put_nowait({"task_id": f"{engine_id}-{index}"})
+    registration = EngineRegistration(
+        engine_id=engine_id,
+        engine_name=engine_id,
+        engine_class="_QueueOnlyEngine",
+        engine_type=EngineType.EXECUTION,
+        module_path="",
+        config=config,
+        instance=engine,
+        healthy=True,
+    )
+    registry.register_engine(registration)
+    return registration
+
+
+def _subscriber_stats(bus: EventBus, handler) -> dict:
+    [stats] = [s for s in bus.get_stats()["subscribers"] if s["handler"] == handler.__qualname__]
+    return stats
+
+
+class TestEventBus:
+    """事件總線背壓與處理器超時測試"""
+
+    def test_full_subscriber_queue_drops_only_for_that_subscriber(self):
+        """Test that a stalled subscriber drops events without starving others."""
+        async def scenario():
+            bus = EventBus(subscriber_queue_size=1, backpressure_timeout=0.01)
+            release = asyncio.Event()
+            fast_seen = []
+
+            async def slow(event):
+                await release.wait()
+
+            async def fast(event):
+                fast_seen.append(event.payload["index"])
+
+            bus.subscribe("test.event", slow)
+            bus.subscribe("test.event", fast)
+            await bus.start()
+            for index in range(4):
+                await bus.publish(_event(index=index))
+            await bus._queue.join()
+
+            release.set()
+            await bus.join()
+            await bus.stop()
+            return bus, slow, fast, fast_seen
+
+        bus, slow, fast, fast_seen = asyncio.run(scenario())
+        # 一個事件正在處理、一個在佇列中，其餘兩個超時丟棄
+        assert _subscriber_stats(bus, slow)["dropped"] == 2
+        assert _subscriber_stats(bus, slow)["delivered"] == 2
+        assert _subscriber_stats(bus, fast)["dropped"] == 0
+        assert fast_seen == [0, 1, 2, 3]
+
+    def test_handler_timeout_counts_as_error(self):
+        """Test that a handler exceeding handler_timeout is cancelled and counted as an error."""
+        async def scenario():
+            bus = EventBus(handler_timeout=0.01)
+            calls = []
+
+            async def handler(event):
+                calls.append(event.payload["index"])
+                if event.payload["index"] == 0:
+                    await asyncio.sleep(10)
+
+            bus.subscribe("test.event", handler)
+            await bus.start()
+            await bus.publish(_event(index=0))
+            await bus.publish(_event(index=1))
+            await asyncio.wait_for(bus.join(), timeout=5)
+            await bus.stop()
+            return bus, handler, calls
+
+        bus, handler, calls = asyncio.run(scenario())
+        stats = _subscriber_stats(bus, handler)
+        assert calls == [0, 1]
+        assert stats["errors"] == 1
+        assert stats["delivered"] == 1
+
+    def test_orchestrator_config_sets_handler_timeout(self):
+        """Test that OrchestratorConfig.event_handler_timeout reaches the event bus."""
+        orchestrator = MasterOrchestrator(OrchestratorConfig(event_handler_timeout=2.5))
+        assert orchestrator.event_bus._handler_timeout == 2.5
+        assert MasterOrchestrator().event_bus._handler_timeout is None
+
+
+class TestEngineScheduler:
+    """負載感知調度與工作竊取測試"""
+
+    def test_least_loaded_uses_load_ratio(self):
+        """Test that selection compares load relative to each engine's capacity."""
+        async def scenario():
+            registry = EngineRegistry()
+            _register(registry, "small", max_tasks=1, queued=1)
+            _register(registry, "large", max_tasks=8, queued=3)
+            _register(registry, "down", max_tasks=8).healthy = False
+            scheduler = EngineScheduler(registry, EventBus())
+            return scheduler.select_engine(EngineType.EXECUTION).engine_id
+
+        assert asyncio.run(scenario()) == "large"
+
+    def test_dispatch_by_type_goes_to_least_loaded(self):
+        """Test that type-targeted tasks are submitted to the least loaded engine."""
+        async def scenario():
+            registry = EngineRegistry()
+            busy = _register(registry, "busy", queued=3)
+            idle = _register(registry, "idle")
+            scheduler = EngineScheduler(registry, EventBus())
+            await scheduler._dispatch_task({"task_id": "t", "target_engine_type": EngineType.EXECUTION.value})
+            return busy.instance.get_queue_size(), idle.instance.get_queue_size(), scheduler.get_stats()
+
+        busy_queued, idle_queued, stats = asyncio.run(scenario())
+        assert (busy_queued, idle_queued) == (3, 1)
+        assert stats["dispatched"] == {"idle": 1}
+
+    def test_rebalance_steals_untargeted_tasks(self):
+        """Test that an idle engine steals half of the untargeted backlog, newest first."""
+        async def scenario():
+            registry = EngineRegistry()
+            busy = _register(registry, "busy")
+            idle = _register(registry, "idle")
+            for index in range(5):
+                busy.instance._task_queue.put_nowait({"task_id": f"t{index}"})
+            busy.instance._task_queue.put_nowait({"task_id": "pinned", "target_engine_id": "busy"})
+            scheduler = EngineScheduler(registry, EventBus())
+            moved = await scheduler.rebalance()
+            remaining = [busy.instance._task_queue.get_nowait()["task_id"] for _ in range(busy.instance.get_queue_size())]
+            stolen = [idle.instance._task_queue.get_nowait()["task_id"] for _ in range(idle.instance.get_queue_size())]
+            return moved, remaining, stolen, scheduler.get_stats()["stolen"]
+
+        moved, remaining, stolen, total = asyncio.run(scenario())
+        assert moved == total == 3
+        assert stolen == ["t2", "t3", "t4"]
+        assert remaining == ["t0", "t1", "pinned"]
+
+    def test_rebalance_skips_busy_and_single_engines(self):
+        """Test that nothing moves when no engine has spare capacity or there is no peer."""
+        async def scenario():
+            registry = EngineRegistry()
+            _register(registry, "a", queued=2)
+            _register(registry, "b", queued=1)
+            scheduler = EngineScheduler(registry, EventBus())
+            both_busy = await scheduler.rebalance()
+            registry.unregister_engine("b")
+            return both_busy, await scheduler.rebalance()
+
+        assert asyncio.run(scenario()) == (0, 0)
+
+
+def _write(root: Path, relative: str, source: str):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(textwrap.dedent(source), encoding="utf-8")
+
+
+def _discovered(registry: EngineRegistry, root: Path) -> dict:
+    return {
+        (Path(engine["module_path"]).relative_to(root).as_posix(), engine["class_name"]): engine["engine_type"]
+        for engine in registry.discover_engines([root])
+    }
+
+
+class TestEngineDiscovery:
+    """靜態引擎發現的模組限定名稱解析測試"""
+
+    def test_same_named_bases_in_unrelated_modules_do_not_collide(self, tmp_path):
+        """Test that a BaseAgent unrelated to engine_base does not make its subclasses engines."""
+        _write(tmp_path, "engines/base.py", """
+            from engine_base import BaseEngine, EngineType
+
+            class BaseAgent(BaseEngine):
+                ENGINE_TYPE = EngineType.VALIDATION
+        """)
+        _write(tmp_path, "engines/worker.py", """
+            from base import BaseAgent
+
+            class Worker(BaseAgent):
+                pass
+        """)
+        _write(tmp_path, "chat/base.py", """
+            class BaseAgent:
+                pass
+        """)
+        _write(tmp_path, "chat/bot.py", """
+            from base import BaseAgent
+
+            class Bot(BaseAgent):
+                pass
+
+            class BaseEngine:
+                pass
+
+            class Local(BaseEngine):
+                pass
+        """)
+
+        assert _discovered(EngineRegistry(), tmp_path) == {
+            ("engines/base.py", "BaseAgent"): "validation",
+            ("engines/worker.py", "Worker"): "validation",
+        }
+
+    def test_relative_imports_aliases_and_reexports(self, tmp_path):
+        """Test resolution through relative imports, module aliases, re-exports and star imports."""
+        _write(tmp_path, "pkg/common.py", """
+            from engine_base import ExecutionEngineBase as Base
+        """)
+        _write(tmp_path, "pkg/impl.py", """
+            from .common import Base
+
+            class Impl(Base):
+                pass
+        """)
+        _write(tmp_path, "pkg/sub/deep.py", """
+            from .. import impl as parent
+
+            class Deep(parent.Impl):
+                ENGINE_TYPE = EngineType.GENERATION
+        """)
+        _write(tmp_path, "pkg/star.py", """
+            try:
+                from engine_base import *
+            except ImportError:
+                pass
+
+            class Starred(CognitiveEngineBase):
+                pass
+        """)
+
+        assert _discovered(EngineRegistry(), tmp_path) == {
+            ("pkg/impl.py", "Impl"): "execution",
+            ("pkg/sub/deep.py", "Deep"): "generation",
+            ("pkg/star.py", "Starred"): "execution",
+        }
+
+    def test_cached_discovery_matches_fresh_scan(self, tmp_path):
+        """Test that results served from the persisted discovery cache are identical."""
+        source = tmp_path / "src"
+        _write(source, "engines/base.py", """
+            import engine_base
+
+            class BaseAgent(engine_base.BaseEngine):
+                pass
+        """)
+        _write(source, "engines/worker.py", """
+            from engines.base import BaseAgent
+
+            class Worker(BaseAgent):
+                pass
+        """)
+        cache_path = tmp_path / "discovery.json"
+        fresh = _discovered(EngineRegistry(cache_path=cache_path), source)
+
+        assert cache_path.exists()
+        assert _discovered(EngineRegistry(cache_path=cache_path), source) == fresh == {
+            ("engines/base.py", "BaseAgent"): "execution",
+            ("engines/worker.py", "Worker"): "execution",
+        }
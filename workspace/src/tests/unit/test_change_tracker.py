@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Unit tests for structural change tracking in the YAML module audit trail"""
+from core.yaml_module_system.audit_trail import ChangeTracker
+
+MANIFEST = {
+    "metadata": {"name": "mod", "labels": {"tier": "core"}},
+    "spec": {"containers": [{"name": "api", "image": "api:1"}, {"name": "worker", "image": "w:1"}]},
+}
+
+
+def test_creation_emits_single_record():
+    """Test resource creation is one compact root patch"""
+    tracker = ChangeTracker()
+    records = tracker.track_changes("module", "mod-1", None, MANIFEST)
+
+    assert [(r.change_type, r.field_path) for r in records] == [("added", "")]
+    assert records[0].new_value is MANIFEST
+
+
+def test_keyed_list_diff_and_unchanged_subtrees():
+    """Test lists of named items are matched by key and equal subtrees are skipped"""
+    tracker = ChangeTracker()
+    new = {
+        "metadata": MANIFEST["metadata"],
+        "spec": {"containers": [{"name": "worker", "image": "w:2"}, {"name": "api", "image": "api:1"},
+                                {"name": "sidecar", "image": "s:1"}]},
+    }
+    records = tracker.track_changes("module", "mod-1", MANIFEST, new)
+
+    assert sorted((r.change_type, r.field_path) for r in records) == [
+        ("added", "spec.containers[name=sidecar]"),
+        ("modified", "spec.containers[name=worker].image"),
+    ]
+    assert tracker.track_changes("module", "mod-1", new, dict(new)) == []
+
+
+def test_field_history_is_indexed_and_bounded():
+    """Test field history lookups include ancestor patches and old records are evicted"""
+    tracker = ChangeTracker(max_records=3)
+    tracker.track_changes("module", "mod-1", None, {"v": 0})
+    for version in range(1, 4):
+        tracker.track_changes("module", "mod-1", {"v": version - 1}, {"v": version})
+
+    history = tracker.get_field_history("module", "mod-1", "v")
+    assert [r.new_value for r in history] == [3, 2, 1]
+    assert len(tracker.get_changes(resource_type="module", resource_id="mod-1")) == 3
+
+
+def test_record_ids_are_unique_across_trackers():
+    """Test record ids share a per-change-set unique prefix and never repeat across trackers"""
+    new = {"metadata": {"name": "mod", "labels": {"tier": "edge"}}, "spec": {}}
+    ids = []
+    for _ in range(2):
+        records = ChangeTracker().track_changes("module", "mod-1", MANIFEST, new)
+        prefixes = {r.id.rsplit(".", 1)[0] for r in records}
+        assert len(prefixes) == 1
+        assert sorted(r.id.rsplit(".", 1)[1] for r in records) == [str(i) for i in range(len(records))]
+        ids.extend(r.id for r in records)
+
+    assert len(ids) == len(set(ids)) == 4
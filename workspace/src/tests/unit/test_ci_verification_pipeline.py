@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Unit tests for parallel stage scheduling in the CI verification pipeline"""
+import threading
+import time
+from datetime import datetime
+
+from core.yaml_module_system.ci_verification_pipeline import (
+    CIVerificationPipeline,
+    PipelineStage,
+    PipelineStageType,
+    StageResult,
+    StageStatus,
+)
+
+
+def _executor(status=StageStatus.PASSED, delay=0.0, calls=None, barrier=None):
+    def run(data, context):
+        if calls is not None:
+            calls.append(threading.current_thread().name)
+        if barrier is not None:
+            barrier.wait(timeout=2)
+        time.sleep(delay)
+        return StageResult(
+            stage_id="", stage_type=PipelineStageType.TEST, status=status, started_at=datetime.now()
+        )
+    return run
+
+
+def _stage(stage_id, executor, depends_on=(), timeout_ms=300000, required=True):
+    return PipelineStage(
+        id=stage_id, name=stage_id, stage_type=PipelineStageType.TEST, description="",
+        executor=executor, depends_on=list(depends_on), timeout_ms=timeout_ms, required=required,
+    )
+
+
+def test_independent_stages_run_concurrently():
+    """Test sibling stages overlap (the barrier needs both threads)"""
+    barrier = threading.Barrier(2)
+    pipeline = CIVerificationPipeline(max_workers=4)
+    pipeline.add_stage(_stage("root", _executor()))
+    pipeline.add_stage(_stage("a", _executor(barrier=barrier), ["root"]))
+    pipeline.add_stage(_stage("b", _executor(barrier=barrier), ["root"]))
+
+    report = pipeline.run({}, "mod", "1.0.0")
+
+    assert report.status == StageStatus.PASSED
+    assert [r.stage_id for r in report.stages] == ["root", "a", "b"]
+
+
+def test_failure_skips_dependents_and_halts():
+    """Test fail-fast propagation to dependent stages"""
+    pipeline = CIVerificationPipeline(max_workers=1)
+    pipeline.add_stage(_stage("lint", _executor(StageStatus.FAILED)))
+    pipeline.add_stage(_stage("test", _executor(), ["lint"]))
+    pipeline.add_stage(_stage("other", _executor()))
+
+    report = pipeline.run({}, "mod", "1.0.0")
+    statuses = {r.stage_id: r.status for r in report.stages}
+
+    assert report.status == StageStatus.FAILED
+    assert statuses == {"lint": StageStatus.FAILED, "test": StageStatus.SKIPPED, "other": StageStatus.SKIPPED}
+
+
+def test_without_fail_fast_independent_stages_still_run():
+    """Test only dependents are skipped when fail_fast is disabled"""
+    pipeline = CIVerificationPipeline(max_workers=1)
+    pipeline.add_stage(_stage("lint", _executor(StageStatus.FAILED)))
+    pipeline.add_stage(_stage("test", _executor(), ["lint"]))
+    pipeline.add_stage(_stage("other", _executor()))
+
+    report = pipeline.run({}, "mod", "1.0.0", fail_fast=False)
+    statuses = {r.stage_id: r.status for r in report.stages}
+
+    assert statuses["test"] == StageStatus.SKIPPED
+    assert report.stages[1].errors == ["Dependencies not met"]
+    assert statuses["other"] == StageStatus.PASSED
+
+
+def test_stage_timeout_marks_failure():
+    """Test a stage exceeding timeout_ms fails without blocking the run"""
+    pipeline = CIVerificationPipeline()
+    pipeline.add_stage(_stage("slow", _executor(delay=0.5), timeout_ms=50))
+
+    started = time.monotonic()
+    report = pipeline.run({}, "mod", "1.0.0")
+
+    assert time.monotonic() - started < 0.4
+    assert report.stages[0].status == StageStatus.FAILED
+    assert report.stages[0].errors == ["Stage timed out after 50ms"]
+
+
+def test_passed_results_are_cached_per_module_version():
+    """Test unchanged modules reuse cached stage results"""
+    calls = []
+    pipeline = CIVerificationPipeline()
+    pipeline.add_stage(_stage("lint", _executor(calls=calls)))
+
+    pipeline.run({}, "mod", "1.0.0")
+    cached = pipeline.run({}, "mod", "1.0.0")
+    pipeline.run({}, "mod", "1.0.1")
+
+    assert len(calls) == 2
+    assert cached.stages[0].outputs["cached"] is True
+    assert pipeline.cache_hits == 1
+
+
+def test_failed_results_are_not_cached():
+    """Test failures are re-executed on the next run"""
+    calls = []
+    pipeline = CIVerificationPipeline()
+    pipeline.add_stage(_stage("lint", _executor(StageStatus.FAILED, calls=calls)))
+
+    pipeline.run({}, "mod", "1.0.0")
+    pipeline.run({}, "mod", "1.0.0")
+
+    assert len(calls) == 2
+
+
+def test_run_many_preserves_order():
+    """Test batch verification returns one report per module in order"""
+    pipeline = CIVerificationPipeline.create_default_pipeline()
+    reports = pipeline.run_many([({}, f"mod-{i}", "1.0.0") for i in range(4)], max_workers=2)
+
+    assert [r.module_id for r in reports] == ["mod-0", "mod-1", "mod-2", "mod-3"]
+    assert all(r.status == StageStatus.PASSED for r in reports)
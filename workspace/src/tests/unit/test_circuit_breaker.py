@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Unit tests for sliding-window circuit breaker half-open probing"""
+import asyncio
+
+import pytest
+
+from core.safety.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerOpenError,
+    CircuitBreakerRegistry,
+    CircuitBreakerState,
+    SlidingWindowType,
+)
+
+
+def _half_open_breaker(**overrides) -> CircuitBreaker:
+    config = CircuitBreakerConfig(
+        name="probe",
+        failure_threshold=2,
+        success_threshold=2,
+        timeout=0.0,
+        max_half_open_calls=2,
+        sliding_window_type=SlidingWindowType.COUNT_BASED,
+        sliding_window_size=10,
+    )
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    breaker = CircuitBreaker(config)
+    breaker.trip()
+    return breaker
+
+
+def test_trips_on_failure_rate_over_window():
+    """Test the breaker opens once the window holds enough failing calls"""
+    breaker = CircuitBreaker(CircuitBreakerConfig(
+        failure_threshold=4,
+        failure_rate_threshold=0.5,
+        sliding_window_type=SlidingWindowType.COUNT_BASED,
+        sliding_window_size=4,
+    ))
+    for failed in (True, False, True):
+        breaker.record_failure() if failed else breaker.record_success()
+    assert breaker.is_closed
+
+    breaker.record_failure()
+    assert breaker.is_open
+
+
+def test_half_open_limits_concurrent_probes():
+    """Test half-open admits at most max_half_open_calls probes"""
+    breaker = _half_open_breaker()
+
+    assert [breaker.try_acquire() for _ in range(3)] == [True, True, False]
+    assert breaker.is_half_open
+
+    breaker.release()
+    assert breaker.try_acquire()
+
+    breaker.record_success()
+    breaker.record_success()
+    assert breaker.is_closed
+
+
+def test_half_open_failure_reopens():
+    """Test a failed probe returns the breaker to open"""
+    breaker = _half_open_breaker(timeout=60.0)
+    breaker._last_state_change_time -= 60.0
+
+    assert breaker.try_acquire()
+    breaker.record_failure(RuntimeError("still down"))
+    assert breaker.is_open
+    assert not breaker.try_acquire()
+
+
+def test_cancelled_probes_release_their_slots():
+    """Test cancelled half-open probes do not wedge the breaker"""
+    breaker = _half_open_breaker()
+
+    async def scenario():
+        async def hang():
+            await asyncio.sleep(10)
+
+        for _ in range(3):
+            task = asyncio.create_task(breaker.execute(hang))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert breaker.get_stats()["half_open_in_flight"] == 0
+
+        async def ok():
+            return "ok"
+
+        assert await breaker.execute(ok) == "ok"
+        assert await breaker.execute(ok) == "ok"
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreakerState.CLOSED
+
+
+def test_excluded_exceptions_release_slot_without_failing():
+    """Test excluded exceptions neither reopen nor hold a probe slot"""
+    breaker = _half_open_breaker(excluded_exceptions=[KeyError])
+
+    async def missing():
+        raise KeyError("not a downstream failure")
+
+    with pytest.raises(KeyError):
+        asyncio.run(breaker.execute(missing))
+    assert breaker.is_half_open
+    assert breaker.get_stats()["half_open_in_flight"] == 0
+
+
+def test_registry_rejects_when_open():
+    """Test registry execution through an open breaker"""
+    registry = CircuitBreakerRegistry(stripes=4)
+    registry.get_or_create("db").trip()
+
+    async def query():
+        return "rows"
+
+    with pytest.raises(CircuitBreakerOpenError):
+        asyncio.run(registry.execute("db", query))
+    assert asyncio.run(registry.execute("db", query, fallback=lambda: "cached")) == "cached"
+    assert len(registry) == 1
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Unit tests for the single-pass code metrics engine"""
+import sys
+import textwrap
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parents[3] / "tools"
+
+# code_metrics 以頂層名稱導入 path_tools；tools 只在導入期間追加到 sys.path 末尾，
+# 導入後移除，避免其 automation 套件遮蔽 src 下的同名套件
+_added = str(TOOLS_DIR) not in sys.path
+if _added:
+    sys.path.append(str(TOOLS_DIR))
+try:
+    import code_metrics
+    from code_metrics import CodeScanner, analyze_source
+    from path_tools.repo_index import RepoIndex
+finally:
+    if _added:
+        sys.path.remove(str(TOOLS_DIR))
+
+SOURCE = textwrap.dedent('''
+    def simple(a, b=1, *args, c, **kw):
+        return a
+
+
+    def branches(x, items):
+        # TODO: split this function
+        if x > 0 and x < 10:
+            for item in items:
+                if item:
+                    return item
+        elif x < 0:
+            return -x
+        else:
+            return "# TODO inside a string"
+        try:
+            pass
+        except ValueError:
+            pass
+        # FIXME handle empty items
+        return [i for i in items if i]
+
+
+    class Widget:
+        @deprecated("use render")
+        def draw(self):
+            def inner():
+                while True:
+                    break
+            return inner
+''').lstrip()
+
+
+def _functions(source: str) -> dict:
+    return {func.qualname: func for func in analyze_source(source, ".py").functions}
+
+
+def test_cyclomatic_and_cognitive_complexity():
+    """Test complexity, nesting depth, length and parameter counts per function"""
+    functions = _functions(SOURCE)
+    assert list(functions) == ["simple", "branches", "Widget.draw", "Widget.draw.inner"]
+
+    simple = functions["simple"]
+    assert (simple.cyclomatic, simple.cognitive, simple.nesting_depth) == (1, 0, 0)
+    assert (simple.parameters, simple.length) == (5, 1)
+
+    # if + and + for + if + elif + except + comprehension (for, if)
+    branches = functions["branches"]
+    assert branches.cyclomatic == 9
+    # if 1, and 1, for 1+1, nested if 1+2, elif 1, else 1, except 1
+    assert branches.cognitive == 10
+    assert branches.nesting_depth == 3
+    assert (branches.line_start, branches.line_end, branches.length) == (5, 20, 13)
+
+    # 巢狀函數單獨計算，不併入外層
+    assert (functions["Widget.draw"].cyclomatic, functions["Widget.draw"].cognitive) == (1, 0)
+    assert (functions["Widget.draw.inner"].cyclomatic, functions["Widget.draw.inner"].cognitive) == (2, 1)
+
+
+def test_markers_only_in_comments_and_decorators():
+    """Test that markers inside strings are not reported and deprecated decorators are"""
+    markers = [(hit.line_number, hit.debt_type, hit.message) for hit in analyze_source(SOURCE, ".py").markers]
+    assert markers == [
+        (6, "TODO", "split this function"),
+        (19, "FIXME", "handle empty items"),
+        (24, "DEPRECATED", '@deprecated("use render")'),
+    ]
+
+
+def test_line_scan_for_other_files_and_unparsable_python():
+    """Test the line-based fallback for non-Python files and Python with syntax errors"""
+    text = "intro\n# TODO: write docs\nsee XXX later\n"
+    assert [(hit.line_number, hit.debt_type) for hit in analyze_source(text, ".md").markers] == [(2, "TODO")]
+
+    broken = analyze_source("def f(:\n    x = '# HACK: quick fix'\n", ".py")
+    assert broken.parse_error is not None
+    assert broken.functions == []
+    assert [(hit.line_number, hit.message) for hit in broken.markers] == [(2, "quick fix'")]
+
+
+def test_metrics_cache_reuse_and_invalidation(tmp_path, monkeypatch):
+    """Test that unchanged files are served from the cache and edits or a version bump re-analyze"""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    (tree / "a.py").write_text(SOURCE)
+    (tree / "b.py").write_text("def f():\n    return 1\n")
+    cache_path = tmp_path / "cache" / "metrics.json"
+
+    def scan() -> tuple:
+        index = RepoIndex(tree, persist=False)
+        scanner = CodeScanner(index, jobs=1, cache_path=cache_path)
+        results = {
+            entry.path: [(func.qualname, func.cyclomatic) for func in metrics.functions]
+            for entry, metrics in scanner.scan(index.iter_files(suffixes={".py"}))
+        }
+        scanner.save()
+        return results, (scanner.stats["cached"], scanner.stats["analyzed"])
+
+    first, first_stats = scan()
+    assert first["b.py"] == [("f", 1)]
+    assert first_stats == (0, 2)
+
+    cached, cached_stats = scan()
+    assert cached == first
+    assert cached_stats == (2, 0)
+
+    (tree / "b.py").write_text("def f(x):\n    return 1 if x else 2\n")
+    edited, edited_stats = scan()
+    assert edited["b.py"] == [("f", 2)]
+    assert edited_stats == (1, 1)
+
+    monkeypatch.setattr(code_metrics, "ANALYZER_VERSION", code_metrics.ANALYZER_VERSION + 1)
+    assert scan()[1] == (0, 2)
+    assert scan()[1] == (2, 0)
@@ -63,3 +63,30 @@ def test_contract_registration():
     # Test duplicate registration raises ValueError
     with pytest.raises(ValueError, match="already registered"):
         registry.register(contract)
+
+
+def test_compiled_contract_schemas_are_bounded():
+    """Test the validator keeps only the most recently used compiled schemas"""
+    from core.contract_engine import ContractMetadata, ContractType, ContractValidator
+
+    validator = ContractValidator(max_compiled_schemas=2)
+    contracts = [
+        ContractDefinition(
+            metadata=ContractMetadata(
+                name=f"c{i}", version="1.0.0", contract_type=ContractType.SERVICE,
+                description="", author="test-suite",
+            ),
+            schema={"type": "object", "properties": {f"f{i}": {"type": "string"}}},
+            validation_rules=[],
+            execution_config={},
+            lifecycle_config={},
+        )
+        for i in range(3)
+    ]
+
+    first = validator.compile_contract(contracts[0])
+    validator.compile_contract(contracts[1])
+    assert validator.compile_contract(contracts[0]) is first
+    validator.compile_contract(contracts[2])
+
+    assert list(validator._compiled_schemas) == [contracts[0].checksum, contracts[2].checksum]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Unit tests for incremental repository indexing in the knowledge engine"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from core.island_ai_runtime.code_chunker import ContentStore, analyze_file  # noqa: E402
+from core.island_ai_runtime.knowledge_engine import (  # noqa: E402
+    EdgeType,
+    EmbeddingProvider,
+    KnowledgeEngine,
+    NodeType,
+)
+
+UTILS = "import os\n\n\ndef helper():\n    return os.getcwd()\n\n\nclass Tool:\n    pass\n"
+APP = "from pkg import utils\n\n\ndef main():\n    return utils.helper()\n"
+
+
+class CountingProvider(EmbeddingProvider):
+    """Embedding provider that records batch calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def embed_batch(self, texts):
+        self.batches.append(len(texts))
+        return await super().embed_batch(texts)
+
+
+def _make_tree(root):
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text("")
+    (root / "pkg" / "utils.py").write_text(UTILS)
+    (root / "app.py").write_text(APP)
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "skip.js").write_text("function x() {}")
+
+
+def test_python_files_split_into_symbol_chunks():
+    """Test AST chunking yields module, function and class chunks"""
+    analysis = analyze_file("pkg/utils.py", UTILS)
+
+    assert [(c.name, c.kind) for c in analysis.chunks] == [
+        ("utils", "module"), ("helper", "function"), ("Tool", "class"),
+    ]
+    assert analysis.imports == ["os"]
+
+
+def test_index_tree_builds_graph_and_skips_unchanged(tmp_path):
+    """Test initial indexing, edges, and that re-indexing only touches changed files"""
+    _make_tree(tmp_path)
+    engine = KnowledgeEngine({"embedding_batch_size": 2})
+    engine.embedding_provider = CountingProvider()
+
+    report = asyncio.run(engine.index_tree(str(tmp_path)))
+    assert (report.scanned, report.indexed) == (3, 3)
+    assert max(engine.embedding_provider.batches) <= 2
+
+    app_id = engine._generate_id("app.py")
+    utils_id = engine._generate_id("pkg/utils.py")
+    imported = engine.repo_graph.get_neighbors(app_id, EdgeType.IMPORTS)
+    assert [n.id for n in imported] == [utils_id]
+    assert {n.name for n in engine.repo_graph.get_neighbors(utils_id, EdgeType.CONTAINS)} == {
+        "utils", "helper", "Tool",
+    }
+    assert engine.repo_graph.get_node(utils_id).content == ""
+
+    engine.embedding_provider.batches.clear()
+    report = asyncio.run(engine.index_tree(str(tmp_path)))
+    assert (report.indexed, report.unchanged) == (0, 3)
+    assert engine.embedding_provider.batches == []
+
+    (tmp_path / "pkg" / "utils.py").write_text(UTILS + "\n\ndef extra():\n    pass\n")
+    report = asyncio.run(engine.index_tree(str(tmp_path)))
+    assert report.indexed == 1
+    assert [n.id for n in engine.repo_graph.get_neighbors(app_id, EdgeType.IMPORTS)] == [utils_id]
+    assert [n.path for n in engine.repo_graph.get_dependents(utils_id, EdgeType.IMPORTS)] == ["app.py"]
+
+
+def test_removed_files_leave_the_index(tmp_path):
+    """Test deleted files are dropped from graph and vector store"""
+    _make_tree(tmp_path)
+    engine = KnowledgeEngine()
+    asyncio.run(engine.index_tree(str(tmp_path)))
+    vectors_before = len(engine.vector_store)
+
+    (tmp_path / "app.py").unlink()
+    report = asyncio.run(engine.index_tree(str(tmp_path)))
+
+    assert report.removed == 1
+    assert engine.repo_graph.get_node(engine._generate_id("app.py")) is None
+    assert len(engine.vector_store) == vectors_before - 2
+
+
+def test_search_returns_chunk_context(tmp_path):
+    """Test search results read chunk text from the content store"""
+    _make_tree(tmp_path)
+    engine = KnowledgeEngine()
+    asyncio.run(engine.index_tree(str(tmp_path)))
+
+    results = asyncio.run(engine.search("anything", top_k=10))
+    helper = next(r for r in results if r.node.name == "helper")
+    assert helper.node.node_type == NodeType.FUNCTION
+    assert helper.context.startswith("def helper():")
+
+
+def test_saved_index_resumes_incrementally_after_restart(tmp_path):
+    """Test a reloaded engine only re-embeds files changed since the save"""
+    repo, index_dir = tmp_path / "repo", tmp_path / "index"
+    repo.mkdir()
+    _make_tree(repo)
+    engine = KnowledgeEngine()
+    asyncio.run(engine.index_tree(str(repo)))
+    engine.save_index(str(index_dir))
+
+    restarted = KnowledgeEngine()
+    restarted.embedding_provider = CountingProvider()
+    restarted.load_index(str(index_dir))
+    (repo / "app.py").write_text(APP + "\n\ndef cli():\n    pass\n")
+    report = asyncio.run(restarted.index_tree(str(repo)))
+
+    assert (report.indexed, report.unchanged, report.removed) == (1, 2, 0)
+    assert sum(restarted.embedding_provider.batches) == 3
+    utils_id = restarted._generate_id("pkg/utils.py")
+    assert [n.path for n in restarted.repo_graph.get_dependents(utils_id, EdgeType.IMPORTS)] == ["app.py"]
+    assert restarted.get_stats()["contents"] == engine.get_stats()["contents"]
+
+    results = asyncio.run(restarted.search("anything", top_k=20))
+    helper = next(r for r in results if r.node.name == "helper")
+    assert helper.context.startswith("def helper():")
+    restarted.save_index(str(index_dir))
+
+
+def test_same_tick_edit_is_not_skipped(tmp_path):
+    """Test an edit that keeps mtime and size is still detected (racy mtime)"""
+    import os
+
+    _make_tree(tmp_path)
+    engine = KnowledgeEngine()
+    asyncio.run(engine.index_tree(str(tmp_path)))
+
+    target = tmp_path / "pkg" / "utils.py"
+    stat = target.stat()
+    target.write_text(UTILS.replace("helper", "hel_er"))
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    report = asyncio.run(engine.index_tree(str(tmp_path)))
+    assert report.indexed == 1
+    names = {n.name for n in engine.repo_graph.get_neighbors(engine._generate_id("pkg/utils.py"))}
+    assert "hel_er" in names
+
+
+def test_content_store_caches_split_lines():
+    """Test chunk lookups split each blob once and release drops the cache"""
+    store = ContentStore(line_cache_size=1)
+    first = store.put("a\nb\nc")
+    second = store.put("x\ny")
+
+    assert store.get_lines(first, 2, 3) == "b\nc"
+    assert list(store._lines) == [first]
+    assert store.get_lines(second, 1, 1) == "x"
+    assert list(store._lines) == [second]
+
+    store.release(second)
+    assert not store._lines
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Unit tests for the BM25 knowledge search index"""
+from core.training_system import ConceptDefinition, KnowledgeBase, KnowledgeCategory
+from core.training_system.knowledge_index import KnowledgeIndex
+
+
+def test_name_matches_outrank_body_matches():
+    """Test field weights favour name hits over description hits"""
+    index = KnowledgeIndex()
+    index.add('body', 'Connection pooling', 'reuse database connections for caching layers')
+    index.add('name', 'Caching', 'store computed results')
+
+    assert [doc_id for doc_id, _ in index.search('caching', top_k=2)] == ['name', 'body']
+
+
+def test_incremental_replace_and_remove():
+    """Test re-adding an id replaces its postings and remove drops them"""
+    index = KnowledgeIndex()
+    index.add('doc', 'Sharding', tags=['database'])
+    index.add('doc', 'Replication', tags=['availability'])
+
+    assert index.search('sharding') == []
+    assert [doc_id for doc_id, _ in index.search('availability')] == ['doc']
+
+    assert index.remove('doc')
+    assert len(index) == 0
+    assert index.search('replication') == []
+
+
+def test_knowledge_base_indexes_added_concepts():
+    """Test add_concept makes a concept retrievable and top-k is honoured"""
+    kb = KnowledgeBase()
+    kb.add_concept(ConceptDefinition(
+        id='caching', name='Caching', category=KnowledgeCategory.PERFORMANCE,
+        definition='Store computed results close to the consumer', description='',
+        tags=['redis', 'cache'],
+    ))
+
+    relevant = kb.get_relevant_knowledge('redis cache', max_results=1)
+    assert [c.id for c in relevant['concepts']] == ['caching']
+    assert kb.get_relevant_knowledge('sql injection')['anti_patterns'][0].name == 'SQL Injection Vulnerability'
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Unit tests for model gateway caching, coalescing and routing"""
+import asyncio
+
+import pytest
+
+from core.island_ai_runtime.model_gateway import (
+    BaseModelClient,
+    LocalStubClient,
+    ModelGateway,
+    ModelProvider,
+    RoutingStrategy,
+)
+
+MESSAGES = [{"role": "user", "content": "explain  the build"}]
+
+
+def _gateway(**config):
+    config.setdefault("providers", {"openai": {"enabled": False}, "anthropic": {"enabled": False}})
+    return ModelGateway(config)
+
+
+class FailingClient(BaseModelClient):
+    async def complete(self, request):
+        raise ConnectionError("down")
+
+    async def stream(self, request):
+        yield ""
+
+
+def test_parallel_identical_requests_coalesce_and_cache():
+    """Test concurrent duplicates share one call and later ones hit the cache"""
+    gateway = _gateway()
+    stub = LocalStubClient(latency_seconds=0.05)
+    gateway.register_client(ModelProvider.LOCAL, stub)
+
+    async def run():
+        responses = await asyncio.gather(*[
+            gateway.complete(MESSAGES, temperature=0.0) for _ in range(10)
+        ])
+        again = await gateway.complete(
+            [{"role": "USER", "content": "explain the build"}], temperature=0.0
+        )
+        return responses, again
+
+    responses, again = asyncio.run(run())
+    assert stub.calls == 1
+    assert len({r.content for r in responses}) == 1
+    assert again.cached
+    assert gateway.get_stats()["coalesced_requests"] == 9
+
+
+def test_sampled_requests_coalesce_but_are_not_cached_by_default():
+    """Test concurrent duplicates at the default temperature share one call but are never replayed later"""
+    gateway = _gateway()
+    stub = LocalStubClient(latency_seconds=0.01)
+    gateway.register_client(ModelProvider.LOCAL, stub)
+
+    async def run():
+        await asyncio.gather(gateway.complete(MESSAGES), gateway.complete(MESSAGES))
+        return await gateway.complete(MESSAGES)
+
+    assert not asyncio.run(run()).cached
+    assert stub.calls == 2
+    assert gateway.get_stats()["coalesced_requests"] == 1
+    assert len(gateway.cache) == 0
+
+
+def test_coalesced_and_cached_responses_are_copies():
+    """Test each caller gets its own response instance, separate from the cached one"""
+    gateway = _gateway()
+    gateway.register_client(ModelProvider.LOCAL, LocalStubClient(latency_seconds=0.01))
+
+    async def run():
+        first, second = await asyncio.gather(
+            gateway.complete(MESSAGES, temperature=0.0), gateway.complete(MESSAGES, temperature=0.0)
+        )
+        first.usage["total_tokens"] = -1
+        first.content = "changed"
+        return first, second, await gateway.complete(MESSAGES, temperature=0.0)
+
+    first, second, again = asyncio.run(run())
+    assert first is not second
+    assert again.cached and again.content == second.content != "changed"
+    assert second.usage == again.usage and again.usage.get("total_tokens") != -1
+
+
+def test_coalescing_can_be_disabled():
+    """Test coalesce_requests=False sends every sampled duplicate to the provider"""
+    gateway = _gateway(coalesce_requests=False)
+    stub = LocalStubClient(latency_seconds=0.01)
+    gateway.register_client(ModelProvider.LOCAL, stub)
+
+    async def run():
+        await asyncio.gather(gateway.complete(MESSAGES), gateway.complete(MESSAGES))
+
+    asyncio.run(run())
+    assert stub.calls == 2
+    assert gateway.get_stats()["coalesced_requests"] == 0
+
+
+def test_cancelled_leader_does_not_fail_coalesced_callers():
+    """Test cancelling the first caller leaves the shared request running"""
+    gateway = _gateway()
+    stub = LocalStubClient(latency_seconds=0.05)
+    gateway.register_client(ModelProvider.LOCAL, stub)
+
+    async def run():
+        leader = asyncio.create_task(gateway.complete(MESSAGES, temperature=0.0))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(gateway.complete(MESSAGES, temperature=0.0))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    response = asyncio.run(run())
+    assert response.content
+    assert stub.calls == 1
+    assert gateway.get_stats()["in_flight"] == 0
+    assert len(gateway.cache) == 1
+
+
+def test_cache_evicts_by_size():
+    """Test LRU eviction bounds the cache"""
+    gateway = _gateway(cache={"max_entries": 2})
+    gateway.register_client(ModelProvider.LOCAL, LocalStubClient(latency_seconds=0))
+
+    async def run():
+        for i in range(3):
+            await gateway.complete([{"role": "user", "content": f"q{i}"}], temperature=0.0)
+
+    asyncio.run(run())
+    assert len(gateway.cache) == 2
+
+
+def test_failover_to_next_provider():
+    """Test a failing provider is skipped and put in cooldown"""
+    gateway = _gateway(routing_strategy="failover")
+    gateway.register_client(ModelProvider.OPENAI, FailingClient())
+    gateway.register_client(ModelProvider.LOCAL, LocalStubClient(latency_seconds=0))
+
+    response = asyncio.run(gateway.complete(MESSAGES))
+    assert response.provider == "local"
+    assert not gateway.providers[ModelProvider.OPENAI].available
+    assert gateway._route(None)[0].provider == ModelProvider.LOCAL
+
+
+def test_cost_aware_routing_prefers_cheaper_provider():
+    """Test cost-optimized ordering"""
+    gateway = _gateway(routing_strategy=RoutingStrategy.COST_OPTIMIZED.value)
+    gateway.register_client(ModelProvider.OPENAI, LocalStubClient(0), cost_per_1k_tokens=5.0)
+    gateway.register_client(ModelProvider.LOCAL, LocalStubClient(0), cost_per_1k_tokens=0.1)
+
+    assert [s.provider for s in gateway._route(None)] == [ModelProvider.LOCAL, ModelProvider.OPENAI]
+
+
+def test_provider_concurrency_limit():
+    """Test per-provider semaphore bounds in-flight calls"""
+    gateway = _gateway(cache={"enabled": False})
+    stub = LocalStubClient(latency_seconds=0.02)
+    gateway.register_client(ModelProvider.LOCAL, stub, max_concurrency=2)
+    peak = 0
+
+    original = stub.complete
+
+    async def tracking(request):
+        nonlocal peak
+        peak = max(peak, gateway.providers[ModelProvider.LOCAL].in_flight)
+        return await original(request)
+
+    stub.complete = tracking
+
+    async def run():
+        await asyncio.gather(*[gateway.complete([{"role": "user", "content": str(i)}]) for i in range(8)])
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_unknown_model_provider_raises():
+    """Test a model pinned to a disabled provider fails clearly"""
+    gateway = _gateway()
+    with pytest.raises(ValueError, match="Provider not available"):
+        asyncio.run(gateway.complete(MESSAGES, model="claude-x"))
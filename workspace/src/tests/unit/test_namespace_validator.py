@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Unit tests for the namespace validator rules and result cache"""
+import importlib.util
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parents[3] / "tools"
+
+# 檔名含連字號，需以檔案路徑載入；模組導入時會把 tools 插到 sys.path 最前，
+# 載入後還原，避免其 automation 套件遮蔽 src 下的同名套件
+_spec = importlib.util.spec_from_file_location("namespace_validator", TOOLS_DIR / "namespace-validator.py")
+namespace_validator = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = namespace_validator
+_saved_path = list(sys.path)
+try:
+    _spec.loader.exec_module(namespace_validator)
+finally:
+    sys.path[:] = _saved_path
+
+NamespaceValidator = namespace_validator.NamespaceValidator
+RuleSet = namespace_validator.RuleSet
+
+ROOT_FILE_PATTERNS = [r"^root\.[a-zA-Z0-9-]+\.yaml$", r"^root\.specs\.[a-zA-Z0-9-]+\.yaml$"]
+
+
+def _rules(strict: bool = False) -> RuleSet:
+    return RuleSet(NamespaceValidator(strict=strict).validation_rules, ROOT_FILE_PATTERNS)
+
+
+def _issues(rows) -> list:
+    return sorted(((line, rule_id, severity) for line, rule_id, severity, _, _ in rows),
+                  key=lambda issue: (issue[0] or 0, issue[1]))
+
+
+def _validator(tmp_path: Path, **kwargs) -> NamespaceValidator:
+    return NamespaceValidator(jobs=1, cache_path=str(tmp_path / "cache" / "results.json"), **kwargs)
+
+
+def _run(validator: NamespaceValidator, tree: Path) -> dict:
+    return {
+        Path(result.file_path).name: _issues(
+            [issue.line_number, issue.rule_id, issue.severity.value, None, None] for issue in result.issues
+        )
+        for result in validator.iter_directory(tree)
+    }
+
+
+def test_forbidden_patterns_report_line_numbers():
+    """Test that legacy references are reported on the line where they occur"""
+    content = "metadata:\n  namespace: axiom\nspec:\n  image: registry.axiom.io/app\n  path: /etc/axiom/conf\n"
+    assert _issues(_rules().check("deploy.yaml", content)) == [
+        (None, "NS-001", "error"),
+        (2, "NS-001", "error"),
+        (4, "NS-004", "error"),
+        (4, "NS-005", "error"),
+        (4, "NS-008", "warning"),
+        (5, "NS-006", "error"),
+    ]
+
+
+def test_required_namespace_only_checked_when_defined():
+    """Test that NS-001 requires the namespace value only in structured files that set one"""
+    rules = _rules()
+    assert _issues(rules.check("a.yaml", "namespace: other\n")) == [(None, "NS-001", "error")]
+    assert rules.check("a.yaml", "namespace: machinenativeops\n") == []
+    assert rules.check("a.yaml", "kind: Service\n") == []
+    assert rules.check("a.md", "namespace: other\n") == []
+
+
+def test_naming_rules():
+    """Test kebab-case names, snake_case keys and root file names in YAML files only"""
+    content = (
+        "apiVersion: v1\n"
+        "kind: Service\n"
+        "metadata:\n"
+        "  name: MyService\n"
+        "  labels:\n"
+        "    appName: web\n"
+        "    LOG_LEVEL: info\n"
+        "    name: '{{ release }}'\n"
+        "    name: good-name\n"
+    )
+    assert _issues(_rules().check("service.yaml", content)) == [
+        (4, "NS-003", "error"),
+        (6, "NS-010", "warning"),
+    ]
+    assert _issues(_rules(strict=True).check("service.yaml", content)) == [
+        (4, "NS-003", "error"),
+        (6, "NS-010", "error"),
+    ]
+    assert _rules().check("service.json", content) == []
+
+    rules = _rules()
+    assert rules.check("root.config.yaml", "") == []
+    assert rules.check("root.specs.naming.yaml", "") == []
+    assert _issues(rules.check("root.bad_name.yaml", "")) == [(None, "NS-011", "warning")]
+    assert RuleSet(rules.rules).check("root.bad_name.yaml", "") == []
+
+
+def test_rules_digest_tracks_rule_changes():
+    """Test that the rules digest changes with severities and file name patterns"""
+    assert _rules().digest == _rules().digest
+    assert _rules().digest != _rules(strict=True).digest
+    assert _rules().digest != RuleSet(_rules().rules).digest
+
+
+def test_result_cache_reuse_and_invalidation(tmp_path, monkeypatch):
+    """Test that unchanged files are served from the cache and edits or rule changes re-validate"""
+    monkeypatch.setenv("REPO_INDEX_CACHE_DIR", str(tmp_path / "cache" / "index"))
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    (tree / "bad.yaml").write_text("metadata:\n  name: Bad_Name\n")
+    (tree / "good.yaml").write_text("metadata:\n  name: good-name\n")
+    (tree / "notes.md").write_text("see axiom.io/docs\n")
+    (tree / "skip.txt").write_text("namespace: axiom\n")
+
+    first = _validator(tmp_path)
+    expected = {
+        "bad.yaml": [(2, "NS-003", "error")],
+        "notes.md": [(1, "NS-004", "error"), (1, "NS-008", "warning")],
+    }
+    assert _run(first, tree) == expected
+    assert first.stats == {"files": 3, "cached": 0, "validated": 3}
+
+    second = _validator(tmp_path)
+    assert _run(second, tree) == expected
+    assert second.stats == {"files": 3, "cached": 3, "validated": 0}
+
+    (tree / "bad.yaml").write_text("metadata:\n  name: fixed-name\n")
+    third = _validator(tmp_path)
+    assert _run(third, tree) == {"notes.md": expected["notes.md"]}
+    assert third.stats == {"files": 3, "cached": 2, "validated": 1}
+
+    strict = _validator(tmp_path, strict=True)
+    _run(strict, tree)
+    assert strict.stats == {"files": 3, "cached": 0, "validated": 3}
+
+    uncached = _validator(tmp_path, use_cache=False)
+    _run(uncached, tree)
+    assert uncached.stats["cached"] == 0
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Unit tests for realtime connector batching and timeouts"""
+import asyncio
+
+import pytest
+
+from core.integrations.realtime_connector import (
+    ConnectionConfig,
+    LatencyHistogram,
+    RealTimeConnector,
+    TimerWheel,
+)
+
+
+def test_latency_histogram_percentiles():
+    """Test rolling histogram percentiles and window eviction"""
+    histogram = LatencyHistogram(window=100)
+    for _ in range(99):
+        histogram.record(1.0)
+    histogram.record(1000.0)
+
+    assert histogram.percentile(50) == pytest.approx(1.0, rel=0.25)
+    assert histogram.percentile(100) == pytest.approx(1000.0, rel=0.25)
+
+    for _ in range(100):
+        histogram.record(10.0)
+    assert histogram.count == 100
+    assert histogram.percentile(99) == pytest.approx(10.0, rel=0.25)
+
+
+def test_timer_wheel_expires_after_multiple_rounds():
+    """Test deadlines longer than one wheel revolution"""
+    wheel = TimerWheel(resolution=0.01, slots=4)
+    wheel.schedule('req', 0.1)
+
+    expired_at = [tick for tick in range(1, 12) if 'req' in wheel.advance()]
+    assert expired_at == [10]
+
+
+def test_timer_wheel_next_expiry_and_cancel():
+    """Test the ticker can sleep until the earliest live deadline"""
+    wheel = TimerWheel(resolution=0.01, slots=4)
+    assert wheel.next_expiry() is None
+
+    wheel.schedule('late', 0.1)
+    wheel.schedule('early', 0.03)
+    assert len(wheel) == 2
+    assert wheel.next_expiry() == 3
+
+    assert wheel.cancel('early')
+    assert not wheel.cancel('early')
+    assert wheel.next_expiry() == 10
+
+
+def test_timer_loop_idles_without_pending_requests():
+    """Test the timer wheel empties after responses and timeouts"""
+    async def scenario():
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connector.connect(
+            ConnectionConfig(server_name='idle', heartbeat_interval=0)
+        )
+        await connector.send_request(connection.id, 'tools/list')
+        assert len(connector._timer_wheel) == 0
+
+        with pytest.raises(TimeoutError):
+            await connector.send_request(connection.id, 'tools/call', timeout=10)
+        await asyncio.sleep(0.01)
+        assert connector._timer_deadline is None
+        assert not connector._timer_task.done()
+        await connector.stop()
+
+    asyncio.run(scenario())
+
+
+def test_expired_queued_requests_are_not_sent():
+    """Test requests that time out while queued are dropped by the writer"""
+    async def scenario():
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connector.connect(
+            ConnectionConfig(server_name='slow', heartbeat_interval=0, max_batch_size=1)
+        )
+        frames = []
+
+        async def slow_write(conn, data):
+            frames.append(data)
+            await asyncio.sleep(0.1)
+
+        connector._write_frame = slow_write
+        first = asyncio.create_task(connector.send_request(connection.id, 'first'))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await connector.send_request(connection.id, 'second', timeout=20)
+
+        await first
+        assert len(frames) == 1
+        assert connection.messages_expired == 1
+        assert connector.get_stats()['total_messages_expired'] == 1
+        await connector.stop()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.asyncio
+async def test_same_tick_requests_are_batched():
+    """Test concurrent requests coalesce into batch frames"""
+    connector = RealTimeConnector()
+    await connector.start()
+    connection = await connector.connect(
+        ConnectionConfig(server_name='batch', heartbeat_interval=0, max_batch_size=50)
+    )
+
+    results = await asyncio.gather(*[
+        connector.send_request(connection.id, 'tools/call', {'i': i})
+        for i in range(100)
+    ])
+
+    assert len(results) == 100
+    assert connection.messages_sent == 100
+    assert connection.batches_sent <= 3
+    await connector.stop()
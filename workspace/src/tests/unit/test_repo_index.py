@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Unit tests for the shared incremental repository index"""
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parents[3] / "tools"
+
+# 以檔案路徑載入，不把 tools 加入 sys.path (其 automation 套件會遮蔽 src 下的同名套件)
+_spec = importlib.util.spec_from_file_location("repo_index", TOOLS_DIR / "path_tools" / "repo_index.py")
+repo_index = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = repo_index
+_spec.loader.exec_module(repo_index)
+
+MTIME_RESOLUTION_NS = repo_index.MTIME_RESOLUTION_NS
+RepoIndex = repo_index.RepoIndex
+hash_file = repo_index.hash_file
+
+
+def _rewrite_keeping_stat(path: Path, content: bytes):
+    """Rewrite a file with same-size content and restore its mtime (a same-tick edit)"""
+    st = path.stat()
+    path.write_bytes(content)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _index(tmp_path: Path) -> RepoIndex:
+    return RepoIndex(tmp_path / "tree", cache_path=tmp_path / "cache" / "index.json")
+
+
+def test_digest_hashed_within_mtime_window_is_rehashed(tmp_path):
+    """Test that an edit within the timestamp resolution of hashing is not hidden by the cached digest"""
+    target = tmp_path / "tree" / "a.txt"
+    target.parent.mkdir()
+    target.write_bytes(b"first")
+
+    index = _index(tmp_path)
+    index.refresh()
+    entry = index.get("a.txt")
+    assert index.digest(entry) == hash_file(target)
+    assert entry.digest_is_racy
+    index.save()
+
+    _rewrite_keeping_stat(target, b"other")
+
+    reloaded = _index(tmp_path)
+    stats = reloaded.refresh()
+    assert (stats.unchanged, stats.rehashed) == (1, 1)
+    assert reloaded.digest(reloaded.get("a.txt")) == hash_file(target)
+
+
+def test_digest_of_settled_file_is_reused(tmp_path):
+    """Test that digests are trusted once the file's mtime is older than the resolution window"""
+    target = tmp_path / "tree" / "a.txt"
+    target.parent.mkdir()
+    target.write_bytes(b"first")
+    settled_ns = time.time_ns() - 2 * MTIME_RESOLUTION_NS
+    os.utime(target, ns=(settled_ns, settled_ns))
+
+    index = _index(tmp_path)
+    index.refresh()
+    digest = index.digest(index.get("a.txt"))
+    assert not index.get("a.txt").digest_is_racy
+    index.save()
+
+    reloaded = _index(tmp_path)
+    stats = reloaded.refresh()
+    assert stats.rehashed == 0
+    assert reloaded.get("a.txt").digest == digest
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_symlinks_and_excluded_dirs_are_not_indexed(tmp_path):
+    """Test that symlinked files and directories and default-excluded directories are skipped"""
+    tree = tmp_path / "tree"
+    (tree / "pkg").mkdir(parents=True)
+    (tree / "node_modules" / "dep").mkdir(parents=True)
+    (tree / "pkg" / "real.py").write_text("x = 1\n")
+    (tree / "node_modules" / "dep" / "index.js").write_text("")
+    (tree / "pkg" / "link.py").symlink_to(tree / "pkg" / "real.py")
+    (tree / "linked_pkg").symlink_to(tree / "pkg", target_is_directory=True)
+
+    index = RepoIndex(tree, persist=False)
+    assert sorted(entry.path for entry in index.iter_entries()) == ["pkg", "pkg/real.py"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_record_links_and_parallel_refresh(tmp_path):
+    """Test that record_links keeps in-tree links as unfollowed entries and parallel refresh matches serial"""
+    tree = tmp_path / "tree"
+    (tree / "pkg" / "sub").mkdir(parents=True)
+    (tree / "docs").mkdir()
+    (tree / "pkg" / "real.py").write_text("x = 1\n")
+    (tree / "docs" / "pkg").symlink_to(tree / "pkg", target_is_directory=True)
+    (tree / "docs" / "real.py").symlink_to(tree / "pkg" / "real.py")
+    (tree / "docs" / "outside").symlink_to(tmp_path, target_is_directory=True)
+    (tree / "docs" / "dangling").symlink_to(tree / "missing")
+
+    index = RepoIndex(tree, persist=False, record_links=True)
+    index.refresh()
+    serial = {entry.path: (entry.is_dir, entry.link) for entry in index.iter_entries(links=True)}
+    assert serial == {
+        "pkg": (True, None),
+        "pkg/sub": (True, None),
+        "pkg/real.py": (False, None),
+        "docs": (True, None),
+        "docs/pkg": (True, "pkg"),
+        "docs/real.py": (False, "pkg/real.py"),
+    }
+    assert "docs/pkg" not in {entry.path for entry in index.iter_entries()}
+    assert index.digest(index.get("docs/real.py")) is None
+
+    parallel = RepoIndex(tree, persist=False, record_links=True)
+    stats = parallel.refresh(workers=4)
+    assert stats.added == stats.total == len(serial)
+    assert {entry.path: (entry.is_dir, entry.link) for entry in parallel.iter_entries(links=True)} == serial
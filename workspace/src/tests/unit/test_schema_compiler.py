@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Unit tests for the compiled JSON Schema validator"""
+import pytest
+
+from core.validators.schema_compiler import compile_schema
+from core.engine.function_calling import FunctionCallHandler, FunctionDefinition
+from core.engine.tool_system import Tool, ToolCategory, ToolRegistry
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "pattern": "^[a-z]+$", "maxLength": 8},
+        "age": {"type": "integer", "minimum": 0},
+        "role": {"enum": ["admin", "user"]},
+        "address": {
+            "type": "object",
+            "properties": {"city": {"type": "string"}},
+            "required": ["city"],
+        },
+        "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+    },
+    "required": ["name"],
+}
+
+
+def test_valid_document_has_no_violations():
+    """Test a conforming value passes"""
+    validator = compile_schema(SCHEMA)
+    value = {"name": "alice", "age": 30, "role": "user",
+             "address": {"city": "taipei"}, "tags": ["a"]}
+
+    assert validator.validate(value) == []
+    assert validator.is_valid(value)
+
+
+def test_nested_violations_report_paths():
+    """Test nested objects, arrays, enums, patterns and bounds"""
+    validator = compile_schema(SCHEMA)
+    violations = validator.validate({
+        "name": "Alice",
+        "age": -1,
+        "role": "root",
+        "address": {},
+        "tags": ["a", 2, "c"],
+    })
+
+    by_path = {(v.path, v.keyword) for v in violations}
+    assert ("name", "pattern") in by_path
+    assert ("age", "minimum") in by_path
+    assert ("role", "enum") in by_path
+    assert ("address.city", "required") in by_path
+    assert ("tags", "maxItems") in by_path
+    assert ("tags[1]", "type") in by_path
+
+
+def test_first_error_stops_early():
+    """Test fail-fast mode returns a single violation"""
+    validator = compile_schema(SCHEMA)
+    violation = validator.first_error({"age": "x"})
+
+    assert violation is not None
+    assert not validator.is_valid({"age": "x"})
+
+
+def test_bool_is_not_an_integer():
+    """Test JSON Schema integer/boolean distinction"""
+    validator = compile_schema({"type": "object", "properties": {"n": {"type": "integer"}}})
+    assert [v.keyword for v in validator.validate({"n": True})] == ["type"]
+
+
+def test_equal_schemas_share_compilation():
+    """Test the compile cache deduplicates equal schemas"""
+    assert compile_schema(dict(SCHEMA)) is compile_schema(dict(SCHEMA))
+
+
+def test_function_definition_uses_compiled_schema():
+    """Test function calling keeps its error messages"""
+    func_def = FunctionDefinition(name="create_user", description="", parameters=SCHEMA)
+    FunctionCallHandler().register(func_def, lambda **kwargs: kwargs)
+
+    assert func_def.validate_arguments({"age": "30"}) == [
+        "Missing required field: name",
+        "Invalid type for age: expected integer",
+    ]
+
+
+def test_tool_validation_raises_first_error():
+    """Test tool input validation via the registry-compiled schema"""
+    tool = Tool(name="t", description="", category=ToolCategory.CODE, input_schema=SCHEMA)
+    ToolRegistry().register(tool)
+
+    with pytest.raises(ValueError, match="Missing required field: name"):
+        tool._validate_input({})
+
+
+def test_multiple_of_is_exact_for_decimal_steps():
+    """Test multipleOf is not fooled by binary float error"""
+    validator = compile_schema({"type": "number", "multipleOf": 0.1})
+
+    assert validator.is_valid(0.3)
+    assert validator.is_valid(1e30)
+    assert not validator.is_valid(0.35)
+    assert compile_schema({"multipleOf": 3}).is_valid(10 ** 40 * 3)
+
+
+def test_non_finite_numbers_fail_instead_of_raising():
+    """Test Infinity/NaN accepted by json.loads are reported, not raised"""
+    import json
+
+    validator = compile_schema({"type": "object", "properties": {
+        "step": {"type": "number", "multipleOf": 0.5},
+        "ratio": {"type": "number", "maximum": 1},
+    }})
+    value = json.loads('{"step": Infinity, "ratio": NaN}')
+
+    assert {(v.path, v.keyword) for v in validator.validate(value)} == {
+        ("step", "multipleOf"), ("ratio", "maximum"),
+    }
+    assert not validator.is_valid({"step": float("nan")})
+
+
+def test_enum_and_const_distinguish_booleans_from_numbers():
+    """Test True does not match 1 while 1.0 still matches 1"""
+    validator = compile_schema({"enum": [1, "a", [0, {"k": False}]]})
+
+    assert not validator.is_valid(True)
+    assert validator.is_valid(1.0)
+    assert validator.is_valid([0, {"k": False}])
+    assert not validator.is_valid([False, {"k": 0}])
+    assert not compile_schema({"const": 0}).is_valid(False)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Unit tests for service registry indexes and health check scheduling"""
+import asyncio
+
+import pytest
+
+from core.integrations.service_registry import (
+    RegistryConfig,
+    ServiceCategory,
+    ServiceRegistry,
+    ServiceStatus,
+)
+
+
+def test_discover_by_tag_uses_index():
+    """Test tag discovery follows registration and deregistration"""
+    registry = ServiceRegistry()
+    sid = registry.register_service(
+        name='tagged', version='1.0.0', category=ServiceCategory.CORE, tags={'edge'}
+    )
+
+    assert [s.service_id for s in registry.discover_by_tag('edge')] == [sid]
+
+    registry.deregister_service(sid)
+    assert registry.discover_by_tag('edge') == []
+
+
+def test_discover_healthy_tracks_status_changes():
+    """Test healthy discovery reflects update_health transitions"""
+    registry = ServiceRegistry()
+    sid = registry.register_service(
+        name='svc', version='1.0.0', category=ServiceCategory.EXECUTION
+    )
+    assert registry.discover_healthy() == []
+
+    registry.update_health(sid, ServiceStatus.HEALTHY, latency_ms=3.0)
+    assert [s.service_id for s in registry.discover_healthy(ServiceCategory.EXECUTION)] == [sid]
+    assert registry.discover_healthy(ServiceCategory.CORE) == []
+
+    registry.update_health(sid, ServiceStatus.UNHEALTHY)
+    assert registry.discover_healthy() == []
+    assert registry.get_stats()['status_counts'] == {'unhealthy': 1}
+
+
+def test_select_service_prefers_low_latency():
+    """Test weighted selection favours faster instances"""
+    registry = ServiceRegistry()
+    fast = registry.register_service(
+        name='api', version='1.0.0', category=ServiceCategory.GATEWAY, service_id='fast'
+    )
+    slow = registry.register_service(
+        name='api', version='1.0.0', category=ServiceCategory.GATEWAY, service_id='slow'
+    )
+    registry.update_health(fast, ServiceStatus.HEALTHY, latency_ms=1.0)
+    registry.update_health(slow, ServiceStatus.HEALTHY, latency_ms=500.0)
+
+    picks = [registry.select_service(name='api').service_id for _ in range(200)]
+    assert picks.count('fast') > picks.count('slow')
+
+
+def test_select_service_falls_back_to_degraded():
+    """Test selection uses degraded services when nothing is healthy"""
+    registry = ServiceRegistry()
+    sid = registry.register_service(
+        name='db', version='1.0.0', category=ServiceCategory.STORAGE
+    )
+    registry.update_health(sid, ServiceStatus.DEGRADED)
+
+    assert registry.select_service(name='db').service_id == sid
+    assert registry.select_service(name='db', allow_degraded=False) is None
+
+
+@pytest.mark.asyncio
+async def test_health_checks_run_concurrently_with_timeout():
+    """Test a slow checker times out without delaying the others"""
+    registry = ServiceRegistry(RegistryConfig(health_check_timeout_seconds=0.1))
+
+    async def slow_check():
+        await asyncio.sleep(5)
+        return True
+
+    slow = registry.register_service(
+        name='slow', version='1.0.0', category=ServiceCategory.CORE, health_checker=slow_check
+    )
+    fast_ids = [
+        registry.register_service(
+            name=f'fast-{i}', version='1.0.0', category=ServiceCategory.CORE,
+            health_checker=lambda: True
+        )
+        for i in range(5)
+    ]
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await registry.run_health_checks()
+
+    assert loop.time() - started < 1.0
+    assert registry.get_service(slow).health.status == ServiceStatus.UNHEALTHY
+    assert registry.get_service(slow).health.details == {'error': 'timeout'}
+    for sid in fast_ids:
+        assert registry.get_service(sid).health.status == ServiceStatus.HEALTHY
+
+
+def test_unknown_checker_status_marks_service_unhealthy():
+    """Test a checker returning an unknown status string records UNHEALTHY instead of raising"""
+    registry = ServiceRegistry()
+    sid = registry.register_service(
+        name='odd', version='1.0.0', category=ServiceCategory.CORE,
+        health_checker=lambda: {'status': 'sleepy'}
+    )
+    registry.update_health(sid, ServiceStatus.HEALTHY)
+
+    asyncio.run(registry.run_health_checks())
+
+    health = registry.get_service(sid).health
+    assert health.status == ServiceStatus.UNHEALTHY
+    assert health.details == {'error': "unknown status: 'sleepy'"}
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Unit tests for token-budgeted session context"""
+from core.island_ai_runtime.session_memory import (
+    MessageRole,
+    SessionMemory,
+    estimate_tokens,
+)
+
+
+def test_context_respects_token_budget_and_keeps_pinned():
+    """Test pinned instructions survive while old turns are summarized"""
+    memory = SessionMemory({"max_tokens": 200})
+    memory.add_message(MessageRole.SYSTEM, "Always answer in JSON.")
+    for i in range(40):
+        memory.add_message(MessageRole.USER, f"question number {i} about the deployment pipeline")
+
+    context = memory.get_context()
+    total = sum(estimate_tokens(m["content"]) for m in context)
+
+    assert total <= 200
+    assert context[0] == {"role": "system", "content": "Always answer in JSON."}
+    assert context[1]["content"].startswith("Earlier conversation summary:")
+    assert context[-1]["content"].endswith("question number 39 about the deployment pipeline")
+
+
+def test_evicted_history_feeds_rolling_summary():
+    """Test messages evicted by max_messages are summarized, pinned are kept"""
+    memory = SessionMemory({"max_messages": 5})
+    memory.add_message(MessageRole.SYSTEM, "You are the release bot.")
+    for i in range(10):
+        memory.add_message(MessageRole.USER, f"step {i}")
+
+    assert len(memory.short_term.messages) == 5
+    assert memory.short_term.messages[0].pinned
+    assert "user: step 0" in memory.context_window.summary
+    assert memory.short_term.total_tokens == sum(m.tokens for m in memory.short_term.messages)
+
+
+def test_keyword_recall_uses_index():
+    """Test recall intersects keywords and forgets evicted messages"""
+    memory = SessionMemory({"max_messages": 3})
+    memory.add_message(MessageRole.USER, "The database password rotates weekly")
+    memory.add_message(MessageRole.USER, "Deploy the database migration")
+    memory.add_message(MessageRole.USER, "Rotate database credentials")
+
+    assert [m.content for m in memory.recall("database")] == [
+        "The database password rotates weekly",
+        "Deploy the database migration",
+        "Rotate database credentials",
+    ]
+    assert [m.content for m in memory.recall("database migration")] == ["Deploy the database migration"]
+
+    memory.add_message(MessageRole.USER, "unrelated")
+    assert memory.recall("password") == []
+
+
+def test_default_context_unchanged_for_short_sessions():
+    """Test small sessions still return every message in order"""
+    memory = SessionMemory()
+    memory.add_message("user", "hi")
+    memory.add_message("assistant", "hello")
+
+    assert memory.get_context() == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    assert memory.get_context(max_messages=1) == [{"role": "assistant", "content": "hello"}]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for indexed tool call routing"""
+import asyncio
+
+import pytest
+
+from core.engine.function_calling import RoutingRule, ToolCallRouter
+
+
+@pytest.fixture
+def router():
+    """Create a router with three executors and a default"""
+    router = ToolCallRouter()
+    router.register_executor("database", lambda name, params: ("database", name))
+    router.register_executor("api", lambda name, params: ("api", name))
+    router.register_executor("default", lambda name, params: ("default", name))
+    router.set_default_executor("default")
+    return router
+
+
+def test_structured_matchers(router):
+    """Test exact, prefix and glob matchers with param predicates"""
+    router.add_rule(RoutingRule(name="exact", tool_name="ping", executor_id="api"))
+    router.add_rule(RoutingRule(name="prefix", name_prefix="db_", executor_id="database"))
+    router.add_rule(RoutingRule(
+        name="glob", name_glob="fetch_*", param_equals={"secure": True},
+        executor_id="api", priority=5,
+    ))
+
+    assert router.route("ping", {}) is router._executors["api"]
+    assert router.route("db_query", {}) is router._executors["database"]
+    assert router.route("fetch_page", {"secure": True}) is router._executors["api"]
+    assert router.route("fetch_page", {"secure": False}) is router._executors["default"]
+
+
+def test_priority_and_legacy_conditions(router):
+    """Test callable conditions still work alongside structured rules"""
+    router.add_rule(RoutingRule("legacy", lambda name, params: "url" in params, "api", 50))
+    router.add_rule(RoutingRule(name="db", name_prefix="db_", executor_id="database", priority=10))
+
+    assert router.route("db_query", {"url": "x"}) is router._executors["api"]
+    assert router.route("db_query", {}) is router._executors["database"]
+
+
+def test_cache_invalidated_on_rule_changes(router):
+    """Test add_rule/remove_rule invalidate cached routes"""
+    assert router.route("db_query", {}) is router._executors["default"]
+
+    router.add_rule(RoutingRule(name="db", name_prefix="db_", executor_id="database"))
+    assert router.route("db_query", {}) is router._executors["database"]
+
+    router.remove_rule("db")
+    assert router.route("db_query", {}) is router._executors["default"]
+
+
+def test_rule_without_executor_rejected(router):
+    """Test rules must name an executor"""
+    with pytest.raises(ValueError):
+        router.add_rule(RoutingRule(name="broken", name_prefix="x"))
+
+
+def test_execute_resolves_executor_call_shapes():
+    """Test execute() awaits async functions, execute methods and async __call__ instances"""
+    class AsyncCallable:
+        async def __call__(self, name, params):
+            return ("callable", name)
+
+    class WithExecute:
+        async def execute(self, name, params):
+            return ("execute", name)
+
+    async def coroutine_fn(name, params):
+        return ("coroutine", name)
+
+    router = ToolCallRouter()
+    router.register_executor("callable", AsyncCallable())
+    router.register_executor("execute", WithExecute())
+    router.register_executor("coroutine", coroutine_fn)
+    router.register_executor("sync", lambda name, params: ("sync", name))
+    router.register_executor("broken", object())
+    for executor_id in ("callable", "execute", "coroutine", "sync", "broken"):
+        router.add_rule(RoutingRule(name=executor_id, tool_name=f"{executor_id}_tool", executor_id=executor_id))
+
+    async def run():
+        return [
+            await router.execute(f"{executor_id}_tool", {})
+            for executor_id in ("callable", "execute", "coroutine", "sync")
+        ]
+
+    assert asyncio.run(run()) == [
+        ("callable", "callable_tool"),
+        ("execute", "execute_tool"),
+        ("coroutine", "coroutine_tool"),
+        ("sync", "sync_tool"),
+    ]
+    with pytest.raises(ValueError, match="not callable"):
+        asyncio.run(router.execute("broken_tool", {}))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Unit tests for the island runtime vector store"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.island_ai_runtime.vector_store import VectorStore  # noqa: E402
+
+
+def _random_vectors(count, dimension, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+
+
+def test_flat_search_matches_bruteforce_cosine():
+    """Test exact search ranks by cosine similarity"""
+    vectors = _random_vectors(500, 16)
+    store = VectorStore(dimension=16)
+    store.upsert_many([f"v{i}" for i in range(500)], vectors)
+
+    query = vectors[42] * 3.0
+    expected = np.argsort(-(vectors @ query / np.linalg.norm(vectors, axis=1)))[:5]
+
+    results = store.search(query.tolist(), top_k=5)
+    assert [id for id, _ in results] == [f"v{i}" for i in expected]
+    assert results[0] == ("v42", pytest.approx(1.0, abs=1e-5))
+
+
+def test_delete_tombstones_then_compacts():
+    """Test deleted vectors disappear and compaction keeps ids consistent"""
+    store = VectorStore(dimension=4, compact_ratio=0.5)
+    store.upsert_many(["a", "b", "c", "d"], np.eye(4))
+
+    store.delete("a")
+    assert store.get_stats()["tombstones"] == 1
+    assert "a" not in [id for id, _ in store.search([1, 0, 0, 0], top_k=4)]
+
+    store.delete("b")
+    store.delete("c")
+    assert store.get_stats()["tombstones"] == 0
+    assert store.search([0, 0, 0, 1], top_k=4) == [("d", pytest.approx(1.0))]
+
+
+def test_ivf_recall_on_clustered_data():
+    """Test the approximate index finds the true nearest neighbour"""
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(8, 32))
+    vectors = np.concatenate([c + 0.05 * rng.normal(size=(200, 32)) for c in centers])
+    store = VectorStore(dimension=32, index="ivf", nlist=8, nprobe=2, ivf_train_size=1000)
+    store.upsert_many([f"v{i}" for i in range(len(vectors))], vectors)
+
+    assert store.get_stats()["ivf_trained"]
+    hits = sum(store.search(vectors[i].tolist(), top_k=1)[0][0] == f"v{i}" for i in range(0, 1600, 97))
+    assert hits >= 16
+
+
+def test_save_and_mmap_load_roundtrip(tmp_path):
+    """Test persisted indexes load memory-mapped and stay writable"""
+    store = VectorStore(dimension=8)
+    store.upsert_many(["x", "y"], _random_vectors(2, 8), [{"path": "x.py"}, {"path": "y.py"}])
+    store.save(tmp_path)
+
+    loaded = VectorStore.load(tmp_path)
+    assert loaded.get_stats()["memory_mapped"]
+    assert loaded.metadata["y"] == {"path": "y.py"}
+    assert loaded.search(store.get_vector("x"), top_k=1)[0][0] == "x"
+
+    loaded.upsert("z", [1.0] * 8)
+    assert loaded.search([1.0] * 8, top_k=1)[0][0] == "z"
+
+
+def test_save_back_to_mmap_loaded_directory(tmp_path):
+    """Test load → save → load on the same directory keeps the index intact"""
+    vectors = _random_vectors(2000, 16)
+    store = VectorStore(dimension=16, index="ivf", nlist=4, ivf_train_size=500)
+    store.upsert_many([f"v{i}" for i in range(2000)], vectors)
+    store.save(tmp_path)
+
+    loaded = VectorStore.load(tmp_path)
+    assert loaded.get_stats()["memory_mapped"]
+    loaded.save(tmp_path)
+    assert loaded.search(vectors[7].tolist(), top_k=1)[0][0] == "v7"
+
+    reloaded = VectorStore.load(tmp_path)
+    assert len(reloaded) == 2000
+    assert reloaded.get_stats()["ivf_trained"]
+    assert np.allclose(reloaded.get_vector("v1999"), store.get_vector("v1999"))
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Unit tests for compiled schema validation in the YAML module system"""
+import pytest
+
+from core.yaml_module_system.yaml_schema_validator import (
+    CompiledSchema,
+    SchemaRegistry,
+    ValidationErrorType,
+    YAMLSchemaValidator,
+)
+
+MODULE_SCHEMA = {
+    "type": "object",
+    "required": ["name", "version"],
+    "properties": {
+        "name": {"type": "string", "pattern": "[a-z-]+$"},
+        "version": {"type": "string", "format": "semver"},
+        "owner": {"$ref": "#/definitions/owner"},
+        "tree": {"$ref": "#/definitions/node"},
+    },
+    "additionalProperties": False,
+    "patternProperties": {"^x-": {}},
+    "definitions": {
+        "owner": {"type": "object", "required": ["team"]},
+        "node": {
+            "type": "object",
+            "properties": {"children": {"type": "array", "items": {"$ref": "#/definitions/node"}}},
+            "required": ["id"],
+        },
+    },
+}
+
+
+def test_registry_latest_version_uses_numeric_order():
+    """Test 1.10.0 is newer than 1.9.0"""
+    registry = SchemaRegistry()
+    registry.register("module", {"v": 9}, "1.9.0")
+    registry.register("module", {"v": 10}, "1.10.0")
+    registry.register("module", {"v": 2}, "1.2.0")
+
+    assert registry.get("module") == {"v": 10}
+    assert registry.get_versions("module") == ["1.9.0", "1.10.0", "1.2.0"]
+
+
+def test_local_and_recursive_refs():
+    """Test $ref resolution including self-referencing definitions"""
+    validator = YAMLSchemaValidator()
+    result = validator.validate({
+        "name": "mod",
+        "version": "1.0.0",
+        "owner": {},
+        "tree": {"id": 1, "children": [{"id": 2, "children": [{}]}]},
+    }, MODULE_SCHEMA)
+
+    assert [e.path for e in result.errors] == ["$.owner.team", "$.tree.children[0].children[0].id"]
+
+
+def test_registry_ref_and_unresolvable_ref():
+    """Test refs to other registered schemas"""
+    validator = YAMLSchemaValidator()
+    validator.registry.register("owner", {"type": "object", "required": ["team"]}, "2.0.0")
+    schema = {"properties": {"owner": {"$ref": "owner@2.0.0"}}}
+
+    assert not validator.is_valid({"owner": {}}, schema)
+    with pytest.raises(ValueError):
+        validator.compile({"$ref": "#/definitions/missing"})
+
+
+def test_pattern_matches_from_start_and_pattern_properties_allowed():
+    """Test pattern keeps re.match semantics and patternProperties are regexes"""
+    validator = YAMLSchemaValidator()
+    result = validator.validate({"name": "Mod-a", "version": "1.0.0", "x-team": "a", "extra": 1}, MODULE_SCHEMA)
+
+    assert {(e.path, e.error_type) for e in result.errors} == {
+        ("$.name", ValidationErrorType.PATTERN_MISMATCH),
+        ("$.extra", ValidationErrorType.ADDITIONAL_PROPERTY),
+    }
+
+
+def test_fail_fast_stops_at_first_error():
+    """Test the pass/fail fast path"""
+    validator = YAMLSchemaValidator()
+    document = {"name": 1, "version": "x", "extra": True}
+
+    assert len(validator.validate(document, MODULE_SCHEMA).errors) == 3
+    result = validator.validate(document, MODULE_SCHEMA, fail_fast=True)
+    assert not result.valid and len(result.errors) == 1
+    assert not validator.is_valid(document, MODULE_SCHEMA)
+
+
+def test_schemas_are_compiled_once():
+    """Test equal schemas and registered versions reuse one compilation"""
+    validator = YAMLSchemaValidator()
+    assert validator.compile(dict(MODULE_SCHEMA)) is validator.compile(dict(MODULE_SCHEMA))
+
+    validator.registry.register("module", MODULE_SCHEMA, "1.0.0")
+    compiled = validator.get_compiled("module")
+    assert isinstance(compiled, CompiledSchema)
+    assert validator.get_compiled("module", "1.0.0") is compiled
+
+    validator.registry.register("module", {"type": "object"}, "1.0.0")
+    assert validator.get_compiled("module") is not compiled
+
+
+def test_validate_many_by_schema_id():
+    """Test bulk validation against a registered schema"""
+    validator = YAMLSchemaValidator()
+    validator.registry.register("module", MODULE_SCHEMA, "1.0.0")
+    documents = [{"name": "a", "version": "1.0.0"}, {"name": "b"}, {"name": "c", "version": "2.0.0"}]
+
+    results = validator.validate_many(documents, "module")
+
+    assert [r.valid for r in results] == [True, False, True]
+    with pytest.raises(KeyError):
+        validator.validate_many(documents, "unknown")
+
+
+def test_custom_validator_registered_after_compile():
+    """Test custom validators are looked up at validation time"""
+    validator = YAMLSchemaValidator()
+    compiled = validator.compile({"x-custom-validator": "no_root"})
+
+    def no_root(data, path, result):
+        if data == "root":
+            raise ValueError("root is reserved")
+
+    validator.register_custom_validator("no_root", no_root)
+    result = compiled.validate("root")
+    assert result.errors[0].error_type == ValidationErrorType.CUSTOM_VALIDATION_FAILED
+
+
+def test_type_semantics():
+    """Test boolean/integer distinction and numeric bounds"""
+    validator = YAMLSchemaValidator()
+
+    assert validator.validate(True, {"type": "integer"}).errors[0].message == "Expected integer, got boolean"
+    assert validator.is_valid(True, {"type": "boolean"})
+    assert validator.validate(5, {"minimum": 5, "exclusiveMinimum": True}).errors[0].expected == "> 5"
+    assert validator.is_valid(6, {"exclusiveMaximum": 7, "multipleOf": 3})
@@ -299,6 +299,53 @@ class TestCircuitBreaker:
         assert stats["state"] == "closed"
         assert "failure_count" in stats
 
+    @pytest.mark.asyncio
+    async def test_mixed_traffic_below_rate_stays_closed(self, breaker):
+        """Test that scattered failures under the rate threshold do not trip."""
+        for i in range(30):
+            if i % 4 == 0:
+                await breaker.record_failure()
+            else:
+                await breaker.record_success()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_statistics()["window_failure_rate"] == pytest.approx(100 * 8 / 30)
+
+    @pytest.mark.asyncio
+    async def test_half_open_limits_concurrent_probes(self, breaker):
+        """Test that half-open admits at most half_open_requests probes."""
+        for _ in range(3):
+            await breaker.record_failure()
+        await asyncio.sleep(1.1)
+
+        admitted = [await breaker.can_execute() for _ in range(4)]
+        assert admitted == [True, True, False, False]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probes_release_slots(self):
+        """Test that cancelled half-open probes give their slot back."""
+        breaker = CircuitBreaker(
+            name="probe",
+            failure_threshold=1,
+            recovery_timeout=0.0,
+            half_open_requests=2,
+        )
+        await breaker.record_failure()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        for _ in range(3):
+            task = asyncio.create_task(breaker.execute(hang))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.get_statistics()["half_open_in_flight"] == 0
+        assert await breaker.execute(lambda: "ok") == "ok"
+
 
 class TestCircuitBreakerRegistry:
     """Tests for CircuitBreakerRegistry."""
@@ -322,6 +369,14 @@ class TestCircuitBreakerRegistry:
         breaker2 = await registry.get("service-a")
         assert breaker1 is breaker2
 
+    def test_get_nowait_shares_instance_across_stripes(self, registry):
+        """Test that sync lookup returns the breaker created by get()."""
+        for i in range(200):
+            registry.get_nowait(f"dep-{i}")
+
+        assert len(registry) == 200
+        assert registry.get_nowait("dep-7") is registry.get_nowait("dep-7")
+
     @pytest.mark.asyncio
     async def test_reset_all(self, registry):
         """Test resetting all breakers."""
@@ -6,13 +6,20 @@ Implements circuit breaker for fault tolerance:
 - Closed: Normal operation
 - Open: Requests fail fast
 - Half-Open: Testing recovery
+
+Breakers trip on the failure rate and slow-call rate over a time-sliced
+sliding window instead of a consecutive-failure count, so mixed traffic
+does not make them flap.
 """
 
 import asyncio
+import threading
 import time
+import zlib
+from array import array
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, Optional, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 from functools import wraps
 
 
@@ -26,15 +33,75 @@ class CircuitState(str, Enum):
 T = TypeVar("T")
 
 
+class SlidingWindow:
+    """
+    Time-sliced sliding window of call outcomes.
+
+    The window is split into fixed-size bucket arrays. Advancing clears only
+    the buckets that expired since the last call and running totals are
+    kept, so recording and reading rates are amortized O(1).
+    """
+
+    def __init__(self, window_seconds: float = 60.0, buckets: int = 12):
+        self.window_seconds = window_seconds
+        self.buckets = max(1, buckets)
+        self._bucket_seconds = max(window_seconds / self.buckets, 1e-3)
+        self._head_epoch = -1
+        self._calls = array("L", [0] * self.buckets)
+        self._failures = array("L", [0] * self.buckets)
+        self._slow = array("L", [0] * self.buckets)
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+
+    def _advance(self, now: float) -> int:
+        """Expire stale buckets and return the index of the current one."""
+        epoch = int(now / self._bucket_seconds)
+        if epoch > self._head_epoch:
+            steps = min(epoch - self._head_epoch, self.buckets)
+            for expired in range(epoch - steps + 1, epoch + 1):
+                index = expired % self.buckets
+                self.calls -= self._calls[index]
+                self.failures -= self._failures[index]
+                self.slow_calls -= self._slow[index]
+                self._calls[index] = 0
+                self._failures[index] = 0
+                self._slow[index] = 0
+            self._head_epoch = epoch
+        return self._head_epoch % self.buckets
+
+    def record(self, failed: bool, slow: bool, now: Optional[float] = None) -> None:
+        """Record one call outcome."""
+        index = self._advance(time.monotonic() if now is None else now)
+        self._calls[index] += 1
+        self._failures[index] += failed
+        self._slow[index] += slow
+        self.calls += 1
+        self.failures += failed
+        self.slow_calls += slow
+
+    def totals(self, now: Optional[float] = None) -> Tuple[int, int, int]:
+        """Return (calls, failures, slow_calls) within the window."""
+        self._advance(time.monotonic() if now is None else now)
+        return self.calls, self.failures, self.slow_calls
+
+    def reset(self) -> None:
+        """Clear all buckets."""
+        self.__init__(self.window_seconds, self.buckets)
+
+
 class CircuitBreaker:
     """
     Circuit breaker implementation.
 
     Provides:
-    - Automatic failure detection
+    - Failure-rate and slow-call-rate detection over a sliding window
     - Fast fail when open
-    - Automatic recovery testing
+    - Automatic recovery testing with a bounded number of concurrent probes
     - Per-target circuit isolation
+
+    The circuit opens once the window holds at least ``failure_threshold``
+    calls and the failure rate or slow-call rate reaches its threshold.
     """
 
     def __init__(
@@ -43,18 +110,28 @@ class CircuitBreaker:
         recovery_timeout: float = 60.0,
         half_open_requests: int = 3,
         name: str = "default",
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: float = 5.0,
+        slow_call_rate_threshold: float = 1.0,
+        window_seconds: float = 60.0,
+        window_buckets: int = 12,
+        lock: Optional[threading.Lock] = None,
     ):
         self.name = name
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.half_open_requests = half_open_requests
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
 
         self._state = CircuitState.CLOSED
-        self._failure_count = 0
-        self._success_count = 0
+        self._window = SlidingWindow(window_seconds, window_buckets)
         self._last_failure_time: Optional[float] = None
         self._half_open_successes = 0
-        self._lock = asyncio.Lock()
+        self._half_open_in_flight = 0
+        # Guards short bookkeeping only; may be shared by a registry stripe
+        self._lock = lock or threading.Lock()
 
         # Statistics
         self._total_requests = 0
@@ -82,80 +159,125 @@ class CircuitBreaker:
         """Check if circuit is half-open (testing recovery)."""
         return self._state == CircuitState.HALF_OPEN
 
-    async def _transition_to(self, new_state: CircuitState) -> None:
-        """Transition to a new state."""
+    def _transition_to(self, new_state: CircuitState) -> None:
+        """Transition to a new state (caller holds the lock)."""
         if new_state != self._state:
             old_state = self._state
             self._state = new_state
+            self._half_open_successes = 0
+            self._half_open_in_flight = 0
+            if new_state == CircuitState.CLOSED:
+                self._window.reset()
             self._state_changes.append({
                 "from": old_state.value,
                 "to": new_state.value,
                 "timestamp": datetime.now().isoformat(),
             })
+            del self._state_changes[:-10]
 
-    async def _check_recovery(self) -> None:
+    def _check_recovery(self) -> None:
         """Check if recovery timeout has passed."""
         if self._state == CircuitState.OPEN and self._last_failure_time:
-            if time.time() - self._last_failure_time >= self.recovery_timeout:
-                await self._transition_to(CircuitState.HALF_OPEN)
-                self._half_open_successes = 0
+            if time.monotonic() - self._last_failure_time >= self.recovery_timeout:
+                self._transition_to(CircuitState.HALF_OPEN)
+
+    def _window_exceeded(self, now: float) -> bool:
+        """Check the failure and slow-call rates over the window."""
+        calls, failures, slow = self._window.totals(now)
+        if calls < max(1, self.failure_threshold):
+            return False
+        return (
+            failures / calls >= self.failure_rate_threshold
+            or slow / calls >= self.slow_call_rate_threshold
+        )
+
+    def try_acquire(self) -> bool:
+        """
+        Synchronously check whether a request may proceed.
+
+        In half-open state this reserves one of ``half_open_requests`` probe
+        slots; the slot is released by record_success/record_failure, or by
+        release() when the call ends without an outcome.
+        """
+        with self._lock:
+            self._check_recovery()
+
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN:
+                if self._half_open_in_flight < self.half_open_requests:
+                    self._half_open_in_flight += 1
+                    return True
+            return False
 
     async def can_execute(self) -> bool:
         """Check if request can be executed."""
-        async with self._lock:
-            await self._check_recovery()
+        return self.try_acquire()
 
-            if self._state == CircuitState.CLOSED:
-                return True
-            elif self._state == CircuitState.HALF_OPEN:
-                return True
-            else:  # OPEN
-                return False
+    def release(self) -> None:
+        """Give back a half-open probe slot without recording an outcome."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
 
-    async def record_success(self) -> None:
-        """Record a successful request."""
-        async with self._lock:
+    def _on_success(self, duration: float) -> None:
+        slow = duration >= self.slow_call_threshold
+        with self._lock:
             self._total_requests += 1
             self._total_successes += 1
 
             if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
                 self._half_open_successes += 1
                 if self._half_open_successes >= self.half_open_requests:
-                    await self._transition_to(CircuitState.CLOSED)
-                    self._failure_count = 0
+                    self._transition_to(CircuitState.CLOSED)
             elif self._state == CircuitState.CLOSED:
-                self._success_count += 1
-                # Reset failure count on success
-                if self._failure_count > 0:
-                    self._failure_count = max(0, self._failure_count - 1)
-
-    async def record_failure(self) -> None:
-        """Record a failed request."""
-        async with self._lock:
+                now = time.monotonic()
+                self._window.record(False, slow, now)
+                if slow and self._window_exceeded(now):
+                    self._last_failure_time = now
+                    self._transition_to(CircuitState.OPEN)
+
+    def _on_failure(self, duration: float) -> None:
+        slow = duration >= self.slow_call_threshold
+        with self._lock:
+            now = time.monotonic()
             self._total_requests += 1
             self._total_failures += 1
-            self._failure_count += 1
-            self._last_failure_time = time.time()
+            self._last_failure_time = now
 
             if self._state == CircuitState.HALF_OPEN:
-                await self._transition_to(CircuitState.OPEN)
-                self._half_open_successes = 0
+                self._transition_to(CircuitState.OPEN)
             elif self._state == CircuitState.CLOSED:
-                if self._failure_count >= self.failure_threshold:
-                    await self._transition_to(CircuitState.OPEN)
+                self._window.record(True, slow, now)
+                if self._window_exceeded(now):
+                    self._transition_to(CircuitState.OPEN)
+
+    async def record_success(self, duration: float = 0.0) -> None:
+        """Record a successful request."""
+        self._on_success(duration)
+
+    async def record_failure(self, duration: float = 0.0) -> None:
+        """Record a failed request."""
+        self._on_failure(duration)
 
     async def execute(self, func: Callable[..., T], *args, **kwargs) -> T:
         """Execute a function through the circuit breaker."""
-        if not await self.can_execute():
+        if not self.try_acquire():
             raise CircuitOpenError(f"Circuit {self.name} is open")
 
+        start = time.monotonic()
         try:
             result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
-            await self.record_success()
-            return result
-        except Exception as e:
-            await self.record_failure()
+        except Exception:
+            self._on_failure(time.monotonic() - start)
+            raise
+        except BaseException:
+            # Cancelled probes must not keep their half-open slot
+            self.release()
             raise
+        self._on_success(time.monotonic() - start)
+        return result
 
     def __call__(self, func: Callable) -> Callable:
         """Decorator to wrap a function with circuit breaker."""
@@ -166,26 +288,32 @@ class CircuitBreaker:
 
     async def reset(self) -> None:
         """Reset the circuit breaker."""
-        async with self._lock:
-            await self._transition_to(CircuitState.CLOSED)
-            self._failure_count = 0
-            self._success_count = 0
-            self._half_open_successes = 0
+        with self._lock:
+            self._transition_to(CircuitState.CLOSED)
+            self._window.reset()
             self._last_failure_time = None
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get circuit breaker statistics."""
+        with self._lock:
+            calls, failures, slow = self._window.totals()
         return {
             "name": self.name,
             "state": self._state.value,
-            "failure_count": self._failure_count,
-            "success_count": self._success_count,
+            "failure_count": failures,
+            "success_count": calls - failures,
             "total_requests": self._total_requests,
             "total_failures": self._total_failures,
             "total_successes": self._total_successes,
             "failure_rate": self._total_failures / self._total_requests * 100 if self._total_requests > 0 else 0,
-            "last_failure": datetime.fromtimestamp(self._last_failure_time).isoformat() if self._last_failure_time else None,
-            "state_changes": self._state_changes[-10:],  # Last 10 changes
+            "window_failure_rate": failures / calls * 100 if calls else 0,
+            "window_slow_call_rate": slow / calls * 100 if calls else 0,
+            "half_open_in_flight": self._half_open_in_flight,
+            "last_failure": (
+                datetime.fromtimestamp(time.time() - (time.monotonic() - self._last_failure_time)).isoformat()
+                if self._last_failure_time else None
+            ),
+            "state_changes": list(self._state_changes),  # Last 10 changes
         }
 
 
@@ -195,41 +323,66 @@ class CircuitOpenError(Exception):
 
 
 class CircuitBreakerRegistry:
-    """Registry for managing multiple circuit breakers."""
+    """
+    Registry for managing multiple circuit breakers, keyed by dependency.
+
+    Breakers are spread over lock stripes by a hash of their name. Lookups
+    of existing breakers take no lock; a stripe lock is taken only to create
+    a breaker and doubles as the bookkeeping lock of the breakers in it.
+    """
 
     def __init__(
         self,
         default_failure_threshold: int = 5,
         default_recovery_timeout: float = 60.0,
         default_half_open_requests: int = 3,
+        stripes: int = 64,
     ):
-        self._breakers: Dict[str, CircuitBreaker] = {}
         self._default_failure_threshold = default_failure_threshold
         self._default_recovery_timeout = default_recovery_timeout
         self._default_half_open_requests = default_half_open_requests
-        self._lock = asyncio.Lock()
-
-    async def get(self, name: str) -> CircuitBreaker:
-        """Get or create a circuit breaker."""
-        async with self._lock:
-            if name not in self._breakers:
-                self._breakers[name] = CircuitBreaker(
+        self._stripe_count = max(1, stripes)
+        self._stripes: List[Dict[str, CircuitBreaker]] = [{} for _ in range(self._stripe_count)]
+        self._stripe_locks = [threading.Lock() for _ in range(self._stripe_count)]
+
+    def get_nowait(self, name: str) -> CircuitBreaker:
+        """Get or create a circuit breaker without awaiting."""
+        index = zlib.crc32(name.encode()) % self._stripe_count
+        stripe = self._stripes[index]
+        breaker = stripe.get(name)
+        if breaker is not None:
+            return breaker
+
+        lock = self._stripe_locks[index]
+        with lock:
+            breaker = stripe.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
                     name=name,
                     failure_threshold=self._default_failure_threshold,
                     recovery_timeout=self._default_recovery_timeout,
                     half_open_requests=self._default_half_open_requests,
+                    lock=lock,
                 )
-            return self._breakers[name]
+                stripe[name] = breaker
+        return breaker
+
+    async def get(self, name: str) -> CircuitBreaker:
+        """Get or create a circuit breaker."""
+        return self.get_nowait(name)
+
+    def _all(self) -> List[Tuple[str, CircuitBreaker]]:
+        return [item for stripe in self._stripes for item in list(stripe.items())]
 
     async def get_all_statistics(self) -> Dict[str, Dict[str, Any]]:
         """Get statistics for all circuit breakers."""
-        return {name: cb.get_statistics() for name, cb in self._breakers.items()}
+        return {name: cb.get_statistics() for name, cb in self._all()}
 
     async def reset_all(self) -> None:
         """Reset all circuit breakers."""
-        for cb in self._breakers.values():
+        for _, cb in self._all():
             await cb.reset()
 
     def __len__(self) -> int:
         """Return number of circuit breakers."""
-        return len(self._breakers)
+        return sum(len(stripe) for stripe in self._stripes)
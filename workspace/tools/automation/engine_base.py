@@ -235,6 +235,7 @@ class BaseEngine(ABC):
         # 任務隊列
         self._task_queue: asyncio.Queue = None
         self._active_tasks: Set[str] = set()
+        self._concurrency: asyncio.Semaphore = None
 
         # 控制標誌
         self._running = False
@@ -335,6 +336,7 @@ class BaseEngine(ABC):
         try:
             # 初始化組件
             self._task_queue = asyncio.Queue(maxsize=self.config.resource.max_queue_size)
+            self._concurrency = asyncio.Semaphore(self.config.resource.max_concurrent_tasks)
             self._shutdown_event = asyncio.Event()
 
             # 載入檢查點
@@ -483,17 +485,67 @@ class BaseEngine(ABC):
                 except asyncio.TimeoutError:
                     continue
 
-                # 檢查並發限制
-                while len(self._active_tasks) >= self.config.resource.max_concurrent_tasks:
-                    await asyncio.sleep(0.1)
+                # 檢查並發限制 (等待空閒槽位)
+                await self._concurrency.acquire()
 
                 # 執行任務
-                asyncio.create_task(self._process_task(task))
+                running = asyncio.create_task(self._process_task(task))
+                running.add_done_callback(lambda _: self._concurrency.release())
 
             except Exception as e:
                 self._logger.error(f"主循環錯誤: {e}")
                 await asyncio.sleep(1)
 
+    def get_load(self) -> int:
+        """當前負載 (執行中 + 排隊中的任務數)"""
+        return len(self._active_tasks) + self.get_queue_size()
+
+    def has_capacity(self) -> bool:
+        """是否有空閒執行槽位且隊列為空"""
+        return (
+            self._state == EngineState.RUNNING
+            and len(self._active_tasks) < self.config.resource.max_concurrent_tasks
+            and (self._task_queue is None or self._task_queue.empty())
+        )
+
+    def get_queue_size(self) -> int:
+        """排隊中的任務數"""
+        return self._task_queue.qsize() if self._task_queue else 0
+
+    def steal_tasks(
+        self,
+        max_count: int,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        從隊列尾部取出尚未開始的任務，供同類型空閒引擎執行
+
+        不符合 predicate 的任務保持原有順序留在隊列中。
+        """
+        if not self._task_queue or max_count <= 0:
+            return []
+
+        pending: List[Dict[str, Any]] = []
+        while True:
+            try:
+                pending.append(self._task_queue.get_nowait())
+                self._task_queue.task_done()
+            except asyncio.QueueEmpty:
+                break
+
+        stolen: List[Dict[str, Any]] = []
+        kept: List[Dict[str, Any]] = []
+        for task in reversed(pending):
+            if len(stolen) < max_count and (predicate is None or predicate(task)):
+                stolen.append(task)
+            else:
+                kept.append(task)
+
+        for task in reversed(kept):
+            self._task_queue.put_nowait(task)
+        stolen.reverse()
+        return stolen
+
     async def _process_task(self, task: Dict[str, Any]):
         """處理單一任務"""
         task_id = task["task_id"]
@@ -73,19 +73,25 @@ Version: 1.0.0
 """
 
 import asyncio
+import ast
+import hashlib
 import json
 import yaml
 import sys
 import signal
 import importlib
 import importlib.util
+import itertools
+import random
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Type, Set, Callable, Union
+from typing import Dict, List, Optional, Any, Type, Set, Callable, Union, Tuple
 from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
 import logging
 import argparse
+from collections import deque
+from itertools import islice
 
 from engine_base import (
     BaseEngine, EngineConfig, EngineState, EngineType,
@@ -101,6 +107,91 @@ CONFIG_PATH = BASE_PATH / "config" / "automation"
 ENGINES_PATH = BASE_PATH / "tools" / "automation" / "engines"
 STATE_PATH = BASE_PATH / ".automation_state"
 
+# 靜態發現快取格式版本
+DISCOVERY_CACHE_VERSION = 2
+
+# engine_base 中定義的引擎基類 (靜態發現時作為繼承根節點)
+_ENGINE_BASE_CLASSES = frozenset(
+    name for name, obj in vars(sys.modules[BaseEngine.__module__]).items()
+    if isinstance(obj, type) and issubclass(obj, BaseEngine)
+)
+
+def _base_reference(node: ast.expr) -> Optional[str]:
+    """取得基類在原始碼中的點分名稱 (`Base` 或 `module.Base`)"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        owner = _base_reference(node.value)
+        return f"{owner}.{node.attr}" if owner else None
+    if isinstance(node, ast.Subscript):
+        return _base_reference(node.value)
+    return None
+
+def _module_statements(body: List[ast.stmt]):
+    """遍歷模組級語句 (含 if/try 區塊內，不進入函數與類)"""
+    for statement in body:
+        yield statement
+        if isinstance(statement, ast.If):
+            yield from _module_statements(statement.body + statement.orelse)
+        elif isinstance(statement, ast.Try):
+            blocks = statement.body + statement.orelse + statement.finalbody
+            for handler in statement.handlers:
+                blocks += handler.body
+            yield from _module_statements(blocks)
+
+def _module_imports(tree: ast.Module) -> Tuple[Dict[str, str], List[str]]:
+    """
+    收集模組級導入
+
+    Returns:
+        (綁定名稱 -> 完整引用, `import *` 的模組)；相對導入保留前導點，
+        例如 `from .base import A as B` 記為 `{"B": ".base.A"}`
+    """
+    imports: Dict[str, str] = {}
+    star_imports: List[str] = []
+    for statement in _module_statements(tree.body):
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname:
+                    imports[alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".", 1)[0]
+                    imports[head] = head
+        elif isinstance(statement, ast.ImportFrom):
+            prefix = "." * statement.level + (statement.module or "")
+            for alias in statement.names:
+                if alias.name == "*":
+                    star_imports.append(prefix)
+                else:
+                    separator = "." if statement.module else ""
+                    imports[alias.asname or alias.name] = f"{prefix}{separator}{alias.name}"
+    return imports, star_imports
+
+def _qualify(reference: str, imports: Dict[str, str]) -> str:
+    """以模組導入展開基類引用的首段名稱"""
+    head, dot, rest = reference.partition(".")
+    return imports[head] + dot + rest if head in imports else reference
+
+def _static_engine_type(node: ast.ClassDef) -> Optional[str]:
+    """從類體中的 `ENGINE_TYPE = EngineType.X` 靜態取得引擎類型值"""
+    for statement in node.body:
+        if isinstance(statement, ast.Assign):
+            targets, value = statement.targets, statement.value
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            targets, value = [statement.target], statement.value
+        else:
+            continue
+        if not any(isinstance(t, ast.Name) and t.id == "ENGINE_TYPE" for t in targets):
+            continue
+        try:
+            if isinstance(value, ast.Attribute):
+                return EngineType[value.attr].value
+            if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                return EngineType(value.value).value
+        except (KeyError, ValueError):
+            return None
+    return None
+
 # ============================================================================
 # 配置資料結構
 # ============================================================================
@@ -114,6 +205,7 @@ class OrchestratorConfig:
     # 自動化設定
     auto_discover: bool = True              # 自動發現引擎
     auto_start_engines: bool = True         # 自動啟動引擎
+    lazy_engine_loading: bool = True        # 引擎類在首次使用時才導入與啟動
     auto_recover: bool = True               # 自動恢復
     auto_scale: bool = False                # 自動擴縮
 
@@ -132,8 +224,16 @@ class OrchestratorConfig:
 
     # 事件設定
     event_queue_size: int = 10000
+    event_subscriber_queue_size: int = 1000  # 每個訂閱者的佇列上限
+    event_backpressure_timeout: float = 1.0  # 訂閱者佇列滿時的等待秒數
+    event_handler_timeout: Optional[float] = None  # 異步處理器單次執行上限秒數 (None 不限)
+    event_history_size: int = 1000
     event_retention_hours: int = 24
 
+    # 調度設定
+    dispatch_strategy: str = "least_loaded"  # least_loaded | power_of_two
+    work_steal_interval: float = 0.5        # 工作竊取檢查間隔 (0 停用)
+
 @dataclass
 class PipelineConfig:
     """管道配置"""
@@ -162,80 +262,217 @@ class EngineRegistration:
 # 事件總線
 # ============================================================================
 
+class _Subscription:
+    """
+    單一訂閱者 - 獨立佇列與工作協程
+
+    每個訂閱者擁有有界佇列，處理器在自己的協程中依序執行，
+    慢速處理器只會填滿自己的佇列，不會阻塞其他訂閱者。
+    """
+
+    def __init__(self, event_type: str, handler: Callable, queue_size: int):
+        self.event_type = event_type
+        self.handler = handler
+        self.is_async = asyncio.iscoroutinefunction(handler)
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self, bus: "EventBus"):
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self.task = asyncio.create_task(bus._run_subscriber(self))
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
 class EventBus:
     """
     事件總線 - 引擎間通信中心
+
+    - 訂閱表為不可變 tuple 快照，分發時無需複製或加鎖
+    - 每個訂閱者有獨立的有界佇列與工作協程，處理器之間並發執行
+    - 訂閱者佇列已滿時分發等待 backpressure_timeout（背壓），
+      超時則僅對該訂閱者丟棄事件（隔離）
+    - 異步處理器執行超過 handler_timeout 時取消並計為錯誤
+    - 歷史記錄使用固定長度的 deque 環形緩衝
     """
 
-    def __init__(self, max_size: int = 10000):
+    def __init__(
+        self,
+        max_size: int = 10000,
+        subscriber_queue_size: int = 1000,
+        backpressure_timeout: float = 1.0,
+        handler_timeout: Optional[float] = None,
+        max_history: int = 1000,
+    ):
         self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
-        self._subscribers: Dict[str, List[Callable]] = {}
-        self._history: List[EngineEvent] = []
-        self._max_history = 1000
+        self._subscribers: Dict[str, Tuple[_Subscription, ...]] = {}
+        self._history: deque = deque(maxlen=max_history)
+        self._max_history = max_history
+        self._subscriber_queue_size = subscriber_queue_size
+        self._backpressure_timeout = backpressure_timeout
+        self._handler_timeout = handler_timeout
         self._running = False
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._published = 0
         self._logger = logging.getLogger("event_bus")
 
     async def start(self):
         """啟動事件總線"""
         self._running = True
-        asyncio.create_task(self._dispatch_loop())
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.start(self)
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
         self._logger.info("事件總線已啟動")
 
     async def stop(self):
         """停止事件總線"""
         self._running = False
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
+            self._dispatch_task = None
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.stop()
 
     async def publish(self, event: EngineEvent):
         """發布事件"""
         await self._queue.put(event)
+        self._published += 1
 
         # 記錄歷史
         self._history.append(event)
-        if len(self._history) > self._max_history:
-            self._history = self._history[-self._max_history:]
 
     def subscribe(self, event_type: str, handler: Callable):
         """訂閱事件"""
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(handler)
+        subscription = _Subscription(event_type, handler, self._subscriber_queue_size)
+        self._subscribers[event_type] = self._subscribers.get(event_type, ()) + (subscription,)
+        if self._running:
+            subscription.start(self)
 
     def unsubscribe(self, event_type: str, handler: Callable):
         """取消訂閱"""
-        if event_type in self._subscribers:
-            self._subscribers[event_type].remove(handler)
+        subscriptions = self._subscribers.get(event_type, ())
+        for index, subscription in enumerate(subscriptions):
+            if subscription.handler == handler:
+                subscription.stop()
+                remaining = subscriptions[:index] + subscriptions[index + 1:]
+                if remaining:
+                    self._subscribers[event_type] = remaining
+                else:
+                    del self._subscribers[event_type]
+                return
 
     async def _dispatch_loop(self):
         """事件分發循環"""
         while self._running:
             try:
-                event = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+                event = await self._queue.get()
+            except asyncio.CancelledError:
+                break
+            try:
                 await self._dispatch(event)
-            except asyncio.TimeoutError:
-                continue
+            except asyncio.CancelledError:
+                break
             except Exception as e:
                 self._logger.error(f"事件分發錯誤: {e}")
+            finally:
+                self._queue.task_done()
 
     async def _dispatch(self, event: EngineEvent):
-        """分發單一事件"""
-        handlers = self._subscribers.get(event.event_type, [])
-        handlers.extend(self._subscribers.get("*", []))  # 全局訂閱者
-
-        for handler in handlers:
+        """分發單一事件到訂閱者佇列"""
+        subscriptions = self._subscribers.get(event.event_type, ())
+        if event.event_type != "*":
+            subscriptions += self._subscribers.get("*", ())  # 全局訂閱者
+
+        for subscription in subscriptions:
+            queue = subscription.queue
+            if queue is None:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                try:
+                    await asyncio.wait_for(queue.put(event), timeout=self._backpressure_timeout)
+                except asyncio.TimeoutError:
+                    subscription.dropped += 1
+                    self._logger.warning(
+                        f"訂閱者佇列已滿，丟棄事件: {event.event_type} -> {getattr(subscription.handler, '__qualname__', subscription.handler)}"
+                    )
+
+    async def _run_subscriber(self, subscription: _Subscription):
+        """訂閱者工作協程"""
+        queue = subscription.queue
+        while True:
+            event = await queue.get()
             try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
+                if subscription.is_async:
+                    if self._handler_timeout is not None:
+                        await asyncio.wait_for(subscription.handler(event), timeout=self._handler_timeout)
+                    else:
+                        await subscription.handler(event)
                 else:
-                    handler(event)
+                    subscription.handler(event)
+                subscription.delivered += 1
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
+                subscription.errors += 1
                 self._logger.error(f"事件處理錯誤: {e}")
+            finally:
+                queue.task_done()
+
+    async def join(self):
+        """等待已發布事件全部處理完成"""
+        await self._queue.join()
+        for subscriptions in list(self._subscribers.values()):
+            for subscription in subscriptions:
+                if subscription.queue is not None and subscription.task is not None:
+                    await subscription.queue.join()
 
     def get_history(self, event_type: str = None, limit: int = 100) -> List[EngineEvent]:
         """獲取事件歷史"""
-        events = self._history
-        if event_type:
-            events = [e for e in events if e.event_type == event_type]
-        return events[-limit:]
+        if limit <= 0:
+            return []
+        if not event_type:
+            start = max(len(self._history) - limit, 0)
+            return list(islice(self._history, start, None))
+
+        events = []
+        for event in reversed(self._history):
+            if event.event_type == event_type:
+                events.append(event)
+                if len(events) >= limit:
+                    break
+        events.reverse()
+        return events
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取事件總線統計"""
+        return {
+            "published": self._published,
+            "pending": self._queue.qsize(),
+            "history_size": len(self._history),
+            "subscribers": [
+                {
+                    "event_type": subscription.event_type,
+                    "handler": getattr(subscription.handler, "__qualname__", repr(subscription.handler)),
+                    "queued": subscription.queue.qsize() if subscription.queue is not None else 0,
+                    "delivered": subscription.delivered,
+                    "dropped": subscription.dropped,
+                    "errors": subscription.errors,
+                }
+                for subscriptions in self._subscribers.values()
+                for subscription in subscriptions
+            ],
+        }
 
 # ============================================================================
 # 引擎註冊中心
@@ -335,9 +572,15 @@ class EngineRegistry:
     - `config/system-manifest.yaml` - Module registration schema
     """
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = None):
         self._engines: Dict[str, EngineRegistration] = {}
+        self._engines_by_type: Dict[EngineType, Dict[str, EngineRegistration]] = {}
         self._engine_classes: Dict[str, Type[BaseEngine]] = {}
+        self._loaded_modules: Dict[str, Any] = {}
+        self._activation_locks: Dict[str, asyncio.Lock] = {}
+        self._cache_path = cache_path
+        self._discovery_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._discovery_cache_dirty = False
         self._logger = logging.getLogger("engine_registry")
 
     def register_class(self, name: str, engine_class: Type[BaseEngine]):
@@ -348,13 +591,18 @@ class EngineRegistry:
     def register_engine(self, registration: EngineRegistration):
         """註冊引擎實例"""
         registration.registered_at = datetime.now().isoformat()
+        previous = self._engines.get(registration.engine_id)
+        if previous is not None:
+            self._engines_by_type.get(previous.engine_type, {}).pop(previous.engine_id, None)
         self._engines[registration.engine_id] = registration
+        self._engines_by_type.setdefault(registration.engine_type, {})[registration.engine_id] = registration
         self._logger.info(f"引擎已註冊: {registration.engine_name} ({registration.engine_id})")
 
     def unregister_engine(self, engine_id: str):
         """取消註冊引擎"""
         if engine_id in self._engines:
-            del self._engines[engine_id]
+            registration = self._engines.pop(engine_id)
+            self._engines_by_type.get(registration.engine_type, {}).pop(engine_id, None)
             self._logger.info(f"引擎已取消註冊: {engine_id}")
 
     def get_engine(self, engine_id: str) -> Optional[EngineRegistration]:
@@ -367,7 +615,11 @@ class EngineRegistry:
 
     def get_engines_by_type(self, engine_type: EngineType) -> List[EngineRegistration]:
         """按類型獲取引擎"""
-        return [e for e in self._engines.values() if e.engine_type == engine_type]
+        return list(self._engines_by_type.get(engine_type, {}).values())
+
+    def get_engines_grouped_by_type(self) -> Dict[EngineType, List[EngineRegistration]]:
+        """按類型分組獲取引擎"""
+        return {t: list(engines.values()) for t, engines in self._engines_by_type.items() if engines}
 
     def get_healthy_engines(self) -> List[EngineRegistration]:
         """獲取健康的引擎"""
@@ -387,10 +639,15 @@ class EngineRegistry:
 
         Discovery Strategies:
         ---------------------
-        1. **Python Module Introspection**:
+        1. **Static Python Module Analysis**:
            - Recursively scans for all `*.py` files in search paths
            - Excludes files starting with underscore (private modules)
-           - Dynamically loads modules and inspects for BaseEngine subclasses
+           - Parses modules with `ast` (no import, no top-level code executed)
+           - Resolves BaseEngine subclasses across all scanned files, including
+             indirect subclasses of the engine_base specialised bases
+           - Base classes are resolved through each module's imports to a
+             (module path, class name) pair, so same-named classes in
+             unrelated files do not collide
            - Extracts engine metadata (class name, module path, engine type)
 
         2. **YAML Configuration Discovery**:
@@ -438,15 +695,16 @@ class EngineRegistry:
 
         Module Loading:
         ---------------
-        - Uses `importlib.util.spec_from_file_location` for dynamic loading
-        - Modules are loaded in isolated namespace to prevent conflicts
+        - Modules are never imported during discovery
         - Only inspects module-level class definitions
-        - Does not instantiate engines during discovery phase
+        - Per-file results are cached by (mtime, size) with a content hash
+          fallback, and persisted to `cache_path` when configured
+        - Engine classes are imported by `load_engine_class()` when an engine
+          is first instantiated
 
         Error Handling:
         ---------------
         - Invalid Python syntax: Logged and skipped
-        - Import errors: Logged and skipped
         - YAML parse errors: Logged and skipped
         - File permission errors: Silently skipped
 
@@ -467,10 +725,9 @@ class EngineRegistry:
 
         Performance Considerations:
         ---------------------------
-        - Discovery time scales with number of files in search paths
-        - Module loading incurs one-time import cost per Python file
-        - Recommended to cache results and re-discover only on file changes
-        - Consider using file system watchers for production deployments
+        - Discovery time scales with number of changed files in search paths
+        - Unchanged files are served from the discovery cache without parsing
+        - Import cost is paid only for engines that are actually used
 
         Thread Safety:
         --------------
@@ -479,11 +736,13 @@ class EngineRegistry:
 
         See Also:
         ---------
-        - `_inspect_module()`: Internal method for Python module introspection
+        - `_scan_module()`: Internal method for static module analysis
         - `register_engine()`: Register discovered engines for use
         - `EngineConfig`: Expected configuration structure for engines
         """
         discovered = []
+        scanned: Dict[str, Dict[str, Any]] = {}
+        cache = self._load_discovery_cache()
 
         for search_path in search_paths:
             if not search_path.exists():
@@ -495,9 +754,7 @@ class EngineRegistry:
                     continue
 
                 try:
-                    engine_info = self._inspect_module(py_file)
-                    if engine_info:
-                        discovered.extend(engine_info)
+                    scanned[str(py_file)] = self._scan_module(py_file, cache)
                 except Exception as e:
                     self._logger.debug(f"檢查模組失敗 {py_file}: {e}")
 
@@ -512,135 +769,261 @@ class EngineRegistry:
                 except Exception as e:
                     self._logger.debug(f"讀取配置失敗 {config_file}: {e}")
 
-        return discovered
-
-    def _inspect_module(self, module_path: Path) -> List[Dict[str, Any]]:
-        """
-        INTERNAL: Inspect a Python module file to discover BaseEngine subclasses.
+        self._save_discovery_cache(cache, scanned)
+        return self._resolve_engine_classes(scanned) + discovered
 
-        This is a private/internal method. It dynamically loads a Python module and uses
-        runtime introspection to identify all classes that inherit from BaseEngine, extracting
-        metadata for registration.
+    def _load_discovery_cache(self) -> Dict[str, Dict[str, Any]]:
+        """載入發現快取"""
+        if self._discovery_cache is None:
+            self._discovery_cache = {}
+            if self._cache_path and self._cache_path.exists():
+                try:
+                    data = json.loads(self._cache_path.read_text(encoding='utf-8'))
+                    if data.get("version") == DISCOVERY_CACHE_VERSION:
+                        self._discovery_cache = data.get("files", {})
+                except (OSError, ValueError) as e:
+                    self._logger.debug(f"讀取發現快取失敗: {e}")
+        return self._discovery_cache
+
+    def _save_discovery_cache(self, cache: Dict[str, Dict[str, Any]], scanned: Dict[str, Any]):
+        """保存發現快取 (移除已不存在的檔案)"""
+        for path in [p for p in cache if p not in scanned and not Path(p).exists()]:
+            del cache[path]
+            self._discovery_cache_dirty = True
+
+        if not self._cache_path or not self._discovery_cache_dirty:
+            return
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps({"version": DISCOVERY_CACHE_VERSION, "files": cache}),
+                encoding='utf-8',
+            )
+            tmp_path.replace(self._cache_path)
+            self._discovery_cache_dirty = False
+        except OSError as e:
+            self._logger.debug(f"寫入發現快取失敗: {e}")
 
-        Do NOT call this method directly. Use the public `discover_engines()` method instead,
-        which handles engine discovery and registration in a safe and supported manner.
+    def _scan_module(self, module_path: Path, cache: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        靜態分析模組中的類定義 (不導入模組)
+
+        Returns ``{"classes", "imports", "star_imports"}``. Each class is a
+        ``{"name", "bases", "engine_type"}`` dict whose bases are expanded
+        through the module's imports (``from engine_base import BaseEngine``
+        gives ``engine_base.BaseEngine``); bare names refer to the module's own
+        classes or its ``import *`` sources. Results are cached by
+        ``(mtime_ns, size)``; when those change the content hash is compared
+        before re-parsing, so touched-but-unchanged files are not parsed again.
+
+        Raises:
+            OSError: 檔案無法讀取
+            SyntaxError: 模組語法錯誤
+        """
+        key = str(module_path)
+        stat = module_path.stat()
+        entry = cache.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["module"]
+
+        source = module_path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        if entry and entry["sha256"] == digest:
+            module = entry["module"]
+        else:
+            module = {"classes": [], "imports": {}, "star_imports": []}
+            # 快速略過既無類定義也無導入 (不可能再導出基類) 的檔案
+            if b"class " in source or b"import " in source:
+                tree = ast.parse(source, filename=key)
+                imports, star_imports = _module_imports(tree)
+                module = {"classes": [], "imports": imports, "star_imports": star_imports}
+                for node in tree.body:
+                    if isinstance(node, ast.ClassDef):
+                        references = filter(None, map(_base_reference, node.bases))
+                        module["classes"].append({
+                            "name": node.name,
+                            "bases": [_qualify(reference, imports) for reference in references],
+                            "engine_type": _static_engine_type(node),
+                        })
+
+        cache[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "module": module,
+        }
+        self._discovery_cache_dirty = True
+        return module
 
-        Parameters
-        ----------
-        module_path : Path
-            Path to the Python module file (.py) to inspect.
+    def _resolve_engine_classes(self, scanned: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        從靜態分析結果解析 BaseEngine 子類 (含跨檔案的間接繼承)
 
-        Returns
-        -------
-        List[Dict[str, Any]]
-            List of metadata dictionaries for each discovered engine class, or an empty list.
-        Engine Class Criteria:
-        ----------------------
-        A class is considered a valid engine if ALL of these conditions are met:
-        - Is a Python class (type instance)
-        - Is a subclass of BaseEngine
-        - Is NOT the BaseEngine class itself (no self-inheritance)
-        - Class name does not start with underscore (public classes only)
-
-        Metadata Extraction:
-        --------------------
-        - **class_name**: Directly from the class `__name__` attribute
-        - **module_path**: Converted to string for JSON serialization
-        - **engine_type**: String value extracted from the ENGINE_TYPE class 
-                           attribute if present, otherwise defaults to the 
-                           string value of EngineType.EXECUTION
+        類以 (模組路徑, 類名) 識別，基類引用按導入解析到具體檔案，
+        不同檔案中的同名類互不干擾。`engine_base` 模組中的引擎基類為繼承根節點。
+        """
+        class_names = {path: {cls["name"] for cls in module["classes"]} for path, module in scanned.items()}
+        by_stem: Dict[str, List[str]] = {}
+        for path in scanned:
+            by_stem.setdefault(Path(path).stem, []).append(path)
+
+        def locate(module_name: str, importer: str) -> Optional[str]:
+            """將 (相對) 模組名稱解析為已掃描的檔案路徑"""
+            level = len(module_name) - len(module_name.lstrip("."))
+            parts = [part for part in module_name[level:].split(".") if part]
+            if not parts:
+                return None
+            if level:
+                package = Path(importer).parent
+                for _ in range(level - 1):
+                    package = package.parent
+                candidate = str(package.joinpath(*parts)) + ".py"
+                return candidate if candidate in scanned else None
+            # 腳本式導入優先匹配同目錄模組，其次為唯一的路徑後綴匹配
+            sibling = str(Path(importer).parent.joinpath(*parts)) + ".py"
+            if sibling in scanned:
+                return sibling
+            matches = [
+                path for path in by_stem.get(parts[-1], [])
+                if Path(path).with_suffix("").parts[-len(parts):] == tuple(parts)
+            ]
+            return matches[0] if len(matches) == 1 else None
+
+        def resolve(reference: str, importer: str, seen: Set[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+            """將基類引用解析為 (模組路徑, 類名)"""
+            level = len(reference) - len(reference.lstrip("."))
+            if "." not in reference[level:]:
+                if not level and reference in class_names[importer]:
+                    return (importer, reference)
+                if level:
+                    return None
+                # 未定義於本模組的裸名稱只可能來自 `import *`
+                for star in scanned[importer]["star_imports"]:
+                    separator = "." if star.strip(".") else ""
+                    resolved = resolve(f"{star}{separator}{reference}", importer, seen)
+                    if resolved:
+                        return resolved
+                return None
+
+            module_name, _, name = reference.rpartition(".")
+            if module_name.rsplit(".", 1)[-1] == "engine_base" and name in _ENGINE_BASE_CLASSES:
+                return ("engine_base", name)
+            path = locate(module_name, importer)
+            if path is None or (path, name) in seen:
+                return None
+            if name in class_names[path]:
+                return (path, name)
+            # 跟隨模組的再導出 (from x import Base)
+            seen.add((path, name))
+            exported = scanned[path]["imports"].get(name)
+            return resolve(exported, path, seen) if exported else None
+
+        engine_classes: Set[Tuple[str, str]] = {("engine_base", name) for name in _ENGINE_BASE_CLASSES}
+        parents: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        own_types: Dict[Tuple[str, str], Optional[str]] = {}
+        for module_path, module in scanned.items():
+            for cls in module["classes"]:
+                key = (module_path, cls["name"])
+                bases = [resolve(base, module_path, set()) for base in cls["bases"]]
+                parents.setdefault(key, []).extend(base for base in bases if base)
+                if cls["engine_type"] and not own_types.get(key):
+                    own_types[key] = cls["engine_type"]
+
+        # 迭代至不動點：任一基類為引擎類即為引擎類
+        changed = True
+        while changed:
+            changed = False
+            for key, bases in parents.items():
+                if key not in engine_classes and any(base in engine_classes for base in bases):
+                    engine_classes.add(key)
+                    changed = True
+
+        def resolve_type(key: Tuple[str, str], seen: Set[Tuple[str, str]]) -> str:
+            if own_types.get(key):
+                return own_types[key]
+            seen.add(key)
+            for base in parents.get(key, []):
+                if base in engine_classes and base not in seen:
+                    return resolve_type(base, seen)
+            return EngineType.EXECUTION.value
 
-        Error Handling:
-        ---------------
-        All exceptions during module loading and introspection are silently
-        caught and ignored. **No exceptions are logged at all.**
-
-        .. warning::
-           This may make debugging difficult, as any errors (e.g., syntax errors,
-           missing dependencies, or other failures) will be completely silent.
-           Unlike ``discover_engines``, which logs exceptions at DEBUG level,
-           this method does not log any errors during discovery.
-
-        This ensures that:
-        - Syntax errors in modules don't crash discovery
-        - Missing dependencies don't halt the process
-        - Malformed modules are gracefully skipped
-
-        Common failure scenarios:
-        - ImportError: Module has missing dependencies
-        - SyntaxError: Module contains invalid Python syntax
-        - AttributeError: Module has unexpected structure
-        - FileNotFoundError: Module path is invalid (should not occur with proper caller)
-
-        Security Considerations:
-        ------------------------
-        - **Code Execution**: This method executes arbitrary Python code from files
-        - **Trust Boundary**: Only use with trusted module paths from controlled
-          search directories
-        - **Isolation**: Each module is loaded in a fresh namespace to prevent
-          cross-contamination
-        - **No Sandbox**: This method does NOT provide security sandboxing
-
-        Performance Notes:
-        ------------------
-        - Module loading has O(n) complexity where n = file size
-        - Class introspection is O(m) where m = number of module attributes
-        - Each module is loaded only once per discovery cycle
-        - Consider caching results for frequently inspected modules
-
-        Example Discovered Metadata:
-        ----------------------------
-        >>> engines = registry._inspect_module(Path("engines/validator.py"))
-        >>> print(engines)
-        [
-            {
-                'class_name': 'ValidationEngine',
-                'module_path': '/app/tools/automation/engines/validator.py',
-                'engine_type': 'validation'
-            },
-            {
-                'class_name': 'SyntaxValidationEngine',
-                'module_path': '/app/tools/automation/engines/validator.py',
-                'engine_type': 'validation'
-            }
-        ]
+        engines = []
+        for module_path, module in scanned.items():
+            for cls in module["classes"]:
+                name = cls["name"]
+                key = (module_path, name)
+                if name.startswith('_') or key not in engine_classes:
+                    continue
+                if Path(module_path).stem == "engine_base" and name in _ENGINE_BASE_CLASSES:
+                    continue
+                engines.append({
+                    "class_name": name,
+                    "module_path": module_path,
+                    "engine_type": resolve_type(key, set()),
+                })
+        return engines
 
-        See Also:
-        ---------
-        - `discover_engines()`: Public method that calls this for module discovery
-        - `BaseEngine`: The base class that all engines must inherit from
-        - `EngineType`: Enum defining valid engine type values
+    def load_engine_class(self, module_path: str, class_name: str) -> Type[BaseEngine]:
         """
-        engines = []
+        按需導入引擎類 (同一模組只執行一次)
 
-        try:
-            spec = importlib.util.spec_from_file_location(
-                module_path.stem, module_path
-            )
+        Raises:
+            ImportError: 模組無法載入
+            TypeError: 類不是 BaseEngine 子類
+        """
+        module = self._loaded_modules.get(module_path)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(Path(module_path).stem, module_path)
             if spec is None or spec.loader is None:
-                return engines
-
+                raise ImportError(f"無法載入模組: {module_path}")
             module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(module)
+            self._loaded_modules[module_path] = module
+
+        engine_class = getattr(module, class_name, None)
+        if not (isinstance(engine_class, type) and issubclass(engine_class, BaseEngine)):
+            raise TypeError(f"{class_name} 不是 BaseEngine 子類: {module_path}")
+        self._engine_classes.setdefault(class_name, engine_class)
+        return engine_class
+
+    def instantiate(self, registration: EngineRegistration) -> BaseEngine:
+        """為延遲註冊的引擎建立實例"""
+        if registration.instance is None:
+            if registration.module_path:
+                engine_class = self.load_engine_class(registration.module_path, registration.engine_class)
+            else:
+                engine_class = self._engine_classes.get(registration.engine_class)
+                if engine_class is None:
+                    raise ImportError(f"未註冊的引擎類: {registration.engine_class}")
+            registration.instance = engine_class(registration.config)
+            self._logger.info(f"引擎已載入: {registration.engine_name}")
+        return registration.instance
+
+    async def activate(self, registration: EngineRegistration) -> Optional[BaseEngine]:
+        """首次使用時載入並啟動引擎"""
+        if registration.instance is not None and registration.healthy:
+            return registration.instance
+
+        lock = self._activation_locks.setdefault(registration.engine_id, asyncio.Lock())
+        async with lock:
+            if registration.instance is not None and registration.healthy:
+                return registration.instance
+            try:
+                instance = self.instantiate(registration)
+                if instance.state in (EngineState.UNINITIALIZED, EngineState.STOPPED):
+                    registration.healthy = await instance.start()
+            except Exception as e:
+                self._logger.error(f"載入引擎 {registration.engine_class} 失敗: {e}")
+                registration.healthy = False
+            return registration.instance if registration.healthy else None
 
-            # 尋找 BaseEngine 子類
-            for name, obj in vars(module).items():
-                if (isinstance(obj, type) and
-                    issubclass(obj, BaseEngine) and
-                    obj is not BaseEngine and
-                    not name.startswith('_')):
-
-                    # 獲取引擎資訊
-                    engines.append({
-                        "class_name": name,
-                        "module_path": str(module_path),
-                        "engine_type": getattr(obj, 'ENGINE_TYPE', EngineType.EXECUTION).value,
-                    })
-
-        except Exception as e:
-            pass
-
-        return engines
+    async def activate_any(self, engine_type: EngineType) -> Optional[EngineRegistration]:
+        """啟動一個尚未載入的指定類型引擎"""
+        for registration in self.get_engines_by_type(engine_type):
+            if registration.instance is None and await self.activate(registration):
+                return registration
+        return None
 
 # ============================================================================
 # 引擎調度器
@@ -649,63 +1032,155 @@ class EngineRegistry:
 class EngineScheduler:
     """
     引擎調度器 - 任務調度與分發
+
+    按引擎類型分發任務時選擇負載最低的健康引擎：
+    - least_loaded: 比較所有候選引擎的 (執行中 + 排隊) / 並發上限
+    - power_of_two: 隨機取兩個候選引擎，選擇負載較低者 (大型引擎池)
+
+    背景平衡循環讓空閒引擎從同類型最忙的引擎隊列竊取尚未開始的任務。
     """
 
-    def __init__(self, registry: EngineRegistry, event_bus: EventBus):
+    STRATEGIES = ("least_loaded", "power_of_two")
+
+    def __init__(
+        self,
+        registry: EngineRegistry,
+        event_bus: EventBus,
+        strategy: str = "least_loaded",
+        steal_interval: float = 0.5,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"未知的調度策略: {strategy}")
         self._registry = registry
         self._event_bus = event_bus
+        self._strategy = strategy
+        self._steal_interval = steal_interval
         self._task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
         self._running = False
+        self._tasks: List[asyncio.Task] = []
+        self._dispatched: Dict[str, int] = {}
+        self._stolen = 0
         self._logger = logging.getLogger("engine_scheduler")
 
     async def start(self):
         """啟動調度器"""
         self._running = True
-        asyncio.create_task(self._schedule_loop())
+        self._tasks = [asyncio.create_task(self._schedule_loop())]
+        if self._steal_interval > 0:
+            self._tasks.append(asyncio.create_task(self._balance_loop()))
         self._logger.info("調度器已啟動")
 
     async def stop(self):
         """停止調度器"""
         self._running = False
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
 
     async def schedule_task(self, task: Dict[str, Any], priority: Priority = Priority.NORMAL):
         """調度任務"""
-        await self._task_queue.put((priority.value, task))
+        # 序號保證同優先級按提交順序出隊，且不比較任務字典
+        await self._task_queue.put((priority.value, next(self._sequence), task))
 
     async def _schedule_loop(self):
         """調度循環"""
         while self._running:
             try:
-                _, task = await asyncio.wait_for(self._task_queue.get(), timeout=1.0)
+                _, _, task = await self._task_queue.get()
                 await self._dispatch_task(task)
-            except asyncio.TimeoutError:
-                continue
+            except asyncio.CancelledError:
+                break
             except Exception as e:
                 self._logger.error(f"調度錯誤: {e}")
 
+    @staticmethod
+    def _load_ratio(reg: EngineRegistration) -> float:
+        capacity = max(reg.config.resource.max_concurrent_tasks, 1)
+        return reg.instance.get_load() / capacity
+
+    def select_engine(self, engine_type: EngineType) -> Optional[EngineRegistration]:
+        """為指定類型選擇負載最低的健康引擎"""
+        candidates = [e for e in self._registry.get_engines_by_type(engine_type) if e.healthy and e.instance]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        if self._strategy == "power_of_two":
+            candidates = random.sample(candidates, 2)
+        return min(candidates, key=self._load_ratio)
+
     async def _dispatch_task(self, task: Dict[str, Any]):
         """分發任務"""
         target_engine_id = task.get("target_engine_id")
         target_engine_type = task.get("target_engine_type")
 
         # 找到合適的引擎
+        engine = None
         if target_engine_id:
             reg = self._registry.get_engine(target_engine_id)
+            if reg and not reg.instance:
+                await self._registry.activate(reg)
             if reg and reg.instance and reg.healthy:
-                await reg.instance.submit_task(task)
-                return
+                engine = reg
 
         elif target_engine_type:
-            engines = self._registry.get_engines_by_type(EngineType(target_engine_type))
-            healthy_engines = [e for e in engines if e.healthy and e.instance]
-            if healthy_engines:
-                # 負載均衡 (簡單輪詢)
-                engine = healthy_engines[0]
-                await engine.instance.submit_task(task)
-                return
+            engine_type = EngineType(target_engine_type)
+            engine = self.select_engine(engine_type) or await self._registry.activate_any(engine_type)
+
+        if engine:
+            await engine.instance.submit_task(task)
+            self._dispatched[engine.engine_id] = self._dispatched.get(engine.engine_id, 0) + 1
+            return
 
         self._logger.warning(f"找不到合適的引擎執行任務: {task.get('task_id')}")
 
+    async def _balance_loop(self):
+        """工作竊取循環"""
+        while self._running:
+            try:
+                await asyncio.sleep(self._steal_interval)
+                await self.rebalance()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._logger.error(f"負載平衡錯誤: {e}")
+
+    async def rebalance(self) -> int:
+        """讓空閒引擎竊取同類型引擎的排隊任務，返回移動的任務數"""
+        moved = 0
+        for engines in self._registry.get_engines_grouped_by_type().values():
+            if len(engines) < 2:
+                continue
+            candidates = [e for e in engines if e.healthy and e.instance]
+            for idle in [e for e in candidates if e.instance.has_capacity()]:
+                victim = max(candidates, key=self._load_ratio)
+                queued = victim.instance.get_queue_size()
+                if victim is idle or queued == 0:
+                    continue
+                free_slots = idle.config.resource.max_concurrent_tasks - idle.instance.get_load()
+                # 指定 engine_id 的任務不能轉移，只竊取按類型分發的任務
+                stolen = victim.instance.steal_tasks(
+                    min(free_slots, (queued + 1) // 2),
+                    predicate=lambda task: not task.get("target_engine_id"),
+                )
+                for task in stolen:
+                    await idle.instance.submit_task(task)
+                moved += len(stolen)
+        if moved:
+            self._stolen += moved
+            self._logger.debug(f"工作竊取: 移動 {moved} 個任務")
+        return moved
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取調度統計"""
+        return {
+            "strategy": self._strategy,
+            "queued": self._task_queue.qsize(),
+            "dispatched": dict(self._dispatched),
+            "stolen": self._stolen,
+        }
+
 # ============================================================================
 # 管道執行器
 # ============================================================================
@@ -790,13 +1265,13 @@ class PipelineExecutor:
         engine = None
         if engine_id:
             reg = self._registry.get_engine(engine_id)
-            if reg and reg.instance:
-                engine = reg.instance
+            if reg:
+                engine = reg.instance or await self._registry.activate(reg)
         elif engine_type:
-            engines = self._registry.get_engines_by_type(EngineType(engine_type))
-            healthy = [e for e in engines if e.healthy and e.instance]
-            if healthy:
-                engine = healthy[0].instance
+            reg = (self._scheduler.select_engine(EngineType(engine_type))
+                   or await self._registry.activate_any(EngineType(engine_type)))
+            if reg:
+                engine = reg.instance
 
         if not engine:
             return {"success": False, "error": "找不到引擎"}
@@ -927,9 +1402,22 @@ class MasterOrchestrator:
         self.config = config or OrchestratorConfig()
 
         # 核心組件
-        self.event_bus = EventBus(max_size=self.config.event_queue_size)
-        self.registry = EngineRegistry()
-        self.scheduler = EngineScheduler(self.registry, self.event_bus)
+        self.event_bus = EventBus(
+            max_size=self.config.event_queue_size,
+            subscriber_queue_size=self.config.event_subscriber_queue_size,
+            backpressure_timeout=self.config.event_backpressure_timeout,
+            handler_timeout=self.config.event_handler_timeout,
+            max_history=self.config.event_history_size,
+        )
+        self.registry = EngineRegistry(
+            cache_path=BASE_PATH / self.config.state_path / "engine_discovery.json",
+        )
+        self.scheduler = EngineScheduler(
+            self.registry,
+            self.event_bus,
+            strategy=self.config.dispatch_strategy,
+            steal_interval=self.config.work_steal_interval,
+        )
         self.pipeline_executor = PipelineExecutor(self.registry, self.scheduler)
         self.health_monitor = HealthMonitor(self.registry, self.event_bus)
 
@@ -1057,26 +1545,13 @@ class MasterOrchestrator:
             return
 
         try:
-            # 動態載入模組
-            spec = importlib.util.spec_from_file_location(
-                Path(module_path).stem, module_path
-            )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            # 獲取引擎類
-            engine_class = getattr(module, class_name)
-
-            # 建立配置
+            # 建立配置 (引擎類在首次實例化時才導入)
             config = EngineConfig(
                 engine_name=class_name,
                 engine_type=EngineType(info.get("engine_type", "execution")),
                 execution_mode=ExecutionMode.AUTONOMOUS,
             )
 
-            # 建立實例
-            instance = engine_class(config)
-
             # 註冊
             registration = EngineRegistration(
                 engine_id=config.engine_id,
@@ -1085,9 +1560,11 @@ class MasterOrchestrator:
                 engine_type=config.engine_type,
                 module_path=module_path,
                 config=config,
-                instance=instance,
             )
 
+            if not self.config.lazy_engine_loading:
+                self.registry.instantiate(registration)
+
             self.registry.register_engine(registration)
 
         except Exception as e:
@@ -1124,8 +1601,10 @@ class MasterOrchestrator:
     async def start_engine(self, engine_id: str) -> bool:
         """啟動指定引擎"""
         reg = self.registry.get_engine(engine_id)
-        if not reg or not reg.instance:
+        if not reg:
             return False
+        if not reg.instance:
+            return await self.registry.activate(reg) is not None
         return await reg.instance.start()
 
     async def stop_engine(self, engine_id: str) -> bool:
@@ -1179,6 +1658,8 @@ class MasterOrchestrator:
     async def execute_task(self, engine_id: str, task: Dict[str, Any]) -> TaskResult:
         """直接執行任務"""
         reg = self.registry.get_engine(engine_id)
+        if reg and not reg.instance:
+            await self.registry.activate(reg)
         if not reg or not reg.instance:
             return TaskResult(
                 task_id=task.get("task_id", ""),
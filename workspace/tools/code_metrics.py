@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Code Metrics - 單次解析的代碼度量引擎
+
+每個 Python 檔案只做一次 ast.parse (含標記候選時再做一次 tokenize)，
+再以訪問器在同一棵語法樹上計算：債務標記 (TODO/FIXME/XXX/HACK/DEPRECATED)、圈複雜度、
+認知複雜度、函數長度與巢狀深度。非 Python 檔案只做逐行標記掃描，
+且先以單一合併正則預篩，命中的行才套用各別模式。
+
+結果以內容哈希 (RepoIndex.digest) 加上分析器版本為鍵快取；未命中的
+檔案分片交給進程池並行分析。
+
+Usage:
+    from path_tools.repo_index import RepoIndex
+    from code_metrics import CodeScanner
+
+    index = RepoIndex(repo_root)
+    index.refresh()
+    scanner = CodeScanner(index, jobs=4)
+    for entry, metrics in scanner.scan(index.iter_files(suffixes={".py"})):
+        print(entry.path, len(metrics.markers), len(metrics.functions))
+    scanner.save()
+    index.save()
+"""
+
+import ast
+import hashlib
+import io
+import json
+import os
+import re
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from path_tools.repo_index import IndexEntry, RepoIndex
+
+# 度量邏輯變更時遞增，使舊快取失效
+ANALYZER_VERSION = 1
+SHARD_SIZE = 32
+
+# 債務標記模式 (與舊版逐行掃描相同)
+MARKER_PATTERNS = {
+    'TODO': re.compile(r'#\s*TODO\s*:?\s*(.+)', re.IGNORECASE),
+    'FIXME': re.compile(r'#\s*FIXME\s*:?\s*(.+)', re.IGNORECASE),
+    'XXX': re.compile(r'#\s*XXX\s*:?\s*(.+)', re.IGNORECASE),
+    'HACK': re.compile(r'#\s*HACK\s*:?\s*(.+)', re.IGNORECASE),
+    'DEPRECATED': re.compile(r'@deprecated|#\s*DEPRECATED', re.IGNORECASE),
+}
+# 合併預篩：絕大多數行不含任何標記，只需一次搜尋
+MARKER_PREFILTER = re.compile(r'TODO|FIXME|XXX|HACK|DEPRECATED', re.IGNORECASE)
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_SCOPE_NODES = _FUNCTION_NODES + (ast.ClassDef,)
+
+
+@dataclass
+class MarkerHit:
+    """債務標記命中"""
+    line_number: int
+    debt_type: str
+    message: str
+    context: str
+
+
+@dataclass
+class FunctionMetrics:
+    """函數度量"""
+    name: str
+    qualname: str
+    line_start: int
+    line_end: int
+    length: int            # 非空、非註釋行數 (不含 def 行)
+    cyclomatic: int
+    cognitive: int
+    nesting_depth: int
+    parameters: int
+
+
+@dataclass
+class FileMetrics:
+    """單個檔案的度量結果"""
+    total_lines: int = 0
+    markers: List[MarkerHit] = field(default_factory=list)
+    functions: List[FunctionMetrics] = field(default_factory=list)
+    parse_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileMetrics":
+        return cls(
+            total_lines=data.get('total_lines', 0),
+            markers=[MarkerHit(**m) for m in data.get('markers', [])],
+            functions=[FunctionMetrics(**f) for f in data.get('functions', [])],
+            parse_error=data.get('parse_error'),
+        )
+
+
+# ----------------------------------------------------------------------
+# 標記掃描
+# ----------------------------------------------------------------------
+
+def _match_markers(text: str, line_number: int, context: str) -> Iterator[MarkerHit]:
+    """對一段文字套用所有標記模式 (呼叫前應已通過預篩)"""
+    for debt_type, pattern in MARKER_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            message = match.group(1) if match.lastindex else context
+            yield MarkerHit(line_number, debt_type, message.strip(), context)
+
+
+def scan_line_markers(lines: List[str]) -> List[MarkerHit]:
+    """逐行掃描標記 (非 Python 檔案，或 Python 無法 tokenize 時的後備)"""
+    hits: List[MarkerHit] = []
+    for line_number, line in enumerate(lines, 1):
+        if MARKER_PREFILTER.search(line):
+            hits.extend(_match_markers(line, line_number, line.strip()))
+    return hits
+
+
+def scan_comment_markers(source: str, lines: List[str]) -> List[MarkerHit]:
+    """以 tokenize 掃描 Python 註釋中的標記 (只檢查 COMMENT token，字串中的 "# TODO" 不再誤報)"""
+    hits: List[MarkerHit] = []
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.COMMENT and MARKER_PREFILTER.search(token.string):
+            line_number = token.start[0]
+            context = lines[line_number - 1].strip() if line_number <= len(lines) else token.string
+            hits.extend(_match_markers(token.string, line_number, context))
+    return hits
+
+
+def _is_deprecated_decorator(node: ast.expr) -> bool:
+    """@deprecated / @x.deprecated / @deprecated(...)"""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr.lower() == 'deprecated'
+    return isinstance(node, ast.Name) and node.id.lower() == 'deprecated'
+
+
+# ----------------------------------------------------------------------
+# 複雜度訪問器
+# ----------------------------------------------------------------------
+
+class ComplexityVisitor:
+    """
+    單次走訪同時計算圈複雜度、認知複雜度與巢狀深度 (不進入巢狀函數與類別)
+
+    圈複雜度：1 + 決策點數 (分支、迴圈、except、case、布林運算、推導式條件)。
+    認知複雜度採 SonarSource 規則：分支與迴圈 +1 並加上目前巢狀層級；
+    elif/else 只 +1；每段布林運算子序列 +1；lambda 增加巢狀層級。
+    以型別分派取代 ast.NodeVisitor 的 getattr 分派，減少走訪開銷。
+    """
+
+    def __init__(self):
+        self.cyclomatic = 1
+        self.cognitive = 0
+        self.max_depth = 0
+
+    def visit_body(self, statements: List[ast.stmt], nesting: int):
+        """以 nesting 層級走訪語句區塊，並更新最大巢狀深度"""
+        if nesting > self.max_depth:
+            self.max_depth = nesting
+        for statement in statements:
+            self.visit(statement, nesting)
+
+    def visit(self, node: ast.AST, nesting: int):
+        handler = self._handlers.get(type(node))
+        if handler is not None:
+            handler(self, node, nesting)
+        else:
+            self.visit_children(node, nesting)
+
+    def visit_children(self, node: ast.AST, nesting: int):
+        for name in node._fields:
+            value = getattr(node, name, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item, nesting)
+            elif isinstance(value, ast.AST):
+                self.visit(value, nesting)
+
+    def _skip(self, node, nesting):
+        pass
+
+    def _visit_if(self, node, nesting, is_elif: bool = False):
+        self.cyclomatic += 1
+        self.cognitive += 1 if is_elif else 1 + nesting
+        self.visit(node.test, nesting)
+        self.visit_body(node.body, nesting + 1)
+        if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+            self._visit_if(node.orelse[0], nesting, is_elif=True)
+        elif node.orelse:
+            self.cognitive += 1
+            self.visit_body(node.orelse, nesting + 1)
+
+    def _visit_loop(self, node, nesting):
+        self.cyclomatic += 1 + bool(node.orelse)
+        self.cognitive += 1 + nesting
+        for name in ('target', 'iter', 'test'):
+            child = getattr(node, name, None)
+            if child is not None:
+                self.visit(child, nesting)
+        self.visit_body(node.body, nesting + 1)
+        if node.orelse:
+            self.cognitive += 1
+            self.visit_body(node.orelse, nesting + 1)
+
+    def _visit_try(self, node, nesting):
+        self.cyclomatic += len(node.handlers) + bool(node.orelse)
+        self.visit_body(node.body, nesting)
+        for handler in node.handlers:
+            self.cognitive += 1 + nesting
+            if handler.type is not None:
+                self.visit(handler.type, nesting)
+            self.visit_body(handler.body, nesting + 1)
+        self.visit_body(node.orelse, nesting)
+        self.visit_body(node.finalbody, nesting)
+
+    def _visit_match(self, node, nesting):
+        self.cyclomatic += len(node.cases)
+        self.cognitive += 1 + nesting
+        self.visit(node.subject, nesting)
+        for case in node.cases:
+            if case.guard is not None:
+                self.visit(case.guard, nesting + 1)
+            self.visit_body(case.body, nesting + 1)
+
+    def _visit_if_exp(self, node, nesting):
+        self.cyclomatic += 1
+        self.cognitive += 1 + nesting
+        self.visit_children(node, nesting)
+
+    def _visit_bool_op(self, node, nesting):
+        self.cyclomatic += len(node.values) - 1
+        self.cognitive += 1
+        self.visit_children(node, nesting)
+
+    def _visit_comprehension(self, node, nesting):
+        self.cyclomatic += 1 + len(node.ifs)
+        self.visit_children(node, nesting)
+
+    def _visit_lambda(self, node, nesting):
+        self.visit(node.body, nesting + 1)
+
+    _handlers: Dict[type, Any] = {
+        # 葉節點與表達式上下文不含決策點，直接略過
+        ast.Name: _skip,
+        ast.Constant: _skip,
+        ast.Load: _skip,
+        ast.Store: _skip,
+        ast.Del: _skip,
+        ast.FunctionDef: _skip,
+        ast.AsyncFunctionDef: _skip,
+        ast.ClassDef: _skip,
+        ast.If: _visit_if,
+        ast.For: _visit_loop,
+        ast.AsyncFor: _visit_loop,
+        ast.While: _visit_loop,
+        ast.Try: _visit_try,
+        ast.IfExp: _visit_if_exp,
+        ast.BoolOp: _visit_bool_op,
+        ast.comprehension: _visit_comprehension,
+        ast.Lambda: _visit_lambda,
+    }
+    if hasattr(ast, 'Match'):
+        _handlers[ast.Match] = _visit_match
+    if hasattr(ast, 'TryStar'):
+        _handlers[ast.TryStar] = _visit_try
+
+
+def _count_parameters(args: ast.arguments) -> int:
+    count = len(getattr(args, 'posonlyargs', [])) + len(args.args) + len(args.kwonlyargs)
+    return count + (args.vararg is not None) + (args.kwarg is not None)
+
+
+def _function_metrics(
+    node: ast.AST,
+    qualname: str,
+    lines: List[str],
+    comment_only_lines: Set[int],
+) -> FunctionMetrics:
+    """在函數節點上執行複雜度訪問器並計算長度"""
+    visitor = ComplexityVisitor()
+    for statement in node.body:
+        visitor.visit(statement, 0)
+
+    end = getattr(node, 'end_lineno', None) or node.lineno
+    length = sum(
+        1 for line_number in range(node.body[0].lineno, end + 1)
+        if line_number not in comment_only_lines and lines[line_number - 1].strip()
+    )
+    return FunctionMetrics(
+        name=node.name,
+        qualname=qualname,
+        line_start=node.lineno,
+        line_end=end,
+        length=length,
+        cyclomatic=visitor.cyclomatic,
+        cognitive=visitor.cognitive,
+        nesting_depth=visitor.max_depth,
+        parameters=_count_parameters(node.args),
+    )
+
+
+def _child_bodies(node: ast.stmt) -> Iterator[List[ast.stmt]]:
+    """複合語句下的語句區塊 (函數與類別只可能出現在這些區塊中)"""
+    for name in ('body', 'orelse', 'finalbody'):
+        value = getattr(node, name, None)
+        if isinstance(value, list) and value:
+            yield value
+    for handler in getattr(node, 'handlers', ()):
+        yield handler.body
+    for case in getattr(node, 'cases', ()):
+        yield case.body
+
+
+def _collect_functions(
+    tree: ast.Module,
+    lines: List[str],
+    comment_only_lines: Set[int],
+    metrics: FileMetrics,
+):
+    """沿語句區塊走訪，收集所有函數 (含方法與巢狀函數) 的度量與 deprecated 裝飾器"""
+    stack: List[Tuple[List[ast.stmt], str]] = [(tree.body, '')]
+    while stack:
+        statements, prefix = stack.pop()
+        for node in statements:
+            if not isinstance(node, _SCOPE_NODES):
+                stack.extend((body, prefix) for body in _child_bodies(node))
+                continue
+            qualname = f"{prefix}{node.name}"
+            for decorator in node.decorator_list:
+                if _is_deprecated_decorator(decorator):
+                    context = lines[decorator.lineno - 1].strip()
+                    metrics.markers.append(MarkerHit(decorator.lineno, 'DEPRECATED', context, context))
+            if isinstance(node, _FUNCTION_NODES):
+                metrics.functions.append(_function_metrics(node, qualname, lines, comment_only_lines))
+            stack.append((node.body, f"{qualname}."))
+
+
+# ----------------------------------------------------------------------
+# 檔案分析
+# ----------------------------------------------------------------------
+
+def analyze_source(source: str, suffix: str) -> FileMetrics:
+    """分析一段原始碼；Python 做一次 ast.parse (必要時一次 tokenize)，其餘只做逐行標記掃描"""
+    lines = source.splitlines()
+    metrics = FileMetrics(total_lines=len(lines))
+    if suffix != '.py':
+        if MARKER_PREFILTER.search(source):
+            metrics.markers = scan_line_markers(lines)
+        return metrics
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        metrics.markers = scan_line_markers(lines)
+        metrics.parse_error = f"parse: {e}"
+        return metrics
+
+    # 絕大多數檔案不含標記，整檔預篩後才需要 tokenize
+    if MARKER_PREFILTER.search(source):
+        try:
+            metrics.markers = scan_comment_markers(source, lines)
+        except (tokenize.TokenError, SyntaxError):
+            metrics.markers = scan_line_markers(lines)
+
+    comment_only_lines = {
+        line_number for line_number, line in enumerate(lines, 1)
+        if line.lstrip().startswith('#')
+    }
+    _collect_functions(tree, lines, comment_only_lines, metrics)
+    metrics.markers.sort(key=lambda hit: hit.line_number)
+    metrics.functions.sort(key=lambda func: func.line_start)
+    return metrics
+
+
+def analyze_path(path: str) -> FileMetrics:
+    """讀取並分析單個檔案"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        source = f.read()
+    return analyze_source(source, os.path.splitext(path)[1])
+
+
+def _analyze_shard(paths: List[str]) -> List[Tuple[Optional[FileMetrics], Optional[str]]]:
+    """工作進程：分析一批檔案，錯誤以訊息回傳而不中斷整批"""
+    results = []
+    for path in paths:
+        try:
+            results.append((analyze_path(path), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+# ----------------------------------------------------------------------
+# 快取與並行掃描
+# ----------------------------------------------------------------------
+
+def default_metrics_cache_path(root: Path) -> Path:
+    """快取位置：$XDG_CACHE_HOME 或 ~/.cache (不寫入被掃描的目錄樹)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha1(str(Path(root).resolve()).encode()).hexdigest()[:16]
+    return Path(base) / "code-metrics" / f"{key}.json"
+
+
+class MetricsCache:
+    """
+    以內容哈希為鍵的度量快取
+
+    分析器版本不符時整個快取失效；本次未使用的項目在保存時丟棄。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._used: Set[str] = set()
+        self._dirty = False
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != ANALYZER_VERSION:
+            self._dirty = True
+            return False
+        self._entries = data.get('results', {})
+        return True
+
+    def get(self, key: str) -> Optional[FileMetrics]:
+        data = self._entries.get(key)
+        if data is None:
+            return None
+        self._used.add(key)
+        return FileMetrics.from_dict(data)
+
+    def put(self, key: str, metrics: FileMetrics):
+        self._entries[key] = metrics.to_dict()
+        self._used.add(key)
+        self._dirty = True
+
+    def save(self):
+        """原子寫入快取"""
+        if not self._dirty and len(self._used) == len(self._entries):
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'version': ANALYZER_VERSION,
+                    'results': {key: self._entries[key] for key in self._used},
+                }, separators=(',', ':')))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+class CodeScanner:
+    """
+    並行、可快取的代碼度量掃描器
+
+    結果依輸入順序產出；未變更的檔案直接取自快取，其餘分片交給進程池。
+    """
+
+    def __init__(
+        self,
+        index: RepoIndex,
+        jobs: Optional[int] = None,
+        use_cache: bool = True,
+        cache_path: Optional[Path] = None,
+    ):
+        self.index = index
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.cache: Optional[MetricsCache] = None
+        if use_cache:
+            self.cache = MetricsCache(cache_path or default_metrics_cache_path(index.root))
+            self.cache.load()
+        self.stats = {'files': 0, 'cached': 0, 'analyzed': 0, 'errors': 0}
+
+    def scan(self, entries: Iterable[IndexEntry]) -> Iterator[Tuple[IndexEntry, FileMetrics]]:
+        """分析檔案並依輸入順序產出 (entry, metrics)；讀取失敗的檔案會被跳過"""
+        ordered: List[Tuple[IndexEntry, Optional[FileMetrics], Optional[str]]] = []
+        pending: List[int] = []
+        for entry in entries:
+            self.stats['files'] += 1
+            key = None
+            if self.cache is not None:
+                digest = self.index.digest(entry)
+                if digest is not None:
+                    key = f"{digest}:{entry.suffix}"
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        self.stats['cached'] += 1
+                        ordered.append((entry, cached, key))
+                        continue
+            pending.append(len(ordered))
+            ordered.append((entry, None, key))
+
+        self.stats['analyzed'] = len(pending)
+        paths = [str(self.index.absolute(ordered[i][0])) for i in pending]
+        for position, (metrics, error) in zip(pending, self._run(paths), strict=True):
+            entry, _, key = ordered[position]
+            if metrics is None:
+                self.stats['errors'] += 1
+                print(f"⚠️  掃描 {self.index.absolute(entry)} 失敗: {error}")
+            elif self.cache is not None and key is not None:
+                self.cache.put(key, metrics)
+            ordered[position] = (entry, metrics, key)
+
+        for entry, metrics, _ in ordered:
+            if metrics is not None:
+                yield entry, metrics
+
+    def _run(self, paths: List[str]) -> Iterator[Tuple[Optional[FileMetrics], Optional[str]]]:
+        """依序分析檔案，數量足夠時分片交給工作進程"""
+        if self.jobs <= 1 or len(paths) < SHARD_SIZE * 2:
+            yield from _analyze_shard(paths)
+            return
+
+        shards = [paths[i:i + SHARD_SIZE] for i in range(0, len(paths), SHARD_SIZE)]
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            for results in pool.map(_analyze_shard, shards):
+                yield from results
+
+    def save(self):
+        if self.cache is not None:
+            self.cache.save()
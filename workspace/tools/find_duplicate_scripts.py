@@ -4,45 +4,39 @@
 Finds and analyzes duplicate scripts across the repository
 """
 
-import hashlib
-import os
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
+
+from path_tools.repo_index import RepoIndex
 
 class ScriptDuplicateFinder:
     """腳本重複查找器"""
 
-    def __init__(self, repo_root: Path):
+    def __init__(self, repo_root: Path, index: Optional[RepoIndex] = None):
         self.repo_root = repo_root
         self.script_extensions = {'.py', '.sh', '.js', '.ts'}
         self.skip_dirs = {'node_modules', '.git', '__pycache__', '.venv', 'venv', 'dist', 'build'}
+        self.index = index or RepoIndex(repo_root)
+        self._refreshed = index is not None
 
     def find_duplicates(self) -> Dict[str, List[str]]:
         """查找重複腳本（基於內容哈希）"""
-        hash_to_files = defaultdict(list)
-
-        # 收集所有腳本文件
-        for file_path in self._iter_scripts():
-            try:
-                content_hash = self._hash_file(file_path)
-                rel_path = str(file_path.relative_to(self.repo_root))
-                hash_to_files[content_hash].append(rel_path)
-            except Exception as e:
-                print(f"⚠️  處理 {file_path} 失敗: {e}")
-
-        # 過濾出真正的重複（>1個文件有相同哈希）
-        duplicates = {h: files for h, files in hash_to_files.items() if len(files) > 1}
+        # 只對大小相同的文件計算哈希（串流讀取，未變更文件使用索引快取）
+        duplicates = {
+            content_hash: [entry.path for entry in entries]
+            for content_hash, entries in self.index.find_duplicates(self._iter_scripts()).items()
+        }
+        self.index.save()
         return duplicates
 
     def find_similar_names(self) -> Dict[str, List[str]]:
         """查找名稱相似的腳本"""
         name_to_files = defaultdict(list)
 
-        for file_path in self._iter_scripts():
-            name = file_path.stem  # 文件名（不含擴展名）
-            rel_path = str(file_path.relative_to(self.repo_root))
-            name_to_files[name].append(rel_path)
+        for entry in self._iter_scripts():
+            name = Path(entry.path).stem  # 文件名（不含擴展名）
+            name_to_files[name].append(entry.path)
 
         # 過濾出名稱重複
         similar = {name: files for name, files in name_to_files.items() if len(files) > 1}
@@ -50,21 +44,10 @@ class ScriptDuplicateFinder:
 
     def _iter_scripts(self):
         """遍歷所有腳本文件"""
-        for root, dirs, files in os.walk(self.repo_root):
-            # 過濾跳過的目錄
-            dirs[:] = [d for d in dirs if d not in self.skip_dirs]
-
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix in self.script_extensions:
-                    yield file_path
-
-    def _hash_file(self, file_path: Path) -> str:
-        """計算文件的哈希值"""
-        hasher = hashlib.md5()
-        with open(file_path, 'rb') as f:
-            hasher.update(f.read())
-        return hasher.hexdigest()
+        if not self._refreshed:
+            self.index.refresh()
+            self._refreshed = True
+        return self.index.iter_files(suffixes=self.script_extensions, exclude_dirs=self.skip_dirs)
 
     def analyze_and_report(self):
         """分析並生成報告"""
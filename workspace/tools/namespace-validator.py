@@ -5,16 +5,22 @@ MachineNativeOps Namespace Validator
 Validates that all resources comply with MachineNativeOps namespace standards.
 Checks against rules defined in mno-namespace.yaml and root.specs.naming.yaml.
 
+Directories are validated by a batch engine: rules are compiled once, files
+come from the shared RepoIndex, unchanged files reuse cached results (keyed by
+content hash and rules hash) and the remaining files are sharded across a
+process pool. Results are streamed into the report, so memory stays flat.
+
 Usage:
     python namespace-validator.py [--verbose] [--strict] <path>
     python namespace-validator.py --fix <path>
+    python namespace-validator.py --jobs 8 --no-cache <path>
 
 Examples:
     python namespace-validator.py .
     python namespace-validator.py --verbose --strict src/
     python namespace-validator.py --fix config/
 
-Version: 1.0.0
+Version: 1.1.0
 Author: MachineNativeOps Platform Team
 """
 
@@ -23,12 +29,38 @@ import sys
 import os
 import yaml
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, Iterator, List, Tuple, Set, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from path_tools.repo_index import RepoIndex  # noqa: E402
+
+WORKSPACE_DIR = Path(__file__).resolve().parent.parent
+
+# Bump when the check logic changes so cached results are discarded
+ENGINE_VERSION = 2
+CACHE_VERSION = 1
+
+# Files per task sent to a worker process; smaller batches run inline
+SHARD_SIZE = 64
+
+STRUCTURED_SUFFIXES = {'.yaml', '.yml', '.json'}
+YAML_SUFFIXES = {'.yaml', '.yml'}
+
+NAME_PATTERN = re.compile(r'^\s*name:\s*(["\']?)([^"\'\s]+)\1\s*$')
+KEBAB_CASE_PATTERN = re.compile(r'^[a-z][a-z0-9-]*[a-z0-9]$')
+YAML_KEY_PATTERN = re.compile(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:')
+SNAKE_CASE_PATTERN = re.compile(r'^[a-z][a-z0-9_]*$')
+
+# (line_number, rule_id, severity, message, suggestion) - plain lists so they
+# can be pickled to/from workers and stored in the JSON cache
+IssueRow = list
+
 
 class Severity(Enum):
     """Validation severity levels."""
@@ -60,6 +92,332 @@ class ValidationResult:
         self.issues.append(issue)
         if issue.severity == Severity.ERROR:
             self.passed = False
+    
+    @classmethod
+    def from_rows(cls, file_path: str, rows: List[IssueRow]) -> 'ValidationResult':
+        """Build a result from engine issue rows."""
+        result = cls(file_path=file_path)
+        for line_number, rule_id, severity, message, suggestion in rows:
+            result.add_issue(ValidationIssue(
+                file_path=file_path,
+                line_number=line_number,
+                rule_id=rule_id,
+                severity=Severity(severity),
+                message=message,
+                suggestion=suggestion
+            ))
+        return result
+
+
+class RuleSet:
+    """
+    Validation rules compiled once.
+    
+    Built from the validator's rule table and the file naming patterns of
+    root.specs.naming.yaml. ``digest`` identifies the rules, so cached results
+    are only reused while the rules are unchanged.
+    """
+    
+    def __init__(self, rules: Dict[str, Dict], file_name_patterns: Optional[List[str]] = None):
+        self.rules = rules
+        self.file_name_patterns = list(file_name_patterns or [])
+        self.digest = hashlib.sha256(json.dumps({
+            'engine': ENGINE_VERSION,
+            'rules': {
+                rule_id: {key: getattr(value, 'value', value) for key, value in rule.items()}
+                for rule_id, rule in rules.items()
+            },
+            'file_name_patterns': self.file_name_patterns,
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+        
+        checks = {
+            '_validate_kebab_case': self._check_kebab_case,
+            '_validate_yaml_keys': self._check_yaml_keys,
+            '_validate_root_file_name': self._check_root_file_name,
+        }
+        self._compiled = [
+            (
+                rule_id,
+                rule,
+                re.compile(rule['forbidden_pattern'], re.MULTILINE) if 'forbidden_pattern' in rule else None,
+                re.compile(rule['pattern'], re.MULTILINE) if 'pattern' in rule else None,
+                checks.get(rule.get('check_function')),
+            )
+            for rule_id, rule in rules.items()
+        ]
+        self._file_name_pattern = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.file_name_patterns)
+        ) if self.file_name_patterns else None
+    
+    def __getstate__(self):
+        return {'rules': self.rules, 'file_name_patterns': self.file_name_patterns}
+    
+    def __setstate__(self, state):
+        self.__init__(state['rules'], state['file_name_patterns'])
+    
+    def check(self, file_name: str, content: str) -> List[IssueRow]:
+        """Run every rule against one file's content."""
+        suffix = os.path.splitext(file_name)[1]
+        lines = content.split('\n')
+        rows: List[IssueRow] = []
+        
+        for rule_id, rule, forbidden, required, check in self._compiled:
+            severity = rule['severity'].value
+            
+            # Check forbidden patterns
+            if forbidden is not None:
+                for match in forbidden.finditer(content):
+                    rows.append([
+                        content.count('\n', 0, match.start()) + 1, rule_id, severity,
+                        f"{rule['description']}: Found '{match.group()}'", rule.get('suggestion')
+                    ])
+            
+            # Check required patterns (only for YAML/JSON files, and only when
+            # the file defines the relevant field)
+            if (required is not None and suffix in STRUCTURED_SUFFIXES and rule_id == 'NS-001'
+                    and 'namespace:' in content and not required.search(content)):
+                rows.append([None, rule_id, severity, rule['description'], rule.get('suggestion')])
+            
+            # Check with custom function
+            if check is not None:
+                check(file_name, suffix, lines, rule_id, severity, rows)
+        
+        return rows
+    
+    def _check_kebab_case(self, _file_name: str, suffix: str, lines: List[str],
+                          rule_id: str, severity: str, rows: List[IssueRow]):
+        """Validate that resource names use kebab-case."""
+        if suffix not in YAML_SUFFIXES:
+            return
+        for i, line in enumerate(lines):
+            match = NAME_PATTERN.match(line)
+            if match:
+                name = match.group(2)
+                # Skip if it's a variable or environment reference
+                if '{{' in name or '${' in name:
+                    continue
+                if not KEBAB_CASE_PATTERN.match(name):
+                    rows.append([
+                        i + 1, rule_id, severity,
+                        f"Resource name '{name}' does not use kebab-case",
+                        "Use lowercase letters, numbers, and hyphens only"
+                    ])
+    
+    def _check_yaml_keys(self, _file_name: str, suffix: str, lines: List[str],
+                         rule_id: str, severity: str, rows: List[IssueRow]):
+        """Validate that YAML keys use snake_case."""
+        if suffix not in YAML_SUFFIXES:
+            return
+        for i, line in enumerate(lines):
+            match = YAML_KEY_PATTERN.match(line)
+            if match:
+                key = match.group(1)
+                # Skip special cases (environment variables, metadata fields)
+                if key.isupper() or key in {'apiVersion', 'kind', 'metadata'}:
+                    continue
+                if not SNAKE_CASE_PATTERN.match(key):
+                    rows.append([
+                        i + 1, rule_id, severity,
+                        f"YAML key '{key}' does not use snake_case",
+                        "Use lowercase letters, numbers, and underscores only"
+                    ])
+    
+    def _check_root_file_name(self, file_name: str, suffix: str, _lines: List[str],
+                              rule_id: str, severity: str, rows: List[IssueRow]):
+        """Validate root layer file names against root.specs.naming.yaml."""
+        if self._file_name_pattern is None or suffix not in YAML_SUFFIXES:
+            return
+        if file_name.startswith('root.') and not self._file_name_pattern.match(file_name):
+            rows.append([
+                None, rule_id, severity,
+                f"Root file name '{file_name}' does not match root.specs.naming.yaml",
+                self.rules[rule_id].get('suggestion')
+            ])
+
+
+def check_file(rule_set: RuleSet, file_path: str) -> List[IssueRow]:
+    """Read and validate a single file; read errors become a SYSTEM issue."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return rule_set.check(os.path.basename(file_path), content)
+    except Exception as e:
+        return [[None, 'SYSTEM', Severity.ERROR.value, f"Error validating file: {e}", None]]
+
+
+_WORKER_RULES: Optional[RuleSet] = None
+
+
+def _init_worker(rule_set: RuleSet):
+    """Process pool initializer: keep the compiled rules for the worker's lifetime."""
+    global _WORKER_RULES
+    _WORKER_RULES = rule_set
+
+
+def _validate_shard(paths: List[str]) -> List[List[IssueRow]]:
+    """Validate a shard of files inside a worker process."""
+    return [check_file(_WORKER_RULES, path) for path in paths]
+
+
+def default_result_cache_path(root: Path) -> Path:
+    """Result cache location: $XDG_CACHE_HOME or ~/.cache, outside the validated tree."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha1(str(Path(root).resolve()).encode()).hexdigest()[:16]
+    return Path(base) / "namespace-validator" / f"{key}.json"
+
+
+class ResultCache:
+    """
+    Per-file validation results keyed by content hash and file name.
+    
+    The whole cache is tied to one rules digest; entries not used by the latest
+    run are dropped on save so the file does not grow without bound.
+    """
+    
+    def __init__(self, path: Path, rules_digest: str):
+        self.path = Path(path)
+        self.rules_digest = rules_digest
+        self._entries: Dict[str, List[IssueRow]] = {}
+        self._used: Set[str] = set()
+        self._dirty = False
+    
+    def load(self) -> bool:
+        """Load cached results; a stale rules digest discards them."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != CACHE_VERSION or data.get('rules') != self.rules_digest:
+            self._dirty = True
+            return False
+        self._entries = data.get('results', {})
+        return True
+    
+    def get(self, key: str) -> Optional[List[IssueRow]]:
+        rows = self._entries.get(key)
+        if rows is not None:
+            self._used.add(key)
+        return rows
+    
+    def put(self, key: str, rows: List[IssueRow]):
+        self._entries[key] = rows
+        self._used.add(key)
+        self._dirty = True
+    
+    def save(self):
+        """Write the cache atomically."""
+        if not self._dirty and len(self._used) == len(self._entries):
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'version': CACHE_VERSION,
+                    'rules': self.rules_digest,
+                    'results': {key: self._entries[key] for key in self._used},
+                }, separators=(',', ':')))
+            tmp_path.replace(self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write result cache: {e}")
+
+
+class StreamingReporter:
+    """
+    Aggregates validation results as they are produced.
+    
+    Only counters and the first few examples per rule are kept, so memory use
+    does not grow with the number of files.
+    """
+    
+    def __init__(self, validation_rules: Dict[str, Dict], strict: bool = False,
+                 max_examples: int = 3, verbose: bool = False):
+        self.validation_rules = validation_rules
+        self.strict = strict
+        self.max_examples = max_examples
+        self.verbose = verbose
+        self.total_files = 0
+        self.files_passed = 0
+        self.total_issues = 0
+        self.total_errors = 0
+        self.total_warnings = 0
+        self.rule_counts: Dict[str, int] = {}
+        self.rule_examples: Dict[str, List[ValidationIssue]] = {}
+    
+    def add(self, result: ValidationResult):
+        """Account for one file's result."""
+        self.total_files += 1
+        if result.passed:
+            self.files_passed += 1
+        
+        for issue in result.issues:
+            self.total_issues += 1
+            if issue.severity == Severity.ERROR:
+                self.total_errors += 1
+            elif issue.severity == Severity.WARNING:
+                self.total_warnings += 1
+            self.rule_counts[issue.rule_id] = self.rule_counts.get(issue.rule_id, 0) + 1
+            examples = self.rule_examples.setdefault(issue.rule_id, [])
+            if len(examples) < self.max_examples:
+                examples.append(issue)
+        
+        if self.verbose and not result.passed:
+            print(f"✗ {result.file_path} ({len(result.issues)} issues)")
+    
+    def render(self) -> str:
+        """Render the validation report."""
+        report = []
+        report.append("=" * 80)
+        report.append("MachineNativeOps Namespace Validation Report")
+        report.append("=" * 80)
+        report.append(f"Generated: {datetime.now().isoformat()}")
+        report.append(f"Mode: {'Strict' if self.strict else 'Standard'}")
+        report.append("")
+        report.append("Summary")
+        report.append("-" * 80)
+        report.append(f"Files validated:     {self.total_files}")
+        report.append(f"Files passed:        {self.files_passed}")
+        report.append(f"Files failed:        {self.total_files - self.files_passed}")
+        report.append(f"Total issues:        {self.total_issues}")
+        report.append(f"  Errors:            {self.total_errors}")
+        report.append(f"  Warnings:          {self.total_warnings}")
+        report.append("")
+        
+        if self.total_files:
+            report.append("Issues by Rule")
+            report.append("-" * 80)
+            for rule_id in sorted(self.rule_counts.keys()):
+                count = self.rule_counts[rule_id]
+                report.append(f"\n{rule_id}: {count} occurrences")
+                rule = self.validation_rules.get(rule_id, {})
+                if rule:
+                    report.append(f"  Description: {rule.get('description', 'N/A')}")
+                
+                # Show first few examples
+                for issue in self.rule_examples[rule_id]:
+                    report.append(f"  - {issue.file_path}:{issue.line_number or '?'}")
+                    report.append(f"    {issue.message}")
+                    if issue.suggestion:
+                        report.append(f"    💡 {issue.suggestion}")
+                
+                if count > self.max_examples:
+                    report.append(f"  ... and {count - self.max_examples} more")
+        
+        report.append("")
+        report.append("=" * 80)
+        
+        if self.total_errors == 0 and self.total_warnings == 0:
+            report.append("✓ All files comply with MachineNativeOps namespace standards")
+        elif self.total_errors == 0:
+            report.append(f"⚠ Validation completed with {self.total_warnings} warnings")
+        else:
+            report.append(f"✗ Validation failed with {self.total_errors} errors")
+        
+        report.append("=" * 80)
+        
+        return "\n".join(report)
 
 
 class NamespaceValidator:
@@ -67,11 +425,20 @@ class NamespaceValidator:
     Comprehensive namespace validator for MachineNativeOps standards.
     """
     
-    def __init__(self, strict=False, verbose=False, auto_fix=False):
+    def __init__(self, strict=False, verbose=False, auto_fix=False,
+                 jobs: Optional[int] = None, use_cache: bool = True,
+                 cache_path: Optional[str] = None):
         self.strict = strict
         self.verbose = verbose
         self.auto_fix = auto_fix
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.use_cache = use_cache
+        self.cache_path = Path(cache_path) if cache_path else None
         self.results: List[ValidationResult] = []
+        self.namespace_config: Optional[Dict] = None
+        self.naming_spec: Optional[Dict] = None
+        self.stats = {'files': 0, 'cached': 0, 'validated': 0}
+        self._rule_set: Optional[RuleSet] = None
         
         # Validation rules aligned with mno-namespace.yaml
         self.validation_rules = {
@@ -140,6 +507,12 @@ class NamespaceValidator:
                 'description': 'YAML keys must use snake_case',
                 'severity': Severity.WARNING if not strict else Severity.ERROR,
                 'check_function': '_validate_yaml_keys'
+            },
+            'NS-011': {
+                'description': 'Root layer file names must follow root.specs.naming.yaml',
+                'severity': Severity.WARNING,
+                'check_function': '_validate_root_file_name',
+                'suggestion': 'Use root.<name>.yaml, root.specs.<name>.yaml or root.registry.<name>.yaml'
             }
         }
         
@@ -154,11 +527,19 @@ class NamespaceValidator:
             'venv', 'dist', 'build', 'target', 'archive'
         }
     
+    @staticmethod
+    def _find_config(config_path: str) -> Path:
+        """Resolve a config path against the working directory, then the workspace."""
+        path = Path(config_path)
+        if path.is_absolute() or path.exists():
+            return path
+        return WORKSPACE_DIR / path
+    
     def load_namespace_config(self, config_path: str = 'mno-namespace.yaml') -> Optional[Dict]:
         """Load namespace configuration."""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            with open(self._find_config(config_path), 'r', encoding='utf-8') as f:
+                self.namespace_config = yaml.safe_load(f)
         except FileNotFoundError:
             if self.verbose:
                 print(f"Info: {config_path} not found, using default rules")
@@ -166,245 +547,49 @@ class NamespaceValidator:
         except Exception as e:
             print(f"Warning: Error loading namespace config: {e}")
             return None
-    
-    def validate_file(self, file_path: Path) -> ValidationResult:
-        """Validate a single file against namespace standards."""
-        result = ValidationResult(file_path=str(file_path))
-Namespace Validator Tool
-命名空間驗證工具
-
-Validates that all files conform to MachineNativeOps namespace standards.
-驗證所有檔案符合 MachineNativeOps 命名空間標準。
-
-Usage:
-    python namespace-validator.py --file <file>
-    python namespace-validator.py --scan <directory>
-    python namespace-validator.py --report
-
-Returns exit code 0 if all validations pass, non-zero otherwise.
-"""
-
-import argparse
-import json
-import logging
-import re
-import sys
-from pathlib import Path
-from typing import Dict, List, Tuple
-import yaml
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-
-class ValidationResult:
-    """Result of a validation check"""
-    
-    def __init__(self, file_path: str):
-        self.file_path = file_path
-        self.passed = True
-        self.errors: List[str] = []
-        self.warnings: List[str] = []
-        self.info: List[str] = []
-    
-    def add_error(self, message: str):
-        """Add an error (causes validation to fail)"""
-        self.errors.append(message)
-        self.passed = False
-    
-    def add_warning(self, message: str):
-        """Add a warning (doesn't cause validation to fail)"""
-        self.warnings.append(message)
-    
-    def add_info(self, message: str):
-        """Add informational message"""
-        self.info.append(message)
-    
-    def to_dict(self) -> dict:
-        """Convert to dictionary"""
-        return {
-            "file": self.file_path,
-            "passed": self.passed,
-            "errors": self.errors,
-            "warnings": self.warnings,
-            "info": self.info
-        }
-
-
-class NamespaceValidator:
-    """Validates namespace compliance"""
-    
-    def __init__(self, config_path: str = "mno-namespace.yaml"):
-        """Initialize validator with namespace configuration"""
-        self.config_path = Path(config_path)
-        self.config = self._load_config()
-        self.results: List[ValidationResult] = []
-        self.stats = {
-            "files_checked": 0,
-            "files_passed": 0,
-            "files_failed": 0,
-            "errors": 0,
-            "warnings": 0
-        }
-    
-    def _load_config(self) -> dict:
-        """Load namespace configuration from YAML"""
-        try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            logger.info(f"Loaded namespace config from {self.config_path}")
-            return config
-        except Exception as e:
-            logger.error(f"Failed to load config: {e}")
-            raise
-    
-    def validate_file(self, file_path: Path) -> ValidationResult:
-        """
-        Validate a single file
-        
-        Args:
-            file_path: Path to file to validate
-        
-        Returns:
-            ValidationResult object
-        """
-        result = ValidationResult(str(file_path))
-        self.stats["files_checked"] += 1
         
+        # Rule descriptions and severities from the config override the defaults
+        spec = self.namespace_config.get('spec', {}) if isinstance(self.namespace_config, dict) else {}
+        for rule in (spec.get('validation') or {}).get('rules') or []:
+            target = self.validation_rules.get(rule.get('id'))
+            if target is None:
+                continue
+            if rule.get('description'):
+                target['description'] = rule['description']
+            if rule.get('severity') in {s.value for s in Severity}:
+                target['severity'] = Severity(rule['severity'])
+        self._rule_set = None
+        return self.namespace_config
+    
+    def load_naming_spec(self, spec_path: str = 'root/spec/root.specs.naming.yaml') -> Optional[Dict]:
+        """Load root layer naming specification (file naming patterns for NS-011)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-            
-            # Check each validation rule
-            for rule_id, rule in self.validation_rules.items():
-                # Check forbidden patterns
-                if 'forbidden_pattern' in rule:
-                    self._check_forbidden_pattern(
-                        content, lines, file_path, rule_id, rule, result
-                    )
-                
-                # Check required patterns (only for YAML/JSON files)
-                if 'pattern' in rule and file_path.suffix in {'.yaml', '.yml', '.json'}:
-                    self._check_required_pattern(
-                        content, file_path, rule_id, rule, result
-                    )
-                
-                # Check with custom function
-                if 'check_function' in rule:
-                    check_func = getattr(self, rule['check_function'], None)
-                    if check_func:
-                        check_func(content, lines, file_path, rule_id, rule, result)
-        
+            with open(self._find_config(spec_path), 'r', encoding='utf-8') as f:
+                self.naming_spec = yaml.safe_load(f)
+        except FileNotFoundError:
+            if self.verbose:
+                print(f"Info: {spec_path} not found, skipping root file naming rules")
+            return None
         except Exception as e:
-            result.add_issue(ValidationIssue(
-                file_path=str(file_path),
-                line_number=None,
-                rule_id='SYSTEM',
-                severity=Severity.ERROR,
-                message=f"Error validating file: {e}"
-            ))
-        
-        return result
+            print(f"Warning: Error loading naming spec: {e}")
+            return None
+        self._rule_set = None
+        return self.naming_spec
+    
+    def compile_rules(self) -> RuleSet:
+        """Compile the current rules (cached until a config is reloaded)."""
+        if self._rule_set is None:
+            file_naming = ((self.naming_spec or {}).get('spec') or {}).get('file_naming') or {}
+            patterns = [
+                entry['pattern'] for entry in file_naming.values()
+                if isinstance(entry, dict) and entry.get('pattern')
+            ]
+            self._rule_set = RuleSet(self.validation_rules, patterns)
+        return self._rule_set
     
-    def _check_forbidden_pattern(self, content: str, lines: List[str], 
-                                 file_path: Path, rule_id: str, 
-                                 rule: Dict, result: ValidationResult):
-        """Check for forbidden patterns."""
-        pattern = rule['forbidden_pattern']
-        matches = list(re.finditer(pattern, content, re.MULTILINE))
-        
-        if matches:
-            for match in matches:
-                # Find line number
-                line_number = content[:match.start()].count('\n') + 1
-                
-                result.add_issue(ValidationIssue(
-                    file_path=str(file_path),
-                    line_number=line_number,
-                    rule_id=rule_id,
-                    severity=rule['severity'],
-                    message=f"{rule['description']}: Found '{match.group()}'",
-                    suggestion=rule.get('suggestion')
-                ))
-    
-    def _check_required_pattern(self, content: str, file_path: Path,
-                               rule_id: str, rule: Dict, result: ValidationResult):
-        """Check for required patterns in YAML/JSON files."""
-        pattern = rule['pattern']
-        
-        # Only check if the file seems to define the relevant resource
-        # (e.g., only check namespace if 'namespace:' exists)
-        if rule_id == 'NS-001' and 'namespace:' in content:
-            if not re.search(pattern, content, re.MULTILINE):
-                result.add_issue(ValidationIssue(
-                    file_path=str(file_path),
-                    line_number=None,
-                    rule_id=rule_id,
-                    severity=rule['severity'],
-                    message=rule['description'],
-                    suggestion=rule.get('suggestion')
-                ))
-    
-    def _validate_kebab_case(self, content: str, lines: List[str],
-                            file_path: Path, rule_id: str,
-                            rule: Dict, result: ValidationResult):
-        """Validate that resource names use kebab-case."""
-        # Check for 'name:' fields in YAML
-        if file_path.suffix in {'.yaml', '.yml'}:
-            name_pattern = r'^\s*name:\s*(["\']?)([^"\'\s]+)\1\s*$'
-            for i, line in enumerate(lines):
-                match = re.match(name_pattern, line)
-                if match:
-                    name = match.group(2)
-                    # Skip if it's a variable or environment reference
-                    if '{{' in name or '${' in name:
-                        continue
-                    
-                    # Check kebab-case
-                    if not re.match(r'^[a-z][a-z0-9-]*[a-z0-9]$', name):
-                        result.add_issue(ValidationIssue(
-                            file_path=str(file_path),
-                            line_number=i + 1,
-                            rule_id=rule_id,
-                            severity=rule['severity'],
-                            message=f"Resource name '{name}' does not use kebab-case",
-                            suggestion="Use lowercase letters, numbers, and hyphens only"
-                        ))
-    
-    def _validate_yaml_keys(self, content: str, lines: List[str],
-                           file_path: Path, rule_id: str,
-                           rule: Dict, result: ValidationResult):
-        """Validate that YAML keys use snake_case."""
-        if file_path.suffix not in {'.yaml', '.yml'}:
-            return
-        
-        # Pattern to match YAML keys
-        key_pattern = r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:'
-        
-        for i, line in enumerate(lines):
-            match = re.match(key_pattern, line)
-            if match:
-                key = match.group(1)
-                
-                # Skip special cases (environment variables, metadata fields)
-                if key.isupper() or key in {'apiVersion', 'kind', 'metadata'}:
-                    continue
-                
-                # Check snake_case
-                if not re.match(r'^[a-z][a-z0-9_]*$', key):
-                    result.add_issue(ValidationIssue(
-                        file_path=str(file_path),
-                        line_number=i + 1,
-                        rule_id=rule_id,
-                        severity=rule['severity'],
-                        message=f"YAML key '{key}' does not use snake_case",
-                        suggestion="Use lowercase letters, numbers, and underscores only"
-                    ))
+    def validate_file(self, file_path: Path) -> ValidationResult:
+        """Validate a single file against namespace standards."""
+        return ValidationResult.from_rows(str(file_path), check_file(self.compile_rules(), str(file_path)))
     
     def should_process_file(self, file_path: Path) -> bool:
         """Determine if a file should be validated."""
@@ -423,100 +608,91 @@ class NamespaceValidator:
         
         return True
     
-    def validate_directory(self, directory_path: Path) -> List[ValidationResult]:
-        """Recursively validate all files in a directory."""
-        results = []
+    def iter_directory(self, directory_path: Path) -> Iterator[ValidationResult]:
+        """
+        Validate all files under a directory, yielding results that have issues.
         
-        for file_path in directory_path.rglob('*'):
-            if file_path.is_file() and self.should_process_file(file_path):
-                result = self.validate_file(file_path)
-                if not result.passed or result.issues:
-                    results.append(result)
+        Unchanged files are answered from the result cache; the rest are
+        validated in shards on a process pool. Results are yielded as soon as
+        they are available.
+        """
+        rule_set = self.compile_rules()
+        index = RepoIndex(directory_path, exclude_dirs=self.excluded_dirs)
+        index.refresh()
+        
+        cache = None
+        if self.use_cache:
+            cache = ResultCache(self.cache_path or default_result_cache_path(directory_path), rule_set.digest)
+            cache.load()
+        
+        self.stats = {'files': 0, 'cached': 0, 'validated': 0}
+        pending: List[Tuple[str, Optional[str]]] = []
+        for entry in index.iter_files(suffixes=self.processable_extensions):
+            file_path = index.absolute(entry)
+            if not os.access(file_path, os.R_OK):
+                continue
+            self.stats['files'] += 1
+            
+            key = None
+            if cache is not None:
+                digest = index.digest(entry)
+                if digest is not None:
+                    key = f"{digest}:{entry.name}"
+                    rows = cache.get(key)
+                    if rows is not None:
+                        self.stats['cached'] += 1
+                        if rows:
+                            yield ValidationResult.from_rows(str(file_path), rows)
+                        continue
+            pending.append((str(file_path), key))
+        
+        self.stats['validated'] = len(pending)
+        for (file_path, key), rows in zip(pending, self._run_checks(rule_set, [p for p, _ in pending]), strict=True):
+            if cache is not None and key is not None:
+                cache.put(key, rows)
+            if rows:
+                yield ValidationResult.from_rows(file_path, rows)
+        
+        index.save()
+        if cache is not None:
+            cache.save()
+    
+    def _run_checks(self, rule_set: RuleSet, paths: List[str]) -> Iterator[List[IssueRow]]:
+        """Validate files in order, sharded across worker processes when worthwhile."""
+        if self.jobs <= 1 or len(paths) < SHARD_SIZE * 2:
+            for path in paths:
+                yield check_file(rule_set, path)
+            return
         
-        return results
+        shards = [paths[i:i + SHARD_SIZE] for i in range(0, len(paths), SHARD_SIZE)]
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(rule_set,)) as pool:
+            for shard_rows in pool.map(_validate_shard, shards):
+                yield from shard_rows
     
-    def validate_path(self, path: Path) -> List[ValidationResult]:
-        """Validate a file or directory."""
+    def validate_directory(self, directory_path: Path) -> List[ValidationResult]:
+        """Recursively validate all files in a directory."""
+        return list(self.iter_directory(directory_path))
+    
+    def iter_path(self, path: Path) -> Iterator[ValidationResult]:
+        """Validate a file or directory, yielding results."""
         if path.is_file():
-            return [self.validate_file(path)]
+            yield self.validate_file(path)
         elif path.is_dir():
-            return self.validate_directory(path)
+            yield from self.iter_directory(path)
         else:
             print(f"Error: {path} is not a valid file or directory")
-            return []
+    
+    def validate_path(self, path: Path) -> List[ValidationResult]:
+        """Validate a file or directory."""
+        return list(self.iter_path(path))
     
     def generate_report(self) -> str:
         """Generate a detailed validation report."""
-        total_files = len(self.results)
-        total_issues = sum(len(r.issues) for r in self.results)
-        total_errors = sum(
-            len([i for i in r.issues if i.severity == Severity.ERROR])
-            for r in self.results
-        )
-        total_warnings = sum(
-            len([i for i in r.issues if i.severity == Severity.WARNING])
-            for r in self.results
-        )
-        files_passed = sum(1 for r in self.results if r.passed)
-        
-        report = []
-        report.append("=" * 80)
-        report.append("MachineNativeOps Namespace Validation Report")
-        report.append("=" * 80)
-        report.append(f"Generated: {datetime.now().isoformat()}")
-        report.append(f"Mode: {'Strict' if self.strict else 'Standard'}")
-        report.append("")
-        report.append("Summary")
-        report.append("-" * 80)
-        report.append(f"Files validated:     {total_files}")
-        report.append(f"Files passed:        {files_passed}")
-        report.append(f"Files failed:        {total_files - files_passed}")
-        report.append(f"Total issues:        {total_issues}")
-        report.append(f"  Errors:            {total_errors}")
-        report.append(f"  Warnings:          {total_warnings}")
-        report.append("")
-        
-        if self.results:
-            # Group issues by rule
-            issues_by_rule: Dict[str, List[ValidationIssue]] = {}
-            for result in self.results:
-                for issue in result.issues:
-                    if issue.rule_id not in issues_by_rule:
-                        issues_by_rule[issue.rule_id] = []
-                    issues_by_rule[issue.rule_id].append(issue)
-            
-            report.append("Issues by Rule")
-            report.append("-" * 80)
-            for rule_id in sorted(issues_by_rule.keys()):
-                issues = issues_by_rule[rule_id]
-                report.append(f"\n{rule_id}: {len(issues)} occurrences")
-                rule = self.validation_rules.get(rule_id, {})
-                if rule:
-                    report.append(f"  Description: {rule.get('description', 'N/A')}")
-                
-                # Show first few examples
-                for issue in issues[:3]:
-                    report.append(f"  - {issue.file_path}:{issue.line_number or '?'}")
-                    report.append(f"    {issue.message}")
-                    if issue.suggestion:
-                        report.append(f"    💡 {issue.suggestion}")
-                
-                if len(issues) > 3:
-                    report.append(f"  ... and {len(issues) - 3} more")
-        
-        report.append("")
-        report.append("=" * 80)
-        
-        if total_errors == 0 and total_warnings == 0:
-            report.append("✓ All files comply with MachineNativeOps namespace standards")
-        elif total_errors == 0:
-            report.append(f"⚠ Validation completed with {total_warnings} warnings")
-        else:
-            report.append(f"✗ Validation failed with {total_errors} errors")
-        
-        report.append("=" * 80)
-        
-        return "\n".join(report)
+        reporter = StreamingReporter(self.validation_rules, strict=self.strict)
+        for result in self.results:
+            reporter.add(result)
+        return reporter.render()
     
     def save_report(self, report: str, output_path: str = "namespace-validation-report.txt"):
         """Save report to file."""
@@ -545,6 +721,9 @@ Examples:
   
   # Generate detailed report
   python namespace-validator.py --report .
+  
+  # Full re-validation on 8 worker processes
+  python namespace-validator.py --no-cache --jobs 8 .
         """
     )
     
@@ -554,6 +733,12 @@ Examples:
     parser.add_argument('--report', action='store_true', help='Generate detailed report file')
     parser.add_argument('--report-path', type=str, default='namespace-validation-report.txt',
                        help='Path for report file (default: namespace-validation-report.txt)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Worker processes for validation (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-validate every file instead of reusing cached results')
+    parser.add_argument('--cache-path', type=str, default=None,
+                       help='Result cache file (default: ~/.cache/namespace-validator/)')
     
     args = parser.parse_args()
     
@@ -566,11 +751,15 @@ Examples:
     # Create validator
     validator = NamespaceValidator(
         strict=args.strict,
-        verbose=args.verbose
+        verbose=args.verbose,
+        jobs=args.jobs,
+        use_cache=not args.no_cache,
+        cache_path=args.cache_path
     )
     
-    # Load namespace config if available
+    # Load namespace config and naming spec if available
     validator.load_namespace_config()
+    validator.load_naming_spec()
     
     # Perform validation
     print(f"Validating namespace compliance in: {path}")
@@ -578,10 +767,17 @@ Examples:
         print("(STRICT MODE - warnings treated as errors)")
     print()
     
-    validator.results = validator.validate_path(path)
+    reporter = StreamingReporter(validator.validation_rules, strict=args.strict, verbose=args.verbose)
+    for result in validator.iter_path(path):
+        reporter.add(result)
+    
+    if args.verbose and path.is_dir():
+        stats = validator.stats
+        print(f"Checked {stats['files']} files: {stats['cached']} from cache, "
+              f"{stats['validated']} validated")
     
     # Generate and display report
-    report = validator.generate_report()
+    report = reporter.render()
     print("\n" + report)
     
     # Save report if requested
@@ -589,330 +785,7 @@ Examples:
         validator.save_report(report, args.report_path)
     
     # Exit with appropriate code
-    total_errors = sum(
-        len([i for i in r.issues if i.severity == Severity.ERROR])
-        for r in validator.results
-    )
-    sys.exit(1 if total_errors > 0 else 0)
-            
-            # Run validation checks
-            self._check_legacy_namespaces(content, result)
-            self._check_namespace_consistency(content, result)
-            self._check_naming_patterns(content, result)
-            self._check_registry_urls(content, result)
-            self._check_certificate_paths(content, result)
-            self._check_cluster_tokens(content, result)
-            
-            # Update stats
-            if result.passed:
-                self.stats["files_passed"] += 1
-            else:
-                self.stats["files_failed"] += 1
-            
-            self.stats["errors"] += len(result.errors)
-            self.stats["warnings"] += len(result.warnings)
-            
-        except Exception as e:
-            result.add_error(f"Validation error: {e}")
-            self.stats["files_failed"] += 1
-            self.stats["errors"] += 1
-        
-        self.results.append(result)
-        return result
-    
-    def _check_legacy_namespaces(self, content: str, result: ValidationResult):
-        """Check for legacy namespace usage"""
-        migration = self.config.get("migration", {})
-        legacy_namespaces = migration.get("legacy_namespaces", [])
-        
-        for legacy_ns in legacy_namespaces:
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(legacy_ns) + r'\b'
-            if re.search(pattern, content):
-                result.add_error(
-                    f"Legacy namespace '{legacy_ns}' found - should be migrated to 'machinenativeops'"
-                )
-    
-    def _check_namespace_consistency(self, content: str, result: ValidationResult):
-        """Check that namespace usage is consistent"""
-        namespace_config = self.config.get("namespace", {})
-        primary_ns = namespace_config.get("primary", "")
-        variants = namespace_config.get("variants", {})
-        
-        # Count occurrences of each variant
-        variant_counts = {}
-        for variant_type, variant_name in variants.items():
-            count = len(re.findall(re.escape(variant_name), content))
-            if count > 0:
-                variant_counts[variant_type] = count
-        
-        # If multiple variants are used, that might indicate inconsistency
-        if len(variant_counts) > 2:  # Allow some flexibility
-            result.add_warning(
-                f"Multiple namespace variants used: {', '.join(variant_counts.keys())} - "
-                "consider using consistent casing"
-            )
-    
-    def _check_naming_patterns(self, content: str, result: ValidationResult):
-        """Validate naming pattern compliance"""
-        validation_config = self.config.get("validation", {})
-        
-        # Check namespace pattern
-        namespace_pattern = validation_config.get("namespace_pattern", "")
-        if namespace_pattern:
-            # Find all potential namespace references
-            matches = re.findall(r'\bmachinenativeops(?:-[a-z0-9]+)*\b', content, re.IGNORECASE)
-            for match in matches:
-                if not re.match(namespace_pattern, match.lower()):
-                    result.add_error(
-                        f"Invalid namespace format '{match}' - must match pattern {namespace_pattern}"
-                    )
-        
-        # Check version pattern if versions are present
-        version_pattern = validation_config.get("version_pattern", "")
-        if version_pattern:
-            version_matches = re.findall(r'\b[vV]?\d+\.\d+\.\d+(?:-[a-z0-9.-]+)?\b', content)
-            for version in version_matches:
-                if not re.match(version_pattern, version):
-                    result.add_warning(
-                        f"Version '{version}' may not match standard pattern {version_pattern}"
-                    )
-    
-    def _check_registry_urls(self, content: str, result: ValidationResult):
-        """Check registry URL usage"""
-        registries = self.config.get("registries", {})
-        primary_registry = registries.get("primary", {}).get("url", "")
-        
-        if not primary_registry:
-            return
-        
-        # Check for correct registry usage
-        if primary_registry in content:
-            result.add_info(f"Uses primary registry: {primary_registry}")
-        
-        # Check for incorrect registry patterns
-        incorrect_patterns = [
-            r'docker\.io/machine-native-ops',
-            r'ghcr\.io/machine-native-ops-machine-native-ops',
-            r'ghcr\.io/machine-native-ops-aaps',
-            r'docker\.io/machine-native-ops-aaps',
-            r'docker\.io/machine-native-ops-apps',
-            r'ghcr\.io/machine-native-ops-apps',
-        ]
-        
-        for pattern in incorrect_patterns:
-            if re.search(pattern, content):
-                result.add_error(
-                    f"Found legacy registry pattern - should use {primary_registry}"
-                )
-    
-    def _check_certificate_paths(self, content: str, result: ValidationResult):
-        """Check certificate path compliance"""
-        certs = self.config.get("certificates", {})
-        correct_base_path = certs.get("base_path", "")
-        correct_pkl_path = certs.get("pkl_path", "")
-        
-        # Check for correct paths
-        if correct_pkl_path and correct_pkl_path in content:
-            result.add_info(f"Uses correct PKL path: {correct_pkl_path}")
-        
-        # Check for incorrect certificate paths
-        incorrect_paths = [
-            r'/etc/aaps',
-            r'/etc/machine-native-ops',
-            r'/etc/apps',
-        ]
-        
-        for pattern in incorrect_paths:
-            if re.search(pattern, content):
-                result.add_error(
-                    f"Found legacy certificate path - should use {correct_base_path}"
-                )
-    
-    def _check_cluster_tokens(self, content: str, result: ValidationResult):
-        """Check cluster token usage"""
-        clusters = self.config.get("clusters", {})
-        etcd_config = clusters.get("etcd", {})
-        correct_token = etcd_config.get("token", "")
-        
-        if correct_token and correct_token in content:
-            result.add_info(f"Uses correct etcd cluster token")
-        
-        # Check for legacy cluster tokens
-        legacy_tokens = [
-            'machine-native-ops-etcd-cluster',
-            'machine-native-ops-etcd',
-        ]
-        
-        for token in legacy_tokens:
-            if token in content:
-                result.add_error(
-                    f"Found legacy cluster token '{token}' - should use {correct_token}"
-                )
-    
-    def scan_directory(self, directory: Path, patterns: List[str] = None) -> None:
-        """
-        Scan and validate all files in a directory
-        
-        Args:
-            directory: Directory to scan
-            patterns: File patterns to match
-        """
-        if patterns is None:
-            patterns = ['*.yaml', '*.yml', '*.md', '*.json', '*.sh', '*.py', '*.ts', '*.js']
-        
-        directory = Path(directory)
-        if not directory.is_dir():
-            logger.error(f"Not a directory: {directory}")
-            return
-        
-        logger.info(f"Scanning directory: {directory}")
-        
-        for pattern in patterns:
-            for file_path in directory.rglob(pattern):
-                # Skip hidden files and directories
-                if any(part.startswith('.') for part in file_path.parts):
-                    continue
-                
-                # Skip certain directories
-                skip_dirs = {'node_modules', 'dist', 'build', '.git', '__pycache__', 'vendor'}
-                if any(skip_dir in file_path.parts for skip_dir in skip_dirs):
-                    continue
-                
-                self.validate_file(file_path)
-    
-    def print_report(self, verbose: bool = False):
-        """Print validation report"""
-        print("\n" + "="*80)
-        print("Namespace Validation Report")
-        print("="*80)
-        
-        # Summary statistics
-        print(f"\n📊 Summary:")
-        print(f"  Files checked:  {self.stats['files_checked']}")
-        print(f"  ✅ Passed:      {self.stats['files_passed']}")
-        print(f"  ❌ Failed:      {self.stats['files_failed']}")
-        print(f"  Errors:         {self.stats['errors']}")
-        print(f"  Warnings:       {self.stats['warnings']}")
-        
-        # Failed files
-        failed_results = [r for r in self.results if not r.passed]
-        if failed_results:
-            print(f"\n❌ Failed Files ({len(failed_results)}):")
-            for result in failed_results:
-                print(f"\n  {result.file_path}")
-                for error in result.errors:
-                    print(f"    ❌ {error}")
-                if verbose and result.warnings:
-                    for warning in result.warnings:
-                        print(f"    ⚠️  {warning}")
-        
-        # Warnings (if verbose)
-        if verbose:
-            warning_results = [r for r in self.results if r.warnings and r.passed]
-            if warning_results:
-                print(f"\n⚠️  Files with Warnings ({len(warning_results)}):")
-                for result in warning_results:
-                    print(f"\n  {result.file_path}")
-                    for warning in result.warnings:
-                        print(f"    ⚠️  {warning}")
-        
-        # Overall result
-        print("\n" + "="*80)
-        if self.stats['files_failed'] == 0:
-            print("✅ All validations passed!")
-        else:
-            print(f"❌ Validation failed: {self.stats['files_failed']} files need attention")
-        print("="*80 + "\n")
-    
-    def generate_json_report(self) -> str:
-        """Generate JSON report"""
-        report = {
-            "summary": self.stats,
-            "results": [r.to_dict() for r in self.results]
-        }
-        return json.dumps(report, indent=2)
-
-
-def main():
-    """Main entry point"""
-    parser = argparse.ArgumentParser(
-        description="Validate namespace compliance with MachineNativeOps standards"
-    )
-    parser.add_argument(
-        "--config",
-        default="mno-namespace.yaml",
-        help="Path to namespace configuration file"
-    )
-    parser.add_argument(
-        "--file",
-        help="Validate a single file"
-    )
-    parser.add_argument(
-        "--scan",
-        help="Scan and validate all files in directory"
-    )
-    parser.add_argument(
-        "--report",
-        action="store_true",
-        help="Generate detailed report"
-    )
-    parser.add_argument(
-        "--json",
-        help="Output JSON report to file"
-    )
-    parser.add_argument(
-        "-v", "--verbose",
-        action="store_true",
-        help="Verbose output"
-    )
-    
-    args = parser.parse_args()
-    
-    if args.verbose:
-        logger.setLevel(logging.DEBUG)
-    
-    # Initialize validator
-    validator = NamespaceValidator(config_path=args.config)
-    
-    # Execute requested operation
-    if args.file:
-        result = validator.validate_file(Path(args.file))
-        
-        print(f"\nValidation result for {result.file_path}:")
-        print(f"Status: {'✅ PASSED' if result.passed else '❌ FAILED'}")
-        
-        if result.errors:
-            print("\nErrors:")
-            for error in result.errors:
-                print(f"  ❌ {error}")
-        
-        if result.warnings:
-            print("\nWarnings:")
-            for warning in result.warnings:
-                print(f"  ⚠️  {warning}")
-        
-        if args.verbose and result.info:
-            print("\nInfo:")
-            for info in result.info:
-                print(f"  ℹ️  {info}")
-        
-        sys.exit(0 if result.passed else 1)
-    
-    elif args.scan:
-        validator.scan_directory(Path(args.scan))
-        validator.print_report(verbose=args.verbose)
-        
-        if args.json:
-            with open(args.json, 'w') as f:
-                f.write(validator.generate_json_report())
-            print(f"JSON report written to {args.json}")
-        
-        sys.exit(0 if validator.stats['files_failed'] == 0 else 1)
-    
-    else:
-        parser.print_help()
-        sys.exit(1)
+    sys.exit(1 if reporter.total_errors > 0 else 0)
 
 
 if __name__ == "__main__":
@@ -5,5 +5,6 @@ Path Tools - 路徑掃描辨識與修復工具集
 from .path_scanner import PathScanner
 from .path_validator import PathValidator
 from .path_fixer import PathFixer
+from .repo_index import IndexEntry, RepoIndex
 
-__all__ = ["PathScanner", "PathValidator", "PathFixer"]
+__all__ = ["PathScanner", "PathValidator", "PathFixer", "RepoIndex", "IndexEntry"]
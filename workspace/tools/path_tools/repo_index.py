@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Repo Index - 共享增量檔案索引
+
+一次 os.scandir 遍歷建立檔案索引 (路徑、大小、mtime、inode、內容哈希)，
+並持久化到本地快取。之後的執行只重新 stat 目錄樹，僅對變更的檔案重新
+計算哈希；哈希以串流方式計算，且只在查詢需要時才計算。
+
+預設只索引普通檔案與目錄：符號連結 (含指向檔案的連結) 不跟隨也不收錄。
+record_links=True 時，指向根目錄內的符號連結以連結項目記錄 (IndexEntry.link
+為目標的相對路徑)，同樣不跟隨；查詢時需以 links=True 明確要求。
+計算哈希時 mtime 仍在檔案系統時間戳精度內的檔案，下次刷新時重新計算
+哈希，避免同一時間戳內再次修改而保留過期哈希。
+
+供 refactor_engine、namespace-validator、scan_tech_debt、
+find_duplicate_scripts、fs-map-generator 等工具共用，避免各自重複遍歷。
+
+Usage:
+    from path_tools.repo_index import RepoIndex
+
+    index = RepoIndex(repo_root)
+    index.refresh()
+    for entry in index.iter_files(suffixes={".py"}, exclude_dirs={"dist"}):
+        print(entry.path, entry.size)
+    duplicates = index.find_duplicates(index.iter_files(suffixes={".sh"}))
+    index.save()
+
+    python repo_index.py --target <dir> [--stats]
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import stat
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CACHE_VERSION = 3
+HASH_CHUNK_SIZE = 1 << 20
+
+# 檔案系統 mtime 精度上限 (FAT 為 2 秒)；在此窗口內修改的檔案哈希不可信
+MTIME_RESOLUTION_NS = 2_000_000_000
+
+# 幾乎所有工具都會跳過的目錄，在遍歷時直接剪枝
+DEFAULT_EXCLUDE_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv',
+    '.pytest_cache', '.mypy_cache', '.tox',
+})
+
+
+@dataclass
+class IndexEntry:
+    """索引項目 (path 為相對於根目錄的 POSIX 路徑)"""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    is_dir: bool = False
+    digest: Optional[str] = None
+    hashed_ns: int = 0  # 開始計算 digest 的時間
+    link: Optional[str] = None  # 符號連結目標 (相對根目錄)；非連結為 None
+
+    @property
+    def digest_is_racy(self) -> bool:
+        """digest 計算時 mtime 仍在時間戳精度內，同一時間戳內的後續修改無法由 stat 察覺"""
+        return self.digest is not None and self.hashed_ns < self.mtime_ns + MTIME_RESOLUTION_NS
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit('/', 1)[-1]
+
+    @property
+    def suffix(self) -> str:
+        name = self.name
+        dot = name.rfind('.')
+        return name[dot:] if dot > 0 else ''
+
+    @property
+    def parent(self) -> str:
+        return self.path.rsplit('/', 1)[0] if '/' in self.path else ''
+
+    @property
+    def depth(self) -> int:
+        return self.path.count('/') + 1
+
+    def to_row(self) -> List[Any]:
+        return [self.path, self.size, self.mtime_ns, self.inode, int(self.is_dir), self.digest, self.hashed_ns,
+                self.link]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "IndexEntry":
+        return cls(row[0], row[1], row[2], row[3], bool(row[4]), row[5], row[6], row[7])
+
+
+@dataclass
+class RefreshStats:
+    """一次刷新的變更統計"""
+    total: int = 0
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    rehashed: int = 0
+
+
+def hash_file(path: Path, algorithm: str = "sha256") -> str:
+    """串流計算檔案哈希 (不一次讀入整個檔案)"""
+    hasher = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def default_cache_path(
+    root: Path,
+    exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+    record_links: bool = False,
+) -> Path:
+    """預設快取位置：$REPO_INDEX_CACHE_DIR 或 ~/.cache/repo-index (不寫入被掃描的目錄樹)"""
+    cache_dir = os.environ.get("REPO_INDEX_CACHE_DIR")
+    if not cache_dir:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(base, "repo-index")
+    key = hashlib.sha1(
+        (str(Path(root).resolve()) + "\0" + "\0".join(sorted(exclude_dirs))
+         + ("\0links" if record_links else "")).encode()
+    ).hexdigest()[:16]
+    return Path(cache_dir) / f"{key}.json"
+
+
+class RepoIndex:
+    """
+    增量檔案索引
+
+    refresh() 以 os.scandir 遍歷目錄樹；(size, mtime_ns, inode) 未變的項目
+    保留已計算的哈希，變更的項目清除哈希，待 digest() 需要時再計算。
+    哈希計算時 mtime 距離過近 (digest_is_racy) 的項目即使 stat 未變也清除哈希。
+    refresh(workers=N) 將根目錄下的各子樹交給執行緒池並行遍歷。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        cache_path: Optional[Path] = None,
+        exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+        persist: bool = True,
+        hash_algorithm: str = "sha256",
+        record_links: bool = False,
+    ):
+        self.root = Path(root)
+        self.exclude_dirs = frozenset(exclude_dirs)
+        self.persist = persist
+        self.record_links = record_links
+        self.cache_path = (
+            Path(cache_path) if cache_path
+            else default_cache_path(self.root, self.exclude_dirs, record_links)
+        )
+        self._real_root = os.path.realpath(self.root)
+        self.hash_algorithm = hash_algorithm
+        self._entries: Dict[str, IndexEntry] = {}
+        self._loaded = False
+        self._dirty = False
+        self.last_refresh = RefreshStats()
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def load(self) -> bool:
+        """從快取載入索引"""
+        self._loaded = True
+        if not self.persist or not self.cache_path.exists():
+            return False
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        if (data.get("version") != CACHE_VERSION or data.get("algorithm") != self.hash_algorithm
+                or data.get("links", False) != self.record_links):
+            return False
+        self._entries = {row[0]: IndexEntry.from_row(row) for row in data.get("entries", [])}
+        return True
+
+    def save(self) -> None:
+        """將索引寫入快取 (原子替換)"""
+        if not self.persist or not self._dirty:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({
+                "version": CACHE_VERSION,
+                "root": str(self.root.resolve()),
+                "algorithm": self.hash_algorithm,
+                "links": self.record_links,
+                "entries": [entry.to_row() for entry in self._entries.values()],
+            }), encoding='utf-8')
+            tmp_path.replace(self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️  寫入索引快取失敗: {e}", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # 掃描
+    # ------------------------------------------------------------------
+
+    def refresh(self, workers: int = 1) -> RefreshStats:
+        """
+        重新遍歷目錄樹，僅更新變更的項目
+
+        Args:
+            workers: 大於 1 時根目錄下的各子樹在執行緒池中並行遍歷
+        """
+        if not self._loaded:
+            self.load()
+
+        previous = self._entries
+        stats = RefreshStats()
+        if workers > 1:
+            entries: Dict[str, IndexEntry] = {}
+            subtrees = self._scan_directory(str(self.root), '', previous, entries, stats)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(lambda subtree: self._walk([subtree], previous), subtrees)
+                for subtree_entries, subtree_stats in results:
+                    entries.update(subtree_entries)
+                    for name in ("added", "changed", "unchanged", "rehashed"):
+                        setattr(stats, name, getattr(stats, name) + getattr(subtree_stats, name))
+        else:
+            entries, stats = self._walk([(str(self.root), '')], previous)
+
+        stats.removed = sum(1 for path in previous if path not in entries)
+        stats.total = len(entries)
+        if stats.added or stats.changed or stats.removed or stats.rehashed:
+            self._dirty = True
+        self._entries = entries
+        self.last_refresh = stats
+        return stats
+
+    def _walk(self, stack: List[Tuple[str, str]], previous: Dict[str, IndexEntry]):
+        """遍歷 (目錄, 相對前綴) 堆疊下的所有子樹，返回 (項目, 統計)"""
+        entries: Dict[str, IndexEntry] = {}
+        stats = RefreshStats()
+        while stack:
+            directory, prefix = stack.pop()
+            stack.extend(self._scan_directory(directory, prefix, previous, entries, stats))
+        return entries, stats
+
+    def _scan_directory(
+        self,
+        directory: str,
+        prefix: str,
+        previous: Dict[str, IndexEntry],
+        entries: Dict[str, IndexEntry],
+        stats: RefreshStats,
+    ) -> List[Tuple[str, str]]:
+        """掃描單一目錄並記錄其項目，返回待遍歷的子目錄 (符號連結不跟隨)"""
+        subdirs: List[Tuple[str, str]] = []
+        exclude_dirs = self.exclude_dirs
+        try:
+            iterator = os.scandir(directory)
+        except OSError:
+            return subdirs
+        with iterator:
+            for item in iterator:
+                try:
+                    is_dir = item.is_dir(follow_symlinks=False)
+                    if is_dir and item.name in exclude_dirs:
+                        continue
+                    st = item.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                link = None
+                if not is_dir and not stat.S_ISREG(st.st_mode):
+                    if not (self.record_links and stat.S_ISLNK(st.st_mode)):
+                        continue
+                    link = self._link_target(item.path)
+                    if link is None:
+                        continue
+                    is_dir = os.path.isdir(item.path)
+                    if is_dir and item.name in exclude_dirs:
+                        continue
+
+                rel_path = prefix + item.name
+                size = 0 if is_dir or link is not None else st.st_size
+                old = previous.get(rel_path)
+                if (old is not None and old.is_dir == is_dir and old.size == size and old.link == link
+                        and old.mtime_ns == st.st_mtime_ns and old.inode == st.st_ino):
+                    if old.digest_is_racy:
+                        old.digest = None
+                        stats.rehashed += 1
+                    entries[rel_path] = old
+                    stats.unchanged += 1
+                else:
+                    entries[rel_path] = IndexEntry(rel_path, size, st.st_mtime_ns, st.st_ino, is_dir, link=link)
+                    if old is None:
+                        stats.added += 1
+                    else:
+                        stats.changed += 1
+                if is_dir and link is None:
+                    subdirs.append((item.path, rel_path + '/'))
+        return subdirs
+
+    def _link_target(self, path: str) -> Optional[str]:
+        """符號連結指向的根目錄內相對路徑 (根目錄本身為 '')；懸空或指向根目錄外時返回 None"""
+        target = os.path.realpath(path)
+        if not os.path.exists(target):
+            return None
+        relative = os.path.relpath(target, self._real_root)
+        if relative == os.curdir:
+            return ''
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return relative.replace(os.sep, '/')
+
+    def _ensure_scanned(self) -> None:
+        if not self._loaded:
+            self.refresh()
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def get(self, path: str) -> Optional[IndexEntry]:
+        """按相對路徑取得項目"""
+        self._ensure_scanned()
+        return self._entries.get(path)
+
+    def absolute(self, entry: IndexEntry) -> Path:
+        """項目的絕對路徑"""
+        return self.root / entry.path
+
+    def iter_entries(
+        self,
+        pattern: Optional[str] = None,
+        suffixes: Optional[Iterable[str]] = None,
+        under: Optional[str] = None,
+        exclude_dirs: Optional[Iterable[str]] = None,
+        files: bool = True,
+        dirs: bool = True,
+        links: bool = False,
+    ) -> Iterator[IndexEntry]:
+        """
+        遍歷索引項目
+
+        Args:
+            pattern: 檔名 glob (如 "*.md"，與 Path.rglob 相同只比對名稱)
+            suffixes: 副檔名集合 (如 {".py", ".sh"})
+            under: 只返回此相對目錄下的項目
+            exclude_dirs: 額外排除的目錄名稱 (任一路徑段匹配即排除)
+            links: 是否包含符號連結項目 (需 record_links=True 建立的索引)
+        """
+        self._ensure_scanned()
+        name_match = re.compile(fnmatch.translate(pattern)).match if pattern else None
+        suffix_set = frozenset(suffixes) if suffixes is not None else None
+        excluded = frozenset(exclude_dirs or ()) - self.exclude_dirs
+        prefix = under.strip('/') + '/' if under else None
+
+        for entry in self._entries.values():
+            if entry.link is not None and not links:
+                continue
+            if entry.is_dir:
+                if not dirs:
+                    continue
+            elif not files:
+                continue
+            if prefix is not None and not entry.path.startswith(prefix):
+                continue
+            if suffix_set is not None and entry.suffix not in suffix_set:
+                continue
+            if name_match is not None and not name_match(entry.name):
+                continue
+            if excluded:
+                parts = entry.path.split('/')
+                if not excluded.isdisjoint(parts if entry.is_dir else parts[:-1]):
+                    continue
+            yield entry
+
+    def iter_files(self, **filters: Any) -> Iterator[IndexEntry]:
+        """遍歷檔案項目"""
+        return self.iter_entries(files=True, dirs=False, **filters)
+
+    def iter_dirs(self, **filters: Any) -> Iterator[IndexEntry]:
+        """遍歷目錄項目"""
+        return self.iter_entries(files=False, dirs=True, **filters)
+
+    def paths(self, **filters: Any) -> List[Path]:
+        """符合條件的絕對路徑列表"""
+        return [self.root / entry.path for entry in self.iter_entries(**filters)]
+
+    # ------------------------------------------------------------------
+    # 內容哈希
+    # ------------------------------------------------------------------
+
+    def digest(self, entry: IndexEntry) -> Optional[str]:
+        """取得檔案哈希 (未變更的檔案使用快取值；目錄與符號連結為 None)"""
+        if entry.is_dir or entry.link is not None:
+            return None
+        if entry.digest is None:
+            started_ns = time.time_ns()
+            try:
+                entry.digest = hash_file(self.root / entry.path, self.hash_algorithm)
+            except OSError:
+                return None
+            entry.hashed_ns = started_ns
+            self._dirty = True
+        return entry.digest
+
+    def find_duplicates(self, entries: Iterable[IndexEntry]) -> Dict[str, List[IndexEntry]]:
+        """
+        查找內容相同的檔案
+
+        先按大小分組，只對大小相同的檔案計算哈希。
+        """
+        by_size: Dict[int, List[IndexEntry]] = defaultdict(list)
+        for entry in entries:
+            if not entry.is_dir:
+                by_size[entry.size].append(entry)
+
+        by_digest: Dict[str, List[IndexEntry]] = defaultdict(list)
+        for group in by_size.values():
+            if len(group) < 2:
+                continue
+            for entry in group:
+                digest = self.digest(entry)
+                if digest is not None:
+                    by_digest[digest].append(entry)
+        return {digest: group for digest, group in by_digest.items() if len(group) > 1}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """索引統計"""
+        self._ensure_scanned()
+        links = sum(1 for entry in self._entries.values() if entry.link is not None)
+        files = sum(1 for entry in self._entries.values() if not entry.is_dir and entry.link is None)
+        return {
+            "root": str(self.root),
+            "cache_path": str(self.cache_path) if self.persist else None,
+            "files": files,
+            "directories": len(self._entries) - files - links,
+            "links": links,
+            "hashed": sum(1 for entry in self._entries.values() if entry.digest),
+            "last_refresh": vars(self.last_refresh),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the shared repository file index")
+    parser.add_argument("--target", default=".", help="Root directory to index")
+    parser.add_argument("--hash", action="store_true", help="Hash every file eagerly")
+    parser.add_argument("--stats", action="store_true", help="Print index statistics as JSON")
+    args = parser.parse_args()
+
+    index = RepoIndex(Path(args.target))
+    stats = index.refresh()
+    if args.hash:
+        for entry in index.iter_files():
+            index.digest(entry)
+    index.save()
+
+    if args.stats:
+        print(json.dumps(index.get_stats(), indent=2, ensure_ascii=False))
+    else:
+        print(f"✅ 索引完成: {stats.total} 項 (新增 {stats.added}, 變更 {stats.changed}, "
+              f"移除 {stats.removed}, 未變 {stats.unchanged})")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,10 +23,13 @@ import re
 import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from collections import defaultdict
 from dataclasses import dataclass, field, asdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from path_tools.repo_index import DEFAULT_EXCLUDE_DIRS, RepoIndex  # noqa: E402
+
 # ============================================================================
 # 常數定義
 # ============================================================================
@@ -38,6 +41,9 @@ CONFIG_PATH = CONFIG_DIR / "refactor-engine-config.yaml"
 SCRATCH_CONFIG_PATH = CONFIG_DIR / "legacy-scratch-processor.yaml"
 INTEGRATION_CONFIG_PATH = CONFIG_DIR / "integration-processor.yaml"
 
+# 掃描時略過備份目錄
+SCAN_EXCLUDE_DIRS = DEFAULT_EXCLUDE_DIRS | {".refactor_backup"}
+
 # 問題嚴重程度
 SEVERITY_CRITICAL = "critical"
 SEVERITY_HIGH = "high"
@@ -129,6 +135,9 @@ class DirectoryAnalyzer:
         self.configs = load_all_configs()
         self.files_cache: List[Path] = []
         self.structure_cache: Dict = {}
+        self.index = RepoIndex(self.target)
+        self._file_sizes: Dict[Path, int] = {}
+        self._dir_set: Set[Path] = set()
 
     def analyze(self) -> AnalysisResult:
         """執行完整分析"""
@@ -160,12 +169,22 @@ class DirectoryAnalyzer:
 
     def _build_files_cache(self):
         """建立檔案緩存"""
-        self.files_cache = list(self.target.rglob("*"))
+        # 共享增量索引：一次遍歷，未變更項目沿用快取
+        self.index.refresh()
+        self.index.save()
+        self.files_cache = []
+        for entry in self.index.iter_entries():
+            path = self.target / entry.path
+            self.files_cache.append(path)
+            if entry.is_dir:
+                self._dir_set.add(path)
+            else:
+                self._file_sizes[path] = entry.size
 
     def _analyze_overview(self) -> Dict:
         """分析目錄概覽"""
-        files = [f for f in self.files_cache if f.is_file()]
-        dirs = [f for f in self.files_cache if f.is_dir()]
+        files = [f for f in self.files_cache if f in self._file_sizes]
+        dirs = [f for f in self.files_cache if f in self._dir_set]
 
         file_types = self._count_file_types(files)
 
@@ -200,11 +219,7 @@ class DirectoryAnalyzer:
         """獲取最大的 N 個檔案"""
         sized_files = []
         for f in files:
-            try:
-                size = f.stat().st_size
-                sized_files.append({"path": str(f.relative_to(self.target)), "size": size})
-            except:
-                pass
+            sized_files.append({"path": str(f.relative_to(self.target)), "size": self._file_sizes[f]})
         return sorted(sized_files, key=lambda x: -x["size"])[:n]
 
     def _get_deepest_paths(self, n: int) -> List[str]:
@@ -307,7 +322,7 @@ class DirectoryAnalyzer:
         }
 
         for file in self.files_cache:
-            if file.is_file():
+            if file in self._file_sizes:
                 name_lower = file.name.lower()
                 for group, kws in keywords.items():
                     if any(kw in name_lower for kw in kws):
@@ -327,7 +342,7 @@ class DirectoryAnalyzer:
     def _detect_root_level_bloat(self) -> List[str]:
         """檢測根層級過多檔案"""
         return [str(f.relative_to(self.target)) for f in self.files_cache
-                if f.is_file() and f.parent == self.target]
+                if f in self._file_sizes and f.parent == self.target]
 
     def _detect_naming_inconsistencies(self) -> List[Dict]:
         """檢測命名不一致"""
@@ -340,7 +355,7 @@ class DirectoryAnalyzer:
 
         issues = []
         for file in self.files_cache:
-            if file.is_file():
+            if file in self._file_sizes:
                 name = file.stem
                 matched_patterns = []
                 for pattern_name, regex in patterns.items():
@@ -361,12 +376,13 @@ class DirectoryAnalyzer:
         if not scratch_path.exists():
             return {}
 
-        files = list(scratch_path.rglob("*"))
-        file_list = [str(f.relative_to(self.target)) for f in files if f.is_file()]
+        file_list = [
+            entry.path for entry in self.index.iter_entries(under="_legacy_scratch") if not entry.is_dir
+        ]
 
         # 檢查是否有子目錄結構
-        has_structure = any(d.is_dir() and d.parent == scratch_path
-                           for d in files if d.name in ["intake", "processing", "analyzed"])
+        has_structure = any((scratch_path / name) in self._dir_set
+                           for name in ["intake", "processing", "analyzed"])
 
         if not has_structure and len(file_list) > 5:
             return {"count": len(file_list), "files": file_list}
@@ -443,7 +459,7 @@ class DirectoryAnalyzer:
         for domain_name, dir_name in domain_patterns.items():
             domain_path = self.target / dir_name
             if domain_path.exists():
-                file_count = len(list(domain_path.rglob("*")))
+                file_count = sum(1 for _ in self.index.iter_entries(under=dir_name))
                 domains.append({
                     "name": domain_name,
                     "path": dir_name,
@@ -466,7 +482,7 @@ class DirectoryAnalyzer:
         references = defaultdict(list)
 
         for file in self.files_cache:
-            if file.is_file() and file.suffix in [".md", ".yaml", ".yml"]:
+            if file in self._file_sizes and file.suffix in [".md", ".yaml", ".yml"]:
                 try:
                     content = file.read_text(encoding='utf-8')
                     # 尋找相對路徑引用
@@ -765,6 +781,13 @@ class Executor:
         self.configs = load_all_configs()
         self.executed_steps = []
         self.backup_dir = self.target / ".refactor_backup" / datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.index = RepoIndex(self.target, exclude_dirs=SCAN_EXCLUDE_DIRS)
+
+    def _scan_files(self, **filters) -> List[Path]:
+        """增量刷新索引並返回檔案路徑（執行步驟後檔案可能已移動）"""
+        self.index.refresh()
+        self.index.save()
+        return [self.index.absolute(entry) for entry in self.index.iter_files(**filters)]
 
     def execute(self, phase_filter: Optional[int] = None) -> Dict:
         """執行計畫"""
@@ -811,10 +834,9 @@ class Executor:
             "files": [],
         }
 
-        for file in self.target.rglob("*"):
-            if file.is_file() and ".refactor_backup" not in str(file):
-                rel_path = file.relative_to(self.target)
-                manifest["files"].append(str(rel_path))
+        for file in self._scan_files():
+            rel_path = file.relative_to(self.target)
+            manifest["files"].append(str(rel_path))
 
         with open(self.backup_dir / "manifest.yaml", 'w', encoding='utf-8') as f:
             yaml.dump(manifest, f, allow_unicode=True)
@@ -920,16 +942,7 @@ class Executor:
 
         # 掃描所有 Markdown 和 YAML 文件
         updated_count = 0
-        for file_path in self.target.rglob("*"):
-            if not file_path.is_file():
-                continue
-
-            if file_path.suffix not in [".md", ".yaml", ".yml"]:
-                continue
-
-            if ".refactor_backup" in str(file_path):
-                continue
-
+        for file_path in self._scan_files(suffixes=[".md", ".yaml", ".yml"]):
             try:
                 content = file_path.read_text(encoding='utf-8')
                 updated_content = content
@@ -975,10 +988,13 @@ class Validator:
     def __init__(self, target_path: str):
         self.target = Path(target_path)
         self.configs = load_all_configs()
+        self.index = RepoIndex(self.target, exclude_dirs=SCAN_EXCLUDE_DIRS)
 
     def validate(self, scope: str = "full") -> Dict:
         """執行驗證"""
         print(f"🔍 驗證中: {scope}")
+        self.index.refresh()
+        self.index.save()
 
         results = {
             "passed": True,
@@ -1028,7 +1044,7 @@ class Validator:
         """驗證引用"""
         errors = []
 
-        for file in self.target.rglob("*.md"):
+        for file in map(self.index.absolute, self.index.iter_files(suffixes=[".md"])):
             try:
                 content = file.read_text(encoding='utf-8')
                 for match in re.finditer(r'\[.*?\]\(([^)]+)\)', content):
@@ -1050,11 +1066,10 @@ class Validator:
         """驗證命名"""
         warnings = []
 
-        for file in self.target.rglob("*"):
-            if file.is_file():
-                name = file.stem
-                if re.search(r'[A-Z]', name) and '_' in name:
-                    warnings.append(f"混合命名風格: {file.relative_to(self.target)}")
+        for file in map(self.index.absolute, self.index.iter_files()):
+            name = file.stem
+            if re.search(r'[A-Z]', name) and '_' in name:
+                warnings.append(f"混合命名風格: {file.relative_to(self.target)}")
 
         return {
             "name": "naming",
@@ -4,23 +4,28 @@
 Scans and categorizes technical debt across the repository
 
 目標：識別並優先處理168個技術債務項目，減少至84個
+
+標記與複雜度由 code_metrics 單次解析取得 (每個 Python 檔案只 tokenize 與
+ast.parse 一次)，結果依內容哈希快取並以多進程並行分析。
 """
 
-import os
-import re
+import argparse
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 import json
 
+from code_metrics import CodeScanner, FileMetrics, FunctionMetrics
+from path_tools.repo_index import RepoIndex
+
 @dataclass
 class DebtItem:
     """技術債務項目"""
     file_path: str
     line_number: int
-    debt_type: str  # TODO, FIXME, XXX, HACK, DEPRECATED
+    debt_type: str  # TODO, FIXME, XXX, HACK, DEPRECATED, HIGH_COMPLEXITY
     severity: str  # HIGH, MEDIUM, LOW
     message: str
     context: str = ""
@@ -33,13 +38,23 @@ class DebtReport:
     by_severity: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
     by_directory: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
     items: List[DebtItem] = field(default_factory=list)
+    functions: List[Tuple[str, FunctionMetrics]] = field(default_factory=list)
 
 class TechDebtScanner:
     """技術債務掃描器"""
 
-    def __init__(self, repo_root: Path):
+    def __init__(
+        self,
+        repo_root: Path,
+        index: Optional[RepoIndex] = None,
+        jobs: Optional[int] = None,
+        use_cache: bool = True,
+    ):
         self.repo_root = repo_root
         self.report = DebtReport()
+        self.index = index or RepoIndex(repo_root)
+        self.jobs = jobs
+        self.use_cache = use_cache
 
         # 要掃描的文件擴展名
         self.extensions = {'.py', '.js', '.ts', '.tsx', '.jsx', '.yaml', '.yml', '.md', '.sh'}
@@ -50,74 +65,51 @@ class TechDebtScanner:
             '.pytest_cache', 'dist', 'build', '.next', 'coverage'
         }
 
-        # 債務標記模式
-        self.debt_patterns = {
-            'TODO': re.compile(r'#\s*TODO\s*:?\s*(.+)', re.IGNORECASE),
-            'FIXME': re.compile(r'#\s*FIXME\s*:?\s*(.+)', re.IGNORECASE),
-            'XXX': re.compile(r'#\s*XXX\s*:?\s*(.+)', re.IGNORECASE),
-            'HACK': re.compile(r'#\s*HACK\s*:?\s*(.+)', re.IGNORECASE),
-            'DEPRECATED': re.compile(r'@deprecated|#\s*DEPRECATED', re.IGNORECASE),
-        }
-
-        # 高複雜度函數模式（Python）
-        self.high_complexity_pattern = re.compile(
-            r'def\s+\w+\([^)]*\).*?(?=\ndef\s|\nclass\s|\Z)',
-            re.DOTALL
-        )
+        # 函數長度閾值（非空、非註釋行）
+        self.max_function_lines = 100
 
     def scan(self) -> DebtReport:
         """掃描整個儲存庫"""
         print("🔍 掃描技術債務...\n")
 
-        for file_path in self._iter_files():
-            self._scan_file(file_path)
+        self.index.refresh()
+        scanner = CodeScanner(self.index, jobs=self.jobs, use_cache=self.use_cache)
+        entries = self.index.iter_files(suffixes=self.extensions, exclude_dirs=self.skip_dirs)
+        for entry, metrics in scanner.scan(entries):
+            self._collect(entry.path, metrics)
+        scanner.save()
+        self.index.save()
 
         self._calculate_summary()
         return self.report
 
-    def _iter_files(self):
-        """遍歷所有要掃描的文件"""
-        for root, dirs, files in os.walk(self.repo_root):
-            # 過濾跳過的目錄
-            dirs[:] = [d for d in dirs if d not in self.skip_dirs]
-
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix in self.extensions:
-                    yield file_path
-
-    def _scan_file(self, file_path: Path):
-        """掃描單個文件"""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-
-            rel_path = str(file_path.relative_to(self.repo_root))
-
-            for line_num, line in enumerate(lines, 1):
-                # 檢查債務標記
-                for debt_type, pattern in self.debt_patterns.items():
-                    match = pattern.search(line)
-                    if match:
-                        message = match.group(1) if match.lastindex else line.strip()
-                        severity = self._determine_severity(debt_type, message)
-
-                        item = DebtItem(
-                            file_path=rel_path,
-                            line_number=line_num,
-                            debt_type=debt_type,
-                            severity=severity,
-                            message=message.strip(),
-                            context=line.strip()
-                        )
-                        self.report.items.append(item)
-
-            # 檢查高複雜度函數（僅Python）
-            if file_path.suffix == '.py':
-                self._check_complexity(file_path, ''.join(lines))
-
-        except Exception as e:
-            print(f"⚠️  掃描 {file_path} 失敗: {e}")
+    def _collect(self, rel_path: str, metrics: FileMetrics):
+        """將單個文件的度量轉為債務項目"""
+        for hit in metrics.markers:
+            self.report.items.append(DebtItem(
+                file_path=rel_path,
+                line_number=hit.line_number,
+                debt_type=hit.debt_type,
+                severity=self._determine_severity(hit.debt_type, hit.message),
+                message=hit.message,
+                context=hit.context
+            ))
+
+        # 檢查高複雜度函數（僅Python）
+        for func in metrics.functions:
+            self.report.functions.append((rel_path, func))
+            if func.length > self.max_function_lines:
+                self.report.items.append(DebtItem(
+                    file_path=rel_path,
+                    line_number=func.line_start,
+                    debt_type="HIGH_COMPLEXITY",
+                    severity="MEDIUM",
+                    message=(
+                        f"Function '{func.name}' has {func.length} lines "
+                        f"(threshold: {self.max_function_lines})"
+                    ),
+                    context=f"def {func.name}(...)"
+                ))
 
     def _determine_severity(self, debt_type: str, message: str) -> str:
         """確定嚴重程度"""
@@ -137,37 +129,6 @@ class TechDebtScanner:
         else:
             return "LOW"
 
-    def _check_complexity(self, file_path: Path, content: str):
-        """檢查函數複雜度"""
-        rel_path = str(file_path.relative_to(self.repo_root))
-
-        # 簡化版複雜度檢查：函數行數
-        functions = re.findall(r'def\s+(\w+)\([^)]*\):', content)
-
-        for func_name in functions:
-            # 查找函數體
-            func_pattern = re.compile(
-                rf'def\s+{re.escape(func_name)}\([^)]*\):(.+?)(?=\ndef\s|\nclass\s|\Z)',
-                re.DOTALL
-            )
-            match = func_pattern.search(content)
-
-            if match:
-                func_body = match.group(1)
-                lines = len([l for l in func_body.split('\n') if l.strip() and not l.strip().startswith('#')])
-
-                # 如果函數超過100行，標記為高複雜度
-                if lines > 100:
-                    item = DebtItem(
-                        file_path=rel_path,
-                        line_number=content[:match.start()].count('\n') + 1,
-                        debt_type="HIGH_COMPLEXITY",
-                        severity="MEDIUM",
-                        message=f"Function '{func_name}' has {lines} lines (threshold: 100)",
-                        context=f"def {func_name}(...)"
-                    )
-                    self.report.items.append(item)
-
     def _calculate_summary(self):
         """計算摘要統計"""
         self.report.total_items = len(self.report.items)
@@ -214,6 +175,35 @@ class TechDebtScanner:
                 for item in medium_priority[:30]  # 前30個
             ],
             "low_priority_count": len(low_priority),
+            "complexity": self._complexity_summary(),
+        }
+
+    def _complexity_summary(self, top: int = 20) -> Dict:
+        """函數複雜度摘要（與債務標記同一次解析取得）"""
+        functions = self.report.functions
+
+        def rows(key):
+            ranked = sorted(functions, key=lambda item: -getattr(item[1], key))[:top]
+            return [
+                {
+                    "file": path,
+                    "line": func.line_start,
+                    "function": func.qualname,
+                    "cyclomatic": func.cyclomatic,
+                    "cognitive": func.cognitive,
+                    "length": func.length,
+                    "nesting_depth": func.nesting_depth,
+                }
+                for path, func in ranked
+            ]
+
+        count = len(functions)
+        return {
+            "total_functions": count,
+            "average_cyclomatic": round(sum(f.cyclomatic for _, f in functions) / count, 2) if count else 0,
+            "average_cognitive": round(sum(f.cognitive for _, f in functions) / count, 2) if count else 0,
+            "top_cyclomatic": rows("cyclomatic"),
+            "top_cognitive": rows("cognitive"),
         }
 
     def print_summary(self):
@@ -239,6 +229,12 @@ class TechDebtScanner:
         for directory, count in top_dirs:
             print(f"  {directory:30} {count:4}")
 
+        if self.report.functions:
+            print("\n認知複雜度最高的函數 (Top 5):")
+            ranked = sorted(self.report.functions, key=lambda item: -item[1].cognitive)[:5]
+            for path, func in ranked:
+                print(f"  {func.cognitive:4} (CC {func.cyclomatic:3})  {path}:{func.line_start} {func.qualname}")
+
         print("\n" + "="*70)
 
         # 顯示高優先級項目
@@ -253,9 +249,14 @@ class TechDebtScanner:
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description="技術債務與複雜度掃描")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="並行進程數 (預設為 CPU 核心數)")
+    parser.add_argument("--no-cache", action="store_true", help="停用內容哈希結果快取")
+    args = parser.parse_args()
+
     repo_root = Path(__file__).parent.parent
 
-    scanner = TechDebtScanner(repo_root)
+    scanner = TechDebtScanner(repo_root, jobs=args.jobs, use_cache=not args.no_cache)
     scanner.scan()
 
     # 打印摘要